@@ -0,0 +1,321 @@
+import copy
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from opencontext_py.apps.all_items import configs
+from opencontext_py.apps.all_items.models import (
+    AllManifest,
+    AllAssertion,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------
+# NOTE: These functions keep an in-process graph of the SKOS / OWL
+# (and part-of and containment) concept hierarchy relations between
+# predicates, types, classes, properties and vocabularies.
+#
+# Walking these hierarchies one immediate parent at a time costs a
+# redis or database request per node, and the indexer does this for
+# every predicate and type of every document. Instead, we load all the
+# hierarchy relations (and the manifest objects in them) once per
+# process, give each node an integer id, and memoize the parent paths
+# of each node. Path queries then don't need any I/O.
+#
+# The graph has a version number kept in the cache. Editorial changes
+# to hierarchy assertions bump the version, and processes check
+# the version (at most every CONCEPT_GRAPH_CHECK_INTERVAL seconds) to
+# decide if they need to reload the graph.
+#
+# We don't load the relations of items with the item types in
+# CONCEPT_GRAPH_EXCLUDE_ITEM_TYPES (like spatial containment of
+# subjects), since those would make the graph enormous. Hierarchy
+# functions fall back to the old (cached) walks for those items.
+# ---------------------------------------------------------------------
+
+CONCEPT_GRAPH_VERSION_CACHE = 'redis'
+CONCEPT_GRAPH_VERSION_KEY = 'concept-graph-version'
+
+# Seconds between checks of the graph version in the cache.
+CONCEPT_GRAPH_CHECK_INTERVAL = 60
+# Seconds before we reload the graph anyway, to pick up hierarchy
+# relations that got loaded outside of the editorial updaters.
+if settings.DEBUG:
+    CONCEPT_GRAPH_MAX_AGE = 60 * 10 # 10 minutes
+else:
+    CONCEPT_GRAPH_MAX_AGE = 60 * 60 * 6 # 6 hours
+
+# Don't load hierarchy relations for children of these item types.
+CONCEPT_GRAPH_EXCLUDE_ITEM_TYPES = [
+    'subjects',
+    'media',
+    'documents',
+    'persons',
+    'tables',
+    'projects',
+]
+
+CONCEPT_GRAPH_PREDICATE_IDS = (
+    configs.PREDICATE_LIST_SBJ_IS_SUPER_OF_OBJ
+    + configs.PREDICTATE_LIST_CONTEXT_SBJ_IS_SUPER_OF_OBJ
+    + configs.PREDICATE_LIST_SBJ_IS_SUBORD_OF_OBJ
+)
+
+# Number of manifest objects to get in each query when loading
+# the graph.
+CONCEPT_GRAPH_LOAD_CHUNK_SIZE = 5000
+
+_CONCEPT_GRAPH = None
+_CONCEPT_GRAPH_CHECKED = 0
+_CONCEPT_GRAPH_LOCK = threading.Lock()
+
+
+# ---------------------------------------------------------------------
+# testing
+"""
+from opencontext_py.apps.all_items.models import AllManifest
+from opencontext_py.apps.all_items import concept_graph
+man_obj = AllManifest.objects.filter(
+    item_type='class',
+    label__icontains='bos taurus'
+).exclude(uri__contains='eol.org').first()
+graph = concept_graph.get_concept_graph()
+paths = graph.get_parent_obj_paths(man_obj.uuid)
+"""
+# ---------------------------------------------------------------------
+
+
+class ConceptGraph():
+    """An in-memory graph of concept hierarchy relations"""
+
+    def __init__(self, version=None):
+        self.version = version
+        self.loaded = time.time()
+        self.node_ids = {}  # Integer node ids, keyed by string uuid
+        self.node_uuids = []  # String uuids, by integer node id
+        self.node_objs = []  # AllManifest objects, by integer node id
+        self.parents = []  # Lists of parent node ids, by node id
+        self.children = []  # Lists of child node ids, by node id
+        self._parent_paths = {}  # Memo of parent paths, by node id
+
+    def get_node_id(self, uuid, add=False):
+        """Gets (or adds) the integer node id for a uuid"""
+        uuid = str(uuid)
+        node_id = self.node_ids.get(uuid)
+        if node_id is not None or not add:
+            return node_id
+        node_id = len(self.node_uuids)
+        self.node_ids[uuid] = node_id
+        self.node_uuids.append(uuid)
+        self.node_objs.append(None)
+        self.parents.append([])
+        self.children.append([])
+        return node_id
+
+    def add_relation(self, child_uuid, parent_uuid):
+        """Adds a child to parent relation"""
+        child_id = self.get_node_id(child_uuid, add=True)
+        parent_id = self.get_node_id(parent_uuid, add=True)
+        if child_id == parent_id:
+            return None
+        if parent_id not in self.parents[child_id]:
+            self.parents[child_id].append(parent_id)
+        if child_id not in self.children[parent_id]:
+            self.children[parent_id].append(child_id)
+
+    def load(self):
+        """Loads the hierarchy relations and manifest objects"""
+        assert_qs = AllAssertion.objects.filter(
+            predicate_id__in=CONCEPT_GRAPH_PREDICATE_IDS,
+        ).values_list(
+            'subject_id',
+            'predicate_id',
+            'object_id',
+            'subject__item_type',
+            'object__item_type',
+        )
+        super_pred_ids = set(
+            configs.PREDICATE_LIST_SBJ_IS_SUPER_OF_OBJ
+            + configs.PREDICTATE_LIST_CONTEXT_SBJ_IS_SUPER_OF_OBJ
+        )
+        super_relations = []
+        subord_relations = []
+        for subject_id, predicate_id, object_id, subj_type, obj_type in assert_qs.iterator():
+            if str(predicate_id) in super_pred_ids:
+                if obj_type in CONCEPT_GRAPH_EXCLUDE_ITEM_TYPES:
+                    continue
+                super_relations.append((object_id, subject_id,))
+            else:
+                if subj_type in CONCEPT_GRAPH_EXCLUDE_ITEM_TYPES:
+                    continue
+                subord_relations.append((subject_id, object_id,))
+        # NOTE: Like models_utils.get_immediate_concept_parent_objs_db,
+        # parents from "super" relations come before parents from
+        # "subordinate" relations.
+        for child_uuid, parent_uuid in (super_relations + subord_relations):
+            self.add_relation(child_uuid, parent_uuid)
+        self.load_node_objs()
+        logger.info(
+            f'Loaded concept graph (version {self.version}) with '
+            f'{len(self.node_uuids)} nodes'
+        )
+
+    def load_node_objs(self):
+        """Loads the manifest objects for all the nodes"""
+        for i in range(0, len(self.node_uuids), CONCEPT_GRAPH_LOAD_CHUNK_SIZE):
+            chunk = self.node_uuids[i:(i + CONCEPT_GRAPH_LOAD_CHUNK_SIZE)]
+            m_qs = AllManifest.objects.filter(
+                uuid__in=chunk
+            ).select_related(
+                'context'
+            )
+            for man_obj in m_qs:
+                self.node_objs[self.node_ids[str(man_obj.uuid)]] = man_obj
+
+    def get_parent_id_paths(self, node_id):
+        """Gets a tuple of parent paths (tuples of node ids, from the
+        immediate parent to the most general concept) for a node"""
+        paths = self._parent_paths.get(node_id)
+        if paths is not None:
+            return paths
+        paths = self._make_parent_id_paths(node_id, visited=(node_id,))
+        self._parent_paths[node_id] = paths
+        return paths
+
+    def _make_parent_id_paths(self, node_id, visited):
+        """Makes parent paths for a node, avoiding cycles"""
+        paths = []
+        for parent_id in self.parents[node_id]:
+            if parent_id in visited:
+                # Don't loop around in a cycle.
+                continue
+            parent_paths = self._parent_paths.get(parent_id)
+            if (
+                parent_paths is None
+                or any(i in visited for p in parent_paths for i in p)
+            ):
+                parent_paths = self._make_parent_id_paths(
+                    parent_id,
+                    visited=(visited + (parent_id,)),
+                )
+            if not parent_paths:
+                paths.append((parent_id,))
+                continue
+            for parent_path in parent_paths:
+                paths.append((parent_id,) + parent_path)
+        return tuple(paths)
+
+    def get_parent_obj_paths(self, uuid):
+        """Gets a list of parent paths (lists of AllManifest objects, from
+        the immediate parent to the most general concept) for a uuid
+
+        returns a list of lists, or None if a path has a node without
+            a manifest object
+        """
+        node_id = self.get_node_id(uuid)
+        if node_id is None:
+            return []
+        paths = []
+        for id_path in self.get_parent_id_paths(node_id):
+            path = [self.node_objs[i] for i in id_path]
+            if None in path:
+                return None
+            # Copy the objects, because callers may add attributes
+            # (like alt_label) to them.
+            paths.append([copy.copy(obj) for obj in path])
+        return paths
+
+    def get_descendant_objs(self, uuid):
+        """Gets a list of the AllManifest objects that are descendants
+        of a uuid, in depth first order"""
+        node_id = self.get_node_id(uuid)
+        if node_id is None:
+            return []
+        descendant_ids = []
+        seen = {node_id}
+        stack = list(reversed(self.children[node_id]))
+        while stack:
+            act_id = stack.pop()
+            if act_id in seen:
+                continue
+            seen.add(act_id)
+            descendant_ids.append(act_id)
+            stack += list(reversed(self.children[act_id]))
+        return [
+            self.node_objs[i] for i in descendant_ids
+            if self.node_objs[i] is not None
+        ]
+
+
+def get_concept_graph_version():
+    """Gets the current concept graph version from the cache"""
+    cache = caches[CONCEPT_GRAPH_VERSION_CACHE]
+    try:
+        return cache.get(CONCEPT_GRAPH_VERSION_KEY)
+    except:
+        return None
+
+
+def bump_concept_graph_version():
+    """Bumps the concept graph version, so processes reload their
+    concept graphs"""
+    global _CONCEPT_GRAPH_CHECKED
+    # Use the current time (in milliseconds) so a lost version key
+    # can't come back with an older version number.
+    version = int(time.time() * 1000)
+    cache = caches[CONCEPT_GRAPH_VERSION_CACHE]
+    try:
+        cache.set(CONCEPT_GRAPH_VERSION_KEY, version, timeout=None)
+    except:
+        logger.info('Cache failure bumping the concept graph version')
+    # Make sure this process checks for the new version.
+    _CONCEPT_GRAPH_CHECKED = 0
+    return version
+
+
+def check_item_in_concept_graph(man_obj):
+    """Checks if an item's hierarchy relations are in the concept graph"""
+    return man_obj.item_type not in CONCEPT_GRAPH_EXCLUDE_ITEM_TYPES
+
+
+def get_concept_graph():
+    """Gets this process' concept graph, loading (or reloading) it
+    if needed"""
+    global _CONCEPT_GRAPH
+    global _CONCEPT_GRAPH_CHECKED
+    now = time.time()
+    graph = _CONCEPT_GRAPH
+    if (
+        graph is not None
+        and (now - _CONCEPT_GRAPH_CHECKED) < CONCEPT_GRAPH_CHECK_INTERVAL
+    ):
+        return graph
+    with _CONCEPT_GRAPH_LOCK:
+        graph = _CONCEPT_GRAPH
+        version = get_concept_graph_version()
+        _CONCEPT_GRAPH_CHECKED = now
+        if (
+            graph is not None
+            and graph.version == version
+            and (now - graph.loaded) < CONCEPT_GRAPH_MAX_AGE
+        ):
+            return graph
+        graph = ConceptGraph(version=version)
+        graph.load()
+        _CONCEPT_GRAPH = graph
+    return graph
+
+
+def reset_concept_graph():
+    """Forgets this process' concept graph"""
+    global _CONCEPT_GRAPH
+    global _CONCEPT_GRAPH_CHECKED
+    with _CONCEPT_GRAPH_LOCK:
+        _CONCEPT_GRAPH = None
+        _CONCEPT_GRAPH_CHECKED = 0
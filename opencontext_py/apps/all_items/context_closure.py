@@ -0,0 +1,518 @@
+from django.db import connection, transaction
+
+from opencontext_py.apps.all_items import configs
+from opencontext_py.apps.all_items.models import (
+    AllManifest,
+    AllContextClosure,
+)
+
+
+# ---------------------------------------------------------------------
+# NOTE: These functions maintain and query the AllContextClosure table,
+# a closure table of the spatial context hierarchy of "subjects" items.
+#
+# The closure table gives us all the ancestors (or all descendants) of
+# an item in one indexed query, instead of walking up (or down) the
+# hierarchy one .context at a time. When a context gets moved (gets a
+# new parent), we update the closure rows for the whole subtree with
+# two set based SQL statements. When a context gets relabeled or moved,
+# we update the paths of all of its descendants with one recursive SQL
+# UPDATE, rather than saving every descendant item one at a time.
+#
+# Data loaded outside of the editorial updaters (like ETL imports)
+# should be followed by rebuild_context_closure(). Query functions
+# return None for items missing from the closure table, or for items
+# with closure rows that don't match the .context hierarchy (like items
+# moved by ETL loads), so callers can fall back to walking the
+# hierarchy.
+# ---------------------------------------------------------------------
+
+CLOSURE_TABLE = AllContextClosure._meta.db_table
+MANIFEST_TABLE = AllManifest._meta.db_table
+
+
+SQL_DELETE_ALL_CLOSURE = f'DELETE FROM {CLOSURE_TABLE};'
+
+SQL_REBUILD_CLOSURE = f"""
+INSERT INTO {CLOSURE_TABLE} (ancestor_uuid, descendant_uuid, depth)
+WITH RECURSIVE chain AS (
+    SELECT
+        m.uuid AS ancestor_uuid,
+        m.uuid AS descendant_uuid,
+        0 AS depth
+    FROM {MANIFEST_TABLE} AS m
+    WHERE m.item_type = 'subjects'
+
+    UNION ALL
+
+    SELECT
+        parent.uuid AS ancestor_uuid,
+        chain.descendant_uuid,
+        chain.depth + 1 AS depth
+    FROM chain
+    JOIN {MANIFEST_TABLE} AS child ON child.uuid = chain.ancestor_uuid
+    JOIN {MANIFEST_TABLE} AS parent ON parent.uuid = child.context_uuid
+    WHERE parent.item_type = 'subjects'
+      AND parent.uuid <> child.uuid
+      AND NOT (child.uuid::text = ANY(%(roots)s))
+      AND chain.depth < %(max_depth)s
+)
+SELECT ancestor_uuid, descendant_uuid, MIN(depth)
+FROM chain
+GROUP BY ancestor_uuid, descendant_uuid;
+"""
+
+SQL_INSERT_SELF_CLOSURE = f"""
+INSERT INTO {CLOSURE_TABLE} (ancestor_uuid, descendant_uuid, depth)
+VALUES (%(uuid)s, %(uuid)s, 0)
+ON CONFLICT (ancestor_uuid, descendant_uuid) DO NOTHING;
+"""
+
+# Removes the links between the subtree of an item (the item and its
+# descendants) and the item's old ancestors.
+SQL_DETACH_SUBTREE_CLOSURE = f"""
+DELETE FROM {CLOSURE_TABLE} AS link
+USING {CLOSURE_TABLE} AS sub
+WHERE sub.ancestor_uuid = %(uuid)s
+  AND link.descendant_uuid = sub.descendant_uuid
+  AND link.ancestor_uuid NOT IN (
+      SELECT descendant_uuid
+      FROM {CLOSURE_TABLE}
+      WHERE ancestor_uuid = %(uuid)s
+  );
+"""
+
+# Links the subtree of an item to all the ancestors of the item's
+# (new) parent context, including the parent itself.
+SQL_ATTACH_SUBTREE_CLOSURE = f"""
+INSERT INTO {CLOSURE_TABLE} (ancestor_uuid, descendant_uuid, depth)
+SELECT
+    sup.ancestor_uuid,
+    sub.descendant_uuid,
+    sup.depth + sub.depth + 1
+FROM {CLOSURE_TABLE} AS sup
+CROSS JOIN {CLOSURE_TABLE} AS sub
+WHERE sup.descendant_uuid = %(parent_uuid)s
+  AND sub.ancestor_uuid = %(uuid)s
+ON CONFLICT (ancestor_uuid, descendant_uuid) DO NOTHING;
+"""
+
+# Finds an item and all of its context ancestors by walking up the
+# manifest .context hierarchy, following the same rules as
+# SQL_REBUILD_CLOSURE.
+SQL_ITEM_CHAIN_CTE = f"""
+item_chain AS (
+    SELECT
+        m.uuid,
+        m.context_uuid,
+        0 AS depth
+    FROM {MANIFEST_TABLE} AS m
+    WHERE m.uuid = %(uuid)s
+      AND m.item_type = 'subjects'
+
+    UNION ALL
+
+    SELECT
+        parent.uuid,
+        parent.context_uuid,
+        item_chain.depth + 1 AS depth
+    FROM item_chain
+    JOIN {MANIFEST_TABLE} AS parent ON parent.uuid = item_chain.context_uuid
+    WHERE parent.item_type = 'subjects'
+      AND parent.uuid <> item_chain.uuid
+      AND NOT (item_chain.uuid::text = ANY(%(roots)s))
+      AND item_chain.depth < %(max_depth)s
+)
+"""
+
+# Removes the closure rows (as descendants) of an item and all of its
+# context ancestors.
+SQL_DELETE_ITEM_CHAIN_CLOSURE = f"""
+WITH RECURSIVE {SQL_ITEM_CHAIN_CTE}
+DELETE FROM {CLOSURE_TABLE}
+WHERE descendant_uuid IN (SELECT uuid FROM item_chain);
+"""
+
+# Adds the closure rows (as descendants) of an item and all of its
+# context ancestors.
+SQL_INSERT_ITEM_CHAIN_CLOSURE = f"""
+INSERT INTO {CLOSURE_TABLE} (ancestor_uuid, descendant_uuid, depth)
+WITH RECURSIVE {SQL_ITEM_CHAIN_CTE},
+chain AS (
+    SELECT
+        item_chain.uuid AS ancestor_uuid,
+        item_chain.uuid AS descendant_uuid,
+        0 AS depth
+    FROM item_chain
+
+    UNION ALL
+
+    SELECT
+        parent.uuid AS ancestor_uuid,
+        chain.descendant_uuid,
+        chain.depth + 1 AS depth
+    FROM chain
+    JOIN {MANIFEST_TABLE} AS child ON child.uuid = chain.ancestor_uuid
+    JOIN {MANIFEST_TABLE} AS parent ON parent.uuid = child.context_uuid
+    WHERE parent.item_type = 'subjects'
+      AND parent.uuid <> child.uuid
+      AND NOT (child.uuid::text = ANY(%(roots)s))
+      AND chain.depth < %(max_depth)s
+)
+SELECT ancestor_uuid, descendant_uuid, MIN(depth)
+FROM chain
+GROUP BY ancestor_uuid, descendant_uuid
+ON CONFLICT (ancestor_uuid, descendant_uuid) DO NOTHING;
+"""
+
+# Updates the paths of all the subjects descendants of an item, using
+# the item's (already saved) path. This follows the same rules as
+# AllManifest.make_subjects_path_and_validate().
+SQL_UPDATE_DESCENDANT_PATHS = f"""
+WITH RECURSIVE sub AS (
+    SELECT
+        m.uuid,
+        (%(path)s || '/' || REPLACE(m.label, '''', '`')) AS new_path,
+        1 AS depth
+    FROM {MANIFEST_TABLE} AS m
+    WHERE m.context_uuid = %(uuid)s
+      AND m.uuid <> %(uuid)s
+      AND m.item_type = 'subjects'
+
+    UNION ALL
+
+    SELECT
+        m.uuid,
+        (sub.new_path || '/' || REPLACE(m.label, '''', '`')) AS new_path,
+        sub.depth + 1 AS depth
+    FROM {MANIFEST_TABLE} AS m
+    JOIN sub ON m.context_uuid = sub.uuid
+    WHERE m.uuid <> sub.uuid
+      AND m.item_type = 'subjects'
+      AND sub.depth < %(max_depth)s
+)
+UPDATE {MANIFEST_TABLE} AS m
+SET path = sub.new_path, updated = NOW()
+FROM sub
+WHERE m.uuid = sub.uuid
+  AND m.path IS DISTINCT FROM sub.new_path;
+"""
+
+
+# ---------------------------------------------------------------------
+# testing
+"""
+from opencontext_py.apps.all_items.models import AllManifest
+from opencontext_py.apps.all_items import context_closure
+context_closure.rebuild_context_closure()
+man_obj = AllManifest.objects.get(slug='24-catalhoyuk-east')
+ancestors = context_closure.get_context_ancestors(man_obj)
+descendants_qs = context_closure.get_context_descendants_qs(man_obj)
+depth = context_closure.get_context_depth(man_obj)
+"""
+# ---------------------------------------------------------------------
+
+
+def get_uuid(man_obj_or_uuid):
+    """Gets a string uuid for a manifest object or a uuid"""
+    if isinstance(man_obj_or_uuid, AllManifest):
+        return str(man_obj_or_uuid.uuid)
+    return str(man_obj_or_uuid)
+
+
+def rebuild_context_closure():
+    """Rebuilds the whole context closure table from the manifest
+
+    returns the number of closure rows
+    """
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(SQL_DELETE_ALL_CLOSURE)
+            cursor.execute(
+                SQL_REBUILD_CLOSURE,
+                {
+                    'roots': configs.DEFAULT_SUBJECTS_ROOTS,
+                    'max_depth': configs.MAX_HIERARCHY_DEPTH,
+                }
+            )
+            row_count = cursor.rowcount
+    print(f'Rebuilt context closure with {row_count} rows')
+    return row_count
+
+
+def rebuild_context_closure_for_item_chain(man_obj_or_uuid):
+    """Rebuilds the context closure rows of a subjects item and all of
+    its context ancestors, walking up the manifest .context hierarchy
+
+    :param AllManifest man_obj_or_uuid: An AllManifest object or uuid
+    """
+    params = {
+        'uuid': get_uuid(man_obj_or_uuid),
+        'roots': configs.DEFAULT_SUBJECTS_ROOTS,
+        'max_depth': configs.MAX_HIERARCHY_DEPTH,
+    }
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(SQL_DELETE_ITEM_CHAIN_CLOSURE, params)
+            cursor.execute(SQL_INSERT_ITEM_CHAIN_CLOSURE, params)
+
+
+def update_context_closure_for_item(man_obj):
+    """Adds (or moves) a subjects item and all its descendants in the
+    context closure table, after the item got added or got a new parent
+    context
+
+    :param AllManifest man_obj: A subjects item, already saved with its
+        (new) context
+    """
+    if man_obj.item_type != 'subjects':
+        return None
+    uuid = str(man_obj.uuid)
+    params = {
+        'uuid': uuid,
+        'parent_uuid': str(man_obj.context_id),
+    }
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(SQL_INSERT_SELF_CLOSURE, params)
+            cursor.execute(SQL_DETACH_SUBTREE_CLOSURE, params)
+            if (
+                uuid in configs.DEFAULT_SUBJECTS_ROOTS
+                or man_obj.context.item_type != 'subjects'
+                or str(man_obj.context_id) == uuid
+            ):
+                # Roots don't have ancestors.
+                return None
+            if get_context_ancestors(man_obj.context_id) is None:
+                # The parent is missing from the closure table (like a
+                # parent made by an ETL load), or its rows are stale, so
+                # rebuild the rows of the parent's ancestor chain before
+                # we copy them to the subtree.
+                rebuild_context_closure_for_item_chain(man_obj.context_id)
+            cursor.execute(SQL_ATTACH_SUBTREE_CLOSURE, params)
+
+
+def update_subjects_descendant_paths(man_obj):
+    """Updates the paths of all the subjects descendants of an item,
+    after the item got relabeled or moved
+
+    :param AllManifest man_obj: A subjects item, already saved with
+        its new path
+
+    returns the number of descendant items with changed paths
+    """
+    if man_obj.item_type != 'subjects':
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(
+            SQL_UPDATE_DESCENDANT_PATHS,
+            {
+                'uuid': str(man_obj.uuid),
+                'path': man_obj.path or '',
+                'max_depth': configs.MAX_HIERARCHY_DEPTH,
+            }
+        )
+        return cursor.rowcount
+
+
+def check_closure_chain(uuid, chain):
+    """Checks that the closure rows of an item still match the .context
+    hierarchy in the manifest
+
+    Items saved or moved outside of the editorial updaters (like by ETL
+    loads) may be missing closure rows for some ancestors, or may have
+    stale rows. We only trust closure rows that make an unbroken chain
+    up to a root.
+
+    :param str uuid: The uuid of the item
+    :param list chain: A list of (depth, ancestor_uuid,
+        ancestor_context_uuid, ancestor_context_item_type) tuples for
+        all the closure rows of the item, ordered by depth
+
+    returns a boolean
+    """
+    if not chain or chain[0][1] != uuid:
+        return False
+    for i, (depth, ancestor_uuid, context_uuid, context_item_type) in enumerate(chain):
+        if depth != i:
+            return False
+        if (i + 1) < len(chain):
+            if chain[i + 1][1] != context_uuid:
+                # The next ancestor is not the parent context of
+                # this ancestor.
+                return False
+            continue
+        # The last (most general) ancestor must be a root.
+        return (
+            ancestor_uuid in configs.DEFAULT_SUBJECTS_ROOTS
+            or context_item_type != 'subjects'
+            or context_uuid == ancestor_uuid
+        )
+    return False
+
+
+def get_context_ancestors(man_obj_or_uuid, include_self=False, exclude_roots=True):
+    """Gets a list of the context ancestors of a subjects item, ordered
+    from the immediate parent to the most general context
+
+    :param AllManifest man_obj_or_uuid: An AllManifest object or uuid
+    :param bool include_self: Include the item itself (first in the list)
+    :param bool exclude_roots: Exclude the subjects root items
+
+    returns a list of AllManifest objects, or None if the item is not
+        in the context closure table (or its closure rows don't match
+        the .context hierarchy)
+    """
+    uuid = get_uuid(man_obj_or_uuid)
+    closure_qs = AllContextClosure.objects.filter(
+        descendant_id=uuid,
+    ).select_related(
+        'ancestor'
+    ).select_related(
+        'ancestor__item_class'
+    ).select_related(
+        'ancestor__context'
+    ).order_by('depth')
+    closure_objs = [c for c in closure_qs]
+    chain = [
+        (
+            c.depth,
+            str(c.ancestor_id),
+            str(c.ancestor.context_id),
+            (c.ancestor.context.item_type if c.ancestor.context else None),
+        )
+        for c in closure_objs
+    ]
+    if not check_closure_chain(uuid, chain):
+        return None
+    ancestors = []
+    for closure_obj in closure_objs:
+        if not include_self and closure_obj.depth == 0:
+            continue
+        if exclude_roots and str(closure_obj.ancestor_id) in configs.DEFAULT_SUBJECTS_ROOTS:
+            continue
+        ancestors.append(closure_obj.ancestor)
+    return ancestors
+
+
+def get_context_ancestor_uuids_dict(uuids, include_self=False, exclude_roots=True):
+    """Gets a dict, keyed by item uuid, of lists of ancestor uuids
+    (ordered from immediate parent to the most general context) in one
+    query
+
+    :param list uuids: A list of uuids of subjects items
+    :param bool include_self: Include the item itself (first in the lists)
+    :param bool exclude_roots: Exclude the subjects root items
+
+    returns a dict. Items not in the closure table (or with closure rows
+        that don't match the .context hierarchy) are missing from the
+        output dict.
+    """
+    closure_qs = AllContextClosure.objects.filter(
+        descendant_id__in=uuids,
+    ).order_by(
+        'descendant', 'depth'
+    ).values_list(
+        'descendant_id',
+        'depth',
+        'ancestor_id',
+        'ancestor__context_id',
+        'ancestor__context__item_type',
+    )
+    chains = {}
+    for descendant_id, depth, ancestor_id, context_id, context_item_type in closure_qs:
+        chains.setdefault(str(descendant_id), []).append(
+            (depth, str(ancestor_id), str(context_id), context_item_type,)
+        )
+    ancestors_dict = {}
+    for uuid, chain in chains.items():
+        if not check_closure_chain(uuid, chain):
+            continue
+        ancestors_dict[uuid] = [
+            ancestor_id for depth, ancestor_id, _, _ in chain
+            if (include_self or depth > 0)
+            and not (exclude_roots and ancestor_id in configs.DEFAULT_SUBJECTS_ROOTS)
+        ]
+    return ancestors_dict
+
+
+def get_context_ancestors_dict(uuids, include_self=False, exclude_roots=True):
+    """Gets a dict, keyed by item uuid, of lists of ancestor AllManifest
+    objects (ordered from immediate parent to the most general context)
+    in two queries, for many items at once
+
+    :param list uuids: A list of uuids of subjects items
+    :param bool include_self: Include the item itself (first in the lists)
+    :param bool exclude_roots: Exclude the subjects root items
+
+    returns a dict. Items not in the closure table (or with closure rows
+        that don't match the .context hierarchy) are missing from the
+        output dict.
+    """
+    ancestor_uuids_dict = get_context_ancestor_uuids_dict(
+        [str(uuid) for uuid in uuids],
+        include_self=include_self,
+        exclude_roots=exclude_roots,
+    )
+    all_ancestor_uuids = {
+        ancestor_uuid
+        for ancestor_uuids in ancestor_uuids_dict.values()
+        for ancestor_uuid in ancestor_uuids
+    }
+    if not all_ancestor_uuids:
+        return {uuid: [] for uuid in ancestor_uuids_dict.keys()}
+    man_objs_dict = {
+        str(m.uuid): m
+        for m in AllManifest.objects.filter(
+            uuid__in=list(all_ancestor_uuids)
+        ).select_related(
+            'item_class'
+        ).select_related(
+            'context'
+        )
+    }
+    ancestors_dict = {}
+    for uuid, ancestor_uuids in ancestor_uuids_dict.items():
+        if not all(a in man_objs_dict for a in ancestor_uuids):
+            continue
+        ancestors_dict[uuid] = [man_objs_dict[a] for a in ancestor_uuids]
+    return ancestors_dict
+
+
+def get_context_descendants_qs(man_obj_or_uuid, max_depth=None, include_self=False):
+    """Gets a queryset of the context descendants of a subjects item
+
+    :param AllManifest man_obj_or_uuid: An AllManifest object or uuid
+    :param int max_depth: The maximum depth of descendants (1 for
+        immediate children only). None for no limit.
+    :param bool include_self: Include the item itself
+    """
+    uuid = get_uuid(man_obj_or_uuid)
+    closure_qs = AllContextClosure.objects.filter(
+        ancestor_id=uuid,
+    )
+    if not include_self:
+        closure_qs = closure_qs.filter(depth__gt=0)
+    if max_depth is not None:
+        closure_qs = closure_qs.filter(depth__lte=max_depth)
+    return AllManifest.objects.filter(
+        uuid__in=closure_qs.values('descendant_id')
+    )
+
+
+def get_context_depth(man_obj_or_uuid):
+    """Gets the depth of a subjects item below its subjects root
+
+    :param AllManifest man_obj_or_uuid: An AllManifest object or uuid
+
+    returns an integer depth, or None if the item is not in the
+        context closure table
+    """
+    uuid = get_uuid(man_obj_or_uuid)
+    depths = AllContextClosure.objects.filter(
+        descendant_id=uuid,
+    ).values_list('depth', flat=True)
+    depths = [d for d in depths]
+    if not depths:
+        return None
+    return max(depths)
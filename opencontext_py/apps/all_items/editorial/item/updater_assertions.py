@@ -14,8 +14,10 @@ from opencontext_py.apps.all_items.models import (
     AllAssertion,
 )
 
+from opencontext_py.apps.all_items import concept_graph
 from opencontext_py.apps.all_items import permissions
 from opencontext_py.apps.all_items.editorial.item import updater_general
+from opencontext_py.apps.all_items.representations import rep_cache
 
 
 
@@ -86,6 +88,16 @@ PROJECT_SORT_CACHE_LIFE = 60 * 60  # 60 minutes (1 hour)
 PROJECT_SORT_CHUNK_SIZE = 20
 
 
+def bump_concept_graph_for_hierarchy_assertions(assert_objs):
+    """Bumps the concept graph version if any of the assertions
+    are concept hierarchy relations"""
+    for assert_obj in assert_objs:
+        if str(assert_obj.predicate_id) in concept_graph.CONCEPT_GRAPH_PREDICATE_IDS:
+            concept_graph.bump_concept_graph_version()
+            return True
+    return False
+
+
 def get_assert_related_qs(assert_obj):
     """Gets a queryset of assertions in the same node as assert_obj"""
     node_assert_qs = AllAssertion.objects.filter(
@@ -295,6 +307,7 @@ def update_attribute_objs(request_json, request=None):
         if not move_sort:
             # Delete the assertion that we just changed. The UUID will be different.
             assert_obj.delete()
+        bump_concept_graph_for_hierarchy_assertions([assert_obj, update_assert_obj])
 
         # Make a copy of the new state of your model.
         after_edit_model_dict = updater_general.make_models_dict(item_obj=update_assert_obj)
@@ -441,6 +454,7 @@ def add_assertions(request_json, request=None, source_id=DEFAULT_SOURCE_ID):
             errors.append(f'Assertion item add error: {error}')
         if not ok:
             continue
+        bump_concept_graph_for_hierarchy_assertions([assert_obj])
 
         # Make a copy of the new state of your model.
         after_edit_model_dict = updater_general.make_models_dict(item_obj=assert_obj)
@@ -507,6 +521,7 @@ def delete_assertions(request_json, request=None):
 
         # Delete the assertion.
         assert_obj.delete()
+        bump_concept_graph_for_hierarchy_assertions([assert_obj])
 
         history_obj = updater_general.record_edit_history(
             subj_man_obj,
@@ -625,6 +640,11 @@ def resort_assertion_objects_for_subject_uuids(
         )
         count_updated += 1
 
+    if count_updated > 0:
+        # The queryset updates above don't change the assertion
+        # updated times, so invalidate cached representations
+        # directly.
+        rep_cache.bump_item_rep_revisions(subject_uuids)
     return count_updated
 
 
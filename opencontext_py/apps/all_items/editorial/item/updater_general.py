@@ -8,6 +8,7 @@ from django.utils import timezone
 from opencontext_py.apps.all_items.models import (
     AllHistory,
 )
+from opencontext_py.apps.all_items.representations import rep_cache
 
 from opencontext_py.libs.models import (
     make_model_object_json_safe_dict
@@ -105,6 +106,9 @@ def record_edit_history(
     history_obj.item = man_obj
     history_obj.meta_json = edit_dict
     history_obj.save()
+    # Make sure we don't serve a stale cached representation of
+    # this edited item, or of items that show data from it.
+    rep_cache.bump_rep_revisions_for_items([man_obj])
     return history_obj
 
 
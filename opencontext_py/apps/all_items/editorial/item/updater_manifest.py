@@ -20,6 +20,7 @@ from opencontext_py.apps.all_items.models import (
     AllSpaceTime,
 )
 
+from opencontext_py.apps.all_items import context_closure
 from opencontext_py.apps.all_items import permissions
 from opencontext_py.apps.all_items.editorial.item import updater_general
 from opencontext_py.apps.all_items.editorial.item import item_validation
@@ -37,6 +38,7 @@ from opencontext_py.libs.models import (
 )
 
 from opencontext_py.apps.indexer import index_new_schema as new_ind
+from opencontext_py.apps.searcher.new_solrsearcher import search_cache
 from opencontext_py.apps.etl.importer import utilities as import_utilities
 
 #----------------------------------------------------------------------
@@ -88,6 +90,15 @@ def recursive_subjects_path_update(man_obj):
         # Skip out. not a subjects item.
         return None
 
+    if str(man_obj.uuid) not in configs.DEFAULT_SUBJECTS_ROOTS:
+        # Update all the descendant paths with one set based SQL
+        # update, and keep the context closure table up to date.
+        context_closure.update_context_closure_for_item(man_obj)
+        context_closure.update_subjects_descendant_paths(man_obj)
+        return None
+
+    # Children of the roots follow special path rules, so save
+    # them one at a time.
     man_children = AllManifest.objects.filter(
         context=man_obj
     ).exclude(uuid=man_obj.uuid)
@@ -679,6 +690,9 @@ def delete_manifest_obj(to_delete_man_obj, context_recursive=False, note=None, d
     edited_obj.save()
 
     delete_uuid = str(to_delete_man_obj.uuid)
+    # Get the projects of the item before we delete it, so we can
+    # invalidate cached searches that may include it.
+    delete_project_slugs = search_cache.get_project_slugs_for_uuids([delete_uuid])
 
     # Now do the actual delete of the item we want to delete.
     to_delete_man_obj.delete()
@@ -695,7 +709,10 @@ def delete_manifest_obj(to_delete_man_obj, context_recursive=False, note=None, d
     }
     deleted.append(delete_dict)
     # Now delete the item from the solr index.
-    new_ind.delete_solr_documents(uuids=[delete_uuid])
+    new_ind.delete_solr_documents(
+        uuids=[delete_uuid],
+        project_slugs=delete_project_slugs,
+    )
     return deleted, errors
 
 
@@ -897,6 +914,10 @@ def merge_manifest_objs(
                     if not ok_save:
                         warnings.append(f'Could not update {legacy_obj} {attrib} to {keep_man_obj}')
                         continue
+                    if attrib == 'context':
+                        # Move the subtree of this (former) child of the
+                        # to_delete_man_obj under the keep_man_obj.
+                        context_closure.update_context_closure_for_item(legacy_obj)
                     updated_objs.append(legacy_obj)
                     continue
                 # First check about 'rank', which we use to allow multiple records
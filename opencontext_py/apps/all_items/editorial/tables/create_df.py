@@ -4,10 +4,10 @@ import numpy as np
 import pandas as pd
 
 from django.db.models import Q, OuterRef, Subquery
-from django.core.paginator import Paginator
 
 
 from opencontext_py.apps.all_items import configs
+from opencontext_py.apps.all_items import context_closure
 from opencontext_py.apps.all_items.defaults import (
     DEFAULT_MANIFESTS,
 )
@@ -24,6 +24,7 @@ from opencontext_py.apps.all_items.representations.item import (
 )
 
 from opencontext_py.apps.all_items.editorial.tables.ui_utilities import check_set_project_inventory
+from opencontext_py.libs import keysetpages
 
 # ---------------------------------------------------------------------
 # NOTE: These functions provide a means to export tabular data from
@@ -86,6 +87,19 @@ df = create_df.add_attribute_data_to_df(df, assert_df)
 # How many rows will we get in 1 database query?
 DB_QS_CHUNK_SIZE = 100
 
+# The (ascending) fields we use to get pages of manifest and assertion
+# querysets, ending with the primary key so each row has a unique
+# position. These match the orders of get_manifest_qs and get_assert_qs.
+MANIFEST_KEYSET_FIELDS = ['sort', 'path', 'label', 'uuid',]
+ASSERTION_KEYSET_FIELDS = [
+    'subject__sort',
+    'obs_sort',
+    'event_sort',
+    'attribute_group_sort',
+    'sort',
+    'uuid',
+]
+
 # Make a list of default Manifest objects for which we prohibit
 # edits.
 DEFAULT_UUIDS = [m.get('uuid') for m in DEFAULT_MANIFESTS if m.get('uuid')]
@@ -463,8 +477,18 @@ def make_urls_from_persistent_ids(act_df, prefix_uris='https://'):
     return act_df
 
 
-def get_raw_manifest_df(man_qs, prefix_uris='https://', chunk_size=10000):
-    """Makes a dataframe from a manifest queryset"""
+def get_raw_manifest_df(
+    man_qs,
+    prefix_uris='https://',
+    chunk_size=10000,
+    spill_dir=None,
+):
+    """Makes a dataframe from a manifest queryset
+
+    :param int chunk_size: The number of rows to get in each query
+    :param str spill_dir: An optional directory for temporary files
+        of each chunk of rows, to limit memory use
+    """
     man_qs = man_qs.values(
         'uuid',
         '_uri',
@@ -483,12 +507,12 @@ def get_raw_manifest_df(man_qs, prefix_uris='https://', chunk_size=10000):
         'published',
         'revised',
     )
-    paginator = Paginator(man_qs, chunk_size)
-    man_df = pd.DataFrame(data={})
-    for page_number in paginator.page_range:
-        page = paginator.page(page_number)
-        act_df = pd.DataFrame.from_records(page)
-        man_df = pd.concat([man_df, act_df], ignore_index=True)
+    man_df = keysetpages.make_df_from_keyset_pages(
+        man_qs,
+        key_fields=MANIFEST_KEYSET_FIELDS,
+        chunk_size=chunk_size,
+        spill_dir=spill_dir,
+    )
 
     man_df = add_prefix_to_uri_col_values(
         man_df,
@@ -506,13 +530,18 @@ def get_raw_assertion_df(
     truncate_long_text=False, 
     prefix_uris='https://', 
     chunk_size=10000,
+    spill_dir=None,
 ):
     """Makes a dataframe from an assertion queryset
     
     :param bool truncate_long_text: If true, truncate long strings of text
-
+    :param int chunk_size: The number of rows to get in each query
+    :param str spill_dir: An optional directory for temporary files
+        of each chunk of rows, to limit memory use
     """
     assert_qs = assert_qs.values(
+        # The assertion uuid is only used to get chunks of rows.
+        'uuid',
         'subject_id',
         'subject__uri',
         'subject__label',
@@ -561,12 +590,13 @@ def get_raw_assertion_df(
         'predicate_equiv_ld_uri',
         'updated',
     )
-    paginator = Paginator(assert_qs, chunk_size)
-    assert_df = pd.DataFrame(data={})
-    for page_number in paginator.page_range:
-        page = paginator.page(page_number)
-        act_df = pd.DataFrame.from_records(page)
-        assert_df = pd.concat([assert_df, act_df], ignore_index=True)
+    assert_df = keysetpages.make_df_from_keyset_pages(
+        assert_qs,
+        key_fields=ASSERTION_KEYSET_FIELDS,
+        chunk_size=chunk_size,
+        drop_cols=['uuid'],
+        spill_dir=spill_dir,
+    )
 
     if 'obj_string' in assert_df.columns.tolist() and truncate_long_text:
         long_index = assert_df['obj_string'].str.len() > MAX_CELL_STRING_LENGTH 
@@ -790,13 +820,30 @@ def get_context_hierarchy_df(uuids):
     :param list uuids: A list or other iterator of UUIDs to get
         their contet hierarchy
     """
-    man_qs = AllManifest.objects.filter(uuid__in=uuids)
+    uuids = [str(uuid) for uuid in uuids]
+    # Get the ancestors of all the items in one query of the context
+    # closure table.
+    ancestors_dict = context_closure.get_context_ancestor_uuids_dict(uuids)
+    data_dicts = []
+    for uuid, ancestor_uuids in ancestors_dict.items():
+        data = {
+            'level_0': GenUUID.UUID(uuid),
+        }
+        for i, ancestor_uuid in enumerate(ancestor_uuids, start=1):
+            data[f'level_{i}'] = GenUUID.UUID(ancestor_uuid)
+        data_dicts.append(data)
+
+    # Walk up the hierarchy for items missing from the closure table
+    # (like items that are not subjects).
+    missing_uuids = [uuid for uuid in uuids if uuid not in ancestors_dict]
+    if not missing_uuids:
+        return pd.DataFrame(data=data_dicts)
+    man_qs = AllManifest.objects.filter(uuid__in=missing_uuids)
     man_qs = add_select_related_contexts_to_qs(
         man_qs,
         context_prefix='',
         depth=10,
     )
-    data_dicts = []
     for man_obj in man_qs:
         data = {
             'level_0': man_obj.uuid,
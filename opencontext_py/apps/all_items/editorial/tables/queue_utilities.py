@@ -12,6 +12,7 @@ from django.core.cache import caches
 
 
 from opencontext_py.apps.all_items.editorial.tables import create_df
+from opencontext_py.apps.all_items.editorial.tables import stage_store
 from opencontext_py.apps.all_items.editorial.tables import ui_utilities
 
 from opencontext_py.libs.queue_utilities import (
@@ -35,6 +36,9 @@ from opencontext_py.libs.queue_utilities import (
 #
 # python manage.py rqworker high
 #
+# NOTE: The dataframes made in each stage don't pass through the job
+# queue. Workers load and save them with the stage_store.
+#
 # ---------------------------------------------------------------------
 logger = logging.getLogger("tab-exporter-logger")
 
@@ -105,6 +109,9 @@ def get_cached_export_df(export_id):
     :param str export_id: The identifier for a specific 
         cached export process.
     """
+    df = stage_store.load_stage_df(f'df__{export_id}')
+    if df is not None:
+        return df
     cache = caches['redis']
     df = cache.get(f'df__{export_id}')
     if df is not None:
@@ -119,6 +126,9 @@ def get_cached_no_style_df(export_id):
     :param str export_id: The identifier for a specific 
         cached export process.
     """
+    df = stage_store.load_stage_df(f'df_no_style__{export_id}')
+    if df is not None:
+        return df
     cache = caches['redis']
     df = cache.get(f'df_no_style__{export_id}')
     return df
@@ -183,6 +193,84 @@ def add_job_metadata_to_stage_status(job_id, job_done, stage_status):
 
 
 
+def make_export_stage_kwargs(process_stage, export_id, args):
+    """Makes the keyword arguments for stage_store.run_export_stage
+    to run the function of an export process stage
+
+    :param str process_stage: The export stage
+    :param str export_id: The identifier for a specific
+        cached export process.
+    :param dict args: The arguments used to generate this export.
+    """
+    df_key = f'df__{export_id}'
+    assert_df_key = f'assert_df__{export_id}'
+    stage_kwargs = {
+        'export_id': export_id,
+        'out_keys': [df_key],
+        'in_keys': {'df': df_key},
+        'kwargs': {},
+    }
+    if process_stage == 'prepare_assert_df':
+        # Make the initial assertion query and output the
+        # resulting AllAssertion queryset into a "tall" dataframe.
+        stage_kwargs['func'] = create_df.get_raw_assert_df_by_making_query
+        stage_kwargs['out_keys'] = [assert_df_key]
+        stage_kwargs['in_keys'] = {}
+        stage_kwargs['kwargs'] = {
+            'filter_args': args.get('filter_args'),
+            'exclude_args': args.get('exclude_args'),
+        }
+    elif process_stage == 'prepare_df_from_assert_df':
+        # Make the output dataframe, where there's a single row
+        # for each "subject" of the assertions.
+        stage_kwargs['func'] = create_df.prepare_df_from_assert_df
+        stage_kwargs['in_keys'] = {'assert_df': assert_df_key}
+    elif process_stage == 'add_spacetime_to_df':
+        # Add geometry and chronology information to the output dataframe,
+        # either directly added to the subject item, or inferred by
+        # spatial containment relationships.
+        stage_kwargs['func'] = create_df.add_spacetime_to_df
+    elif process_stage == 'expand_context_path':
+        # OK. Add all of the spatial context columns
+        stage_kwargs['func'] = create_df.expand_context_path
+    elif process_stage == 'add_authors_to_df':
+        # Add author information to the output dataframe, either directly
+        # added as dublin core properties on the subject item, inferred
+        # from equivalence relations between other predicates and
+        # dublin core authors, or inferred from dublin core authors
+        # assigned to the parent projects.
+        stage_kwargs['func'] = create_df.add_authors_to_df
+        stage_kwargs['in_keys']['assert_df'] = assert_df_key
+    elif process_stage == 'add_media_resource_files_to_df':
+        # Add media resource files to media items, if present.
+        stage_kwargs['func'] = create_df.add_media_resource_files_to_df
+    elif process_stage == 'add_df_linked_data_from_assert_df':
+        # Add equivalent linked data descriptions to the subject.
+        stage_kwargs['func'] = create_df.add_df_linked_data_from_assert_df
+        stage_kwargs['in_keys']['assert_df'] = assert_df_key
+        stage_kwargs['kwargs'] = {
+            'add_entity_ld': args.get('add_entity_ld'),
+            'add_literal_ld': args.get('add_literal_ld'),
+        }
+    elif process_stage == 'add_attribute_data_to_df':
+        # Add the project specific attributes asserted about
+        # the subject items.
+        stage_kwargs['func'] = create_df.add_attribute_data_to_df
+        stage_kwargs['in_keys']['assert_df'] = assert_df_key
+        stage_kwargs['kwargs'] = {
+            'add_object_uris': args.get('add_object_uris'),
+            'node_pred_unique_prefixing': args.get('node_pred_unique_prefixing'),
+        }
+    elif process_stage == 'stylize_df':
+        # Stylize the dataframe and then we are finished!! But first,
+        # keep the pre-styled dataframe.
+        stage_kwargs['func'] = create_df.stylize_df
+        stage_kwargs['keep_input_key'] = f'df_no_style__{export_id}'
+    else:
+        return None
+    return stage_kwargs
+
+
 def staged_make_export_df(
     filter_args=None, 
     exclude_args=None,
@@ -211,12 +299,16 @@ def staged_make_export_df(
     if reset_cache:
         # Eliminate any cached items relevant to this export_id
         reset_request_process_cache(export_id)
+        stage_store.remove_export_stage_files(export_id)
+
+    # Clean up old stage dataframe files from other exports.
+    stage_store.remove_expired_stage_files()
     
     cache = caches['redis']
 
     # Cache the arguments used to generate this export.
     export_args_key = f'export-args-{export_id}'
-    if not cache.get(export_args_key) and kwargs:
+    if not cache.get(export_args_key) and args:
         cache_item_and_cache_key_for_request(
             export_id, 
             cache_key=export_args_key, 
@@ -234,8 +326,6 @@ def staged_make_export_df(
     else:
         act_stages = raw_stages.copy()
     
-    df = None
-    assert_df = None
     do_next_stage = True
     for process_stage, label, expect_assert_df, expect_df in PROCESS_STAGES:
         stage_status = act_stages.get(process_stage)
@@ -254,252 +344,38 @@ def staged_make_export_df(
             continue
 
         if not stage_status.get('job_id'):
-            # Only fetch these big objects from the cache
+            # Only check for the stored dataframes the stage needs
             # if we haven't yet started a job for this current
-            # status stage.
-            df = cache.get(f'df__{export_id}')
-            assert_df = cache.get(f'assert_df__{export_id}')
-        
-            if expect_assert_df and assert_df is None:
+            # status stage. The worker loads them.
+            if expect_assert_df and not stage_store.get_stage_df_meta(f'assert_df__{export_id}'):
                 stage_status['error'] = f'Failed to get assert_df for {export_id}'
                 do_next_stage = False
                 continue
 
-            if expect_df and df is None:
+            if expect_df and not stage_store.get_stage_df_meta(f'df__{export_id}'):
                 stage_status['error'] = f'Failed to get df for {export_id}'
                 do_next_stage = False
                 continue
 
-        if do_next_stage and process_stage == 'prepare_assert_df':
-            # Make the initial assertion query and output the
-            # resulting AllAssertion queryset into a "tall" dataframe.
-            job_id, job_done, assert_df = wrap_func_for_rq(
-                func=create_df.get_raw_assert_df_by_making_query, 
-                kwargs={'filter_args':filter_args, 'exclude_args': exclude_args},
-                job_id=stage_status.get('job_id'),
-            )
-            stage_status = add_job_metadata_to_stage_status(
-                job_id, 
-                job_done, 
-                stage_status
-            )
-
-            if job_done and assert_df is not None:
-                cache_item_and_cache_key_for_request(
-                    export_id, 
-                    cache_key=f'assert_df__{export_id}', 
-                    object_to_cache=assert_df
-                )
-                
-            do_next_stage = False
-
-        elif do_next_stage and process_stage == 'prepare_df_from_assert_df':
-            
-            # Make the output dataframe, where there's a single row
-            # for each "subject" of the assertions.
-            job_id, job_done, df = wrap_func_for_rq(
-                func=create_df.prepare_df_from_assert_df, 
-                kwargs={'assert_df': assert_df},
-                job_id=stage_status.get('job_id'),
-            )
-            stage_status = add_job_metadata_to_stage_status(
-                job_id, 
-                job_done, 
-                stage_status
-            )
-
-            if job_done and df is not None:
-                cache_item_and_cache_key_for_request(
-                    export_id, 
-                    cache_key=f'df__{export_id}', 
-                    object_to_cache=df
-                )
-            do_next_stage = False
-        
-        elif do_next_stage and process_stage == 'add_spacetime_to_df':
-            
-            # Add geometry and chronology information to the output dataframe,
-            # either directly added to the subject item, or inferred by 
-            # spatial containment relationships.
-            job_id, job_done, df = wrap_func_for_rq(
-                func=create_df.add_spacetime_to_df, 
-                kwargs={'df': df,},
-                job_id=stage_status.get('job_id'),
-            )
-            stage_status = add_job_metadata_to_stage_status(
-                job_id, 
-                job_done, 
-                stage_status
-            )
-
-            if job_done and df is not None:
-                cache_item_and_cache_key_for_request(
-                    export_id, 
-                    cache_key=f'df__{export_id}', 
-                    object_to_cache=df
-                )
-
-            do_next_stage = False
-        
-        elif do_next_stage and process_stage == 'expand_context_path':
-            
-            # OK. Add all of the spatial context columns
-            job_id, job_done, df = wrap_func_for_rq(
-                func=create_df.expand_context_path, 
-                kwargs={'df': df,},
-                job_id=stage_status.get('job_id'),
-            )
-            stage_status = add_job_metadata_to_stage_status(
-                job_id, 
-                job_done, 
-                stage_status
-            )
-
-            if job_done and df is not None:
-                cache_item_and_cache_key_for_request(
-                    export_id, 
-                    cache_key=f'df__{export_id}', 
-                    object_to_cache=df
-                )
-
-            do_next_stage = False
-        
-        elif do_next_stage and process_stage == 'add_authors_to_df':
-           
-            # Add author information to the output dataframe, either directly
-            # added as dublin core properties on the subject item, inferred
-            # from equivalence relations between other predicates and 
-            # dublin core authors, or inferred from dublin core authors 
-            # assigned to the parent projects.
-            job_id, job_done, df = wrap_func_for_rq(
-                func=create_df.add_authors_to_df, 
-                kwargs={'df': df, 'assert_df': assert_df},
-                job_id=stage_status.get('job_id'),
-            )
-            stage_status = add_job_metadata_to_stage_status(
-                job_id, 
-                job_done, 
-                stage_status
-            )
-
-            if job_done and df is not None:
-                cache_item_and_cache_key_for_request(
-                    export_id, 
-                    cache_key=f'df__{export_id}', 
-                    object_to_cache=df
-                )
-
-            do_next_stage = False
-        
-        elif do_next_stage and process_stage == 'add_media_resource_files_to_df':
-            # Add media resource files to media items, if present.
-            job_id, job_done, df = wrap_func_for_rq(
-                func=create_df.add_media_resource_files_to_df, 
-                kwargs={'df': df,},
-                job_id=stage_status.get('job_id'),
-            )
-            stage_status = add_job_metadata_to_stage_status(
-                job_id, 
-                job_done, 
-                stage_status
-            )
-
-            if job_done and df is not None:
-                cache_item_and_cache_key_for_request(
-                    export_id, 
-                    cache_key=f'df__{export_id}', 
-                    object_to_cache=df
-                )
-
-            do_next_stage = False
-        
-        elif do_next_stage and process_stage == 'add_df_linked_data_from_assert_df':
-            # Add equivalent linked data descriptions to the subject.
-            job_id, job_done, df = wrap_func_for_rq(
-                func=create_df.add_df_linked_data_from_assert_df, 
-                kwargs={
-                    'df': df,
-                    'assert_df': assert_df,
-                    'add_entity_ld': add_entity_ld,
-                    'add_literal_ld': add_literal_ld,
-                },
-                job_id=stage_status.get('job_id'),
-            )
-            stage_status = add_job_metadata_to_stage_status(
-                job_id, 
-                job_done, 
-                stage_status
-            )
-
-            if job_done and df is not None:
-                cache_item_and_cache_key_for_request(
-                    export_id, 
-                    cache_key=f'df__{export_id}', 
-                    object_to_cache=df
-                )
-
-            do_next_stage = False
-        
-        elif do_next_stage and process_stage == 'add_attribute_data_to_df':
-            
-            # Add the project specific attributes asserted about
-            # the subject items.
-            job_id, job_done, df = wrap_func_for_rq(
-                func=create_df.add_attribute_data_to_df, 
-                kwargs={
-                    'df': df,
-                    'assert_df': assert_df,
-                    'add_object_uris': add_object_uris,
-                    'node_pred_unique_prefixing': node_pred_unique_prefixing,
-                },
-                job_id=stage_status.get('job_id'),
-            )
-            stage_status = add_job_metadata_to_stage_status(
-                job_id, 
-                job_done, 
-                stage_status
-            )
-
-            if job_done and df is not None:
-                cache_item_and_cache_key_for_request(
-                    export_id, 
-                    cache_key=f'df__{export_id}', 
-                    object_to_cache=df
-                )
-
-            do_next_stage = False
-        
-        elif do_next_stage and process_stage == 'stylize_df':
-            
-            # Stylize the dataframe and then we are finished!!
-            # First, let's cache the pre-styled dataframe
-            cache_item_and_cache_key_for_request(
-                export_id, 
-                cache_key=f'df__no_style_{export_id}', 
-                object_to_cache=df
-            )
-            stage_status['df_no_style__key'] = f'df_no_style__{export_id}'
-
-            # Now actually do the work to fix style issues.
-            job_id, job_done, df = wrap_func_for_rq(
-                func=create_df.stylize_df, 
-                kwargs={'df': df,},
-                job_id=stage_status.get('job_id'),
-            )
-            stage_status = add_job_metadata_to_stage_status(
-                job_id, 
-                job_done, 
-                stage_status
-            )
-
-            if job_done and df is not None:
-                cache_item_and_cache_key_for_request(
-                    export_id, 
-                    cache_key=f'df__{export_id}', 
-                    object_to_cache=df
-                )
-
-            do_next_stage = False
+        stage_kwargs = make_export_stage_kwargs(process_stage, export_id, args)
+        if not stage_kwargs:
+            continue
+
+        # The worker saves the dataframe(s) the stage makes to the
+        # stage_store, and only returns their metadata.
+        job_id, job_done, _ = wrap_func_for_rq(
+            func=stage_store.run_export_stage,
+            kwargs=stage_kwargs,
+            job_id=stage_status.get('job_id'),
+        )
+        stage_status = add_job_metadata_to_stage_status(
+            job_id, 
+            job_done, 
+            stage_status
+        )
+        if stage_kwargs.get('keep_input_key'):
+            stage_status['df_no_style__key'] = stage_kwargs['keep_input_key']
+        do_next_stage = False
     
     # Check if we're all complete with this export process.
     all_done = True
@@ -545,6 +421,10 @@ def single_stage_make_export_df(
     if reset_cache:
         # Eliminate any cached items relevant to this export_id
         reset_request_process_cache(export_id)
+        stage_store.remove_export_stage_files(export_id)
+
+    # Clean up old stage dataframe files from other exports.
+    stage_store.remove_expired_stage_files()
     
     cache = caches['redis']
 
@@ -571,11 +451,19 @@ def single_stage_make_export_df(
     
     
     job_done = None
+    metas = None
     if not status.get('done') or not status.get('complete'):
-        # Now actually do the work to fix style issues.
-        job_id, job_done, df_tup = wrap_func_for_rq(
-            func=create_df.make_clean_export_df, 
-            kwargs=kwargs,
+        # Now actually do the work to fix style issues. The worker
+        # saves the dataframes to the stage_store, and only returns
+        # their metadata.
+        job_id, job_done, metas = wrap_func_for_rq(
+            func=stage_store.run_export_stage,
+            kwargs={
+                'func': create_df.make_clean_export_df,
+                'export_id': export_id,
+                'out_keys': [f'df__{export_id}', f'df_no_style__{export_id}'],
+                'kwargs': kwargs,
+            },
             job_id=status.get('job_id'),
         )
         status = add_job_metadata_to_stage_status(
@@ -584,22 +472,12 @@ def single_stage_make_export_df(
             status
         )
 
-    if job_done and df_tup is not None:
-        df, df_no_style = df_tup
-        cache_item_and_cache_key_for_request(
-            export_id, 
-            cache_key=f'df__{export_id}', 
-            object_to_cache=df
-        )
-        cache_item_and_cache_key_for_request(
-            export_id, 
-            cache_key=f'df_no_style__{export_id}', 
-            object_to_cache=df_no_style
-        )
+    if job_done and metas is not None:
+        df_meta = metas[f'df__{export_id}']
         status['complete'] = True
-        status['count_columns'] = len(df.columns)
-        status['count_rows'] = len(df.index)
-        status['columns'] = df.columns.tolist()
+        status['count_columns'] = len(df_meta['columns'])
+        status['count_rows'] = df_meta['count_rows']
+        status['columns'] = df_meta['columns']
     
     # Save this stake of the process to the cache.
     cache_item_and_cache_key_for_request(
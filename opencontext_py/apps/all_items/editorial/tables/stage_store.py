@@ -0,0 +1,344 @@
+import logging
+import os
+import shutil
+import time
+import uuid as GenUUID
+
+import duckdb
+import pandas as pd
+
+from django.conf import settings
+from django.core.cache import caches
+
+from opencontext_py.libs.queue_utilities import (
+    cache_item_and_cache_key_for_request,
+)
+
+
+# ---------------------------------------------------------------------
+# NOTE: These functions store the (often very big) dataframes made in
+# the stages of a table export, so we don't need to pass them through
+# redis.
+#
+# The stage functions run in rq workers. Rather than taking dataframes
+# as job arguments and returning them as job results (which rq pickles
+# into redis), a worker loads its input dataframes from this store, and
+# saves its output dataframes back to this store. Redis only gets a
+# small metadata dict about each stored dataframe.
+#
+# With settings.EXPORT_STAGE_STORE_PATH, dataframes get saved as
+# Parquet files (written and read with DuckDB) in a directory for each
+# export. Dataframes with values that don't fit Parquet columns (like
+# lists, dicts or mixed types in an object column) get saved as pickle
+# files in the same directory. Files older than STAGE_FILE_LIFE get
+# removed. Without an EXPORT_STAGE_STORE_PATH, the dataframes get
+# saved in the redis cache, like before.
+# ---------------------------------------------------------------------
+logger = logging.getLogger("tab-exporter-logger")
+
+STAGE_FILE_LIFE = 60 * 60 * 6 # 6 hours.
+
+# Name of the column for a (non default) index in a Parquet file.
+STAGE_INDEX_COL = '__stage_index__'
+
+# Numpy dtype kinds that DuckDB round trips: bool, int, uint, float,
+# datetime.
+PARQUET_DTYPE_KINDS = {'b', 'i', 'u', 'f', 'M'}
+
+
+# ---------------------------------------------------------------------
+# testing
+"""
+from opencontext_py.apps.all_items.editorial.tables import stage_store
+meta = stage_store.save_stage_df('test-export', 'df__test-export', df)
+df = stage_store.load_stage_df('df__test-export')
+"""
+# ---------------------------------------------------------------------
+
+
+def make_stage_meta_cache_key(stage_key):
+    """Makes the cache key for the metadata about a stored dataframe"""
+    return f'stage-meta__{stage_key}'
+
+
+def get_export_stage_dir(path, export_id):
+    """Gets the directory for the stored dataframes of an export"""
+    return os.path.join(path, f'export-{export_id}')
+
+
+def get_stage_df_parquet_meta(df):
+    """Checks if a dataframe can round trip through a Parquet file,
+    and gets the metadata we need to restore it
+
+    returns a metadata dict, or None if the dataframe needs pickling
+    """
+    if not df.columns.is_unique:
+        return None
+    if not all([isinstance(col, str) for col in df.columns]):
+        return None
+    if STAGE_INDEX_COL in df.columns:
+        return None
+    # A default (0 to n) index doesn't need saving.
+    keep_index = not df.index.equals(pd.RangeIndex(len(df.index)))
+    if keep_index:
+        if df.index.nlevels > 1:
+            return None
+        if df.index.dtype.kind not in PARQUET_DTYPE_KINDS:
+            # We don't bother checking the values of object indexes.
+            return None
+    meta = {
+        'index': keep_index,
+        'index_name': df.index.name,
+        'dtypes': {},
+        'null_cols': [],
+        'str_cols': [],
+        'uuid_cols': [],
+    }
+    for col in df.columns:
+        dtype = df[col].dtype
+        if dtype.kind in PARQUET_DTYPE_KINDS:
+            meta['dtypes'][col] = str(dtype)
+            continue
+        if dtype != object and pd.api.types.is_string_dtype(dtype):
+            # A pandas string dtype (the default for strings in
+            # newer versions of pandas)
+            meta['dtypes'][col] = str(dtype)
+            continue
+        if dtype != object:
+            # Categories, extension types, timedeltas, etc.
+            return None
+        value_types = set(df[col].dropna().map(type).unique())
+        if not value_types:
+            # DuckDB can't tell the type of a column that is all
+            # missing values, so we leave it out and add it back
+            # when we load.
+            meta['null_cols'].append(col)
+        elif value_types == {str}:
+            meta['str_cols'].append(col)
+        elif value_types == {GenUUID.UUID}:
+            meta['uuid_cols'].append(col)
+        else:
+            return None
+    return meta
+
+
+def write_stage_df_parquet(df, file_path, meta):
+    """Writes a dataframe to a Parquet file"""
+    df = df.drop(columns=meta['null_cols'])
+    for col in meta['uuid_cols']:
+        df[col] = df[col].map(lambda v: str(v) if v is not None else None)
+    if meta['index']:
+        df = df.rename_axis(STAGE_INDEX_COL).reset_index()
+    else:
+        df = df.reset_index(drop=True)
+    temp_path = f'{file_path}.{os.getpid()}.tmp'
+    con = duckdb.connect(':memory:')
+    try:
+        # Keep timezone aware datetimes in UTC.
+        con.execute("SET TimeZone = 'UTC'")
+        con.register('stage_df', df)
+        con.execute(f"COPY stage_df TO '{temp_path}' (FORMAT PARQUET)")
+    finally:
+        con.close()
+    os.replace(temp_path, file_path)
+
+
+def read_stage_df_parquet(file_path, meta):
+    """Reads a dataframe from a Parquet file"""
+    con = duckdb.connect(':memory:')
+    try:
+        con.execute("SET TimeZone = 'UTC'")
+        df = con.execute(f"SELECT * FROM read_parquet('{file_path}')").df()
+    finally:
+        con.close()
+    if meta['index']:
+        df.set_index(STAGE_INDEX_COL, inplace=True)
+        df.index.name = meta['index_name']
+    for col, dtype in meta['dtypes'].items():
+        if str(df[col].dtype) != dtype:
+            df[col] = df[col].astype(dtype)
+    # DuckDB gives back pd.NA (or NaN) for missing values, so make
+    # these columns objects with None again.
+    for col in meta['str_cols']:
+        df[col] = df[col].astype(object)
+        df[col] = df[col].where(df[col].notnull(), None)
+    for col in meta['uuid_cols']:
+        df[col] = df[col].astype(object)
+        df[col] = df[col].map(lambda v: GenUUID.UUID(v) if isinstance(v, str) else None)
+    for col in meta['null_cols']:
+        df[col] = None
+    return df[meta['columns']]
+
+
+def save_stage_df(export_id, stage_key, df):
+    """Saves a dataframe made in a stage of an export
+
+    :param str export_id: The identifier for a specific
+        cached export process.
+    :param str stage_key: The key for this dataframe, like
+        'df__{export_id}'
+    :param DataFrame df: The dataframe to save
+
+    returns a (small) metadata dict about the saved dataframe
+    """
+    meta = {
+        'stage_key': stage_key,
+        'format': 'redis',
+        'path': None,
+        'count_rows': len(df.index),
+        'columns': df.columns.tolist(),
+        'saved': time.time(),
+    }
+    path = settings.EXPORT_STAGE_STORE_PATH
+    if not path:
+        cache_item_and_cache_key_for_request(
+            export_id,
+            cache_key=stage_key,
+            object_to_cache=df,
+        )
+    else:
+        export_dir = get_export_stage_dir(path, export_id)
+        os.makedirs(export_dir, exist_ok=True)
+        parquet_meta = get_stage_df_parquet_meta(df)
+        if parquet_meta is not None:
+            meta.update(parquet_meta)
+            meta['format'] = 'parquet'
+            meta['path'] = os.path.join(export_dir, f'{stage_key}.parquet')
+            try:
+                write_stage_df_parquet(df, meta['path'], meta)
+            except Exception as e:
+                logger.info(f'Parquet failure with {stage_key}: {str(e)}')
+                meta['format'] = 'pickle'
+        if meta['format'] != 'parquet':
+            meta['format'] = 'pickle'
+            meta['path'] = os.path.join(export_dir, f'{stage_key}.pkl')
+            temp_path = f"{meta['path']}.{os.getpid()}.tmp"
+            df.to_pickle(temp_path)
+            os.replace(temp_path, meta['path'])
+    cache_item_and_cache_key_for_request(
+        export_id,
+        cache_key=make_stage_meta_cache_key(stage_key),
+        object_to_cache=meta,
+    )
+    return meta
+
+
+def get_stage_df_meta(stage_key):
+    """Gets the metadata about a stored dataframe, if we still have
+    the dataframe"""
+    cache = caches['redis']
+    meta = cache.get(make_stage_meta_cache_key(stage_key))
+    if not meta:
+        return None
+    if meta.get('path') and not os.path.exists(meta['path']):
+        return None
+    return meta
+
+
+def load_stage_df(stage_key):
+    """Loads a dataframe saved with save_stage_df
+
+    :param str stage_key: The key for the dataframe, like
+        'df__{export_id}'
+
+    returns a dataframe, or None if we don't have it
+    """
+    meta = get_stage_df_meta(stage_key)
+    if not meta:
+        return None
+    try:
+        if meta['format'] == 'parquet':
+            return read_stage_df_parquet(meta['path'], meta)
+        if meta['format'] == 'pickle':
+            return pd.read_pickle(meta['path'])
+    except Exception as e:
+        logger.info(f'Failed to load {stage_key}: {str(e)}')
+        return None
+    cache = caches['redis']
+    return cache.get(stage_key)
+
+
+def remove_export_stage_files(export_id):
+    """Removes the stored dataframe files of an export"""
+    path = settings.EXPORT_STAGE_STORE_PATH
+    if not path:
+        return None
+    shutil.rmtree(get_export_stage_dir(path, export_id), ignore_errors=True)
+
+
+def remove_expired_stage_files(max_age=STAGE_FILE_LIFE):
+    """Removes stored dataframe files older than max_age seconds
+
+    returns the number of files removed
+    """
+    path = settings.EXPORT_STAGE_STORE_PATH
+    if not path or not os.path.isdir(path):
+        return 0
+    now = time.time()
+    count_removed = 0
+    for dir_name in os.listdir(path):
+        export_dir = os.path.join(path, dir_name)
+        if not dir_name.startswith('export-') or not os.path.isdir(export_dir):
+            continue
+        for file_name in os.listdir(export_dir):
+            file_path = os.path.join(export_dir, file_name)
+            try:
+                if (now - os.path.getmtime(file_path)) > max_age:
+                    os.remove(file_path)
+                    count_removed += 1
+            except OSError:
+                # Another process may have removed it.
+                continue
+        try:
+            # Only removes the directory if it is empty.
+            os.rmdir(export_dir)
+        except OSError:
+            pass
+    return count_removed
+
+
+def run_export_stage(
+    func,
+    export_id,
+    out_keys,
+    in_keys=None,
+    keep_input_key=None,
+    kwargs=None,
+):
+    """Runs an export stage function (in a worker), loading its input
+    dataframes from the stage store, and saving the dataframes it
+    returns to the stage store
+
+    :param Object func: The export stage function
+    :param str export_id: The identifier for a specific
+        cached export process.
+    :param list out_keys: The stage keys for saving the output
+        dataframe(s) of func. More than one key means func
+        returns a tuple of dataframes.
+    :param dict in_keys: Keyword argument names of func, with the
+        stage keys of the dataframes to pass to func
+    :param str keep_input_key: An optional stage key to save a
+        copy of the 'df' input before running func
+    :param dict kwargs: Other keyword arguments for func
+
+    returns a dict of the metadata of the saved dataframes, keyed
+        by stage key, or None if func returned nothing
+    """
+    kwargs = dict(kwargs or {})
+    for arg, stage_key in (in_keys or {}).items():
+        kwargs[arg] = load_stage_df(stage_key)
+        if kwargs[arg] is None:
+            raise ValueError(f'Missing stage dataframe {stage_key}')
+    if keep_input_key:
+        save_stage_df(export_id, keep_input_key, kwargs['df'])
+    result = func(**kwargs)
+    if result is None:
+        return None
+    if len(out_keys) == 1:
+        result = (result,)
+    metas = {}
+    for stage_key, df in zip(out_keys, result):
+        if df is None:
+            return None
+        metas[stage_key] = save_stage_df(export_id, stage_key, df)
+    return metas
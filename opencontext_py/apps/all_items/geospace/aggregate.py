@@ -2,13 +2,15 @@
 
 
 import json
+import math
 import numpy as np
 import pandas as pd
 
+from scipy.cluster.hierarchy import fcluster
 from sklearn.cluster import KMeans, AffinityPropagation, SpectralClustering
 from shapely.geometry import mapping, shape, JOIN_STYLE
 from shapely.ops import unary_union
-from shapely import get_precision, set_precision, to_geojson
+from shapely import box, get_precision, set_precision, to_geojson, STRtree
 
 from django.db.models import Q
 
@@ -59,6 +61,22 @@ data = {
 df = pd.DataFrame(data=data)
 r_l = geo_agg.cluster_geo_centroids(df)
 
+# Benchmark the clustering methods on a big synthetic dataset
+import time
+import numpy as np
+rng = np.random.default_rng(42)
+centers = [(35.0, 32.0), (23.0, 38.0), (44.0, 41.0), (12.5, 41.9)]
+big_df = pd.DataFrame(
+    data=np.concatenate(
+        [rng.normal(loc=c, scale=0.5, size=(100000, 2)) for c in centers]
+    ),
+    columns=['longitude', 'latitude'],
+)
+for cluster_method in ['KMeans', 'Hierarchical']:
+    start = time.time()
+    r_l = geo_agg.cluster_geo_centroids(big_df, cluster_method=cluster_method)
+    print(f'{cluster_method}: {len(r_l)} regions in {(time.time() - start):.2f} sec')
+
 """
 
 
@@ -66,14 +84,27 @@ MAX_CLUSTERS = 15
 MIN_CLUSTER_SIZE_KM = 5  # diagonal length in KM between min(lat/lon) and max(lat/lon)
 
 
-DEFAULT_CLUSTER_METHOD = 'KMeans'
+# NOTE: The 'Hierarchical' method deduplicates points (keeping counts
+# as weights), and if there are too many of them, bins them into grid
+# cells. It then makes one hierarchical (Ward) clustering of these
+# weighted points, and searches cuts of the dendrogram (from
+# max_clusters down) for the first set of reasonable regions. The
+# 'KMeans' method fits a new KMeans for each number of clusters it
+# tries, so it is much slower with lots of points.
+DEFAULT_CLUSTER_METHOD = 'Hierarchical'
 CLUSTER_METHODS = [
     DEFAULT_CLUSTER_METHOD,
+    'KMeans',
     'AffinityPropagation',
     'SpectralClustering',
     'unary_union',
 ]
 
+# The maximum number of weighted points (or grid cells) we cluster
+# hierarchically. Hierarchical clustering needs memory for the
+# distances between all pairs of points.
+MAX_HIERARCHICAL_POINTS = 2000
+
 DEFAULT_SOURCE_ID = 'geospace-aggregate'
 
 
@@ -143,30 +174,30 @@ def make_min_size_region(region_dict, min_distance=MIN_CLUSTER_SIZE_KM):
 def check_region_overlaps(region_dicts):
     """Checks if regions overlap with other regions"""
     overlapping_regions = []
-    for region_dict in region_dicts:
-        region_overlap_ids = []
-        for comp_dict in region_dicts:
-            if region_dict.get('id') == comp_dict.get('id'):
-                # Same region, skip
-                continue
-            if region_dict['max_lon'] < comp_dict['min_lon']:
-                continue
-            if region_dict['min_lon'] > comp_dict['max_lon']:
-                continue
-            if region_dict['max_lat'] < comp_dict['min_lat']:
-                continue
-            if region_dict['min_lat'] > comp_dict['max_lat']:
-                continue
-            region_overlap_ids += [
-                region_dict.get('id'),
-                comp_dict.get('id')
-            ]
-        if not region_overlap_ids:
+    if len(region_dicts) < 2:
+        return overlapping_regions
+    boxes = box(
+        np.array([r['min_lon'] for r in region_dicts]),
+        np.array([r['min_lat'] for r in region_dicts]),
+        np.array([r['max_lon'] for r in region_dicts]),
+        np.array([r['max_lat'] for r in region_dicts]),
+    )
+    # Use an R-tree of the region bounding boxes to find pairs of
+    # regions that intersect (including regions that only touch),
+    # rather than comparing every pair of regions.
+    tree = STRtree(boxes)
+    region_indexes, comp_indexes = tree.query(boxes, predicate='intersects')
+    region_overlap_ids = {}
+    for i, j in zip(region_indexes, comp_indexes):
+        if i == j:
+            # Same region, skip
             continue
-        region_overlap_ids = set(region_overlap_ids)
-        if region_overlap_ids in overlapping_regions:
+        region_overlap_ids.setdefault(i, set([region_dicts[i].get('id')]))
+        region_overlap_ids[i].add(region_dicts[j].get('id'))
+    for i in sorted(region_overlap_ids.keys()):
+        if region_overlap_ids[i] in overlapping_regions:
             continue
-        overlapping_regions.append(region_overlap_ids)
+        overlapping_regions.append(region_overlap_ids[i])
     return overlapping_regions
 
 
@@ -239,6 +270,301 @@ def check_cluster_contains_enough(region_dict, lone_point_check_uuid=None):
     return False
 
 
+def make_region_dict(
+    cluster_id,
+    count_points,
+    min_lon,
+    min_lat,
+    max_lon,
+    max_lat,
+    min_cluster_size_km=MIN_CLUSTER_SIZE_KM,
+):
+    """Makes a region dict for a cluster from its bounding box"""
+    region_dict = {
+        'id': cluster_id,
+        'count_points': count_points,
+        'max_lon': max_lon,
+        'max_lat': max_lat,
+        'min_lon': min_lon,
+        'min_lat': min_lat,
+    }
+    # ensure a minimum sized region
+    region_dict = make_min_size_region(
+        region_dict,
+        min_distance=min_cluster_size_km
+    )
+    region_dict['coordinates'] = geo_utils.make_geojson_coord_box(
+        region_dict['min_lon'],
+        region_dict['min_lat'],
+        region_dict['max_lon'],
+        region_dict['max_lat'],
+    )
+    region_dict['cent_lon'], region_dict['cent_lat'] = (
+        geo_utils.get_centroid_of_coord_box(region_dict['coordinates'])
+    )
+    return region_dict
+
+
+def make_weighted_points_df(df, max_points=MAX_HIERARCHICAL_POINTS):
+    """Makes a dataframe of deduplicated (weighted) points, binned
+    into grid cells if there are more than max_points
+
+    :param DataFrame df: A Pandas DataFrame with longitude and
+        latitude columns and (non-null) values.
+    :param int max_points: The maximum number of weighted points
+
+    returns a DataFrame with longitude, latitude (the weighted
+        centroid), count_points, min_lon, min_lat, max_lon, max_lat
+        columns
+    """
+    df_w = df.groupby(
+        ['latitude', 'longitude'],
+        as_index=False,
+    ).size().rename(columns={'size': 'count_points'})
+    if len(df_w.index) <= max_points:
+        # Each weighted point is its own bounding box.
+        df_w['min_lat'] = df_w['latitude']
+        df_w['max_lat'] = df_w['latitude']
+        df_w['min_lon'] = df_w['longitude']
+        df_w['max_lon'] = df_w['longitude']
+        return df_w
+    df_w['w_lat'] = df_w['latitude'] * df_w['count_points']
+    df_w['w_lon'] = df_w['longitude'] * df_w['count_points']
+    span = max(
+        (df_w['latitude'].max() - df_w['latitude'].min()),
+        (df_w['longitude'].max() - df_w['longitude'].min()),
+    )
+    cell_size = span / math.floor(math.sqrt(max_points))
+    while True:
+        df_w['lat_cell'] = np.floor(
+            (df_w['latitude'] - df_w['latitude'].min()) / cell_size
+        ).astype(int)
+        df_w['lon_cell'] = np.floor(
+            (df_w['longitude'] - df_w['longitude'].min()) / cell_size
+        ).astype(int)
+        df_c = df_w.groupby(['lat_cell', 'lon_cell'], as_index=False).agg(
+            count_points=('count_points', 'sum'),
+            w_lat=('w_lat', 'sum'),
+            w_lon=('w_lon', 'sum'),
+            min_lat=('latitude', 'min'),
+            max_lat=('latitude', 'max'),
+            min_lon=('longitude', 'min'),
+            max_lon=('longitude', 'max'),
+        )
+        if len(df_c.index) <= max_points:
+            break
+        # Too many occupied cells, so try bigger ones.
+        cell_size *= 1.5
+    df_c['latitude'] = df_c['w_lat'] / df_c['count_points']
+    df_c['longitude'] = df_c['w_lon'] / df_c['count_points']
+    return df_c[
+        [
+            'latitude',
+            'longitude',
+            'count_points',
+            'min_lat',
+            'min_lon',
+            'max_lat',
+            'max_lon',
+        ]
+    ]
+
+
+def make_region_dicts_for_cluster_ids(
+    df_w,
+    cluster_ids,
+    min_cluster_size_km=MIN_CLUSTER_SIZE_KM,
+):
+    """Makes region dicts for clusters of weighted points, computing
+    the bounding boxes of all the clusters at once
+
+    :param DataFrame df_w: A DataFrame of weighted points
+    :param array cluster_ids: The cluster id of each weighted point
+    """
+    df_r = df_w.assign(geo_cluster=cluster_ids).groupby('geo_cluster').agg(
+        count_points=('count_points', 'sum'),
+        min_lon=('min_lon', 'min'),
+        min_lat=('min_lat', 'min'),
+        max_lon=('max_lon', 'max'),
+        max_lat=('max_lat', 'max'),
+    )
+    region_dicts = []
+    for cluster_id, row in df_r.iterrows():
+        region_dicts.append(
+            make_region_dict(
+                int(cluster_id),
+                int(row['count_points']),
+                float(row['min_lon']),
+                float(row['min_lat']),
+                float(row['max_lon']),
+                float(row['max_lat']),
+                min_cluster_size_km=min_cluster_size_km,
+            )
+        )
+    return region_dicts
+
+
+def check_region_dicts_reasonable(region_dicts, lone_point_check_uuid=None):
+    """Checks that regions don't overlap and have enough in them"""
+    if len(check_region_overlaps(region_dicts)):
+        return False
+    for region_dict in region_dicts:
+        contains_enough = check_cluster_contains_enough(
+            region_dict,
+            lone_point_check_uuid=lone_point_check_uuid
+        )
+        if not contains_enough:
+            return False
+    return True
+
+
+def make_weighted_ward_linkage(points, weights):
+    """Makes a Ward linkage matrix (like scipy's linkage) for weighted
+    points, where each point counts like weight points at the same place
+
+    Scipy's linkage has no weights, so we use the nearest neighbor
+    chain algorithm with the Lance-Williams updates of Ward distances.
+    Cluster sizes start out as the weights rather than 1.
+
+    :param array points: An (n, 2) array of coordinates
+    :param array weights: An array of n (positive) point weights
+
+    returns a linkage matrix that works with scipy's fcluster. Like
+        scipy's, the last column counts the (unweighted) points in
+        each merged cluster.
+    """
+    points = np.asarray(points, dtype=float)
+    sizes = np.asarray(weights, dtype=float).copy()
+    n = len(sizes)
+    # Squared Ward distances, scaled like scipy (so two points with
+    # weights of 1 are apart by their euclidean distance).
+    dists = (
+        np.subtract.outer(points[:, 0], points[:, 0]) ** 2
+        + np.subtract.outer(points[:, 1], points[:, 1]) ** 2
+    )
+    dists *= 2.0 * np.outer(sizes, sizes) / np.add.outer(sizes, sizes)
+    np.fill_diagonal(dists, np.inf)
+    active = np.ones(n, dtype=bool)
+    # Scipy's fcluster expects counts of observations (not weights) in
+    # the linkage matrix.
+    obs_counts = np.ones(n, dtype=int)
+    merges = []
+    chain = []
+    while len(merges) < (n - 1):
+        if not chain:
+            chain.append(int(np.argmax(active)))
+        while True:
+            a = chain[-1]
+            b = int(np.argmin(dists[a]))
+            if len(chain) > 1 and dists[a, chain[-2]] <= dists[a, b]:
+                # Prefer the prior link of the chain for ties.
+                b = chain[-2]
+            if len(chain) > 1 and b == chain[-2]:
+                break
+            chain.append(b)
+        # a and b are reciprocal nearest neighbors, so merge them.
+        b = chain.pop()
+        a = chain.pop()
+        dist_ab = dists[a, b]
+        size_a = sizes[a]
+        size_b = sizes[b]
+        with np.errstate(invalid='ignore'):
+            new_dists = (
+                (size_a + sizes) * dists[a]
+                + (size_b + sizes) * dists[b]
+                - sizes * dist_ab
+            ) / (size_a + size_b + sizes)
+        active[b] = False
+        new_dists[~active] = np.inf
+        # The merged cluster takes the place of a.
+        dists[a, :] = new_dists
+        dists[:, a] = new_dists
+        dists[a, a] = np.inf
+        dists[b, :] = np.inf
+        dists[:, b] = np.inf
+        sizes[a] = size_a + size_b
+        obs_counts[a] += obs_counts[b]
+        merges.append((a, b, math.sqrt(max(dist_ab, 0.0)), obs_counts[a]))
+    # Sort the merges by distance and label the clusters the way
+    # scipy does, with merged clusters numbered from n.
+    merges.sort(key=lambda m: m[2])
+    parents = list(range(n))
+    link_matrix = np.zeros((len(merges), 4), dtype=float)
+    for i, (a, b, dist, size) in enumerate(merges):
+        cluster_ids = []
+        for act_id in [a, b]:
+            while parents[act_id] != act_id:
+                act_id = parents[act_id]
+            cluster_ids.append(act_id)
+        new_id = n + i
+        parents.append(new_id)
+        parents[cluster_ids[0]] = new_id
+        parents[cluster_ids[1]] = new_id
+        link_matrix[i] = [min(cluster_ids), max(cluster_ids), dist, size]
+    return link_matrix
+
+
+def cluster_geo_centroids_hierarchical(
+    df,
+    max_clusters=MAX_CLUSTERS,
+    min_cluster_size_km=MIN_CLUSTER_SIZE_KM,
+    lone_point_check_uuid=None,
+    max_points=MAX_HIERARCHICAL_POINTS,
+):
+    """Clusters centroids with one hierarchical clustering of
+    weighted points, returning the regions of the first reasonable
+    cut of the dendrogram (starting with max_clusters)
+
+    :param DataFrame df: A Pandas DataFrame with longitude and
+        latitude columns and (non-null) values.
+    :param int max_clusters: The maximum number of clusters
+        to return
+    :param float min_cluster_size_km: The minimum diagonal
+        length in KM between min(lat/lon) and max(lat/lon)
+    :param UUID lone_point_check_uuid: A UUID or string UUID that
+        needs to be checked to see if this point is representative
+        of enough items to be its own cluster.
+    :param int max_points: The maximum number of weighted points
+        (or grid cells) to cluster
+    """
+    df_w = make_weighted_points_df(df, max_points=max_points)
+    if len(df_w.index) < 2:
+        return make_region_dicts_for_cluster_ids(
+            df_w,
+            np.ones(len(df_w.index), dtype=int),
+            min_cluster_size_km=min_cluster_size_km,
+        )
+    # Weight each point (or grid cell) by its count, so a dense site
+    # pulls clusters toward it more than a lone point does.
+    link_matrix = make_weighted_ward_linkage(
+        df_w[['longitude', 'latitude']].to_numpy(dtype=float),
+        df_w['count_points'].to_numpy(dtype=float),
+    )
+    region_dicts = []
+    prior_cluster_count = None
+    act_cluster_count = min(max_clusters, len(df_w.index))
+    while act_cluster_count >= 1:
+        cluster_ids = fcluster(link_matrix, act_cluster_count, criterion='maxclust')
+        cluster_count = len(np.unique(cluster_ids))
+        act_cluster_count -= 1
+        if cluster_count == prior_cluster_count:
+            # Cuts of a dendrogram with the same number of clusters
+            # are the same, so we already checked these.
+            continue
+        prior_cluster_count = cluster_count
+        region_dicts = make_region_dicts_for_cluster_ids(
+            df_w,
+            cluster_ids,
+            min_cluster_size_km=min_cluster_size_km,
+        )
+        if check_region_dicts_reasonable(
+            region_dicts,
+            lone_point_check_uuid=lone_point_check_uuid
+        ):
+            break
+    return region_dicts
+
+
 def cluster_geo_centroids(
     df,
     max_clusters=MAX_CLUSTERS,
@@ -254,8 +580,8 @@ def cluster_geo_centroids(
         to return
     :param float min_cluster_size_km: The minimum diagonal
         length in KM between min(lat/lon) and max(lat/lon)
-    :param str cluster_method: A string that names the sklearn
-        clustering method to use on these data.
+    :param str cluster_method: A string that names the clustering
+        method to use on these data.
     :param UUID lone_point_check_uuid: A UUID or string UUID that
         needs to be checked to see if this point is representative
         of enough items to be its own cluster.
@@ -337,6 +663,14 @@ def cluster_geo_centroids(
     if min_cluster_size_km > max_dataset_distance * 0.05:
         min_cluster_size_km = max_dataset_distance * 0.05
 
+    if cluster_method == 'Hierarchical':
+        return cluster_geo_centroids_hierarchical(
+            df,
+            max_clusters=max_clusters,
+            min_cluster_size_km=min_cluster_size_km,
+            lone_point_check_uuid=lone_point_check_uuid,
+        )
+
     region_dicts = []
     reasonable_clusters = False
     act_cluster_count = max_clusters
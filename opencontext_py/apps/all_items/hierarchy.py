@@ -3,6 +3,7 @@ import copy
 
 from django.core.cache import caches
 
+from opencontext_py.apps.all_items import concept_graph
 from opencontext_py.apps.all_items import configs
 from opencontext_py.apps.all_items import labels
 from opencontext_py.apps.all_items import models_utils
@@ -48,6 +49,14 @@ def get_list_concept_children_recursive(parent_obj, use_cache=True, all_children
 
     return list of child concepts.
     """
+    if (
+        use_cache
+        and not all_children
+        and concept_graph.check_item_in_concept_graph(parent_obj)
+    ):
+        # Use the in-process concept graph, no I/O needed.
+        graph = concept_graph.get_concept_graph()
+        return graph.get_descendant_objs(parent_obj.uuid)
     if not all_children:
         all_children = []
     act_children = models_utils.get_immediate_concept_children_objs(
@@ -75,6 +84,19 @@ def get_concept_parent_paths(child_obj, use_cache=True, paths=None):
 
     Returns a list of lists.
     """
+    if (
+        use_cache
+        and paths is None
+        and concept_graph.check_item_in_concept_graph(child_obj)
+    ):
+        # Use the precomputed paths of the in-process concept graph,
+        # no I/O needed.
+        graph = concept_graph.get_concept_graph()
+        parent_paths = graph.get_parent_obj_paths(child_obj.uuid)
+        if parent_paths is not None:
+            if not parent_paths:
+                return [[child_obj]]
+            return [([child_obj] + p) for p in parent_paths]
     if paths is None:
         paths = [[child_obj]]
     parent_objs = models_utils.get_immediate_concept_parent_objs(
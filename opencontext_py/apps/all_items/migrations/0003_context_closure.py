@@ -0,0 +1,72 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# NOTE: This migration keeps its own copies of these values and of the
+# SQL to fill the closure table, so later changes to the
+# context_closure module or the configs don't change what this
+# migration does.
+SUBJECTS_ROOTS = [
+    'fc8ff176-beb1-4aaa-896b-d5f49ede58c8',
+    '572c2821-d2a8-4986-8537-5e37a64c7361',
+]
+MAX_DEPTH = 100
+
+
+def _to_pg_text_array(values):
+    return ", ".join(f"'{val}'" for val in values)
+
+
+SQL_FILL_CONTEXT_CLOSURE = f"""
+INSERT INTO oc_all_context_closure (ancestor_uuid, descendant_uuid, depth)
+WITH RECURSIVE chain AS (
+    SELECT
+        m.uuid AS ancestor_uuid,
+        m.uuid AS descendant_uuid,
+        0 AS depth
+    FROM oc_all_manifest AS m
+    WHERE m.item_type = 'subjects'
+
+    UNION ALL
+
+    SELECT
+        parent.uuid AS ancestor_uuid,
+        chain.descendant_uuid,
+        chain.depth + 1 AS depth
+    FROM chain
+    JOIN oc_all_manifest AS child ON child.uuid = chain.ancestor_uuid
+    JOIN oc_all_manifest AS parent ON parent.uuid = child.context_uuid
+    WHERE parent.item_type = 'subjects'
+      AND parent.uuid <> child.uuid
+      AND NOT (child.uuid::text = ANY(ARRAY[{_to_pg_text_array(SUBJECTS_ROOTS)}]::text[]))
+      AND chain.depth < {MAX_DEPTH}
+)
+SELECT ancestor_uuid, descendant_uuid, MIN(depth)
+FROM chain
+GROUP BY ancestor_uuid, descendant_uuid;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('all_items', '0002_manifest_spacetime_sql'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AllContextClosure',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('depth', models.IntegerField()),
+                ('ancestor', models.ForeignKey(db_column='ancestor_uuid', on_delete=django.db.models.deletion.CASCADE, related_name='+', to='all_items.allmanifest')),
+                ('descendant', models.ForeignKey(db_column='descendant_uuid', on_delete=django.db.models.deletion.CASCADE, related_name='+', to='all_items.allmanifest')),
+            ],
+            options={
+                'db_table': 'oc_all_context_closure',
+                'indexes': [models.Index(fields=['descendant', 'depth'], name='closure_descendant_depth_idx'), models.Index(fields=['ancestor', 'depth'], name='closure_ancestor_depth_idx')],
+                'unique_together': {('ancestor', 'descendant')},
+            },
+        ),
+        migrations.RunSQL(SQL_FILL_CONTEXT_CLOSURE, migrations.RunSQL.noop),
+    ]
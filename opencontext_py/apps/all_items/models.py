@@ -1838,6 +1838,47 @@ class AllIdentifier(models.Model):
         default_related_name = 'identifiers'
 
 
+# NOTE: AllContextClosure is a closure table for the spatial context
+# hierarchy of "subjects" items. Each subjects item has a row for
+# itself (depth 0) and a row for every one of its context ancestors
+# (depth 1 is the immediate parent, depth 2 the grandparent, etc.),
+# up to and including the subjects root items. This lets us get all
+# the ancestors or descendants of an item with a single indexed
+# query. See all_items/context_closure.py for functions that maintain
+# and query this table.
+class AllContextClosure(models.Model):
+    id = models.BigAutoField(primary_key=True)
+    ancestor = models.ForeignKey(
+        AllManifest,
+        db_column='ancestor_uuid',
+        related_name='+',
+        on_delete=models.CASCADE,
+    )
+    descendant = models.ForeignKey(
+        AllManifest,
+        db_column='descendant_uuid',
+        related_name='+',
+        on_delete=models.CASCADE,
+    )
+    depth = models.IntegerField()
+
+    def __str__(self):
+        return f'{self.ancestor_id} -> {self.descendant_id} ({self.depth})'
+
+    class Meta:
+        db_table = 'oc_all_context_closure'
+        unique_together = (
+            (
+                "ancestor",
+                "descendant",
+            ),
+        )
+        indexes = [
+            models.Index(fields=["descendant", "depth"], name="closure_descendant_depth_idx"),
+            models.Index(fields=["ancestor", "depth"], name="closure_ancestor_depth_idx"),
+        ]
+
+
 class ManifestCachedSpacetime(models.Model):
     """Model mapped to the oc_all_manifest_best_spacetime view.
     
@@ -16,6 +16,10 @@ from django.db.models import Q
 from django.template.defaultfilters import slugify
 
 from opencontext_py.apps.all_items import configs
+from opencontext_py.libs.cachecodec import (
+    decode_cache_value,
+    encode_cache_value,
+)
 
 
 DEFAULT_LABEL_SORT_LEN = 9
@@ -502,14 +506,14 @@ def get_immediate_concept_parent_objs(child_obj, use_cache=True):
         return get_immediate_concept_parent_objs_db(child_obj)
     cache_key = f'{str(child_obj.uuid)}-concept-parents'
     cache = caches['redis']
-    all_parents = cache.get(cache_key)
+    all_parents = decode_cache_value(cache.get(cache_key))
     if all_parents is not None:
         return all_parents
     # We don't have this cached yet, so get the result from
     # the cache.
     all_parents = get_immediate_concept_parent_objs_db(child_obj)
     try:
-        cache.set(cache_key, all_parents)
+        cache.set(cache_key, encode_cache_value(all_parents))
     except:
         pass
     return all_parents
@@ -521,14 +525,14 @@ def get_immediate_concept_children_objs(parent_obj, use_cache=True):
         return get_immediate_concept_children_objs_db(parent_obj)
     cache_key = f'{str(parent_obj.uuid)}-concept-children'
     cache = caches['redis']
-    all_children = cache.get(cache_key)
+    all_children = decode_cache_value(cache.get(cache_key))
     if all_children is not None:
         return all_children
     # We don't have this cached yet, so get the result from
     # the cache.
     all_children = get_immediate_concept_children_objs_db(parent_obj)
     try:
-        cache.set(cache_key, all_children)
+        cache.set(cache_key, encode_cache_value(all_children))
     except:
         pass
     return all_children
@@ -540,14 +544,14 @@ def get_immediate_context_parent_obj(child_obj, use_cache=True):
         return get_immediate_context_parent_obj_db(child_obj)
     cache_key = f'{str(child_obj.uuid)}-context-parent'
     cache = caches['redis']
-    parent_obj = cache.get(cache_key)
+    parent_obj = decode_cache_value(cache.get(cache_key))
     if parent_obj is not None:
         return parent_obj
     # We don't have this cached yet, so get the result from
     # the cache.
     parent_obj = get_immediate_concept_parent_objs_db(child_obj)
     try:
-        cache.set(cache_key, parent_obj)
+        cache.set(cache_key, encode_cache_value(parent_obj))
     except:
         pass
     return parent_obj
@@ -559,14 +563,14 @@ def get_immediate_context_children_obs(parent_obj, use_cache=True):
         return get_immediate_context_children_objs_db(parent_obj)
     cache_key = f'{str(parent_obj.uuid)}-context-children'
     cache = caches['redis']
-    all_children = cache.get(cache_key)
+    all_children = decode_cache_value(cache.get(cache_key))
     if all_children is not None:
         return all_children
     # We don't have this cached yet, so get the result from
     # the cache.
     all_children = get_immediate_context_children_objs_db(parent_obj)
     try:
-        cache.set(cache_key, all_children)
+        cache.set(cache_key, encode_cache_value(all_children))
     except:
         pass
     return all_children
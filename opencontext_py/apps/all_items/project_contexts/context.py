@@ -11,6 +11,10 @@ from opencontext_py.apps.all_items.models import (
     AllAssertion,
     AllManifest,
 )
+from opencontext_py.libs.cachecodec import (
+    decode_cache_value,
+    encode_cache_value,
+)
 
 
 logger = logging.getLogger("project-context-logger")
@@ -277,7 +281,7 @@ def get_project_context_df_from_cache(project_id):
     """
     cache = caches['redis_context']
     cache_key = make_project_context_cache_key(project_id)
-    return cache.get(cache_key)
+    return decode_cache_value(cache.get(cache_key))
 
 
 def clear_project_context_df_from_cache(project_id):
@@ -301,14 +305,14 @@ def get_cache_project_context_df(project_id, use_cache=True, reset_cache=False):
     df = None
     cache_key = make_project_context_cache_key(project_id)
     if not reset_cache:
-        df = cache.get(cache_key)
+        df = decode_cache_value(cache.get(cache_key))
 
     if df is not None:
         return df
 
     df = db_make_project_context_df(project_id)
     try:
-        cache.set(cache_key, df, timeout=DEFAULT_TIMEOUT)
+        cache.set(cache_key, encode_cache_value(df), timeout=DEFAULT_TIMEOUT)
     except:
         logger.info(f'Cache failure with: {cache_key}')
     return df
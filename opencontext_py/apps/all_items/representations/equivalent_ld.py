@@ -6,7 +6,6 @@ import numpy as np
 import pandas as pd
 
 from django.conf import settings
-from django.core.cache import caches
 
 
 from opencontext_py.apps.all_items import configs
@@ -26,6 +25,13 @@ from opencontext_py.apps.all_items.representations.rep_utils import (
 
 from opencontext_py.apps.all_items.representations import item_class_defaults
 
+from opencontext_py.libs.cacheutilities import (
+    cache_get,
+    cache_get_many,
+    cache_set,
+    cache_set_many,
+)
+
 LITERAL_ASSERTION_ATTRIBUTES = [v for _, v in ASSERTION_DATA_TYPE_LITERAL_MAPPINGS.items()]
 
 # Make these from fixtures so don't need to query the DB
@@ -229,32 +235,34 @@ def make_manifest_obj_cache_key(uuid):
 
 
 def cache_all_df_context_related_manifest_objects(df_context):
-    cache = caches['redis']
     if not 'object_id' in df_context.columns:
         return None
     all_uuids = df_context[
         ~df_context['object_id'].isnull()
         & (df_context['object_id'] != 'nan')
     ]['object_id'].unique().tolist()
-    uuids = []
-    for uuid in all_uuids:
-        cache_key = make_manifest_obj_cache_key(uuid)
-        if cache.get(cache_key):
-            # We've already got this cached.
-            continue
-        uuids.append(uuid)
+    # Check the cache for all of these in one round trip.
+    cache_dict = cache_get_many(
+        'redis',
+        [make_manifest_obj_cache_key(uuid) for uuid in all_uuids]
+    )
+    uuids = [
+        uuid for uuid in all_uuids
+        if not cache_dict.get(make_manifest_obj_cache_key(uuid))
+    ]
+    if not uuids:
+        # We've already got these cached.
+        return None
 
     mqs = AllManifest.objects.filter(
         uuid__in=uuids
     ).select_related(
         'context'
     )
-    for man_obj in mqs:
-        cache_key = make_manifest_obj_cache_key(man_obj.uuid)
-        try:
-            cache.set(cache_key, man_obj)
-        except:
-            pass
+    cache_set_many(
+        'redis',
+        {make_manifest_obj_cache_key(man_obj.uuid): man_obj for man_obj in mqs}
+    )
 
 
 def get_real_man_obj_from_equiv_row(equiv_row, use_cache=True):
@@ -264,8 +272,7 @@ def get_real_man_obj_from_equiv_row(equiv_row, use_cache=True):
     cache_key = None
     if use_cache:
         cache_key = make_manifest_obj_cache_key(uuid)
-        cache = caches['redis']
-        man_obj = cache.get(cache_key)
+        man_obj = cache_get('redis', cache_key)
     if man_obj:
         return man_obj
     man_obj = AllManifest.objects.filter(
@@ -273,11 +280,8 @@ def get_real_man_obj_from_equiv_row(equiv_row, use_cache=True):
     ).select_related(
         'context'
     ).first()
-    if cache_key:
-        try:
-            cache.set(cache_key, man_obj)
-        except:
-            pass
+    if cache_key and man_obj:
+        cache_set('redis', cache_key, man_obj)
     return man_obj
 
 
@@ -1,3 +1,5 @@
+import copy
+
 
 
 
@@ -7,6 +9,7 @@ from opencontext_py.libs.isoyears import ISOyears
 
 
 from opencontext_py.apps.all_items import configs
+from opencontext_py.apps.all_items import context_closure
 from opencontext_py.apps.all_items.models import (
     AllSpaceTime,
 )
@@ -32,27 +35,42 @@ DEFAULT_LOCATION_LOW_PRECISION_NOTE = (
 DEFAULT_LOCATION_SECURITY_NOTE = 'Location data approximated as a security precaution.'
 
 
-def get_spacetime_geo_and_chronos(rel_subjects_man_obj, require_geo=True):
-    """Gets space time objects for a manifest_obj and parent contexts
+def get_spacetime_context_objs(rel_subjects_man_obj, context_ancestors_dict=None):
+    """Gets the list of manifest objects that may have spacetime objects
+    for a rel_subjects_man_obj, ordered from most specific to most general
 
     :param AllManifest rel_subjects_man_obj: The related manifest item
         that will hopefully have associated (either directly or through
         contexts) geospatial and chronology data.
-    :param bool require_geo: If True, return None if there is no
-        geospatial data to return. If False, allow return of chronology
-        absent geospatial data.
+    :param dict context_ancestors_dict: An optional dict of prefetched
+        context ancestors (see context_closure.get_context_ancestors_dict)
+        used instead of a query of the context closure table.
     """
     if not rel_subjects_man_obj:
-        return None
+        return []
     if (rel_subjects_man_obj.item_type not in GEO_OK_ITEM_TYPES
         and rel_subjects_man_obj.context.uri not in GAZETTEER_VOCAB_URIS):
-        return None
+        return []
     if rel_subjects_man_obj.item_type == 'persons' and not rel_subjects_man_obj.meta_json.get('flag_do_index'):
         # Only get geospatial data for persons records if they have a meta_json do_index key = True
-        return None
+        return []
     context_objs = [rel_subjects_man_obj]
     # Get a list of all the context objects in this manifest_obj
     # hierarchy.
+    if rel_subjects_man_obj.item_type == 'subjects':
+        # Get all the context ancestors in one query of the context
+        # closure table (or from the prefetched ancestors).
+        if context_ancestors_dict is not None:
+            ancestors = context_ancestors_dict.get(str(rel_subjects_man_obj.uuid))
+            if ancestors is not None:
+                ancestors = [
+                    a for a in ancestors
+                    if str(a.uuid) not in configs.DEFAULT_SUBJECTS_ROOTS
+                ]
+        else:
+            ancestors = context_closure.get_context_ancestors(rel_subjects_man_obj)
+        if ancestors is not None:
+            return context_objs + ancestors
     if rel_subjects_man_obj.item_type not in ['media', 'documents']:
         # Only do this for items that are not media or documents.
         act_man_obj = rel_subjects_man_obj
@@ -66,16 +84,33 @@ def get_spacetime_geo_and_chronos(rel_subjects_man_obj, require_geo=True):
                 break
             context_objs.append(act_man_obj.context)
             act_man_obj = act_man_obj.context
+    return context_objs
 
-    context_order_dict = {}
-    context_order = 0
-    for context_obj in context_objs:
-        context_order += 1
-        context_order_dict[context_obj.uuid] = context_order
 
-    # Now use these context objects to query for space time objects
+def get_spacetime_objs_dict(man_objs, context_ancestors_dict=None):
+    """Gets a dict, keyed by item uuid, of spacetime objects for a list
+    of manifest objects and all their parent contexts in one query
+
+    :param list man_objs: List of AllManifest objects that may get
+        GeoJSON representations.
+    :param dict context_ancestors_dict: An optional dict of prefetched
+        context ancestors (see context_closure.get_context_ancestors_dict)
+    """
+    context_uuids = set()
+    for man_obj in man_objs:
+        context_objs = get_spacetime_context_objs(
+            man_obj,
+            context_ancestors_dict=context_ancestors_dict,
+        )
+        context_uuids.update([str(c_obj.uuid) for c_obj in context_objs])
+    # NOTE: Every context uuid gets a key, even with an empty list, so
+    # we can tell the difference between "prefetched, nothing found" and
+    # "not prefetched".
+    spacetime_objs_dict = {uuid: [] for uuid in context_uuids}
+    if not context_uuids:
+        return spacetime_objs_dict
     spacetime_qs = AllSpaceTime.objects.filter(
-        item__in=context_objs,
+        item_id__in=list(context_uuids),
     ).select_related(
         'item'
     ).select_related(
@@ -87,6 +122,73 @@ def get_spacetime_geo_and_chronos(rel_subjects_man_obj, require_geo=True):
     ).order_by(
         '-item__path'
     )
+    for spacetime_obj in spacetime_qs:
+        spacetime_objs_dict[str(spacetime_obj.item_id)].append(spacetime_obj)
+    return spacetime_objs_dict
+
+
+def get_spacetime_geo_and_chronos(
+    rel_subjects_man_obj,
+    require_geo=True,
+    spacetime_objs_dict=None,
+    context_ancestors_dict=None,
+):
+    """Gets space time objects for a manifest_obj and parent contexts
+
+    :param AllManifest rel_subjects_man_obj: The related manifest item
+        that will hopefully have associated (either directly or through
+        contexts) geospatial and chronology data.
+    :param bool require_geo: If True, return None if there is no
+        geospatial data to return. If False, allow return of chronology
+        absent geospatial data.
+    :param dict spacetime_objs_dict: An optional dict of prefetched
+        spacetime objects (see get_spacetime_objs_dict) used instead
+        of a database query.
+    :param dict context_ancestors_dict: An optional dict of prefetched
+        context ancestors (see context_closure.get_context_ancestors_dict)
+    """
+    context_objs = get_spacetime_context_objs(
+        rel_subjects_man_obj,
+        context_ancestors_dict=context_ancestors_dict,
+    )
+    if not context_objs:
+        return None
+
+    context_order_dict = {}
+    context_order = 0
+    for context_obj in context_objs:
+        context_order += 1
+        context_order_dict[context_obj.uuid] = context_order
+
+    if (spacetime_objs_dict is not None
+        and all(str(c_obj.uuid) in spacetime_objs_dict for c_obj in context_objs)):
+        # Use the prefetched spacetime objects. We copy them because the
+        # loop below adds item specific attributes, and the same parent
+        # context spacetime objects get shared by many items.
+        spacetime_qs = [
+            copy.copy(spacetime_obj)
+            for c_obj in context_objs
+            for spacetime_obj in spacetime_objs_dict.get(str(c_obj.uuid), [])
+        ]
+        spacetime_qs.sort(
+            key=lambda spacetime_obj: (spacetime_obj.item.path or ''),
+            reverse=True,
+        )
+    else:
+        # Now use these context objects to query for space time objects
+        spacetime_qs = AllSpaceTime.objects.filter(
+            item__in=context_objs,
+        ).select_related(
+            'item'
+        ).select_related(
+            'item__project'
+        ).select_related(
+            'event'
+        ).select_related(
+            'event__item_class'
+        ).order_by(
+            '-item__path'
+        )
     if not len(spacetime_qs):
         # We found no spacetime objects at all. Distressing, but possible
         # if we're still preparing a dataset for publication.
@@ -364,7 +466,14 @@ def alter_geometry_by_precision_specificity(
     return geometry
 
 
-def add_geojson_features(item_man_obj, rel_subjects_man_obj=None, act_dict=None, for_solr=False):
+def add_geojson_features(
+    item_man_obj,
+    rel_subjects_man_obj=None,
+    act_dict=None,
+    for_solr=False,
+    spacetime_objs_dict=None,
+    context_ancestors_dict=None,
+):
     """Adds GeoJSON feature (with when object) to the act_dict
 
     :param AllManifest item_man_obj: The manifest object getting a
@@ -374,6 +483,10 @@ def add_geojson_features(item_man_obj, rel_subjects_man_obj=None, act_dict=None,
         of spacetime data for the item_man_obj.
     :param bool for_solr: A boolean flag to add additional metadata because
         the dict will be used for solr indexing.
+    :param dict spacetime_objs_dict: An optional dict of prefetched
+        spacetime objects (see get_spacetime_objs_dict)
+    :param dict context_ancestors_dict: An optional dict of prefetched
+        context ancestors (see context_closure.get_context_ancestors_dict)
     """
     if not act_dict:
         act_dict = LastUpdatedOrderedDict()
@@ -382,19 +495,35 @@ def add_geojson_features(item_man_obj, rel_subjects_man_obj=None, act_dict=None,
     if rel_subjects_man_obj and item_man_obj.item_type == 'projects' and  item_man_obj.item_class.slug == 'oc-gen-cat-collection':
         # We have a related subject item, and we're dealing with a project that is a collection. Get the
         # spatial data from the related subject item.
-        act_spacetime_features = get_spacetime_geo_and_chronos(rel_subjects_man_obj)
+        act_spacetime_features = get_spacetime_geo_and_chronos(
+            rel_subjects_man_obj,
+            spacetime_objs_dict=spacetime_objs_dict,
+            context_ancestors_dict=context_ancestors_dict,
+        )
     elif item_man_obj.item_type in GEO_OK_ITEM_TYPES:
         # We're describing a subjects item, or another item that can
         # have it's own GeoJSON
         # so the rel_subjects_man_obj is the same manifest object.
-        act_spacetime_features = get_spacetime_geo_and_chronos(item_man_obj)
+        act_spacetime_features = get_spacetime_geo_and_chronos(
+            item_man_obj,
+            spacetime_objs_dict=spacetime_objs_dict,
+            context_ancestors_dict=context_ancestors_dict,
+        )
     elif item_man_obj.item_type == "uri" and item_man_obj.context.uri in GAZETTEER_VOCAB_URIS:
         # We're describing a geonames place item.
-        act_spacetime_features = get_spacetime_geo_and_chronos(item_man_obj)
+        act_spacetime_features = get_spacetime_geo_and_chronos(
+            item_man_obj,
+            spacetime_objs_dict=spacetime_objs_dict,
+            context_ancestors_dict=context_ancestors_dict,
+        )
 
     if rel_subjects_man_obj and not act_spacetime_features:
         # Get the spacetime features for this rel_subjects_man_obj.
-        act_spacetime_features = get_spacetime_geo_and_chronos(rel_subjects_man_obj)
+        act_spacetime_features = get_spacetime_geo_and_chronos(
+            rel_subjects_man_obj,
+            spacetime_objs_dict=spacetime_objs_dict,
+            context_ancestors_dict=context_ancestors_dict,
+        )
 
     if not act_spacetime_features:
         # No geomtries found in the whole context hierarchy, so
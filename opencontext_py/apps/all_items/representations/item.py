@@ -6,6 +6,7 @@ from django.db.models import OuterRef, Subquery
 from opencontext_py.libs.general import LastUpdatedOrderedDict
 
 from opencontext_py.apps.all_items import configs
+from opencontext_py.apps.all_items import context_closure
 from opencontext_py.apps.all_items import hierarchy
 from opencontext_py.apps.all_items.models import (
     AllManifest,
@@ -141,11 +142,18 @@ def _print_tree_dict(tree_dict, level=0):
 
 
 def get_item_assertions(
-        subject_id,
+        subject_id=None,
         select_related_object_contexts=False,
         get_geo_overlays=False,
+        subject_ids=None,
     ):
-    """Gets an assertion queryset about an item"""
+    """Gets an assertion queryset about an item (or a list of items)
+
+    :param str subject_id: UUID or string UUID for the item
+    :param list subject_ids: A list of UUIDs for many items. If given,
+        this is used instead of the subject_id and the queryset gets
+        ordered by subject first.
+    """
 
     # Limit this subquery to only 1 result, the first.
     thumbs_qs = AllResource.objects.filter(
@@ -180,9 +188,16 @@ def get_item_assertions(
         visible=True,
     ).order_by().values('object')[:1]
 
+    if subject_ids is not None:
+        filter_args = {'subject_id__in': subject_ids}
+        first_sort = ['subject_id']
+    else:
+        filter_args = {'subject_id': subject_id}
+        first_sort = []
+
     qs = AllAssertion.objects.filter(
-        subject_id=subject_id,
         visible=True,
+        **filter_args,
     ).exclude(
         # NOTE: Keep this for debugging. Sometimes vue won't render a
         # string with bad characters. We had trouble with
@@ -212,6 +227,7 @@ def get_item_assertions(
     ).select_related(
         'object__context'
     ).order_by(
+        *first_sort,
         'obs_sort',
         'event_sort',
         'attribute_group_sort',
@@ -244,18 +260,11 @@ def get_item_assertions(
     return qs
 
 
-def get_related_subjects_item_from_object_id(object_id):
-    """Gets a Query Set of subjects items related to an assertion object_id"""
-    # NOTE: Some media and documents items are only related to
-    # an item_type subject via an assertion where the media and
-    # documents items is the object of a assertion relationship.
-    # Since an item_type = 'subjects' is needed to establish the
-    # full context of a media or document item, and we won't necessarily
-    # get a relationship to an item_type = 'subjects' item from
-    # the get_item_assertions function, we will often need to
-    # do this additional query.
+def get_related_subjects_assertion_qs(object_ids):
+    """Gets a Query Set of assertions with subjects items as subjects
+    related to a list of assertion object_ids"""
     rel_subj_item_assetion_qs = AllAssertion.objects.filter(
-        object_id=object_id,
+        object_id__in=object_ids,
         subject__item_type='subjects',
         visible=True,
     ).select_related(
@@ -269,11 +278,36 @@ def get_related_subjects_item_from_object_id(object_id):
         rel_subj_item_assetion_qs,
         context_prefix='subject__'
     )
+    return rel_subj_item_assetion_qs
+
+
+def get_related_subjects_item_from_object_id(object_id):
+    """Gets a Query Set of subjects items related to an assertion object_id"""
+    # NOTE: Some media and documents items are only related to
+    # an item_type subject via an assertion where the media and
+    # documents items is the object of a assertion relationship.
+    # Since an item_type = 'subjects' is needed to establish the
+    # full context of a media or document item, and we won't necessarily
+    # get a relationship to an item_type = 'subjects' item from
+    # the get_item_assertions function, we will often need to
+    # do this additional query.
+    rel_subj_item_assetion_qs = get_related_subjects_assertion_qs(
+        object_ids=[object_id]
+    )
     return rel_subj_item_assetion_qs.first()
 
 
-def get_related_subjects_item_assertion(item_man_obj, assert_qs):
-    """Gets the related subject item for a media or documents subject item"""
+def get_related_subjects_item_assertion(item_man_obj, assert_qs, rel_subjects_dict=None):
+    """Gets the related subject item for a media or documents subject item
+
+    :param AllManifest item_man_obj: The item's manifest object
+    :param QuerySet assert_qs: A query set (or list) of assertions made
+        on the item
+    :param dict rel_subjects_dict: An optional dict, keyed by string uuid,
+        of prefetched related subjects manifest objects (see
+        get_related_subjects_items_dict). If given, we skip the
+        database query.
+    """
     if item_man_obj.item_type not in ['media', 'documents', 'tables',]:
         return None
 
@@ -285,6 +319,8 @@ def get_related_subjects_item_assertion(item_man_obj, assert_qs):
     # the assert_qs assertions, so we need to do another database pull
     # to check for manifest item_type 'subjects' items that are the
     # subject of an assertion.
+    if rel_subjects_dict is not None:
+        return rel_subjects_dict.get(str(item_man_obj.uuid))
     rel_subj_item_assetion = get_related_subjects_item_from_object_id(
         object_id=item_man_obj.uuid
     )
@@ -293,6 +329,43 @@ def get_related_subjects_item_assertion(item_man_obj, assert_qs):
     return rel_subj_item_assetion.subject
 
 
+def get_related_subjects_items_dict(man_objs_dict, assert_dict):
+    """Gets a dict of related subjects manifest objects for media,
+    documents, and tables items, in one query
+
+    :param dict man_objs_dict: A dict, keyed by string uuid, of item
+        manifest objects
+    :param dict assert_dict: A dict, keyed by string uuid, of lists of
+        assertions made on each item
+    """
+    object_ids = []
+    for uuid, item_man_obj in man_objs_dict.items():
+        if item_man_obj.item_type not in ['media', 'documents', 'tables',]:
+            continue
+        if any(
+            assert_obj.object.item_type == 'subjects'
+            for assert_obj in assert_dict.get(uuid, [])
+        ):
+            # We'll find the related subjects item in the item's
+            # own assertions.
+            continue
+        object_ids.append(uuid)
+    rel_subjects_dict = {}
+    if not object_ids:
+        return rel_subjects_dict
+    rel_subj_item_assetion_qs = get_related_subjects_assertion_qs(
+        object_ids
+    ).order_by(
+        'object_id',
+        'uuid',
+    )
+    for assert_obj in rel_subj_item_assetion_qs:
+        # The first assertion for each object wins, just like .first()
+        # in get_related_subjects_item_from_object_id.
+        rel_subjects_dict.setdefault(str(assert_obj.object_id), assert_obj.subject)
+    return rel_subjects_dict
+
+
 def get_observations_attributes_from_assertion_qs(
     assert_qs,
     for_edit=False,
@@ -391,8 +464,39 @@ def get_related_media_resources(item_man_obj):
     return resource_qs
 
 
-def add_related_media_files_dicts(item_man_obj, act_dict=None):
-    resource_qs = get_related_media_resources(item_man_obj)
+def get_related_media_resources_dict(man_objs):
+    """Gets a dict, keyed by item uuid, of related media resources
+    for a list of manifest objects in one query"""
+    item_ids = [
+        m.uuid for m in man_objs if m.item_type in ['media', 'projects']
+    ]
+    resources_dict = {}
+    if not item_ids:
+        return resources_dict
+    resource_qs = AllResource.objects.filter(
+        item_id__in=item_ids,
+    ).select_related(
+        'resourcetype'
+    ).select_related(
+        'mediatype'
+    ).select_related(
+        'mediatype__context'
+    )
+    for res_obj in resource_qs:
+        resources_dict.setdefault(str(res_obj.item_id), []).append(res_obj)
+    return resources_dict
+
+
+def add_related_media_files_dicts(item_man_obj, act_dict=None, resource_qs=None):
+    """Adds a list of file resource dicts to the act_dict
+
+    :param AllManifest item_man_obj: The item's manifest object
+    :param dict act_dict: The representation dict we're adding to
+    :param list resource_qs: An optional list of prefetched resource
+        objects for the item_man_obj. If None, we query the database.
+    """
+    if resource_qs is None:
+        resource_qs = get_related_media_resources(item_man_obj)
     if not resource_qs:
         return act_dict
     if not act_dict:
@@ -410,7 +514,12 @@ def add_related_media_files_dicts(item_man_obj, act_dict=None):
     return act_dict
 
 
-def add_to_parent_context_list(manifest_obj, context_list=None, for_solr_or_html=False):
+def add_to_parent_context_list(
+    manifest_obj,
+    context_list=None,
+    for_solr_or_html=False,
+    context_ancestors_dict=None,
+):
     """Recursively add to a list of parent contexts
 
     :param AllManifest manifest_obj: Instance of the AllManifest model that
@@ -419,11 +528,60 @@ def add_to_parent_context_list(manifest_obj, context_list=None, for_solr_or_html
         by this function
     :param bool for_solr_or_html: A boolean flag, if True add additional keys useful
         for HTML tempating
+    :param dict context_ancestors_dict: An optional dict of prefetched
+        context ancestors, including roots (see
+        context_closure.get_context_ancestors_dict) used instead of a
+        query of the context closure table.
     """
     if context_list is None:
         context_list = []
     if manifest_obj.item_type != 'subjects':
         return context_list
+    if not context_list:
+        # Get all the ancestors in one query of the context closure table,
+        # rather than walking up the hierarchy one context at a time.
+        if context_ancestors_dict is not None:
+            ancestors = context_ancestors_dict.get(str(manifest_obj.uuid))
+        else:
+            ancestors = context_closure.get_context_ancestors(
+                manifest_obj,
+                exclude_roots=False,
+            )
+        if ancestors is not None:
+            for act_obj in [manifest_obj] + ancestors:
+                if str(act_obj.uuid) == configs.DEFAULT_SUBJECTS_ROOT_UUID:
+                    break
+                context_list.append(
+                    make_parent_context_dict(
+                        act_obj,
+                        for_solr_or_html=for_solr_or_html,
+                    )
+                )
+            return context_list
+    context_list.append(
+        make_parent_context_dict(
+            manifest_obj,
+            for_solr_or_html=for_solr_or_html,
+        )
+    )
+    if (manifest_obj.context.item_type == 'subjects'
+       and str(manifest_obj.context.uuid) != configs.DEFAULT_SUBJECTS_ROOT_UUID):
+        context_list = add_to_parent_context_list(
+            manifest_obj.context,
+            context_list=context_list,
+            for_solr_or_html=for_solr_or_html,
+        )
+    return context_list
+
+
+def make_parent_context_dict(manifest_obj, for_solr_or_html=False):
+    """Makes a context dictionary for a parent context list
+
+    :param AllManifest manifest_obj: Instance of the AllManifest model that
+        we want to see context information
+    :param bool for_solr_or_html: A boolean flag, if True add additional keys useful
+        for HTML tempating
+    """
     item_dict = LastUpdatedOrderedDict()
     item_dict['id'] = rep_utils.make_web_url(manifest_obj)
     item_dict['slug'] = manifest_obj.slug
@@ -434,15 +592,7 @@ def add_to_parent_context_list(manifest_obj, context_list=None, for_solr_or_html
         item_dict['object__item_type'] = manifest_obj.item_type
         item_dict['item_class_id'] = str(manifest_obj.item_class.uuid)
         item_dict['item_class__label'] = manifest_obj.item_class.label
-    context_list.append(item_dict)
-    if (manifest_obj.context.item_type == 'subjects'
-       and str(manifest_obj.context.uuid) != configs.DEFAULT_SUBJECTS_ROOT_UUID):
-        context_list = add_to_parent_context_list(
-            manifest_obj.context,
-            context_list=context_list,
-            for_solr_or_html=for_solr_or_html,
-        )
-    return context_list
+    return item_dict
 
 
 def find_collection_rel_subject_man_obj(item_man_obj, assert_qs):
@@ -509,10 +659,10 @@ def start_item_representation_dict(item_man_obj, for_solr_or_html=False):
     return rep_dict
 
 
-def get_annotate_item_manifest_obj(subject_id):
-    """Gets an annotated item manifest object and joined objects
+def get_annotate_item_manifest_qs(subject_ids):
+    """Gets a queryset of annotated item manifest objects and joined objects
 
-    :param str subject_id: UUID or string UUID for the item
+    :param list subject_ids: List of UUIDs or string UUIDs for the items
     """
     # Limit this subquery to only 1 result, the first.
     item_hero_qs = AllResource.objects.filter(
@@ -547,7 +697,7 @@ def get_annotate_item_manifest_obj(subject_id):
     ).values('id')[:1]
 
     item_man_obj_qs = AllManifest.objects.filter(
-        uuid=subject_id
+        uuid__in=subject_ids
     ).select_related(
         'project'
     ).select_related(
@@ -573,7 +723,15 @@ def get_annotate_item_manifest_obj(subject_id):
     item_man_obj_qs = add_select_related_contexts_to_qs(
         item_man_obj_qs
     )
+    return item_man_obj_qs
+
+
+def get_annotate_item_manifest_obj(subject_id):
+    """Gets an annotated item manifest object and joined objects
 
+    :param str subject_id: UUID or string UUID for the item
+    """
+    item_man_obj_qs = get_annotate_item_manifest_qs([subject_id])
     item_man_obj = item_man_obj_qs.first()
     return item_man_obj
 
@@ -607,15 +765,36 @@ def add_persistent_identifiers(item_man_obj, rep_dict):
     return rep_dict
 
 
-def make_representation_dict(subject_id, for_solr_or_html=False, for_solr=False):
-    """Makes a representation dict for a subject id"""
+def make_representation_dict(
+    subject_id,
+    for_solr_or_html=False,
+    for_solr=False,
+    item_man_obj=None,
+    assert_qs=None,
+    rel_subjects_dict=None,
+    resource_qs=None,
+    spacetime_objs_dict=None,
+    context_ancestors_dict=None,
+):
+    """Makes a representation dict for a subject id
+
+    :param str subject_id: UUID or string UUID for the item
+    :param bool for_solr_or_html: Add additional keys useful for
+        HTML templating
+    :param bool for_solr: Add additional keys useful for solr indexing
+
+    The remaining arguments are data prefetched for many items at
+    once by make_representation_dicts. If None, we get them from
+    the database.
+    """
     # This will most likely get all the context hierarchy in 1 query, thereby
     # limiting the number of times we hit the database.
 
     if for_solr:
         for_solr_or_html = True
 
-    item_man_obj = get_annotate_item_manifest_obj(subject_id)
+    if not item_man_obj:
+        item_man_obj = get_annotate_item_manifest_obj(subject_id)
 
     if not item_man_obj:
         return None, None
@@ -632,16 +811,18 @@ def make_representation_dict(subject_id, for_solr_or_html=False, for_solr=False)
         # item_type subjects.
         select_related_object_contexts = True
 
-    # Get the assertion query set for this item
-    assert_qs = get_item_assertions(
-        subject_id=item_man_obj.uuid,
-        select_related_object_contexts=select_related_object_contexts,
-    )
+    if assert_qs is None:
+        # Get the assertion query set for this item
+        assert_qs = get_item_assertions(
+            subject_id=item_man_obj.uuid,
+            select_related_object_contexts=select_related_object_contexts,
+        )
     # Get the related subjects item (for media and documents)
     # NOTE: rel_subjects_man_obj will be None for all other item types.
     rel_subjects_man_obj = get_related_subjects_item_assertion(
         item_man_obj,
-        assert_qs
+        assert_qs,
+        rel_subjects_dict=rel_subjects_dict,
     )
     # Get a related subjects manifest object for a collection object.
     if item_man_obj.item_type == 'projects' and item_man_obj.item_class.slug == 'oc-gen-cat-collection':
@@ -657,16 +838,23 @@ def make_representation_dict(subject_id, for_solr_or_html=False, for_solr=False)
         rel_subjects_man_obj=rel_subjects_man_obj,
         act_dict=rep_dict,
         for_solr=for_solr,
+        spacetime_objs_dict=spacetime_objs_dict,
+        context_ancestors_dict=context_ancestors_dict,
     )
 
     # Add the list of media resources associated with this item if
     # the item has the appropriate item_type.
-    rep_dict = add_related_media_files_dicts(item_man_obj, act_dict=rep_dict)
+    rep_dict = add_related_media_files_dicts(
+        item_man_obj,
+        act_dict=rep_dict,
+        resource_qs=resource_qs,
+    )
 
     if item_man_obj.item_type == 'subjects':
         parent_list = add_to_parent_context_list(
             item_man_obj.context,
-            for_solr_or_html=for_solr_or_html
+            for_solr_or_html=for_solr_or_html,
+            context_ancestors_dict=context_ancestors_dict,
         )
         if parent_list:
             # The parent order needs to be reversed to make the most
@@ -676,7 +864,8 @@ def make_representation_dict(subject_id, for_solr_or_html=False, for_solr=False)
     elif rel_subjects_man_obj:
         parent_list = add_to_parent_context_list(
             rel_subjects_man_obj,
-            for_solr_or_html=for_solr_or_html
+            for_solr_or_html=for_solr_or_html,
+            context_ancestors_dict=context_ancestors_dict,
         )
         if parent_list:
             # The parent order needs to be reversed to make the most
@@ -824,4 +1013,111 @@ def make_representation_dict(subject_id, for_solr_or_html=False, for_solr=False)
     # Add any persistent identifiers assigned to this item.
     rep_dict = add_persistent_identifiers(item_man_obj, rep_dict)
 
-    return item_man_obj, rep_dict
\ No newline at end of file
+    return item_man_obj, rep_dict
+
+def make_representation_dicts(subject_ids, for_solr_or_html=False, for_solr=False):
+    """Makes representation dicts for a list of subject ids
+
+    This prefetches the manifest objects, assertions, related subjects,
+    resources, context ancestors, and spacetime objects for all of the
+    items in a fixed number of queries, then assembles each item's
+    representation dict in memory.
+
+    :param list subject_ids: List of UUIDs or string UUIDs for the items
+
+    returns a LastUpdatedOrderedDict keyed by string uuid (in the order
+        of the subject_ids) with (item_man_obj, rep_dict) tuple values.
+        Items not found in the database are left out.
+    """
+    subject_ids = [str(uuid) for uuid in subject_ids]
+    output = LastUpdatedOrderedDict()
+    if not subject_ids:
+        return output
+
+    man_objs_dict = {
+        str(m.uuid): m for m in get_annotate_item_manifest_qs(subject_ids)
+    }
+    if not man_objs_dict:
+        return output
+
+    # Get the assertions for all the items. We only select_related
+    # object contexts for media and documents, since we need those for
+    # the spatial hierarchy of related item_type subjects.
+    assert_dict = {uuid: [] for uuid in man_objs_dict.keys()}
+    context_obj_ids = [
+        uuid for uuid, m in man_objs_dict.items()
+        if m.item_type in ['media', 'documents']
+    ]
+    other_ids = [
+        uuid for uuid in man_objs_dict.keys() if uuid not in context_obj_ids
+    ]
+    for act_ids, select_related_object_contexts in [
+        (context_obj_ids, True,),
+        (other_ids, False,),
+    ]:
+        if not act_ids:
+            continue
+        assert_qs = get_item_assertions(
+            subject_ids=act_ids,
+            select_related_object_contexts=select_related_object_contexts,
+        )
+        for assert_obj in assert_qs:
+            assert_dict[str(assert_obj.subject_id)].append(assert_obj)
+
+    rel_subjects_dict = get_related_subjects_items_dict(
+        man_objs_dict,
+        assert_dict
+    )
+    resources_dict = get_related_media_resources_dict(
+        man_objs_dict.values()
+    )
+
+    # Get the spacetime objects for the items, their related subjects
+    # items (including those referenced in assertions), and all of their
+    # parent contexts.
+    geo_man_objs = list(man_objs_dict.values())
+    geo_man_objs += list(rel_subjects_dict.values())
+    for uuid, item_man_obj in man_objs_dict.items():
+        if item_man_obj.item_type not in ['media', 'documents', 'tables',]:
+            continue
+        geo_man_objs += [
+            assert_obj.object for assert_obj in assert_dict[uuid]
+            if assert_obj.object.item_type == 'subjects'
+        ]
+    # Get the context ancestors of all of these items (and the parent
+    # contexts of subjects items) from the context closure table at
+    # once, rather than with a query for each item.
+    ancestor_uuids = {
+        str(m.uuid) for m in geo_man_objs if m.item_type == 'subjects'
+    }
+    ancestor_uuids.update(
+        [
+            str(m.context_id) for m in man_objs_dict.values()
+            if m.item_type == 'subjects'
+        ]
+    )
+    context_ancestors_dict = context_closure.get_context_ancestors_dict(
+        list(ancestor_uuids),
+        exclude_roots=False,
+    )
+    spacetime_objs_dict = geojson.get_spacetime_objs_dict(
+        geo_man_objs,
+        context_ancestors_dict=context_ancestors_dict,
+    )
+
+    for uuid in subject_ids:
+        item_man_obj = man_objs_dict.get(uuid)
+        if not item_man_obj:
+            continue
+        output[uuid] = make_representation_dict(
+            subject_id=uuid,
+            for_solr_or_html=for_solr_or_html,
+            for_solr=for_solr,
+            item_man_obj=item_man_obj,
+            assert_qs=assert_dict.get(uuid, []),
+            rel_subjects_dict=rel_subjects_dict,
+            resource_qs=resources_dict.get(uuid, []),
+            spacetime_objs_dict=spacetime_objs_dict,
+            context_ancestors_dict=context_ancestors_dict,
+        )
+    return output
@@ -0,0 +1,228 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from opencontext_py.apps.all_items import configs
+from opencontext_py.apps.all_items.representations import item
+
+from opencontext_py.libs.queue_utilities import make_hash_id_from_args
+
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------
+# NOTE: These functions cache item representation dicts, so popular
+# item pages don't rebuild the same large dict on every request.
+#
+# Cache keys include a revision stamp made from:
+# 1. The item's AllManifest.updated time (this also changes for
+#    descendants of relabeled or moved contexts, because their paths
+#    get updated).
+# 2. A per-item revision number bumped by the editorial updaters.
+# 3. A per-project revision number bumped by the editorial updaters
+#    and ETL loads. Representation dicts show data from related items
+#    (parent context labels, project metadata, inherited spacetime,
+#    labels of assertion objects), so an edit to an item bumps the
+#    revision of its project, invalidating the cached dicts of every
+#    item in that project.
+# 4. A global revision number, bumped by edits to items of the Open
+#    Context project (like shared predicates and vocabulary items) that
+#    any item may reference.
+#
+# All the revision numbers for a stamp come from one redis get_many,
+# without any database queries. Writers that don't bump revisions (like
+# one-off shell scripts) may leave stale cached dicts until they time
+# out, so the timeout is fairly short.
+#
+# Permission dependent fields (observations and files) are NOT removed
+# in the cached dicts. Views remove them after the cache lookup, based
+# on the requesting user's permissions.
+# ---------------------------------------------------------------------
+
+REP_CACHE_NAME = 'redis'
+REP_REVISION_KEY_PREFIX = 'rep-rev-'
+REP_PROJECT_REVISION_KEY_PREFIX = 'rep-rev-proj-'
+REP_GLOBAL_REVISION_KEY = 'rep-rev-global'
+REP_CACHE_KEY_PREFIX = 'rep-dict-'
+
+if settings.DEBUG:
+    REP_CACHE_TIMEOUT = 60  # 1 minute
+else:
+    REP_CACHE_TIMEOUT = 60 * 60 * 4  # 4 hours
+
+# Revision numbers need to outlive the cached dicts stamped with them.
+REP_REVISION_TIMEOUT = REP_CACHE_TIMEOUT * 2
+
+
+# ---------------------------------------------------------------------
+# testing
+"""
+from opencontext_py.apps.all_items.representations import rep_cache
+man_obj, rep_dict = rep_cache.get_cache_representation_dict(
+    '39d0ff0c-1b44-4d9c-b60c-5e4b0a5d1b55',
+    for_solr_or_html=True,
+)
+rep_cache.bump_item_rep_revisions(['39d0ff0c-1b44-4d9c-b60c-5e4b0a5d1b55'])
+rep_cache.bump_project_rep_revisions([man_obj.project.uuid])
+"""
+# ---------------------------------------------------------------------
+
+
+def make_revision_key(uuid):
+    """Makes the cache key for an item's representation revision number"""
+    return f'{REP_REVISION_KEY_PREFIX}{str(uuid)}'
+
+
+def make_project_revision_key(project_uuid):
+    """Makes the cache key for a project's representation revision number"""
+    return f'{REP_PROJECT_REVISION_KEY_PREFIX}{str(project_uuid)}'
+
+
+def set_rep_revisions(revision_keys):
+    """Sets new revision numbers for a list of revision keys"""
+    if not revision_keys:
+        return None
+    # Use the current time (in milliseconds) so a lost revision key
+    # can't come back with an older revision number.
+    revision = int(time.time() * 1000)
+    cache = caches[REP_CACHE_NAME]
+    try:
+        cache.set_many(
+            {key: revision for key in set(revision_keys)},
+            timeout=REP_REVISION_TIMEOUT,
+        )
+    except:
+        logger.info(f'Cache failure with representation revisions for: {revision_keys}')
+
+
+def bump_item_rep_revisions(uuids):
+    """Invalidates cached representation dicts for a list of item uuids
+
+    :param list uuids: List of UUIDs or string UUIDs of items that
+        got edited.
+    """
+    if not uuids:
+        return None
+    set_rep_revisions([make_revision_key(uuid) for uuid in uuids])
+
+
+def bump_project_rep_revisions(project_uuids):
+    """Invalidates cached representation dicts for all the items in
+    a list of projects
+
+    :param list project_uuids: List of UUIDs or string UUIDs of projects
+        with edited items.
+    """
+    if not project_uuids:
+        return None
+    project_uuids = [str(uuid) for uuid in project_uuids]
+    revision_keys = [make_project_revision_key(uuid) for uuid in project_uuids]
+    if configs.OPEN_CONTEXT_PROJ_UUID in project_uuids:
+        # Items in the Open Context project (like shared predicates
+        # and vocabulary items) can be referenced by any item.
+        revision_keys.append(REP_GLOBAL_REVISION_KEY)
+    set_rep_revisions(revision_keys)
+
+
+def bump_rep_revisions_for_items(man_objs):
+    """Invalidates cached representation dicts for edited items, and
+    for items that may show data from the edited items
+
+    :param list man_objs: List of AllManifest objects of edited items
+    """
+    uuids = []
+    project_uuids = []
+    for man_obj in man_objs:
+        uuids.append(man_obj.uuid)
+        project_uuids.append(man_obj.project_id)
+        if man_obj.item_type == 'projects':
+            # Items in this project show its metadata.
+            project_uuids.append(man_obj.uuid)
+    set_rep_revisions(
+        [make_revision_key(uuid) for uuid in uuids]
+    )
+    bump_project_rep_revisions(project_uuids)
+
+
+def make_item_revision_stamp(item_man_obj):
+    """Makes a revision stamp string for an item
+
+    :param AllManifest item_man_obj: The item's manifest object
+    """
+    revision_keys = [
+        make_revision_key(item_man_obj.uuid),
+        make_project_revision_key(item_man_obj.project_id),
+        REP_GLOBAL_REVISION_KEY,
+    ]
+    cache = caches[REP_CACHE_NAME]
+    try:
+        revisions = cache.get_many(revision_keys)
+    except:
+        revisions = {}
+    man_updated = None
+    if item_man_obj.updated:
+        man_updated = item_man_obj.updated.isoformat()
+    revision_parts = [str(revisions.get(key)) for key in revision_keys]
+    return f'{man_updated}_' + '_'.join(revision_parts)
+
+
+def make_rep_cache_key(item_man_obj, for_solr_or_html=False):
+    """Makes a cache key for an item's representation dict
+
+    :param AllManifest item_man_obj: The item's manifest object
+    :param bool for_solr_or_html: The representation dict includes
+        additional keys useful for HTML templating
+    """
+    stamp_hash = make_hash_id_from_args(
+        args=make_item_revision_stamp(item_man_obj)
+    )
+    variant = 'html' if for_solr_or_html else 'json'
+    return (
+        f'{REP_CACHE_KEY_PREFIX}{variant}-{str(item_man_obj.uuid)}'
+        f'-{stamp_hash[:12]}'
+    )
+
+
+def get_cache_representation_dict(subject_id, for_solr_or_html=False, reset_cache=False):
+    """Gets an item's representation dict from the cache, or makes and
+    caches it if not already cached
+
+    :param str subject_id: UUID or string UUID for the item
+    :param bool for_solr_or_html: Add additional keys useful for
+        HTML templating
+    :param bool reset_cache: Make a new representation dict, even if
+        one is cached
+
+    returns a (item_man_obj, rep_dict) tuple, like
+        item.make_representation_dict
+    """
+    item_man_obj = item.get_annotate_item_manifest_obj(subject_id)
+    if not item_man_obj:
+        return None, None
+    cache = caches[REP_CACHE_NAME]
+    cache_key = make_rep_cache_key(
+        item_man_obj,
+        for_solr_or_html=for_solr_or_html,
+    )
+    if not reset_cache:
+        try:
+            rep_dict = cache.get(cache_key)
+        except:
+            rep_dict = None
+        if rep_dict:
+            return item_man_obj, rep_dict
+    item_man_obj, rep_dict = item.make_representation_dict(
+        subject_id=item_man_obj.uuid,
+        for_solr_or_html=for_solr_or_html,
+        item_man_obj=item_man_obj,
+    )
+    if not item_man_obj or not rep_dict:
+        return item_man_obj, rep_dict
+    try:
+        cache.set(cache_key, rep_dict, timeout=REP_CACHE_TIMEOUT)
+    except:
+        logger.info(f'Cache failure with: {cache_key}')
+    return item_man_obj, rep_dict
@@ -284,7 +284,8 @@ def get_sitemap_items_dict_for_proj_slug(
     proj_slug,
     proj_count,
     max_count,
-    reset_proj_item_index=False):
+    reset_proj_item_index=False,
+    use_worker=True):
     # Check solr for projects that are actually indexed. This
     # is a signal that the project data is ready to fully
     # publicize with search engines.
@@ -304,10 +305,18 @@ def get_sitemap_items_dict_for_proj_slug(
     )
     proj_obj.url = compute_sitemap_url(proj_obj)
     # Get representative content for the project.
-    rep_man_objs = get_cache_project_representative_sample(
-        proj_obj,
-        reset_proj_item_index=reset_proj_item_index,
-    )
+    if use_worker:
+        rep_man_objs = get_cache_project_representative_sample(
+            proj_obj,
+            reset_proj_item_index=reset_proj_item_index,
+        )
+    else:
+        # We're probably already in a worker (like when we build
+        # sitemap files).
+        rep_man_objs = get_cache_project_representative_sample_no_worker(
+            proj_obj,
+            reset_proj_item_index=reset_proj_item_index,
+        )
     for man_obj in rep_man_objs:
         man_obj.sitemap_priority = compute_sitemap_priority(
             item_type=man_obj.item_type,
@@ -355,11 +364,14 @@ def get_sitemap_items_for_proj_slug(
     proj_slug,
     proj_count,
     max_count,
-    reset_proj_item_index=False
+    reset_proj_item_index=False,
+    page=1,
 ):
     # Check solr for projects that are actually indexed. This
     # is a signal that the project data is ready to fully
     # publicize with search engines.
+    # NOTE: Items are split into pages of MAX_SITEMAP_ITEMS, like
+    # the prebuilt sitemap files.
     all_item_list = []
     all_items = get_sitemap_items_dict_for_proj_slug(
         proj_slug=proj_slug,
@@ -370,9 +382,8 @@ def get_sitemap_items_for_proj_slug(
     )
     for key, _ in SITEMAP_ITEM_TYPES_AND_PRIORITY:
         all_item_list += all_items.get(key, [])
-    if len(all_item_list) > MAX_SITEMAP_ITEMS:
-        return all_item_list[:MAX_SITEMAP_ITEMS]
-    return all_item_list
+    start = (page - 1) * MAX_SITEMAP_ITEMS
+    return all_item_list[start:(start + MAX_SITEMAP_ITEMS)]
 
 
 def warm_sitemap_representative_items():
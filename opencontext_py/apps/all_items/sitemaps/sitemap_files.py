@@ -0,0 +1,357 @@
+import datetime
+import gzip
+import hashlib
+import json
+import logging
+import os
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.template import loader
+
+from opencontext_py.libs.queue_utilities import (
+    wrap_func_for_rq,
+)
+from opencontext_py.libs.rootpath import RootPath
+from opencontext_py.apps.all_items.models import (
+    AllManifest,
+)
+from opencontext_py.apps.all_items.sitemaps import site_data
+
+
+# ---------------------------------------------------------------------
+# NOTE: These functions build (gzipped) sitemap files ahead of time, so
+# that the sitemap views can serve them as static bytes, rather than
+# running a manifest query for each project (and the heavy
+# representative sample queries) every time a crawler asks for a
+# sitemap.
+#
+# We build the files in a worker (or from the shell). A state file
+# keeps a signature for each project's sitemap (the project's count in
+# the solr index, the max count of all projects, the project's updated
+# time and its sitemap index id). Builds only remake the files of
+# projects with changed signatures, like after projects got
+# reindexed. The sitemap views queue a new build when the files get
+# older than SITEMAP_FILES_MAX_AGE.
+# ---------------------------------------------------------------------
+
+# The sitemap protocol allows 50K URLs per sitemap, but like
+# site_data, we're conservative.
+SITEMAP_FILE_MAX_URLS = site_data.MAX_SITEMAP_ITEMS
+
+SITEMAP_INDEX_FILENAME = 'sitemap.xml.gz'
+SITEMAP_FILES_STATE_FILENAME = 'sitemap-files.json'
+
+# Queue a new build of the sitemap files after they get this old.
+SITEMAP_FILES_MAX_AGE = 60 * 60 * 24 # One day
+SITEMAP_FILES_BUILD_TIMEOUT = 60 * 60 * 6 # 6 hours
+SITEMAP_FILES_JOB_CACHE_KEY = 'sitemap-files-build-job-id'
+
+
+logger = logging.getLogger("site-map-items")
+
+
+# ---------------------------------------------------------------------
+# testing
+"""
+from opencontext_py.apps.all_items.sitemaps import sitemap_files
+state = sitemap_files.build_sitemap_files()
+# Remake all of the sitemap files
+state = sitemap_files.build_sitemap_files(force=True)
+"""
+# ---------------------------------------------------------------------
+
+
+def get_sitemap_index_file_path(path):
+    """Gets the file path of the sitemap index file"""
+    return os.path.join(path, SITEMAP_INDEX_FILENAME)
+
+
+def get_project_sitemap_file_path(path, proj_slug, page):
+    """Gets the file path of a page of a project's sitemap"""
+    return os.path.join(path, f'sitemap-{proj_slug}-p{page}.xml.gz')
+
+
+def make_project_sitemap_url(base_url, proj_slug, page):
+    """Makes the URL for a page of a project's sitemap"""
+    if page == 1:
+        return f'{base_url}/sitemap-{proj_slug}.xml'
+    return f'{base_url}/sitemap-{proj_slug}.xml?p={page}'
+
+
+def load_sitemap_files_state(path):
+    """Loads the state of the sitemap files"""
+    state_path = os.path.join(path, SITEMAP_FILES_STATE_FILENAME)
+    try:
+        with open(state_path, 'r') as f:
+            state = json.load(f)
+    except:
+        state = None
+    if not isinstance(state, dict):
+        state = {}
+    if not isinstance(state.get('projects'), dict):
+        state['projects'] = {}
+    return state
+
+
+def write_file_atomic(file_path, data):
+    """Writes bytes to a file, replacing any old file in one step so
+    requests never read a partly written file"""
+    temp_path = f'{file_path}.{os.getpid()}.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, file_path)
+
+
+def write_gzip_xml_file(file_path, xml):
+    """Writes an XML string to a gzipped file"""
+    # A fixed mtime in the gzip header means the same XML always makes
+    # the same bytes.
+    data = gzip.compress(xml.encode('utf-8'), mtime=0)
+    write_file_atomic(file_path, data)
+
+
+def save_sitemap_files_state(path, state):
+    """Saves the state of the sitemap files"""
+    write_file_atomic(
+        os.path.join(path, SITEMAP_FILES_STATE_FILENAME),
+        json.dumps(state, indent=2, ensure_ascii=False).encode('utf-8'),
+    )
+
+
+def make_project_sitemap_signature(proj_obj, proj_count, max_count):
+    """Makes a signature that changes when a project's sitemap
+    needs to change"""
+    sig_parts = [
+        str(proj_obj.uuid),
+        proj_count,
+        max_count,
+        str(proj_obj.updated),
+        proj_obj.meta_json.get('sitemap_index_id'),
+    ]
+    hash_obj = hashlib.sha1()
+    hash_obj.update(str(sig_parts).encode('utf-8'))
+    return hash_obj.hexdigest()
+
+
+def build_project_sitemap_files(
+    path,
+    proj_slug,
+    proj_count,
+    max_count,
+    base_url,
+    reset_proj_item_index=False,
+):
+    """Builds the sitemap files (in pages of up to SITEMAP_FILE_MAX_URLS)
+    for a project
+
+    returns the number of sitemap pages for the project
+    """
+    all_items = site_data.get_sitemap_items_dict_for_proj_slug(
+        proj_slug=proj_slug,
+        proj_count=proj_count,
+        max_count=max_count,
+        reset_proj_item_index=reset_proj_item_index,
+        use_worker=False,
+    )
+    urlset = []
+    for key, _ in site_data.SITEMAP_ITEM_TYPES_AND_PRIORITY:
+        for man_obj in all_items.get(key, []):
+            urlset.append(
+                {
+                    'location': f'{base_url}{man_obj.url}',
+                    'lastmod':  man_obj.updated,
+                    'priority': man_obj.sitemap_priority,
+                }
+            )
+    page = 0
+    for i in range(0, len(urlset), SITEMAP_FILE_MAX_URLS):
+        page += 1
+        xml = loader.render_to_string(
+            'sitemap.xml',
+            {'urlset': urlset[i:(i + SITEMAP_FILE_MAX_URLS)]},
+        )
+        write_gzip_xml_file(
+            get_project_sitemap_file_path(path, proj_slug, page),
+            xml,
+        )
+    return page
+
+
+def remove_project_sitemap_files(path, proj_slug, from_page, to_page):
+    """Removes pages of a project's sitemap files"""
+    for page in range(from_page, (to_page + 1)):
+        file_path = get_project_sitemap_file_path(path, proj_slug, page)
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+
+def build_sitemap_files(reset_proj_item_index=False, force=False):
+    """Builds the sitemap index and project sitemap files, only
+    remaking the files of projects with changed signatures
+
+    :param bool reset_proj_item_index: Remake the representative
+        samples of items for each project
+    :param bool force: Remake the files of all projects
+
+    returns the state dict of the sitemap files
+    """
+    path = settings.SITEMAP_FILES_PATH
+    if not path:
+        return None
+    os.makedirs(path, exist_ok=True)
+    rp = RootPath()
+    base_url = rp.get_baseurl()
+    project_slug_counts, max_count = site_data.get_cache_solr_indexed_project_slugs(
+        reset_cache=True
+    )
+    # Get all of the project objects in one query.
+    proj_objs = {
+        p.slug: p
+        for p in AllManifest.objects.filter(
+            item_type='projects',
+            slug__in=[proj_slug for proj_slug, _ in project_slug_counts],
+        )
+    }
+    old_state = load_sitemap_files_state(path)
+    new_projects = {}
+    built_count = 0
+    for proj_slug, proj_count in project_slug_counts:
+        proj_obj = proj_objs.get(proj_slug)
+        if not proj_obj:
+            continue
+        signature = make_project_sitemap_signature(proj_obj, proj_count, max_count)
+        old_proj = old_state['projects'].get(proj_slug)
+        if (
+            not force
+            and not reset_proj_item_index
+            and old_proj
+            and old_proj.get('signature') == signature
+            and os.path.exists(
+                get_project_sitemap_file_path(path, proj_slug, old_proj.get('pages', 1))
+            )
+        ):
+            # The sitemap files for this project are still good.
+            new_projects[proj_slug] = old_proj
+            continue
+        pages = build_project_sitemap_files(
+            path,
+            proj_slug=proj_slug,
+            proj_count=proj_count,
+            max_count=max_count,
+            base_url=base_url,
+            reset_proj_item_index=reset_proj_item_index,
+        )
+        built_count += 1
+        if not pages:
+            continue
+        lastmod = None
+        if proj_obj.updated:
+            lastmod = proj_obj.updated.isoformat()
+        new_projects[proj_slug] = {
+            'signature': signature,
+            'pages': pages,
+            'lastmod': lastmod,
+        }
+        print(f'Built {pages} sitemap page(s) for {proj_slug}')
+
+    # Remove the files of pages that we don't need anymore.
+    for proj_slug, old_proj in old_state['projects'].items():
+        keep_pages = new_projects.get(proj_slug, {}).get('pages', 0)
+        remove_project_sitemap_files(
+            path,
+            proj_slug,
+            from_page=(keep_pages + 1),
+            to_page=old_proj.get('pages', 0),
+        )
+
+    sitemaps = []
+    for proj_slug, proj in new_projects.items():
+        lastmod = None
+        if proj.get('lastmod'):
+            lastmod = datetime.datetime.fromisoformat(proj['lastmod'])
+        for page in range(1, (proj['pages'] + 1)):
+            sitemaps.append(
+                {
+                    'location': make_project_sitemap_url(base_url, proj_slug, page),
+                    'lastmod': lastmod,
+                }
+            )
+    xml = loader.render_to_string(
+        'sitemap_index.xml',
+        {'sitemaps': sitemaps},
+    )
+    write_gzip_xml_file(get_sitemap_index_file_path(path), xml)
+    state = {
+        'built': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'projects': new_projects,
+    }
+    save_sitemap_files_state(path, state)
+    print(
+        f'Sitemap files for {len(new_projects)} projects '
+        f'({built_count} rebuilt)'
+    )
+    return state
+
+
+def get_sitemap_file_path(section=None, page=1):
+    """Gets the path of a built sitemap file
+
+    :param str section: A project slug, or None for the sitemap index
+    :param int page: The page of a project's sitemap
+
+    returns a file path, or None if we don't have the file
+    """
+    path = settings.SITEMAP_FILES_PATH
+    if not path:
+        return None
+    if section is None:
+        file_path = get_sitemap_index_file_path(path)
+    else:
+        # Only serve project sitemaps listed in the state, so a
+        # section can't point to some other file.
+        proj = load_sitemap_files_state(path)['projects'].get(section)
+        if not proj or page < 1 or page > proj.get('pages', 0):
+            return None
+        file_path = get_project_sitemap_file_path(path, section, page)
+    if not os.path.exists(file_path):
+        return None
+    return file_path
+
+
+def queue_sitemap_files_build_if_stale():
+    """Queues a build of the sitemap files in a worker if they are
+    missing or older than SITEMAP_FILES_MAX_AGE"""
+    path = settings.SITEMAP_FILES_PATH
+    if not path:
+        return None
+    index_path = get_sitemap_index_file_path(path)
+    if (
+        os.path.exists(index_path)
+        and (time.time() - os.path.getmtime(index_path)) < SITEMAP_FILES_MAX_AGE
+    ):
+        return None
+    cache = caches['redis']
+    try:
+        job_id = cache.get(SITEMAP_FILES_JOB_CACHE_KEY)
+        job_id, job_done, _ = wrap_func_for_rq(
+            func=build_sitemap_files,
+            kwargs={},
+            job_id=job_id,
+            default_timeout=SITEMAP_FILES_BUILD_TIMEOUT,
+        )
+        if job_done:
+            cache.delete(SITEMAP_FILES_JOB_CACHE_KEY)
+        else:
+            # Forget a job that never finishes (like a failed one),
+            # so we can try again later.
+            cache.set(
+                SITEMAP_FILES_JOB_CACHE_KEY,
+                job_id,
+                timeout=SITEMAP_FILES_MAX_AGE,
+            )
+    except:
+        logger.info('Failed to queue a build of the sitemap files')
+        job_id = None
+    return job_id
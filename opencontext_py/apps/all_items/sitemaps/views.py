@@ -1,4 +1,7 @@
+import gzip
 import json
+import os
+
 from django.conf import settings
 from django.http import HttpResponse, Http404
 from django.shortcuts import redirect
@@ -10,11 +13,17 @@ from django.contrib.sitemaps import Sitemap
 
 from opencontext_py.apps.all_items.sitemaps import site_data
 
-from django.views.decorators.cache import never_cache
+from django.utils.cache import (
+    add_never_cache_headers,
+    get_conditional_response,
+    patch_vary_headers,
+)
+from django.utils.http import http_date, quote_etag
 
 
 from opencontext_py.libs.rootpath import RootPath
 from opencontext_py.apps.all_items.sitemaps import site_data
+from opencontext_py.apps.all_items.sitemaps import sitemap_files
 
 
 if settings.DEBUG:
@@ -23,9 +32,66 @@ else:
     SITEMAP_XML_DOC_CACHE_TIMEOUT = 60 * 60 * 48 # Two days
 
 
-@never_cache
+def get_request_sitemap_page(request):
+    """Gets the requested page of a project's sitemap"""
+    try:
+        return int(request.GET.get('p', 1))
+    except:
+        return 1
+
+
+def get_request_sitemap_file_path(request, section=None):
+    """Gets the path to a built sitemap file for a request"""
+    if request.GET.get('reset', False):
+        # We want to make the sitemap fresh from the database.
+        return None
+    return sitemap_files.get_sitemap_file_path(
+        section=section,
+        page=get_request_sitemap_page(request),
+    )
+
+
+def make_sitemap_file_response(request, file_path):
+    """Makes a response with the bytes of a built (gzipped) sitemap
+    file, or a 304 response if the client already has them
+
+    The gzipped and the decoded bodies differ, so they get different
+    ETags, and the response varies on Accept-Encoding.
+    """
+    stat = os.stat(file_path)
+    use_gzip = 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+    etag = f'{stat.st_mtime_ns:x}-{stat.st_size:x}'
+    if use_gzip:
+        etag += '-gzip'
+    etag = quote_etag(etag)
+    last_modified = int(stat.st_mtime)
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=last_modified,
+    )
+    if response is None:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        if use_gzip:
+            response = HttpResponse(data, content_type='application/xml')
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response = HttpResponse(gzip.decompress(data), content_type='application/xml')
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
 def sitemap_index(request):
     """A sitemap index listing sitemaps for each public, indexed project"""
+    sitemap_files.queue_sitemap_files_build_if_stale()
+    file_path = get_request_sitemap_file_path(request)
+    if file_path:
+        return make_sitemap_file_response(request, file_path)
+    # We don't have built sitemap files, so make the sitemap index
+    # from the database.
     rp = RootPath()
     base_url = rp.get_baseurl()
     sitemaps = []
@@ -45,18 +111,24 @@ def sitemap_index(request):
             'lastmod':  proj_obj.updated,
         }
         sitemaps.append(site)
-    return TemplateResponse(
+    response = TemplateResponse(
         request,
         'sitemap_index.xml',
         {"sitemaps": sitemaps},
         content_type='application/xml',
         headers=None,
     )
+    add_never_cache_headers(response)
+    return response
 
 
-@never_cache
 def project_section_sitemap(request, section):
     """A sitemap for a specific project"""
+    file_path = get_request_sitemap_file_path(request, section=section)
+    if file_path:
+        return make_sitemap_file_response(request, file_path)
+    # We don't have a built sitemap file for this project, so make
+    # the sitemap from the database.
     proj_slug = None
     proj_count = None
     project_slug_counts, max_count = site_data.get_cache_solr_indexed_project_slugs(
@@ -67,14 +139,18 @@ def project_section_sitemap(request, section):
             proj_slug = act_proj_slug
             proj_count = act_proj_count
             break
-    if not proj_slug:
+    page = get_request_sitemap_page(request)
+    if not proj_slug or page < 1:
         raise Http404
     rep_man_objs = site_data.get_sitemap_items_for_proj_slug(
         proj_slug=proj_slug,
         proj_count=proj_count,
         max_count=max_count,
         reset_proj_item_index=request.GET.get('reset', False),
+        page=page,
     )
+    if page > 1 and not rep_man_objs:
+        raise Http404
     rp = RootPath()
     base_url = rp.get_baseurl()
     urlset = []
@@ -85,10 +161,12 @@ def project_section_sitemap(request, section):
             'priority': man_obj.sitemap_priority,
         }
         urlset.append(url)
-    return TemplateResponse(
+    response = TemplateResponse(
         request,
         'sitemap.xml',
         {"urlset": urlset},
         content_type='application/xml',
         headers=None,
-    )
\ No newline at end of file
+    )
+    add_never_cache_headers(response)
+    return response
\ No newline at end of file
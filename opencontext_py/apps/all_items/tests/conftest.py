@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import pytest
+
+from opencontext_py.apps.all_items import configs
+from opencontext_py.apps.all_items.models import AllManifest
+
+
+def _ensure_manifest(
+    *,
+    uuid_value: str,
+    item_type: str,
+    label: str,
+    project: AllManifest | None,
+    context: AllManifest | None,
+    publisher: AllManifest | None,
+) -> AllManifest:
+    defaults = {
+        'source_id': f'default-{uuid_value}',
+        'item_type': item_type,
+        'label': label,
+        'project': project,
+        'context': context,
+        'publisher': publisher,
+        'meta_json': {},
+        'uri': f'{configs.OC_URI_ROOT}/{uuid_value}',
+    }
+    obj, _ = AllManifest.objects.get_or_create(
+        uuid=uuid_value,
+        defaults=defaults,
+    )
+    return obj
+
+
+@pytest.fixture
+def core_manifests(db):
+    publisher = _ensure_manifest(
+        uuid_value=configs.OPEN_CONTEXT_PUB_UUID,
+        item_type='publishers',
+        label='OC Publisher',
+        project=None,
+        context=None,
+        publisher=None,
+    )
+    project_root = _ensure_manifest(
+        uuid_value=configs.OPEN_CONTEXT_PROJ_UUID,
+        item_type='projects',
+        label='OC Project',
+        project=None,
+        context=None,
+        publisher=publisher,
+    )
+    subject_root = _ensure_manifest(
+        uuid_value=configs.DEFAULT_SUBJECTS_ROOT_UUID,
+        item_type='subjects',
+        label='World',
+        project=project_root,
+        context=None,
+        publisher=publisher,
+    )
+    default_event = _ensure_manifest(
+        uuid_value=configs.DEFAULT_EVENT_UUID,
+        item_type='events',
+        label='Default Event',
+        project=project_root,
+        context=subject_root,
+        publisher=publisher,
+    )
+    return {
+        'publisher': publisher,
+        'project': project_root,
+        'subject_root': subject_root,
+        'event': default_event,
+    }
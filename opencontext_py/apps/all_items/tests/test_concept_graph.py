@@ -0,0 +1,57 @@
+from opencontext_py.apps.all_items import configs
+from opencontext_py.apps.all_items.models import AllManifest
+from opencontext_py.apps.all_items.concept_graph import ConceptGraph
+
+
+def _make_graph(relations):
+    graph = ConceptGraph(version=1)
+    for child_uuid, parent_uuid in relations:
+        graph.add_relation(child_uuid, parent_uuid)
+    for uuid, node_id in graph.node_ids.items():
+        graph.node_objs[node_id] = AllManifest(
+            uuid=uuid,
+            label=uuid,
+            item_type='types',
+            meta_json={},
+            uri=f'{configs.OC_URI_ROOT}/{uuid}',
+        )
+    return graph
+
+
+def _labels(paths):
+    return [[obj.label for obj in path] for path in paths]
+
+
+def test_concept_graph_parent_paths():
+    graph = _make_graph(
+        [
+            ('cow', 'bos'),
+            ('bos', 'bovidae'),
+            ('cow', 'livestock'),
+            ('bovidae', 'mammalia'),
+        ]
+    )
+    assert _labels(graph.get_parent_obj_paths('cow')) == [
+        ['bos', 'bovidae', 'mammalia'],
+        ['livestock'],
+    ]
+    assert graph.get_parent_obj_paths('mammalia') == []
+    assert graph.get_parent_obj_paths('not-in-graph') == []
+    descendants = graph.get_descendant_objs('bovidae')
+    assert [o.label for o in descendants] == ['bos', 'cow']
+
+
+def test_concept_graph_cycles_and_missing_objs():
+    graph = _make_graph(
+        [
+            ('a', 'b'),
+            ('b', 'c'),
+            ('c', 'a'),
+        ]
+    )
+    assert _labels(graph.get_parent_obj_paths('a')) == [['b', 'c']]
+    assert _labels(graph.get_parent_obj_paths('c')) == [['a', 'b']]
+    assert {o.label for o in graph.get_descendant_objs('a')} == {'b', 'c'}
+    # A node without a manifest object means callers should fall back.
+    graph.node_objs[graph.get_node_id('c')] = None
+    assert graph.get_parent_obj_paths('b') is None
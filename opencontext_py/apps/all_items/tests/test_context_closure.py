@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import uuid
+
+import pytest
+
+from opencontext_py.apps.all_items import context_closure
+from opencontext_py.apps.all_items.models import AllManifest
+from opencontext_py.apps.all_items.editorial.item.updater_manifest import (
+    recursive_subjects_path_update,
+)
+from opencontext_py.apps.all_items.representations import geojson
+from opencontext_py.apps.all_items.representations.item import (
+    add_to_parent_context_list,
+)
+
+
+@pytest.fixture
+def subjects_factory(core_manifests):
+    project = core_manifests['project']
+    subject_root = core_manifests['subject_root']
+    publisher = core_manifests['publisher']
+
+    def factory(label: str, *, context: AllManifest | None = None) -> AllManifest:
+        return AllManifest.objects.create(
+            source_id=f'source-{uuid.uuid4()}',
+            item_type='subjects',
+            label=label,
+            project=project,
+            context=context or subject_root,
+            publisher=publisher,
+            meta_json={},
+        )
+
+    return factory
+
+
+@pytest.mark.django_db
+def test_context_closure_queries_and_moves(subjects_factory):
+    site = subjects_factory('Site')
+    other_site = subjects_factory('Other Site')
+    area = subjects_factory('Area', context=site)
+    locus = subjects_factory('Locus', context=area)
+    context_closure.rebuild_context_closure()
+
+    ancestors = context_closure.get_context_ancestors(locus)
+    assert [a.uuid for a in ancestors] == [area.uuid, site.uuid]
+    descendants = context_closure.get_context_descendants_qs(site)
+    assert {m.uuid for m in descendants} == {area.uuid, locus.uuid}
+    children = context_closure.get_context_descendants_qs(site, max_depth=1)
+    assert [m.uuid for m in children] == [area.uuid]
+    # The root is at depth 0
+    assert context_closure.get_context_depth(locus) == 3
+
+    # Relabel the site, and update descendant paths.
+    site.label = 'Site B'
+    site.save()
+    recursive_subjects_path_update(site)
+    locus.refresh_from_db()
+    assert locus.path == '/Site B/Area/Locus'
+
+    # Move the area (and the locus) to the other site.
+    area.context = other_site
+    area.save()
+    recursive_subjects_path_update(area)
+    locus.refresh_from_db()
+    assert locus.path == '/Other Site/Area/Locus'
+    ancestors = context_closure.get_context_ancestors(locus)
+    assert [a.uuid for a in ancestors] == [area.uuid, other_site.uuid]
+    assert not context_closure.get_context_descendants_qs(site).exists()
+    ancestors_dict = context_closure.get_context_ancestor_uuids_dict([locus.uuid])
+    assert ancestors_dict == {str(locus.uuid): [str(area.uuid), str(other_site.uuid)]}
+
+
+@pytest.mark.django_db
+def test_context_closure_missing_and_stale_rows(subjects_factory):
+    site = subjects_factory('Site')
+    other_site = subjects_factory('Other Site')
+    area = subjects_factory('Area', context=site)
+    locus = subjects_factory('Locus', context=area)
+
+    # Nothing is in the closure table yet, so callers fall back to
+    # walking the .context hierarchy.
+    assert context_closure.get_context_ancestors(locus) is None
+    assert context_closure.get_context_ancestor_uuids_dict([locus.uuid]) == {}
+
+    # Adding the locus also adds the missing ancestor chain of its parent.
+    context_closure.update_context_closure_for_item(locus)
+    ancestors = context_closure.get_context_ancestors(locus)
+    assert [a.uuid for a in ancestors] == [area.uuid, site.uuid]
+
+    # A move that didn't update the closure table (like an ETL load)
+    # leaves stale rows that we don't trust.
+    area.context = other_site
+    area.save()
+    assert context_closure.get_context_ancestors(locus) is None
+    assert context_closure.get_context_ancestor_uuids_dict([locus.uuid]) == {}
+    context_closure.update_context_closure_for_item(area)
+    ancestors_dict = context_closure.get_context_ancestors_dict([locus.uuid])
+    assert [a.uuid for a in ancestors_dict[str(locus.uuid)]] == [
+        area.uuid, other_site.uuid
+    ]
+
+
+@pytest.mark.django_db
+def test_prefetched_context_ancestors_match_query(
+    subjects_factory,
+    django_assert_num_queries,
+):
+    site = subjects_factory('Site')
+    area = subjects_factory('Area', context=site)
+    locus = subjects_factory('Locus', context=area)
+    context_closure.rebuild_context_closure()
+
+    context_ancestors_dict = context_closure.get_context_ancestors_dict(
+        [locus.uuid, area.uuid],
+        exclude_roots=False,
+    )
+    queried_objs = geojson.get_spacetime_context_objs(locus)
+    queried_list = add_to_parent_context_list(area)
+    with django_assert_num_queries(0):
+        prefetched_objs = geojson.get_spacetime_context_objs(
+            locus,
+            context_ancestors_dict=context_ancestors_dict,
+        )
+    prefetched_list = add_to_parent_context_list(
+        area,
+        context_ancestors_dict=context_ancestors_dict,
+    )
+    assert [m.uuid for m in prefetched_objs] == [locus.uuid, area.uuid, site.uuid]
+    assert [m.uuid for m in prefetched_objs] == [m.uuid for m in queried_objs]
+    assert [c['slug'] for c in prefetched_list] == [area.slug, site.slug]
+    assert prefetched_list == queried_list
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import gzip
+
+from opencontext_py.apps.all_items.sitemaps import sitemap_files
+
+
+def test_sitemap_file_paths_from_state(settings, tmp_path):
+    settings.SITEMAP_FILES_PATH = str(tmp_path)
+    # Nothing is built yet.
+    assert sitemap_files.get_sitemap_file_path() is None
+
+    sitemap_files.write_gzip_xml_file(
+        sitemap_files.get_sitemap_index_file_path(str(tmp_path)),
+        '<sitemapindex></sitemapindex>',
+    )
+    for page in [1, 2]:
+        sitemap_files.write_gzip_xml_file(
+            sitemap_files.get_project_sitemap_file_path(str(tmp_path), 'proj-a', page),
+            f'<urlset>{page}</urlset>',
+        )
+    sitemap_files.save_sitemap_files_state(
+        str(tmp_path),
+        {'projects': {'proj-a': {'signature': 'x', 'pages': 2, 'lastmod': None}}},
+    )
+
+    index_path = sitemap_files.get_sitemap_file_path()
+    with open(index_path, 'rb') as f:
+        assert gzip.decompress(f.read()) == b'<sitemapindex></sitemapindex>'
+    page_path = sitemap_files.get_sitemap_file_path(section='proj-a', page=2)
+    with open(page_path, 'rb') as f:
+        assert gzip.decompress(f.read()) == b'<urlset>2</urlset>'
+    # Pages and projects missing from the state don't have files.
+    assert sitemap_files.get_sitemap_file_path(section='proj-a', page=3) is None
+    assert sitemap_files.get_sitemap_file_path(section='../proj-a', page=1) is None
+
+    assert sitemap_files.make_project_sitemap_url('https://oc', 'proj-a', 1) == (
+        'https://oc/sitemap-proj-a.xml'
+    )
+    assert sitemap_files.make_project_sitemap_url('https://oc', 'proj-a', 2) == (
+        'https://oc/sitemap-proj-a.xml?p=2'
+    )
+
+    # Removing extra pages leaves the first page.
+    sitemap_files.remove_project_sitemap_files(str(tmp_path), 'proj-a', 2, 2)
+    assert not (tmp_path / 'sitemap-proj-a-p2.xml.gz').exists()
+    assert (tmp_path / 'sitemap-proj-a-p1.xml.gz').exists()
+
+
+def test_sitemap_file_response_etags(settings, tmp_path, rf):
+    from opencontext_py.apps.all_items.sitemaps import views
+
+    settings.SITEMAP_FILES_PATH = str(tmp_path)
+    file_path = sitemap_files.get_sitemap_index_file_path(str(tmp_path))
+    sitemap_files.write_gzip_xml_file(file_path, '<sitemapindex></sitemapindex>')
+
+    gzip_resp = views.make_sitemap_file_response(
+        rf.get('/sitemap.xml', HTTP_ACCEPT_ENCODING='gzip'),
+        file_path,
+    )
+    plain_resp = views.make_sitemap_file_response(rf.get('/sitemap.xml'), file_path)
+    assert gzip_resp['Content-Encoding'] == 'gzip'
+    assert plain_resp.content == b'<sitemapindex></sitemapindex>'
+    # The gzipped and decoded bodies have different ETags.
+    assert gzip_resp['ETag'] != plain_resp['ETag']
+    assert 'Accept-Encoding' in gzip_resp['Vary']
+    assert 'Accept-Encoding' in plain_resp['Vary']
+
+    not_modified = views.make_sitemap_file_response(
+        rf.get(
+            '/sitemap.xml',
+            HTTP_ACCEPT_ENCODING='gzip',
+            HTTP_IF_NONE_MATCH=gzip_resp['ETag'],
+        ),
+        file_path,
+    )
+    assert not_modified.status_code == 304
+    assert 'Accept-Encoding' in not_modified['Vary']
+    # The decoded body's ETag doesn't match the gzipped body.
+    changed = views.make_sitemap_file_response(
+        rf.get('/sitemap.xml', HTTP_IF_NONE_MATCH=gzip_resp['ETag']),
+        file_path,
+    )
+    assert changed.status_code == 200
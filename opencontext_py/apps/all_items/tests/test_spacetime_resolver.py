@@ -5,81 +5,14 @@ import uuid
 
 import pytest
 
-from opencontext_py.apps.all_items import configs, spacetime_resolver
+from opencontext_py.apps.all_items import spacetime_resolver
 from opencontext_py.apps.all_items.models import AllManifest, AllSpaceTime
 from opencontext_py.apps.all_items.representations.geojson import (
     get_spacetime_geo_and_chronos,
+    get_spacetime_objs_dict,
 )
 
 
-def _ensure_manifest(
-    *,
-    uuid_value: str,
-    item_type: str,
-    label: str,
-    project: AllManifest | None,
-    context: AllManifest | None,
-    publisher: AllManifest | None,
-) -> AllManifest:
-    defaults = {
-        'source_id': f'default-{uuid_value}',
-        'item_type': item_type,
-        'label': label,
-        'project': project,
-        'context': context,
-        'publisher': publisher,
-        'meta_json': {},
-        'uri': f'{configs.OC_URI_ROOT}/{uuid_value}',
-    }
-    obj, _ = AllManifest.objects.get_or_create(
-        uuid=uuid_value,
-        defaults=defaults,
-    )
-    return obj
-
-
-@pytest.fixture
-def core_manifests(db):
-    publisher = _ensure_manifest(
-        uuid_value=configs.OPEN_CONTEXT_PUB_UUID,
-        item_type='publishers',
-        label='OC Publisher',
-        project=None,
-        context=None,
-        publisher=None,
-    )
-    project_root = _ensure_manifest(
-        uuid_value=configs.OPEN_CONTEXT_PROJ_UUID,
-        item_type='projects',
-        label='OC Project',
-        project=None,
-        context=None,
-        publisher=publisher,
-    )
-    subject_root = _ensure_manifest(
-        uuid_value=configs.DEFAULT_SUBJECTS_ROOT_UUID,
-        item_type='subjects',
-        label='World',
-        project=project_root,
-        context=None,
-        publisher=publisher,
-    )
-    default_event = _ensure_manifest(
-        uuid_value=configs.DEFAULT_EVENT_UUID,
-        item_type='events',
-        label='Default Event',
-        project=project_root,
-        context=subject_root,
-        publisher=publisher,
-    )
-    return {
-        'publisher': publisher,
-        'project': project_root,
-        'subject_root': subject_root,
-        'event': default_event,
-    }
-
-
 @pytest.fixture
 def manifest_factory(core_manifests):
     project = core_manifests['project']
@@ -286,3 +219,46 @@ def test_best_spacetime_returns_chrono_without_geo(
     expected = _best_from_geojson(child, require_geo=False)
     result = spacetime_resolver.fetch_best_spacetime_for_manifest(child.uuid)
     assert result == expected
+
+
+@pytest.mark.django_db
+def test_prefetched_spacetime_matches_query(
+    core_manifests,
+    manifest_factory,
+    spacetime_factory,
+):
+    parent = manifest_factory('Prefetch Parent')
+    child = manifest_factory('Prefetch Child', context=parent)
+    sibling = manifest_factory('Prefetch Sibling', context=parent)
+
+    spacetime_factory(
+        item=child,
+        geometry_type='Point',
+        geometry={'type': 'Point', 'coordinates': [3.0, 4.0]},
+        latitude=Decimal('4.0'),
+        longitude=Decimal('3.0'),
+        geo_specificity=2,
+    )
+    spacetime_factory(
+        item=parent,
+        geometry_type='Point',
+        geometry={'type': 'Point', 'coordinates': [5.0, 6.0]},
+        latitude=Decimal('6.0'),
+        longitude=Decimal('5.0'),
+        earliest=Decimal('-300.0'),
+        latest=Decimal('-200.0'),
+    )
+
+    spacetime_objs_dict = get_spacetime_objs_dict([child, sibling])
+    for manifest in [child, sibling]:
+        queried = get_spacetime_geo_and_chronos(manifest)
+        prefetched = get_spacetime_geo_and_chronos(
+            manifest,
+            spacetime_objs_dict=spacetime_objs_dict,
+        )
+        assert [st.uuid for st in prefetched] == [st.uuid for st in queried]
+        assert [
+            getattr(st.inherit_chrono, 'uuid', None) for st in prefetched
+        ] == [
+            getattr(st.inherit_chrono, 'uuid', None) for st in queried
+        ]
@@ -14,6 +14,7 @@ from opencontext_py.libs.requestnegotiation import RequestNegotiation
 from opencontext_py.apps.all_items import configs
 from opencontext_py.apps.all_items.permissions import get_request_user_permissions
 from opencontext_py.apps.all_items.representations import item
+from opencontext_py.apps.all_items.representations import rep_cache
 from opencontext_py.apps.all_items.representations.rep_utils import get_hero_banner_url
 from opencontext_py.apps.all_items.representations.template_prep import (
     prepare_for_item_dict_solr_and_html_template,
@@ -210,7 +211,9 @@ def all_items_json(request, uuid, man_obj=None):
         rep_dict = solrdoc.fields
     else:
         # default, simple JSON-LD
-        man_obj, rep_dict = item.make_representation_dict(subject_id=ok_uuid)
+        man_obj, rep_dict = rep_cache.get_cache_representation_dict(
+            subject_id=ok_uuid
+        )
     if not man_obj or not rep_dict:
         raise Http404
     allow_view, allow_edit = get_request_user_permissions(request, man_obj)
@@ -297,7 +300,7 @@ def all_items_html(
         # with added stuff for Solr
         return make_solr_doc_in_html(request, ok_uuid)
 
-    man_obj, rep_dict = item.make_representation_dict(
+    man_obj, rep_dict = rep_cache.get_cache_representation_dict(
         subject_id=ok_uuid,
         for_solr_or_html=True,
     )
@@ -93,6 +93,9 @@ JSON_LD_ITEM_TYPES = [
     'tables',
 ]
 
+# Number of items to make JSON-LD representations for at a time.
+JSON_LD_CHUNK_SIZE = 100
+
 MANIFEST_CSV_FIELDS = [
     'uuid',
     'publisher_id',
@@ -208,14 +211,15 @@ HISTORY_CSV_FIELDS = [
 ]
 
 
-def create_save_rep_dict(act_path, uuid, save_in_item_type_dir=True):
+def create_save_rep_dict(act_path, uuid, save_in_item_type_dir=True, man_obj=None, rep_dict=None):
     """Creates a JSON-LD dictionary representation of an Open Context
     item to save in a file
     """
-    man_obj, rep_dict = item.make_representation_dict(
-        subject_id=uuid,
-        for_solr=False,
-    )
+    if man_obj is None or rep_dict is None:
+        man_obj, rep_dict = item.make_representation_dict(
+            subject_id=uuid,
+            for_solr=False,
+        )
     if man_obj is None:
         return None
     if save_in_item_type_dir:
@@ -533,10 +537,15 @@ def save_project_json_ld(project_id, man_df):
     uuid_count = len(uuids)
     i = 0
     print(f'Save {uuid_count} items')
-    for uuid in man_df[index]['uuid'].unique().tolist():
-        i += 1
-        create_save_rep_dict(act_path, uuid)
-        print(f'Saved JSON-LD for {uuid} ({i} of {uuid_count})', end="\r",)
+    for chunk_uuids in create_df.chunk_list(uuids, n=JSON_LD_CHUNK_SIZE):
+        # Make the representation dicts for a whole chunk of uuids
+        # in a fixed number of queries.
+        rep_dicts = item.make_representation_dicts(chunk_uuids, for_solr=False)
+        for uuid in chunk_uuids:
+            i += 1
+            man_obj, rep_dict = rep_dicts.get(str(uuid), (None, None,))
+            create_save_rep_dict(act_path, uuid, man_obj=man_obj, rep_dict=rep_dict)
+            print(f'Saved JSON-LD for {uuid} ({i} of {uuid_count})', end="\r",)
     print('\n')
     print('\n')
     print(f'FINISHED saving JSON-LD for {uuid_count} items')
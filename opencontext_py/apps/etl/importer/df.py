@@ -1,3 +1,5 @@
+import duckdb
+import glob
 import os
 import hashlib
 import time
@@ -5,10 +7,16 @@ import time
 import numpy as np
 import pandas as pd
 
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import TextField
+from django.db.models.functions import Cast
+
 
 from opencontext_py.apps.all_items.models import (
     AllManifest,
 )
+from opencontext_py.apps.all_items.legacy_all import SALT
 from opencontext_py.apps.etl.importer.models import (
     DataSource,
     DataSourceField,
@@ -16,6 +24,7 @@ from opencontext_py.apps.etl.importer.models import (
     DataSourceAnnotation,
 )
 from opencontext_py.apps.etl.importer import autofields
+from opencontext_py.libs import dbcopy
 
 # ---------------------------------------------------------------------
 # NOTE: These functions provide a means to load data into our ETL
@@ -42,6 +51,25 @@ df_etl = db_make_dataframe_from_etl_data_source(ds_source, use_column_labels=Tru
 # How many rows will we update in 1 database query?
 DB_ROW_UPDATE_CHUNK_SIZE = 100
 
+# About how many cells (DataSourceRecords) will we prepare and COPY into
+# the database at a time? This keeps memory use flat for big dataframes.
+DB_RECORD_COPY_CHUNK_CELLS = 200000
+
+# How many DataSourceRecords will we fetch at a time (with a server
+# side cursor) when making a dataframe?
+DB_RECORD_FETCH_CHUNK_SIZE = 20000
+
+# The columns of a long format dataframe of DataSourceRecords.
+RECORDS_LONG_DF_COLS = ['row_num', 'field_num', 'record', 'context_id', 'item_id']
+
+# NOTE: If settings.ETL_DF_SNAPSHOT_PATH is set, we keep a Parquet
+# snapshot of all the DataSourceRecords (in long format) for each
+# data source, so that repeated ETL stages can make their dataframes
+# without querying the database. A version number (in the cache)
+# for each data source gets bumped when records get saved or updated,
+# which makes new snapshots.
+RECORDS_VERSION_CACHE = 'redis'
+
 
 def chunk_list(list_name, n=DB_ROW_UPDATE_CHUNK_SIZE):
     """Breaks a long list into chunks of size n"""
@@ -49,6 +77,217 @@ def chunk_list(list_name, n=DB_ROW_UPDATE_CHUNK_SIZE):
         yield list_name[i:i + n]
 
 
+def get_data_source_records_version(ds_source):
+    """Gets the version number of the records of a data source"""
+    cache = caches[RECORDS_VERSION_CACHE]
+    try:
+        return cache.get(f'etl-records-version-{str(ds_source.uuid)}')
+    except:
+        return None
+
+
+def get_data_source_records_snapshot_paths(ds_source):
+    """Gets a list of paths to the Parquet snapshot files of a data source"""
+    if not settings.ETL_DF_SNAPSHOT_PATH:
+        return []
+    return glob.glob(
+        os.path.join(
+            settings.ETL_DF_SNAPSHOT_PATH,
+            f'etl-records-{str(ds_source.uuid)}-*.parquet',
+        )
+    )
+
+
+def bump_data_source_records_version(ds_source):
+    """Bumps the version number of the records of a data source, after
+    records get saved, updated or deleted, so we don't use stale
+    Parquet snapshots of them"""
+    if not settings.ETL_DF_SNAPSHOT_PATH:
+        # We're not using snapshots, so we don't need versions.
+        return None
+    # Use the current time (in milliseconds) so a lost version key
+    # can't come back with an older version number.
+    version = int(time.time() * 1000)
+    cache = caches[RECORDS_VERSION_CACHE]
+    try:
+        cache.set(
+            f'etl-records-version-{str(ds_source.uuid)}',
+            version,
+            timeout=None,
+        )
+    except:
+        pass
+    # Remove the old (now stale) snapshots.
+    for path in get_data_source_records_snapshot_paths(ds_source):
+        try:
+            os.remove(path)
+        except:
+            pass
+    return version
+
+
+def db_get_data_source_records_long_df(ds_recs_qs):
+    """Gets a long format dataframe (one row per record) from a queryset
+    of DataSourceRecords, fetched as tuples with a server side cursor
+
+    :param QuerySet ds_recs_qs: A DataSourceRecord queryset
+
+    returns a dataframe with the RECORDS_LONG_DF_COLS columns
+    """
+    # Let the database cast the uuids to strings.
+    values_qs = ds_recs_qs.annotate(
+        context_str=Cast('context_id', output_field=TextField()),
+        item_str=Cast('item_id', output_field=TextField()),
+    ).order_by().values_list(
+        'row_num',
+        'field_num',
+        'record',
+        'context_str',
+        'item_str',
+    )
+    return pd.DataFrame.from_records(
+        values_qs.iterator(chunk_size=DB_RECORD_FETCH_CHUNK_SIZE),
+        columns=RECORDS_LONG_DF_COLS,
+    )
+
+
+def write_data_source_records_snapshot(ds_source, version):
+    """Writes a Parquet snapshot of all the records of a data source
+
+    returns the path to the snapshot file
+    """
+    path = os.path.join(
+        settings.ETL_DF_SNAPSHOT_PATH,
+        f'etl-records-{str(ds_source.uuid)}-{version}.parquet',
+    )
+    if os.path.exists(path):
+        return path
+    long_df = db_get_data_source_records_long_df(
+        DataSourceRecord.objects.filter(data_source=ds_source)
+    )
+    os.makedirs(settings.ETL_DF_SNAPSHOT_PATH, exist_ok=True)
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    con = duckdb.connect(':memory:')
+    try:
+        con.register('long_df', long_df)
+        # Sorting by row_num lets reads of row ranges skip most of
+        # the file.
+        con.execute(
+            f"COPY (SELECT * FROM long_df ORDER BY row_num, field_num) "
+            f"TO '{temp_path}' (FORMAT PARQUET)"
+        )
+    finally:
+        con.close()
+    os.replace(temp_path, path)
+    return path
+
+
+def read_data_source_records_snapshot(
+    ds_source,
+    limit_field_num_list=None,
+    limit_row_num_start=None,
+    limit_row_num_last=None,
+    limit_row_count=None,
+    limit_row_num_list=None,
+    exclude_row_list=None,
+):
+    """Reads a long format dataframe of records from the Parquet snapshot
+    of a data source, making the snapshot if needed
+
+    returns a dataframe with the RECORDS_LONG_DF_COLS columns, or None
+        if we can't use a snapshot
+    """
+    version = get_data_source_records_version(ds_source)
+    if version is None:
+        version = bump_data_source_records_version(ds_source)
+    try:
+        path = write_data_source_records_snapshot(ds_source, version)
+    except Exception as e:
+        print(f'Could not make records snapshot: {str(e)}')
+        return None
+
+    # These conditions match the queryset filters in
+    # db_make_dataframe_from_etl_data_source.
+    where_terms = []
+    params = []
+    if limit_field_num_list:
+        where_terms.append('list_contains(?, field_num)')
+        params.append([int(f) for f in limit_field_num_list])
+    if limit_row_num_start is not None and limit_row_count is not None:
+        where_terms.append('row_num >= ? AND row_num < ?')
+        params += [limit_row_num_start, (limit_row_num_start + limit_row_count)]
+    if limit_row_num_start is not None and limit_row_num_last is not None:
+        where_terms.append('row_num >= ? AND row_num <= ?')
+        params += [limit_row_num_start, limit_row_num_last]
+    if limit_row_num_list is not None:
+        where_terms.append('list_contains(?, row_num)')
+        params.append([int(r) for r in limit_row_num_list])
+    if exclude_row_list is not None:
+        where_terms.append('NOT list_contains(?, row_num)')
+        params.append([int(r) for r in exclude_row_list])
+    sql = f"SELECT {', '.join(RECORDS_LONG_DF_COLS)} FROM read_parquet('{path}')"
+    if where_terms:
+        sql += ' WHERE ' + ' AND '.join([f'({t})' for t in where_terms])
+    con = duckdb.connect(':memory:')
+    try:
+        long_df = con.execute(sql, params).df()
+    except Exception as e:
+        print(f'Could not read records snapshot: {str(e)}')
+        long_df = None
+    finally:
+        con.close()
+    return long_df
+
+
+def make_wide_df_from_records_long_df(
+    long_df,
+    field_nums,
+    include_uuid_cols=False,
+    include_error_cols=False,
+):
+    """Pivots a long format dataframe of records into a wide dataframe
+    with one row per row_num
+
+    :param DataFrame long_df: A dataframe with the RECORDS_LONG_DF_COLS columns
+    :param list field_nums: The field_nums for the columns of the
+        output dataframe, in order.
+    :param bool include_uuid_cols: Include the context and item uuid columns
+    :param bool include_error_cols: Include (empty) reconcile error columns
+
+    returns a wide dataframe
+    """
+    # Fields with records, but not in the field_nums go at the end.
+    rec_field_nums = sorted(long_df['field_num'].unique().tolist())
+    field_nums = list(field_nums) + [f for f in rec_field_nums if f not in field_nums]
+    value_cols = ['record']
+    if include_uuid_cols:
+        value_cols += ['context_id', 'item_id']
+    wide_df = long_df.pivot(
+        index='row_num',
+        columns='field_num',
+        values=value_cols,
+    ).sort_index()
+    data = {'row_num': wide_df.index.astype(int)}
+    for field_num in field_nums:
+        if include_uuid_cols:
+            for suffix, value_col in [('context', 'context_id'), ('item', 'item_id')]:
+                if (value_col, field_num) not in wide_df.columns:
+                    data[f'{field_num}_{suffix}'] = None
+                    continue
+                col = wide_df[(value_col, field_num)].astype(object)
+                data[f'{field_num}_{suffix}'] = col.where(col.notnull(), None)
+        if ('record', field_num) in wide_df.columns:
+            # Fill missing records with empty strings.
+            data[f'{field_num}_col'] = wide_df[('record', field_num)].fillna('').astype(object)
+        else:
+            data[f'{field_num}_col'] = ''
+    if include_error_cols:
+        for field_num in rec_field_nums:
+            data[f'{field_num}_reconcile_errors'] = None
+    df = pd.DataFrame(data=data, index=wide_df.index)
+    return df.reset_index(drop=True)
+
+
 def db_make_dataframe_from_etl_data_source(
     ds_source,
     include_uuid_cols=False,
@@ -75,17 +314,6 @@ def db_make_dataframe_from_etl_data_source(
         # We're limiting the query set to a list of field_nums.
         ds_fields_qs = ds_fields_qs.filter(field_num__in=limit_field_num_list)
 
-    data = {'row_num': [],}
-    for df_field in ds_fields_qs:
-        if include_uuid_cols:
-            data[f'{df_field.field_num}_context'] = []
-            data[f'{df_field.field_num}_item'] = []
-        data[f'{df_field.field_num}_col'] = []
-
-    df = pd.DataFrame(data=data)
-    for col in df.columns.tolist():
-        df[col] = df[col].astype("string")
-
     # Get the queryset of records for this data source.
     ds_recs_qs = DataSourceRecord.objects.filter(data_source=ds_source)
 
@@ -118,49 +346,27 @@ def db_make_dataframe_from_etl_data_source(
             row_num__in=exclude_row_list,
         )
 
-    ds_recs_qs = ds_recs_qs.select_related(
-        'context'
-    ).select_related(
-        'item'
+    long_df = None
+    if settings.ETL_DF_SNAPSHOT_PATH:
+        long_df = read_data_source_records_snapshot(
+            ds_source,
+            limit_field_num_list=limit_field_num_list,
+            limit_row_num_start=limit_row_num_start,
+            limit_row_num_last=limit_row_num_last,
+            limit_row_count=limit_row_count,
+            limit_row_num_list=limit_row_num_list,
+            exclude_row_list=exclude_row_list,
+        )
+    if long_df is None:
+        long_df = db_get_data_source_records_long_df(ds_recs_qs)
+
+    df = make_wide_df_from_records_long_df(
+        long_df,
+        field_nums=[df_field.field_num for df_field in ds_fields_qs],
+        include_uuid_cols=include_uuid_cols,
+        include_error_cols=include_error_cols,
     )
 
-    # NOTE: We make a list, all_rows, that will have a row_data dict
-    # for each row we want to add to the dataframe. Making a dataframe
-    # from a list (all_rows) is about 30x faster than appending each
-    # individual row_data dict directly to the dataframe
-    all_rows = []
-    row_data = {}
-    prior_row_num = 1
-    for ds_rec in ds_recs_qs.iterator():
-        if ds_rec.row_num != prior_row_num:
-            all_rows.append(row_data)
-            row_data = {}
-            prior_row_num = ds_rec.row_num
-        # Make a row dictionary.
-        row_data['row_num'] = ds_rec.row_num
-        if include_uuid_cols:
-            context = None
-            item = None
-            if ds_rec.context:
-                context = str(ds_rec.context.uuid)
-            if ds_rec.item:
-                item = str(ds_rec.item.uuid)
-            row_data[f'{ds_rec.field_num}_context'] = context
-            row_data[f'{ds_rec.field_num}_item'] = item
-        if include_error_cols:
-            row_data[f'{ds_rec.field_num}_reconcile_errors'] = None
-        row_data[f'{ds_rec.field_num}_col'] = ds_rec.record
-    # Now add the final row.
-    all_rows.append(row_data)
-    df_all_rows = pd.DataFrame(data=all_rows)
-    # Append the all_rows list all at once for a major speed boost.
-    df = pd.concat([df, df_all_rows], ignore_index=True)
-
-    # Fill na with empty strings for missing records.
-    for df_field in ds_fields_qs:
-        # df[f'{df_field.field_num}_col'].fillna('', inplace=True)
-        df.fillna({f'{df_field.field_num}_col': ''}, inplace=True)
-
     # We want to replace the numeric column names with corresponding
     # field labels.
     if use_column_labels:
@@ -292,41 +498,108 @@ def save_data_source_fields_for_df(df, ds_source, col_prior_fields):
     return prior_to_new_fields
 
 
-def save_data_source_records_for_df(df, ds_source, chuck_size=50):
+def make_data_source_record_uuids(data_source_id, row_nums, field_nums):
+    """Makes deterministic DataSourceRecord uuids for series of row and
+    field numbers, the same as DataSourceRecord().primary_key_create() would
+
+    :param str data_source_id: The uuid of a DataSource
+    :param Series row_nums: A series of row numbers
+    :param Series field_nums: A series of field numbers (with the same
+        index as the row_nums)
+
+    returns a series of uuid strings
+    """
+    data_source_id = str(data_source_id)
+    id_prefix = data_source_id.split('-')[0]
+    hash_strs = (
+        f'{SALT}-{data_source_id}-'
+        + row_nums.astype(str)
+        + '-'
+        + field_nums.astype(str)
+    )
+    hash_vals = hash_strs.map(
+        lambda v: hashlib.sha1(v.encode('utf-8')).hexdigest()
+    )
+    # The first part of the uuid comes from the data source uuid, the
+    # rest comes from the first 32 characters of the hash.
+    return (
+        id_prefix
+        + '-' + hash_vals.str[8:12]
+        + '-' + hash_vals.str[12:16]
+        + '-' + hash_vals.str[16:20]
+        + '-' + hash_vals.str[20:32]
+    )
+
+
+def make_data_source_records_df(df, ds_source):
+    """Makes a long format dataframe of DataSourceRecords (one row for
+    each non-empty cell) from a (wide) dataframe
+
+    :param DataFrame df: A dataframe (or a chunk of rows from a dataframe)
+        that we are currently preparing for ETL, with null values already
+        filled with blank strings.
+    :param DataSource ds_source: A DataSource object that provides
+        metadata about the data source for an ETL process.
+    """
+    wide_df = df.copy()
+    # Fields are numbered by column position, and rows by index (+ 1).
+    wide_df.columns = list(range(1, (len(df.columns) + 1)))
+    wide_df['row_num'] = df.index + 1
+    rec_df = wide_df.melt(
+        id_vars=['row_num'],
+        var_name='field_num',
+        value_name='record',
+    )
+    # We store each cell value as a string in the DataSourceRecord model.
+    rec_df['record'] = rec_df['record'].astype(str)
+    # Skip empty records. We should be able to handle these without
+    # clogging our DB with missing junk.
+    rec_df = rec_df[rec_df['record'] != ''].copy()
+    rec_df.sort_values(by=['row_num', 'field_num'], inplace=True)
+    rec_df['data_source_id'] = str(ds_source.uuid)
+    rec_df['uuid'] = make_data_source_record_uuids(
+        ds_source.uuid,
+        rec_df['row_num'],
+        rec_df['field_num'],
+    )
+    return rec_df
+
+
+def save_data_source_records_for_df(
+    df,
+    ds_source,
+    chunk_cells=DB_RECORD_COPY_CHUNK_CELLS,
+    print_progress=True,
+):
     """Saves a datasource field objects for dataframe columns
 
     :param DataFrame df: A dataframe that we are currently preparing for ETL,
     :param DataSource ds_source: A DataSource object that provides
         metadata about the data source for an ETL process.
+    :param int chunk_cells: About how many cells to prepare and save
+        at a time.
+    :param bool print_progress: Print progress messages.
+
+    returns the number of saved records
     """
     # Fill null values with a blank string.
     df.fillna('', inplace=True)
 
-    cols = df.columns.tolist()
-    for df_chunk in np.array_split(df, chuck_size):
-        data_source_records = []
-        for i, row in df_chunk.iterrows():
-            for field_num, col in enumerate(cols, start=1):
-                # We store each cell value as a string in the
-                # DataSourceRecord model.
-                record = str(row[col])
-                if not record:
-                    # Skip empty records. We should be able to handle
-                    # these without clogging our DB with missing junk.
-                    continue
-                ds_rec = DataSourceRecord()
-                ds_rec.uuid = DataSourceRecord().primary_key_create(
-                    data_source_id=ds_source.uuid,
-                    row_num=(i + 1),
-                    field_num=field_num,
-                )
-                ds_rec.data_source = ds_source
-                ds_rec.row_num = (i + 1)
-                ds_rec.field_num = field_num
-                ds_rec.record = record
-                data_source_records.append(ds_rec)
-        # Now bulk create the records in this chunk of rows.
-        DataSourceRecord.objects.bulk_create(data_source_records)
+    num_rows = len(df.index)
+    chunk_rows = max(1, int(chunk_cells / max(1, len(df.columns))))
+    saved_count = 0
+    for i in range(0, num_rows, chunk_rows):
+        df_chunk = df.iloc[i:(i + chunk_rows)]
+        rec_df = make_data_source_records_df(df_chunk, ds_source)
+        # Stream the records into the database with a (fast) COPY.
+        saved_count += dbcopy.copy_df_to_model_table(DataSourceRecord, rec_df)
+        if print_progress:
+            print(
+                f'Saved {saved_count} records from rows 1 to '
+                f'{min(num_rows, (i + chunk_rows))} of {num_rows}'
+            )
+    bump_data_source_records_version(ds_source)
+    return saved_count
 
 
 def load_df_for_etl(
@@ -389,6 +662,7 @@ def load_df_for_etl(
         # Now that we have copied over related field attributes and annotations
         # we can safely delete the prior data source.
         DataSourceRecord.objects.filter(data_source=ds).delete()
+        bump_data_source_records_version(ds)
         DataSourceAnnotation.objects.filter(data_source=ds).delete()
         DataSourceField.objects.filter(data_source=ds).delete()
         DataSource.objects.filter(uuid=ds.uuid).delete()
@@ -307,105 +307,88 @@ def make_descriptive_assertions(
         # Put this to the very end.
         sort_start = ds_source.field_count
 
-    # Mappings between literal to note predicates.
-    literal_to_note_preds = {}
-
-    assert_uuids = []
-    unsaved_assert_objs = []
-    for i, row in df_grp.iterrows():
-        # Start making a dict that includes most of the
-        # assertion's attributes.
-        raw_object_val = str(row[act_obj_col]).strip()
-        act_data_type = str(row[act_obj_dt_col])
-
-        if not raw_object_val:
-            # We have a blank value, so skip.
+    # Make the assertions with whole column operations, rather than
+    # one row at a time.
+    raw_object_vals = df_grp[act_obj_col].astype(str).str.strip()
+    act_data_types = df_grp[act_obj_dt_col].astype(str)
+    # Skip blank values and empty data types.
+    keep_index = (raw_object_vals != '') & (act_data_types != '')
+
+    assert_df = pd.DataFrame(index=df_grp.index)
+    assert_df['project_id'] = str(ds_source.project.uuid)
+    assert_df['publisher_id'] = str(ds_source.project.publisher_id)
+    assert_df['source_id'] = ds_source.source_id
+    assert_df['subject_id'] = df_grp[act_subj_col].astype(str)
+    assert_df['observation_id'] = df_grp[act_obs_col].astype(str)
+    assert_df['event_id'] = df_grp[act_event_col].astype(str)
+    assert_df['attribute_group_id'] = df_grp[act_attrib_group_col].astype(str)
+    assert_df['predicate_id'] = df_grp[act_pred_col].astype(str)
+    assert_df['sort'] = sort_start + (df_grp.index / sort_denom)
+    assert_df['language_id'] = df_grp[act_lang_col].astype(str)
+    for attrib in ['object_id'] + [a for a, _ in LITERAL_ATTRIBUTE_DATA_TYPES]:
+        assert_df[attrib] = pd.Series(None, index=df_grp.index, dtype=object)
+
+    # We're making assertions where the object is a named entity.
+    id_index = keep_index & (act_data_types == 'id')
+    assert_df.loc[id_index, 'object_id'] = raw_object_vals[id_index]
+    literal_index = pd.Series(False, index=df_grp.index)
+
+    for lit_attrib, data_type in LITERAL_ATTRIBUTE_DATA_TYPES:
+        dt_index = keep_index & (act_data_types == data_type)
+        if not dt_index.any():
             continue
-        if not act_data_type:
-            # We have a data type that is empty, skip.
+        literal_index |= dt_index
+        # Convert the raw_object_vals to object values that conform
+        # to the expected data type.
+        object_vals = etl_utils.validate_transform_data_type_series(
+            raw_object_vals[dt_index],
+            data_type
+        )
+        valid_vals = object_vals[object_vals.notnull()]
+        assert_df.loc[valid_vals.index, lit_attrib] = valid_vals
+        invalid_index = object_vals[object_vals.isnull()].index
+        if not len(invalid_index):
             continue
-
-        predicate_uuid = str(row[act_pred_col])
-        if log_new_assertion:
-            logger.info(f'Make assertion on: {predicate_uuid} {raw_object_val}')
-
-        assert_dict = {
-            'project': ds_source.project,
-            'publisher': ds_source.project.publisher,
-            'source_id': ds_source.source_id,
-            'subject_id': str(row[act_subj_col]),
-            'observation_id': str(row[act_obs_col]),
-            'event_id': str(row[act_event_col]),
-            'attribute_group_id': str(row[act_attrib_group_col]),
-            'predicate_id': predicate_uuid,
-            'sort': (sort_start + (i/sort_denom)),
-            'language_id': str(row[act_lang_col]),
-        }
-        if act_data_type == 'id':
-            # We're making an assertion where the object is a named
-            # entity.
-            assert_dict['object_id'] = raw_object_val
-        else:
-            # We're making an assertion where the object is a
-            # literal of some data_type.
-            literal_done = False
-            for lit_attrib, data_type in LITERAL_ATTRIBUTE_DATA_TYPES:
-                if literal_done or act_data_type != data_type:
-                    # The assertion is not about this data_type
-                    continue
-                # Convert the raw_object_val to an object value that
-                # conforms to the expected data type.
-                object_val = etl_utils.validate_transform_data_type_value(
-                    raw_object_val,
-                    data_type
+        # We're in a sad situation where some raw_object_vals cannot
+        # be parsed into object values of the correct data type. So
+        # we need to get or make new note predicates for these, and make
+        # string literal assertions instead.
+        invalid_preds = assert_df.loc[invalid_index, 'predicate_id']
+        for predicate_uuid in invalid_preds.unique():
+            pred_index = invalid_preds[invalid_preds == predicate_uuid].index
+            pred_note_obj = None
+            if invalid_literal_to_str:
+                pred_note_obj = get_make_note_predicate_for_invalid_literal_db(
+                    ds_source=ds_source,
+                    predicate_uuid=predicate_uuid,
+                    sort=ds_anno.object_field.field_num,
+                    add_assoction_uuid=configs.PREDICATE_SKOS_RELATED_UUID,
                 )
-                if object_val is not None:
-                    # We have a literal value that is valid for this
-                    # assertion. Add it.
-                    assert_dict[lit_attrib] = object_val
-                    literal_done = True
-                    continue
-                # We're in a sad situation where the raw_object_val cannot
-                # be parsed into an object_value of the correct data type. So
-                # we need to get or make a new predicate
-                pred_note_obj = literal_to_note_preds.get(predicate_uuid)
-                if invalid_literal_to_str and pred_note_obj is None:
-                    # We don't have an object_val that is
-                    # valid for this data type, so make a string
-                    # literal assertion instead.
-                    pred_note_obj = get_make_note_predicate_for_invalid_literal_db(
-                        ds_source=ds_source,
-                        predicate_uuid=predicate_uuid,
-                        sort=ds_anno.object_field.field_num,
-                        add_assoction_uuid=configs.PREDICATE_SKOS_RELATED_UUID,
-                    )
-                    literal_to_note_preds[predicate_uuid] = pred_note_obj
-                if not pred_note_obj:
-                    # We don't have a predicate note object, so skip.
-                    continue
-
-                if print_progress:
-                    print(f'Using {pred_note_obj.label} for {raw_object_val}')
-                assert_dict['predicate_id'] = str(pred_note_obj.uuid)
-                assert_dict['obj_string'] = raw_object_val
-                literal_done = True
-
-        # Make a UUID keyword arg dict for making the assertion uuid.
-        uuid_kargs = {k:assert_dict.get(k) for k in ASSERT_ID_ATTRIBUTES}
-        assert_uuid = AllAssertion().primary_key_create(**uuid_kargs)
-        assert_uuids.append(assert_uuid)
-        assert_dict['uuid'] = assert_uuid
-        assert_obj = AllAssertion(**assert_dict)
-        unsaved_assert_objs.append(assert_obj)
-        if log_new_assertion:
-            logger.info(ass_obj)
+            if not pred_note_obj:
+                # We don't have a predicate note object, so skip.
+                keep_index[pred_index] = False
+                continue
+            if print_progress:
+                print(
+                    f'Using {pred_note_obj.label} for {len(pred_index)} '
+                    f'invalid {data_type} values'
+                )
+            assert_df.loc[pred_index, 'predicate_id'] = str(pred_note_obj.uuid)
+            assert_df.loc[pred_index, 'obj_string'] = raw_object_vals[pred_index]
+
+    # Only keep assertions with named entity objects or literals of a
+    # known data type.
+    assert_df = assert_df[keep_index & (id_index | literal_index)].copy()
+    assert_df['uuid'] = trans_utils.make_df_assertion_uuids(assert_df)
+    if log_new_assertion:
+        logger.info(
+            f'Make {len(assert_df.index)} assertions from {ds_anno.subject_field.label}'
+        )
 
-    # Bulk save these assertions. This does a fallback to saving saving assertion
-    # objects individually if something goes wrong, but that's far slower.
-    trans_utils.bulk_create_assertions(
-        assert_uuids,
-        unsaved_assert_objs
-    )
+    # Save these assertions with a fast database COPY. This does a fallback
+    # to bulk creating (or even saving assertion objects individually) if
+    # something goes wrong, but that's far slower.
+    trans_utils.copy_create_assertions(assert_df)
 
     end = time.time()
     if print_progress:
@@ -13,6 +13,7 @@ from opencontext_py.apps.all_items.models import (
     AllResource,
     AllHistory,
 )
+from opencontext_py.apps.all_items.representations import rep_cache
 
 from opencontext_py.apps.etl.importer.models import (
     DataSourceField,
@@ -117,6 +118,7 @@ def delete_data_source_reconciled_associations(ds_source):
     ).update(
         context=None
     )
+    etl_df.bump_data_source_records_version(ds_source)
 
     # Remove item_class and context references associated
     # for ds_fields that may be associated with already imported items.
@@ -196,6 +198,9 @@ def reset_data_source_transform_load(ds_source):
     """Resets the Transform, Load stage of the ETL process"""
     delete_data_source_reconciled_associations(ds_source)
     count_prior_load_deleted = delete_imported_from_datasource(ds_source)
+    # Don't serve cached representations of items in this project that
+    # may show deleted data.
+    rep_cache.bump_project_rep_revisions([ds_source.project_id])
     count_etl_cache_deleted = reset_data_source_etl_process_cache(ds_source)
     return count_prior_load_deleted, count_etl_cache_deleted
 
@@ -601,6 +606,10 @@ def transform_load(ds_source):
 
     etl_stages['complete'] = all_done
 
+    # We loaded data into this project, so don't serve stale cached
+    # representations of its items.
+    rep_cache.bump_project_rep_revisions([ds_source.project_id])
+
     # Save this stake of the process to the cache.
     cache_item_and_cache_key_for_etl_source(ds_source, cache_key_stages, etl_stages)
     return etl_stages
\ No newline at end of file
@@ -226,6 +226,7 @@ def reconcile_predicates_types_variables(ds_source, df=None, filter_index=None):
             ).update(
                 context=ds_field.context,
             )
+        etl_df.bump_data_source_records_version(ds_field.data_source)
 
     return df
 
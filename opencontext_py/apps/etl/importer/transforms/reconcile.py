@@ -166,25 +166,24 @@ def ensure_ok_item_class_for_item_type(ds_field, context, record_item_class=None
 
 
 
-def get_or_create_manifest_entity(
-    ds_field,
-    context,
-    raw_column_record,
-    record_item_class=None,
-    record_uuid=None,
-    record_other_id=None,
-):
-    """Gets or creates a manifest entity after reconciliation"""
+def get_reconcile_scope(ds_field, context, record_item_class=None):
+    """Gets the project ids, context, item_type, and item_class that
+    scope entity reconciliation for a ds_field
 
+    returns a (reconcile_project_ids, context, item_type, record_item_class)
+        tuple
+    """
     # Limit the projects in which we will search for matching spatial items
     # for this col_record
-    reconcile_project_ids = ds_field.meta_json.get(
-        'reconcile_project_ids',
-        [
-            configs.OPEN_CONTEXT_PROJ_UUID, 
-            str(ds_field.data_source.project.uuid), 
-            str(ds_field.data_source.project.project.uuid),
-        ]
+    reconcile_project_ids = list(
+        ds_field.meta_json.get(
+            'reconcile_project_ids',
+            [
+                configs.OPEN_CONTEXT_PROJ_UUID,
+                str(ds_field.data_source.project.uuid),
+                str(ds_field.data_source.project.project.uuid),
+            ]
+        )
     )
     context = get_ds_field_context(ds_field, context)
     if ds_field.item_type == 'subjects' and context.item_type == 'projects':
@@ -198,18 +197,60 @@ def get_or_create_manifest_entity(
         context,
         record_item_class
     )
+    return reconcile_project_ids, context, item_type, record_item_class
 
-    # Pass in a slug identifier to use to identify an item.
+
+def make_reconcile_slug_check(raw_column_record):
+    """Makes a slug to check for a raw_column_record, if the
+    raw_column_record is already a slug"""
     slug_check = slugify(unidecode(str(raw_column_record)))
     if str(raw_column_record) != slug_check:
         # The raw_column_record is not a slug.
-        slug_check = None
+        return None
+    return slug_check
 
-    # Prepare the item label.
+
+def make_reconcile_item_label(ds_field, raw_column_record, item_type):
+    """Makes a clean item label for a raw_column_record"""
     item_label = str(raw_column_record)
     if ds_field.value_prefix:
         item_label = ds_field.value_prefix + raw_column_record
-    item_label = AllManifest().clean_label(item_label, item_type=item_type)
+    return AllManifest().clean_label(item_label, item_type=item_type)
+
+
+def filter_reconcile_qs_by_field_args(man_qs, ds_field):
+    """Adds the filter and exclude arguments configured for a ds_field
+    to a manifest queryset"""
+    more_filter_args = ds_field.meta_json.get('reconcile_filter_args')
+    more_exclude_args = ds_field.meta_json.get('reconcile_exclude_args')
+    if more_filter_args:
+        man_qs = man_qs.filter(**more_filter_args)
+    if more_exclude_args:
+        man_qs = man_qs.exclude(**more_exclude_args)
+    return man_qs
+
+
+def get_or_create_manifest_entity(
+    ds_field,
+    context,
+    raw_column_record,
+    record_item_class=None,
+    record_uuid=None,
+    record_other_id=None,
+):
+    """Gets or creates a manifest entity after reconciliation"""
+
+    reconcile_project_ids, context, item_type, record_item_class = get_reconcile_scope(
+        ds_field,
+        context,
+        record_item_class
+    )
+
+    # Pass in a slug identifier to use to identify an item.
+    slug_check = make_reconcile_slug_check(raw_column_record)
+
+    # Prepare the item label.
+    item_label = make_reconcile_item_label(ds_field, raw_column_record, item_type)
 
     man_qs = AllManifest.objects.filter(
         project_id__in=reconcile_project_ids,
@@ -267,12 +308,7 @@ def get_or_create_manifest_entity(
         # filter to contextualize)
         man_qs = man_qs.filter(label=item_label)
 
-    more_filter_args = ds_field.meta_json.get('reconcile_filter_args')
-    more_exclude_args = ds_field.meta_json.get('reconcile_exclude_args')
-    if more_filter_args:
-        man_qs = man_qs.filter(**more_filter_args)
-    if more_exclude_args:
-        man_qs = man_qs.exclude(**more_exclude_args)
+    man_qs = filter_reconcile_qs_by_field_args(man_qs, ds_field)
 
     # Now handle the results where of our query to attempt to
     # find matching records for this specific item.
@@ -331,6 +367,76 @@ def get_or_create_manifest_entity(
 
 
 
+def bulk_reconcile_manifest_entities(ds_field, context, raw_column_records):
+    """Reconciles many raw_column_records against existing manifest
+    entities with a few bulk queries. This works like
+    get_or_create_manifest_entity (for records without a record_uuid or
+    a record_other_id), but it does not create new items.
+
+    :param DataSourceField ds_field: A DataSourceField object
+    :param AllManifest context: An AllManifest object that provides
+        context in which entity reconciliation is scoped.
+    :param list raw_column_records: A list of distinct raw column
+        record values
+
+    returns a dict keyed by raw_column_record, with (item_obj, num_matching)
+        tuples for records with 1 or more matches. The item_obj is None if
+        there is more than 1 match. Records without matches are not in the
+        dict, as they may need new items.
+    """
+    if (
+        ds_field.item_type in configs.URI_CONTEXT_PREFIX_ITEM_TYPES
+        or ds_field.item_type == 'persons'
+    ):
+        # These get reconciled with more flexible matching, so
+        # do them one at a time with get_or_create_manifest_entity.
+        return {}
+
+    reconcile_project_ids, context, item_type, record_item_class = get_reconcile_scope(
+        ds_field,
+        context,
+    )
+    label_records = {}
+    slug_records = {}
+    for raw_column_record in raw_column_records:
+        if not raw_column_record:
+            continue
+        item_label = make_reconcile_item_label(ds_field, raw_column_record, item_type)
+        label_records.setdefault(item_label, []).append(raw_column_record)
+        slug_check = make_reconcile_slug_check(raw_column_record)
+        if slug_check:
+            slug_records.setdefault(slug_check, []).append(raw_column_record)
+
+    man_qs = AllManifest.objects.filter(
+        project_id__in=reconcile_project_ids,
+        item_type=item_type,
+        data_type=ds_field.data_type,
+    )
+    if context:
+        man_qs = man_qs.filter(context=context)
+    if record_item_class:
+        man_qs = man_qs.filter(item_class=record_item_class)
+    man_qs = filter_reconcile_qs_by_field_args(man_qs, ds_field)
+
+    # Gather the (distinct) matching objects for each raw_column_record,
+    # matching on labels and (if the record is a slug) on slugs.
+    record_matches = {}
+    for attrib, attrib_records in [('label', label_records), ('slug', slug_records)]:
+        for chunk in etl_df.chunk_list(list(attrib_records.keys())):
+            for man_obj in man_qs.filter(**{f'{attrib}__in': chunk}):
+                for raw_column_record in attrib_records.get(getattr(man_obj, attrib), []):
+                    record_matches.setdefault(raw_column_record, {})
+                    record_matches[raw_column_record][man_obj.uuid] = man_obj
+
+    reconciled = {}
+    for raw_column_record, match_dict in record_matches.items():
+        num_matching = len(match_dict)
+        item_obj = None
+        if num_matching == 1:
+            item_obj = list(match_dict.values())[0]
+        reconciled[raw_column_record] = (item_obj, num_matching,)
+    return reconciled
+
 def get_predicate_list_subject_is_super_objects(only_spatial_contains, only_variable_range=False):
     """Gets a list of predicates where the subject is super (parent) of objects"""
     if only_spatial_contains:
@@ -422,6 +528,55 @@ def get_immediate_child_field_objs_db(parent_field_obj):
     return all_children
 
 
+def make_df_reconcile_groups(df, row_index, col, col_uuid=None, col_other_id=None):
+    """Makes a dataframe of the distinct combinations of raw_column_record,
+    record_uuid, and record_other_id in some rows of a dataframe
+
+    :param DataFrame df: A dataframe that we are currently preparing for ETL.
+    :param Index row_index: The index labels of the rows in df to group
+    :param str col: The column of raw_column_records
+    :param str col_uuid: The column (if any) of record uuids
+    :param str col_other_id: The column (if any) of record other ids
+
+    returns a (groups_df, row_groups) tuple. The groups_df has one row for
+        each distinct combination, in order of first appearance, with
+        group_num, raw_column_record, record_uuid, and record_other_id
+        columns. The row_groups Series has the group_num of each row in
+        row_index.
+    """
+    keys_df = pd.DataFrame(index=row_index)
+    keys_df['raw_column_record'] = df.loc[row_index, col]
+    keys_df['record_uuid'] = None
+    keys_df['record_other_id'] = None
+    if col_uuid:
+        # Validate each distinct uuid value only once.
+        uuid_vals = df.loc[row_index, col_uuid]
+        valid_uuids = {val: is_valid_uuid(val) for val in uuid_vals.unique()}
+        keys_df['record_uuid'] = uuid_vals.map(valid_uuids)
+    if col_other_id:
+        other_ids = df.loc[row_index, col_other_id]
+        keys_df['record_other_id'] = other_ids.where(
+            other_ids.astype(bool) & other_ids.notnull(),
+            None
+        )
+    key_cols = ['raw_column_record', 'record_uuid', 'record_other_id']
+    # Empty and missing values get grouped together as None.
+    for key_col in key_cols[1:]:
+        keys_df[key_col] = keys_df[key_col].astype(object).where(
+            keys_df[key_col].notnull(),
+            None
+        )
+    row_groups = keys_df.groupby(
+        key_cols,
+        sort=False,
+        dropna=False,
+    ).ngroup()
+    keys_df['group_num'] = row_groups
+    groups_df = keys_df[~row_groups.duplicated()][['group_num'] + key_cols]
+    groups_df = groups_df.reset_index(drop=True)
+    return groups_df, row_groups
+
+
 def df_reconcile_id_field(
     df,
     ds_field,
@@ -429,6 +584,7 @@ def df_reconcile_id_field(
     col_record_tuples=None,
     do_recursive=True,
     filter_index=None,
+    row_index=None,
     ):
     """Reconciles a data_type = 'id' field, walking down a hierarchy if hierarchic.
 
@@ -447,18 +603,34 @@ def df_reconcile_id_field(
         fields.
     :param bool do_recursive: A flag to continue this function recursively by looking
         up child fields for continued entity reconciliation.
+    :param Series filter_index: A boolean series to select the rows of the
+        dataframe to reconcile.
+    :param Index row_index: The index labels of the rows of the dataframe to
+        reconcile. If given, this is used instead of the filter_index and the
+        col_record_tuples (we pass this down the hierarchy, so we don't have
+        to make new filters over the whole dataframe).
     """
     context = get_ds_field_context(ds_field, context)
     # Set up the filter index for the dataframe so as to
     if col_record_tuples is None:
         col_record_tuples = []
 
-    if filter_index is None:
-        filter_index = df['row_num'] >= 0
+    if row_index is None:
+        if filter_index is None:
+            filter_index = df['row_num'] >= 0
+        current_index = filter_index.copy()
+        for index_col, index_col_record in col_record_tuples:
+            current_index &= (df[index_col] == index_col_record)
+        row_index = df.index[current_index]
 
-    current_index = filter_index
-    for index_col, index_col_record in col_record_tuples:
-        current_index &= (df[index_col] == index_col_record)
+    col_context = f'{ds_field.field_num}_context'
+    col_item =  f'{ds_field.field_num}_item'
+    col = f'{ds_field.field_num}_col'
+
+    df.loc[row_index, col_context] = str(context.uuid)
+    if not len(row_index):
+        # No rows to reconcile.
+        return df
 
     # Check to see if the ds_field has a uuid field.
     col_uuid = None
@@ -480,13 +652,6 @@ def df_reconcile_id_field(
     if ds_anno_other_id:
         col_other_id = f'{ds_anno_other_id.object_field.field_num}_col'
 
-
-    col_context = f'{ds_field.field_num}_context'
-    col_item =  f'{ds_field.field_num}_item'
-    col = f'{ds_field.field_num}_col'
-
-    df.loc[current_index, col_context] = str(context.uuid)
-
     if do_recursive:
         # Get immediate child field objects.
         child_field_objs = get_immediate_child_field_objs_db(ds_field)
@@ -494,41 +659,57 @@ def df_reconcile_id_field(
         # An empty list, so don't try to get the next children down.
         child_field_objs = []
 
-    done_rec_uuid_tups = []
-    # Now iterate through all the record values within the column
-    # as subsetted by the current index.
     # NOTE: Because of the possibility that a raw_column_record maybe
-    # associated with a UUID, we need to iterate through all the rows
-    # so as to maintain the association between raw_column_record and
-    # UUID.
-    for _, row in  df[current_index].iterrows():
-        raw_column_record = row[col]
-        record_uuid = None
+    # associated with a UUID (or other ID), we reconcile each distinct
+    # combination of raw_column_record, record_uuid, and record_other_id
+    # once, then write the results back to all the rows in each group.
+    groups_df, row_groups = make_df_reconcile_groups(
+        df,
+        row_index,
+        col,
+        col_uuid=col_uuid,
+        col_other_id=col_other_id,
+    )
+    group_row_positions = row_groups.groupby(row_groups).indices
+
+    # Reconcile the (most common) records that lack uuids and other ids
+    # against existing manifest entities with a few bulk queries.
+    simple_records = groups_df[
+        groups_df['record_uuid'].isnull()
+        & groups_df['record_other_id'].isnull()
+    ]['raw_column_record'].tolist()
+    bulk_reconciled = bulk_reconcile_manifest_entities(
+        ds_field,
+        context,
+        simple_records,
+    )
+
+    group_item_uuids = {}
+    item_row_nums = {}
+    for group in groups_df.itertuples(index=False):
+        raw_column_record = group.raw_column_record
+        record_uuid = group.record_uuid if pd.notnull(group.record_uuid) else None
         record_other_id = None
-        if col_uuid:
-            record_uuid = is_valid_uuid(row[col_uuid])
-        if col_other_id and row[col_other_id]:
-            record_other_id = row[col_other_id]
-        act_index = current_index & (df[col] == raw_column_record)
-        if record_uuid:
-            act_index &= (df[col_uuid] == row[col_uuid])
-        if record_other_id:
-            act_index &= (df[col_other_id] == row[col_other_id])
-        act_rec_uuid_tup = (raw_column_record, record_uuid, record_other_id,)
-        if act_rec_uuid_tup in done_rec_uuid_tups:
-            # We've already done this combination of raw_column_record and
-            # record uuid, so continue to the next one.
-            continue
-        done_rec_uuid_tups.append(act_rec_uuid_tup)
+        if pd.notnull(group.record_other_id):
+            record_other_id = group.record_other_id
+        act_row_index = row_index[group_row_positions[group.group_num]]
         item_obj = None
-        if raw_column_record:
-            item_obj, made_new, num_matching = get_or_create_manifest_entity(
-                ds_field,
-                context,
-                raw_column_record,
-                record_uuid=record_uuid,
-                record_other_id=record_other_id,
-            )
+        if raw_column_record and pd.notnull(raw_column_record):
+            if (
+                not record_uuid
+                and not record_other_id
+                and raw_column_record in bulk_reconciled
+            ):
+                item_obj, num_matching = bulk_reconciled[raw_column_record]
+                made_new = False
+            else:
+                item_obj, made_new, num_matching = get_or_create_manifest_entity(
+                    ds_field,
+                    context,
+                    raw_column_record,
+                    record_uuid=record_uuid,
+                    record_other_id=record_other_id,
+                )
             if not item_obj:
                 logger.info(
                     f'Could not reconcile or create "{raw_column_record}" '
@@ -537,19 +718,15 @@ def df_reconcile_id_field(
                     f'{made_new} num_matching: {num_matching}'
                 )
         if item_obj:
-            df.loc[act_index, col_item] = str(item_obj.uuid)
-            for rows in etl_df.chunk_list(df[act_index]['row_num'].unique().tolist()):
-                # Update the context and the item fields form this ds_field.
-                # Storing these data will let us make assertions about the
-                # item_obj that we just created or reconciled.
-                DataSourceRecord.objects.filter(
-                    data_source=ds_field.data_source,
-                    field_num=ds_field.field_num,
-                    row_num__in=rows,
-                ).update(
-                    context=context,
-                    item=item_obj,
-                )
+            group_item_uuids[group.group_num] = str(item_obj.uuid)
+            item_row_nums.setdefault(item_obj.uuid, (item_obj, []))
+            item_row_nums[item_obj.uuid][1].extend(
+                df.loc[act_row_index, 'row_num'].unique().tolist()
+            )
+
+        if pd.isnull(raw_column_record):
+            # Missing values don't have child records to reconcile.
+            continue
 
         # Now iterate through all the child fields for this current ds_field.
         for child_field_obj in child_field_objs:
@@ -572,13 +749,34 @@ def df_reconcile_id_field(
                     # carry down to be the context for the next level down
                     # in the hierarchy of ds_fields.
                     next_context = context
-            # Now process the items down in this next child field. We add the
-            # col, raw_column_record to the filters so that the df is further filtered
-            # at next level down the hierarchy.
+            # Now process the items down in this next child field, limited
+            # to the rows of this group.
             df = df_reconcile_id_field(
                 df=df,
                 ds_field=child_field_obj,
                 context=next_context,
-                col_record_tuples=(col_record_tuples + [(col, raw_column_record,)])
+                col_record_tuples=(col_record_tuples + [(col, raw_column_record,)]),
+                row_index=act_row_index,
+            )
+
+    # Write the reconciled item uuids back to all the rows of each group.
+    row_item_uuids = row_groups.map(group_item_uuids).dropna()
+    if len(row_item_uuids):
+        df.loc[row_item_uuids.index, col_item] = row_item_uuids
+
+    for item_obj, row_nums in item_row_nums.values():
+        for rows in etl_df.chunk_list(row_nums):
+            # Update the context and the item fields form this ds_field.
+            # Storing these data will let us make assertions about the
+            # item_obj that we just created or reconciled.
+            DataSourceRecord.objects.filter(
+                data_source=ds_field.data_source,
+                field_num=ds_field.field_num,
+                row_num__in=rows,
+            ).update(
+                context=context,
+                item=item_obj,
             )
+    if item_row_nums:
+        etl_df.bump_data_source_records_version(ds_field.data_source)
     return df
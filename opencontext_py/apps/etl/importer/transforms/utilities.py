@@ -1,18 +1,40 @@
+import hashlib
 import logging
 
 import numpy as np
 import pandas as pd
 
+from django.db import transaction
 
+from opencontext_py.apps.all_items import configs
 from opencontext_py.apps.all_items.models import (
     AllAssertion,
 )
+from opencontext_py.libs import dbcopy
 
 
+logger = logging.getLogger("etl-importer-logger")
 
 
+# The attributes (in order) that AllAssertion().make_hash_id() uses
+# to make an assertion hash, with their default values.
+ASSERT_HASH_ATTRIBUTE_DEFAULTS = [
+    ('subject_id', None,),
+    ('observation_id', configs.DEFAULT_OBS_UUID,),
+    ('event_id', configs.DEFAULT_EVENT_UUID,),
+    ('attribute_group_id', configs.DEFAULT_ATTRIBUTE_GROUP_UUID,),
+    ('predicate_id', None,),
+    ('object_id', None,),
+    ('language_id', configs.DEFAULT_LANG_UUID,),
+    ('obj_string', None,),
+    ('obj_boolean', None,),
+    ('obj_integer', None,),
+    ('obj_double', None,),
+    ('obj_datetime', None,),
+]
 
-logger = logging.getLogger("etl-importer-logger")
+# The number of assertion uuids to delete in one query.
+ASSERT_DELETE_CHUNK_SIZE = 5000
 
 
 def bulk_create_assertions(assert_uuids, unsaved_assert_objs, print_errors=True):
@@ -62,4 +84,101 @@ def bulk_create_assertions(assert_uuids, unsaved_assert_objs, print_errors=True)
                 print(f'Single assertion failed: {error}')
         if ok:
             ok_saved_assert_objs.append(assert_obj)
-    return ok_saved_assert_objs
\ No newline at end of file
+    return ok_saved_assert_objs
+
+
+def make_df_assertion_uuids(assert_df):
+    """Makes deterministic assertion uuids for all the rows of a
+    dataframe, the same as AllAssertion().primary_key_create() would
+
+    :param DataFrame assert_df: A dataframe with columns named for
+        AllAssertion attributes (like 'subject_id', 'obj_string')
+
+    returns a series of uuid strings
+    """
+    hash_parts = []
+    for attrib, default in ASSERT_HASH_ATTRIBUTE_DEFAULTS:
+        if attrib not in assert_df.columns:
+            hash_parts.append(
+                pd.Series(str(default), index=assert_df.index, dtype=object)
+            )
+            continue
+        col = assert_df[attrib]
+        if attrib == 'obj_string':
+            col = col.map(lambda v: v.strip() if isinstance(v, str) else v)
+        hash_parts.append(
+            col.map(lambda v: 'None' if pd.isnull(v) else str(v))
+        )
+    concat_strings = hash_parts[0].str.cat(hash_parts[1:], sep=' ')
+    hash_ids = concat_strings.map(
+        lambda v: hashlib.sha1(v.encode('utf-8')).hexdigest()
+    )
+    # The first part of the uuid comes from the subject uuid, the rest
+    # comes from the first 32 characters of the hash.
+    uuid_prefixes = assert_df['subject_id'].astype(str).str.split('-').str[0]
+    return (
+        uuid_prefixes
+        + '-' + hash_ids.str[8:12]
+        + '-' + hash_ids.str[12:16]
+        + '-' + hash_ids.str[16:20]
+        + '-' + hash_ids.str[20:32]
+    )
+
+
+def make_assertion_objs_from_df(assert_df):
+    """Makes a list of unsaved AllAssertion objects from a dataframe"""
+    assert_df = assert_df.astype(object)
+    assert_df = assert_df.where(assert_df.notnull(), None)
+    unsaved_assert_objs = []
+    for assert_dict in assert_df.to_dict('records'):
+        assert_dict = {k:v for k, v in assert_dict.items() if v is not None}
+        unsaved_assert_objs.append(AllAssertion(**assert_dict))
+    return unsaved_assert_objs
+
+
+def copy_create_assertions(assert_df, print_errors=True):
+    """Saves assertions from a dataframe with a (fast) database COPY,
+    replacing existing assertions with the same uuids. If the COPY
+    fails, this falls back to bulk_create_assertions.
+
+    :param DataFrame assert_df: A dataframe with columns named for
+        AllAssertion attributes, including the 'uuid'
+
+    returns the number of saved assertions
+    """
+    if assert_df is None or assert_df.empty:
+        return 0
+    # Different raw values can make the same assertion (like '1' and
+    # '1.0' for an integer), so keep only the first of each.
+    assert_df = assert_df.drop_duplicates(subset=['uuid']).copy()
+    obj_strings = assert_df.get('obj_string')
+    if obj_strings is None:
+        assert_df['obj_string_hash'] = AllAssertion().make_obj_string_hash(None)
+    else:
+        # Do what AllAssertion.save() does to make obj_string_hash values.
+        assert_df['obj_string_hash'] = obj_strings.map(
+            lambda v: AllAssertion().make_obj_string_hash(v if isinstance(v, str) else None)
+        )
+    assert_uuids = assert_df['uuid'].tolist()
+    try:
+        with transaction.atomic():
+            for i in range(0, len(assert_uuids), ASSERT_DELETE_CHUNK_SIZE):
+                AllAssertion.objects.filter(
+                    uuid__in=assert_uuids[i:(i + ASSERT_DELETE_CHUNK_SIZE)]
+                ).delete()
+            return dbcopy.copy_df_to_model_table(AllAssertion, assert_df)
+    except Exception as e:
+        if hasattr(e, 'message'):
+            error = e.message
+        else:
+            error = str(e)
+        if print_errors:
+            print(f'COPY assertions failed: {error}')
+
+    unsaved_assert_objs = make_assertion_objs_from_df(assert_df)
+    ok_saved_assert_objs = bulk_create_assertions(
+        assert_uuids,
+        unsaved_assert_objs,
+        print_errors=print_errors,
+    )
+    return len(ok_saved_assert_objs)
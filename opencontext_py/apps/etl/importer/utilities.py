@@ -1,5 +1,8 @@
 import pytz
 
+import numpy as np
+import pandas as pd
+
 from dateutil.parser import parse
 
 from django.conf import settings
@@ -62,3 +65,65 @@ def validate_transform_data_type_value(raw_str_value, data_type, timezone=settin
         return date_obj
     else:
         return None
+
+
+def raw_str_to_float(raw_str_value):
+    """Converts a raw string to a float, or None if not valid"""
+    try:
+        return float(raw_str_value)
+    except:
+        return None
+
+
+def validate_transform_data_type_series(raw_series, data_type, timezone=settings.TIME_ZONE):
+    """Validates the raw values in a series of a data_type. This works
+    like validate_transform_data_type_value, but with vectorized
+    operations over the whole series.
+
+    NOTE: Unlike validate_transform_data_type_value, non-finite numbers
+    (like 'nan' or 'inf') are not valid xsd:integer or xsd:double values.
+
+    :param Series raw_series: A series of raw values
+    :param str data_type: The data type for the values
+
+    returns a series of valid values, with None for invalid values
+    """
+    str_series = raw_series.where(raw_series.notnull(), '').astype(str).str.strip()
+    not_blank = str_series != ''
+    if data_type == 'xsd:string':
+        vals = str_series
+    elif data_type == 'xsd:boolean':
+        vals = str_series.str.lower().map(STR_TO_BOOLEANS)
+    elif data_type in ['xsd:integer', 'xsd:double']:
+        num_strs = str_series[not_blank]
+        try:
+            # This uses the same (exact) parsing as Python's float().
+            nums = num_strs.astype(float)
+        except (TypeError, ValueError):
+            # Some values are not numbers, so convert one by one.
+            nums = num_strs.map(raw_str_to_float).astype(float)
+        nums = nums.reindex(str_series.index)
+        ok_nums = np.isfinite(nums)
+        if data_type == 'xsd:integer':
+            # Like int(float(x)), but limited to the range of a bigint.
+            ok_nums &= (nums.abs() < 2**63)
+            vals = pd.Series(None, index=str_series.index, dtype=object)
+            vals[ok_nums] = np.trunc(nums[ok_nums]).astype('int64').astype(object)
+        else:
+            vals = nums.astype(object)
+        vals = vals.where(ok_nums, None)
+    elif data_type == 'xsd:date':
+        # Dates are slow to parse, so parse each distinct value only once.
+        parsed_dates = {
+            raw_str_value: validate_transform_data_type_value(
+                raw_str_value,
+                data_type,
+                timezone=timezone,
+            )
+            for raw_str_value in str_series[not_blank].unique()
+        }
+        vals = str_series.map(parsed_dates)
+    else:
+        vals = pd.Series(None, index=str_series.index, dtype=object)
+    vals = vals.astype(object)
+    return vals.where(not_blank & vals.notnull(), None)
@@ -9,6 +9,7 @@ from opencontext_py.apps.all_items.models import (
 )
 
 from opencontext_py.apps.all_items.geospace import aggregate as geo_agg
+from opencontext_py.apps.all_items.representations import rep_cache
 from opencontext_py.apps.utilities import geospace_contains
 
 from opencontext_py.apps.etl.kobo import bulk_finds
@@ -148,6 +149,8 @@ def extract_transform_load_kobo_data():
     db_updates.sort_page_order()
     # Finally make sure that images actually link to something
     db_updates.add_trench_book_media_main_links()
+    # Don't serve stale cached representations of the project's items.
+    rep_cache.bump_project_rep_revisions([pc_configs.PROJECT_UUID])
 
 
 def db_update_only():
@@ -165,6 +168,8 @@ def db_update_only():
     db_updates.make_all_link_assertion()
     db_updates.fix_trench_book_main_links()
     db_updates.sort_page_order()
+    # Don't serve stale cached representations of the project's items.
+    rep_cache.bump_project_rep_revisions([pc_configs.PROJECT_UUID])
 
 
 def clean_duplicate_catalog_items():
@@ -27,6 +27,7 @@ from opencontext_py.apps.etl.importer import df as etl_df
 from opencontext_py.apps.etl.importer.transforms import finalize_all
 
 from opencontext_py.apps.all_items import configs
+from opencontext_py.libs.cacheutilities import clear_cache_namespace
 
 from opencontext_py.apps.all_items.editorial.api import get_man_obj_by_any_id
 
@@ -209,8 +210,7 @@ def load_subjects_parent_child_cols_df(
     df_g.reset_index(drop=True, inplace=True)
     print(f'Reconcile containment in {parent_child_col_tup}')
     # Clear the cache to make sure we get fresh lookups for items.
-    cache = caches['redis']
-    cache.clear()
+    clear_cache_namespace('redis')
     for _, row in df_g.iterrows():
         ok = load_subject_and_containment(
             source_id=source_id,
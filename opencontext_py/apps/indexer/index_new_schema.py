@@ -17,13 +17,19 @@ from opencontext_py.apps.all_items.models import AllAssertion, AllManifest
 from opencontext_py.apps.all_items.project_contexts.context import (
     clear_project_context_df_from_cache
 )
+from opencontext_py.apps.all_items.representations import item
 from opencontext_py.apps.all_items.representations import metadata as rep_metadata
+from opencontext_py.apps.all_items.representations.template_prep import (
+    prepare_for_item_dict_solr_and_html_template
+)
 
+from opencontext_py.libs.cacheutilities import clear_cache_namespace
 from opencontext_py.libs.solrclient import SolrClient
 from opencontext_py.apps.indexer.solrdocument_new_schema import SolrDocumentNS
 from opencontext_py.apps.indexer import index_site_pages as isp
 
 from opencontext_py.apps.searcher.new_solrsearcher import configs as solr_search_configs
+from opencontext_py.apps.searcher.new_solrsearcher import search_cache
 
 
 """
@@ -189,18 +195,21 @@ def clear_all_caches():
     cache_names = list(settings.CACHES.keys())
     for cache_name in cache_names:
         try:
-            cache = caches[cache_name]
-            cache.clear()
+            clear_cache_namespace(cache_name)
         except Exception as e:
             print(str(e))
 
 def clear_caches():
-    """Clears caches to make sure reidexing uses fresh data. """
+    """Clears caches to make sure reidexing uses fresh data.
+
+    NOTE: This leaves the 'redis_context' cache (with the expensive
+    project context dataframes) alone. Those get cleared project by
+    project with reset_project_context_and_metadata_cache.
+    """
     cache_names = ['redis_search', 'redis', 'default', 'memory']
     for cache_name in cache_names:
         try:
-            cache = caches[cache_name]
-            cache.clear()
+            clear_cache_namespace(cache_name)
         except Exception as e:
             print(str(e))
 
@@ -209,8 +218,7 @@ def clear_search_cache():
     cache_names = ['redis_search', ]
     for cache_name in cache_names:
         try:
-            cache = caches[cache_name]
-            cache.clear()
+            clear_cache_namespace(cache_name)
         except Exception as e:
             print(str(e))
 
@@ -225,8 +233,17 @@ def chunk_list(act_list, chunk_size):
 def make_solr_documents(uuids):
     """Makes a list of solr documents"""
     solr_docs = []
+    # Get the representation dicts for all of the uuids in
+    # a fixed number of queries.
+    rep_dicts = item.make_representation_dicts(uuids, for_solr=True)
     for uuid in uuids:
-        solrdoc = SolrDocumentNS(uuid)
+        man_obj, rep_dict = rep_dicts.get(str(uuid), (None, None,))
+        if man_obj and rep_dict:
+            rep_dict = prepare_for_item_dict_solr_and_html_template(
+                man_obj,
+                rep_dict
+            )
+        solrdoc = SolrDocumentNS(uuid, man_obj=man_obj, rep_dict=rep_dict)
         if solrdoc.flag_do_not_index:
             print(f'Flagged to NOT index: {solrdoc.man_obj.label} [{uuid}]')
             continue
@@ -264,17 +281,22 @@ def make_index_site_page_solr_documents(solr=None):
                     f'Problem committing {solr_doc.get("uuid")}'
                 )
     solr.commit()
+    search_cache.bump_search_generations()
     logger.info(f'Indexed committing site pages: {len(solr_docs)}')
     print(f'Indexed committing site pages: {len(solr_docs)}')
     summary = [(solr_doc.get('uuid'), solr_doc.get('slug_type_uri_label'),) for solr_doc in solr_docs]
     print(summary)
 
 
-def make_index_solr_documents(uuids, solr=None):
-    """Makes and indexes solr documents for a list of uuids"""
+def add_solr_documents(solr_docs, solr=None):
+    """Adds a list of solr documents to solr, without committing
+
+    returns a list of the uuids of solr documents that failed
+    to get added (an empty list if all went well)
+    """
     if not solr:
         solr = get_solr_connection()
-    solr_docs =  make_solr_documents(uuids)
+    failed_uuids = []
     try:
         solr.add(
             solr_docs,
@@ -290,13 +312,24 @@ def make_index_solr_documents(uuids, solr=None):
                     overwrite=True,
                 )
             except:
+                failed_uuids.append(solr_doc.get("uuid"))
                 logger.warn(
                     f'Problem committing {solr_doc.get("uuid")}'
                 )
                 print(
                     f'Problem committing {solr_doc.get("uuid")}'
                 )
+    return failed_uuids
+
+
+def make_index_solr_documents(uuids, solr=None):
+    """Makes and indexes solr documents for a list of uuids"""
+    if not solr:
+        solr = get_solr_connection()
+    solr_docs =  make_solr_documents(uuids)
+    add_solr_documents(solr_docs, solr=solr)
     solr.commit()
+    search_cache.bump_search_generations_for_uuids(uuids)
     logger.info(f'Indexed committing {str(uuids)}')
     print(f'Indexed committing {str(uuids)}')
 
@@ -608,14 +641,25 @@ def get_uuids_associated_with_vocab(
     return uuids
 
 
-def delete_solr_documents(uuids, solr=None):
-    """Deletes solr documents identified by a list of uuids"""
+def delete_solr_documents(uuids, solr=None, project_slugs=None):
+    """Deletes solr documents identified by a list of uuids
+
+    :param list uuids: List of uuids of items to delete from solr
+    :param list project_slugs: List of slugs of the projects (including
+        parent projects) of the items. Pass these if the items are
+        already deleted from the manifest, since then we can't look
+        up their projects.
+    """
     if not solr:
         solr = get_solr_connection()
     print(f'Delete {len(uuids)} solr documents from solr index.')
     for uuid in uuids:
         solr.delete(id=uuid)
     solr.commit()
+    if project_slugs:
+        search_cache.bump_search_generations(project_slugs)
+    else:
+        search_cache.bump_search_generations_for_uuids(uuids)
 
 
 def delete_flagged_no_index_from_solr(filter_args=None, solr=None):
@@ -636,3 +680,4 @@ def delete_flagged_no_index_from_solr(filter_args=None, solr=None):
         uuid = str(uuid)
         solr.delete(id=uuid)
     solr.commit()
+    search_cache.bump_global_search_generation()
@@ -0,0 +1,462 @@
+import datetime
+from datetime import timezone
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from time import sleep
+
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    wait,
+)
+
+from django import db
+from django.core.cache import caches
+
+from opencontext_py.apps.all_items.models import AllManifest
+from opencontext_py.apps.indexer import index_new_schema as new_ind
+from opencontext_py.apps.searcher.new_solrsearcher import search_cache
+from opencontext_py.libs.queue_utilities import make_hash_id_from_args
+
+
+"""
+# testing
+
+import importlib
+from opencontext_py.apps.all_items.models import AllManifest
+from opencontext_py.apps.indexer import index_parallel as par_ind
+importlib.reload(par_ind)
+
+m_qs = AllManifest.objects.filter(
+    item_type__in=['projects', 'subjects', 'media', 'documents'],
+).order_by('project_id', 'sort')
+uuids = [str(m.uuid) for m in m_qs]
+par_ind.make_indexed_solr_documents_in_parallel(uuids, workers=8)
+
+# If the process gets interrupted, run the same call again with the same
+# list of uuids. Chunks already committed to Solr will get skipped.
+par_ind.make_indexed_solr_documents_in_parallel(uuids, workers=8)
+
+"""
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_WORKERS = max(1, (multiprocessing.cpu_count() - 1))
+
+# Number of uuids that a worker process turns into solr documents
+# in a single task.
+DEFAULT_CHUNK_SIZE = 20
+
+# Number of solr documents the committer thread accumulates before
+# sending a solr.add request.
+DEFAULT_COMMIT_BATCH_SIZE = 500
+
+# The maximum number of chunks of solr documents waiting (either
+# in the worker pool or waiting on the committer) before we stop
+# handing out more work. This keeps memory bounded if Solr is slower
+# than the workers.
+DEFAULT_MAX_PENDING_CHUNKS_PER_WORKER = 4
+
+# How long do we remember progress on a list of uuids?
+PROGRESS_CACHE_LIFE = 60 * 60 * 24 * 30  # 30 days.
+
+# How many times do we attempt to send a batch to solr before giving up.
+SOLR_ADD_ATTEMPTS = 5
+SOLR_RETRY_SLEEP = 60
+
+# Marker put on the committer queue to signal the end of the work.
+_DONE = None
+
+
+def make_progress_cache_key(uuids, chunk_size):
+    """Makes a cache key for the indexing progress on a list of uuids"""
+    hash_id = make_hash_id_from_args(
+        [str(uuid) for uuid in uuids] + [chunk_size]
+    )
+    return f'index-parallel-progress-{hash_id}'
+
+
+def make_progress_batch_key(progress_key, batch_num):
+    """Makes a cache key for the chunk numbers of one committed batch"""
+    return f'{progress_key}-batch-{batch_num}'
+
+
+def get_progress_batch_keys(progress_key):
+    """Gets the cache keys for all the committed batches"""
+    cache = caches['redis']
+    try:
+        batch_count = cache.get(progress_key)
+    except:
+        batch_count = None
+    if not batch_count:
+        return []
+    return [
+        make_progress_batch_key(progress_key, batch_num)
+        for batch_num in range(1, (batch_count + 1))
+    ]
+
+
+def get_progress_done_chunks(progress_key):
+    """Gets the set of chunk numbers already committed to solr"""
+    cache = caches['redis']
+    done_chunks = set()
+    batch_keys = get_progress_batch_keys(progress_key)
+    if not batch_keys:
+        return done_chunks
+    try:
+        batches = cache.get_many(batch_keys)
+    except:
+        batches = {}
+    for batch_chunks in batches.values():
+        done_chunks.update(batch_chunks)
+    return done_chunks
+
+
+def add_progress_done_chunks(progress_key, batch_chunks):
+    """Records the chunk numbers of a batch just committed to solr
+
+    Each batch gets its own cache key, numbered by a counter kept
+    at the progress_key. That way recording a batch only writes
+    that batch's chunk numbers, not everything done so far.
+
+    :param str progress_key: The cache key for indexing progress
+    :param list batch_chunks: The chunk numbers committed in this batch
+    """
+    cache = caches['redis']
+    try:
+        # Only creates the counter if it does not already exist.
+        cache.add(progress_key, 0, timeout=PROGRESS_CACHE_LIFE)
+        batch_num = cache.incr(progress_key)
+        cache.set(
+            make_progress_batch_key(progress_key, batch_num),
+            list(batch_chunks),
+            timeout=PROGRESS_CACHE_LIFE,
+        )
+    except:
+        logger.info(f'Cache failure with: {progress_key}')
+
+
+def reset_progress(uuids, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Forgets indexing progress on a list of uuids"""
+    cache = caches['redis']
+    progress_key = make_progress_cache_key(uuids, chunk_size)
+    cache.delete_many(get_progress_batch_keys(progress_key) + [progress_key])
+
+
+def worker_init():
+    """Initializes a worker process so it gets its own DB connections
+
+    Forked worker processes inherit the parent's database connections.
+    Sharing a socket between processes corrupts the connection, so
+    we discard the inherited ones and let Django open fresh
+    connections in each worker.
+    """
+    for conn in db.connections.all():
+        # Don't close the connection, since that would also close
+        # the parent's socket. Just forget about it.
+        conn.connection = None
+
+
+def worker_ready():
+    """Returns the process id of a worker, once it has started"""
+    return os.getpid()
+
+
+def start_worker_processes(executor, workers):
+    """Makes the executor start all of its worker processes now
+
+    The worker processes get forked from this process, so we want
+    them all started before we start any threads (like the committer
+    thread). Forking a process with other running threads can copy
+    locks held by those threads, leaving the child deadlocked.
+
+    :param ProcessPoolExecutor executor: The worker process pool
+    :param int workers: Number of worker processes in the pool
+    """
+    futures = [executor.submit(worker_ready) for _ in range(workers)]
+    wait(futures)
+
+
+def worker_make_solr_docs(chunk_num, act_uuids):
+    """Makes solr documents for a chunk of uuids in a worker process
+
+    :param int chunk_num: The number of the chunk of uuids
+    :param list act_uuids: List of uuids for items to index
+
+    returns chunk_num, act_uuids, solr_docs (None if there was
+        an error), elapsed seconds
+    """
+    chunk_start = time.time()
+    try:
+        solr_docs = new_ind.make_solr_documents(act_uuids)
+    except Exception as e:
+        logger.error(f'Problem making solr docs for chunk {chunk_num}: {str(e)}')
+        print(f'Problem making solr docs for chunk {chunk_num}: {str(e)}')
+        solr_docs = None
+    return chunk_num, act_uuids, solr_docs, (time.time() - chunk_start)
+
+
+class SolrCommitter(threading.Thread):
+    '''
+    A thread that takes chunks of solr documents made by worker
+    processes off of a bounded queue and sends them to Solr in
+    batches.
+    '''
+
+    def __init__(
+        self,
+        solr,
+        work_queue,
+        progress_key,
+        total_count,
+        commit_batch_size=DEFAULT_COMMIT_BATCH_SIZE,
+        update_index_time=True,
+    ):
+        super().__init__(daemon=True)
+        self.solr = solr
+        self.work_queue = work_queue
+        self.progress_key = progress_key
+        self.total_count = total_count
+        self.commit_batch_size = commit_batch_size
+        self.update_index_time = update_index_time
+        self.batch_docs = []
+        self.batch_uuids = []
+        self.batch_chunks = []
+        self.total_indexed = 0
+        self.all_start = time.time()
+        self.error = None
+
+    def _add_batch_to_solr(self):
+        """Sends the current batch of solr documents to solr"""
+        if not self.batch_chunks:
+            return None
+        batch_start = time.time()
+        done = False
+        attempt = 0
+        while not done and attempt < SOLR_ADD_ATTEMPTS:
+            attempt += 1
+            try:
+                failed_uuids = new_ind.add_solr_documents(
+                    self.batch_docs,
+                    solr=self.solr
+                )
+                if failed_uuids:
+                    # Don't commit and record a batch as done if
+                    # some of its documents did not get added.
+                    raise ValueError(
+                        f'Failed to add {len(failed_uuids)} solr documents'
+                    )
+                self.solr.commit()
+                done = True
+                search_cache.bump_search_generations_for_uuids(self.batch_uuids)
+            except:
+                print(f'Problem with solr on attempt {attempt}, wait a minute and try again.')
+                done = False
+                sleep(SOLR_RETRY_SLEEP)
+        if not done:
+            raise RuntimeError(
+                f'Failed to add solr documents after {SOLR_ADD_ATTEMPTS} attempts'
+            )
+        if self.update_index_time:
+            now = datetime.datetime.now(timezone.utc)
+            _ = AllManifest.objects.filter(
+                uuid__in=self.batch_uuids,
+            ).update(
+                indexed=now,
+            )
+        add_progress_done_chunks(self.progress_key, self.batch_chunks)
+        act_count = len(self.batch_uuids)
+        self.total_indexed += act_count
+        batch_rate = new_ind.get_crawl_rate_in_seconds(act_count, batch_start)
+        full_rate = new_ind.get_crawl_rate_in_seconds(
+            self.total_indexed,
+            self.all_start
+        )
+        print(
+            f'Solr commit rate: {batch_rate} items/second. '
+            f'Overall rate: {full_rate} items/second. '
+            f'{self.total_indexed} of {self.total_count} done.'
+        )
+        self.batch_docs = []
+        self.batch_uuids = []
+        self.batch_chunks = []
+
+    def run(self):
+        try:
+            while True:
+                work = self.work_queue.get()
+                if work is _DONE:
+                    self._add_batch_to_solr()
+                    break
+                chunk_num, act_uuids, solr_docs = work
+                self.batch_docs += solr_docs
+                self.batch_uuids += act_uuids
+                self.batch_chunks.append(chunk_num)
+                if len(self.batch_docs) >= self.commit_batch_size:
+                    self._add_batch_to_solr()
+        except Exception as e:
+            logger.error(f'Solr committer failed: {str(e)}')
+            self.error = e
+        finally:
+            # Don't hold on to a DB connection in this thread.
+            db.connection.close()
+
+
+def put_work_on_queue(work_queue, committer, work):
+    """Puts work on the committer queue, waiting while the queue is full
+
+    :param queue.Queue work_queue: The bounded queue read by the committer
+    :param SolrCommitter committer: The committer thread
+    :param tuple work: A tuple of the chunk number, uuids and solr documents
+    """
+    while not committer.error and committer.is_alive():
+        try:
+            work_queue.put(work, timeout=5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def make_indexed_solr_documents_in_parallel(
+    uuids,
+    solr=None,
+    workers=DEFAULT_WORKERS,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    commit_batch_size=DEFAULT_COMMIT_BATCH_SIZE,
+    max_pending_chunks=None,
+    start_clear_all_caches=False,
+    start_clear_caches=True,
+    update_index_time=True,
+    resume=True,
+):
+    """Makes and indexes solr documents using a pool of worker processes
+
+    Worker processes make solr documents for chunks of uuids, while
+    a committer thread in this process batches the resulting
+    documents and adds them to solr.
+
+    :param list uuids: List of uuids for items to index
+    :param pysolr.Solr solr: A solr connection for the committer
+    :param int workers: Number of worker processes making solr documents
+    :param int chunk_size: Number of uuids per worker task
+    :param int commit_batch_size: Number of solr documents to accumulate
+        before adding them to solr
+    :param int max_pending_chunks: Maximum number of chunks either being
+        processed or waiting to be committed. Defaults to a multiple of
+        the number of workers.
+    :param bool resume: Skip chunks already committed by a previous
+        (interrupted) run over the same list of uuids
+    """
+    if not solr:
+        solr = new_ind.get_solr_connection()
+    if not max_pending_chunks:
+        max_pending_chunks = workers * DEFAULT_MAX_PENDING_CHUNKS_PER_WORKER
+    uuids = [str(uuid) for uuid in uuids]
+    total_count = len(uuids)
+    logger.info(f'Index {total_count} total items with {workers} workers.')
+    print(f'Index {total_count} total items with {workers} workers.')
+
+    if start_clear_all_caches:
+        print('Clearing ALL caches for fresh indexing')
+        new_ind.clear_all_caches()
+    elif start_clear_caches:
+        print('Clearing caches for fresh indexing')
+        new_ind.clear_caches()
+    else:
+        print('No caches cleared')
+
+    progress_key = make_progress_cache_key(uuids, chunk_size)
+    done_chunks = set()
+    if resume:
+        done_chunks = get_progress_done_chunks(progress_key)
+    if done_chunks:
+        print(f'Resuming, skipping {len(done_chunks)} already indexed chunks')
+
+    chunks = [
+        (chunk_num, act_uuids)
+        for chunk_num, act_uuids in enumerate(new_ind.chunk_list(uuids, chunk_size))
+        if chunk_num not in done_chunks
+    ]
+    todo_count = sum([len(act_uuids) for _, act_uuids in chunks])
+
+    # The committer queue is bounded, so if solr falls behind, we stop
+    # collecting results (and stop handing out new work) until it
+    # catches up.
+    work_queue = queue.Queue(maxsize=max_pending_chunks)
+    committer = SolrCommitter(
+        solr=solr,
+        work_queue=work_queue,
+        progress_key=progress_key,
+        total_count=todo_count,
+        commit_batch_size=commit_batch_size,
+        update_index_time=update_index_time,
+    )
+
+    cleared_project_ids = []
+    all_start = time.time()
+    # Close our DB connections before forking so the workers don't
+    # inherit an open socket.
+    db.connections.close_all()
+    mp_context = multiprocessing.get_context('fork')
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=mp_context,
+        initializer=worker_init,
+    ) as executor:
+        # Fork all the workers before the committer thread is running.
+        start_worker_processes(executor, workers)
+        committer.start()
+        pending = set()
+        chunk_iter = iter(chunks)
+        more_chunks = True
+        while (more_chunks or pending) and not committer.error:
+            while more_chunks and len(pending) < max_pending_chunks:
+                next_chunk = next(chunk_iter, None)
+                if next_chunk is None:
+                    more_chunks = False
+                    break
+                chunk_num, act_uuids = next_chunk
+                if start_clear_caches:
+                    # Make sure we have cleared the project contexts
+                    # for only those projects relevant to the items
+                    # we are reindexing.
+                    cleared_project_ids = new_ind.clear_new_project_context(
+                        act_uuids,
+                        cleared_project_ids
+                    )
+                pending.add(
+                    executor.submit(worker_make_solr_docs, chunk_num, act_uuids)
+                )
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk_num, act_uuids, solr_docs, elapsed = future.result()
+                if solr_docs is None:
+                    # Leave this chunk out of the progress record, so
+                    # it gets attempted again on resume.
+                    continue
+                chunk_rate = str(round(len(act_uuids) / max(elapsed, 0.001), 3))
+                print(
+                    f'Chunk {chunk_num} worker rate: {chunk_rate} items/second.'
+                )
+                # Blocks if the committer is behind (backpressure).
+                put_work_on_queue(
+                    work_queue,
+                    committer,
+                    (chunk_num, act_uuids, solr_docs,)
+                )
+
+    put_work_on_queue(work_queue, committer, _DONE)
+    committer.join()
+    if committer.error:
+        raise committer.error
+    full_rate = new_ind.get_crawl_rate_in_seconds(todo_count, all_start)
+    print(f'ALL {todo_count} items indexed at rate: {full_rate} items/second')
+    return committer.total_indexed
@@ -5,6 +5,7 @@ from django.core.cache import caches
 from django.db.models import Q
 from django.db.models.functions import Length
 
+from opencontext_py.libs.cacheutilities import clear_cache_namespace
 from opencontext_py.libs.utilities import chronotiles
 from opencontext_py.libs.globalmaptiles import GlobalMercator
 
@@ -176,8 +177,7 @@ def clear_caches():
     """Clears caches in case we're making DB updates on
        manifest objects used as predicates.
     """
-    cache = caches['redis']
-    cache.clear()
+    clear_cache_namespace('redis')
     cache = caches['default']
     cache.clear()
     cache = caches['memory']
@@ -1,6 +1,6 @@
-import copy
 import datetime
 import html
+import io
 import json
 import time
 
@@ -22,6 +22,10 @@ from opencontext_py.apps.all_items.editorial.api import get_man_obj_by_any_id
 
 from opencontext_py.apps.searcher.new_solrsearcher import main_search
 from opencontext_py.apps.searcher.new_solrsearcher import db_entities
+from opencontext_py.apps.searcher.new_solrsearcher import search_export
+from opencontext_py.apps.searcher.new_solrsearcher import utilities as search_utilities
+from opencontext_py.apps.searcher.new_solrsearcher.result_records import make_url_from_partial_url
+from opencontext_py.apps.searcher.new_solrsearcher.searchsolr import SearchSolr
 
 
 class SolrOAIpmh():
@@ -185,6 +189,19 @@ class SolrOAIpmh():
         'GetRecord',
     ]
 
+    # NOTE: We query Solr directly for the records in OAI-PMH lists,
+    # skipping the faceted search (ResultMaker) pipeline, and only
+    # get these stored fields. Resumption tokens carry a Solr
+    # cursorMark. Lists of records get streamed to the client, making
+    # representations in batches of OAI_RECORD_BATCH_SIZE.
+    OAI_SOLR_FIELDS = [
+        'uuid',
+        'slug_type_uri_label',
+        'item_type',
+        'published',
+    ]
+    OAI_RECORD_BATCH_SIZE = 20
+
 
     def __init__(self, id_href=True):
         rp = RootPath()
@@ -210,6 +227,9 @@ class SolrOAIpmh():
         self.from_date_solr = None
         self.until_date_solr = None
         self.earliest_date_cache_key = 'oai-pmh-earliest-date'
+        self.stream_list_tag = None  # ListRecords or ListIdentifiers to stream
+        self.stream_items = None  # Items to stream in the list
+        self.stream_token_xml = None  # Resumption token XML to end the list
 
 
     def check_request_param(self, param, request):
@@ -428,14 +448,42 @@ class SolrOAIpmh():
         api_json_obj,
     ):
         """ makes the XML for a resumption token """
+        token_xml = self.make_resumption_token_element(
+            resumption_token_dict,
+            api_json_obj,
+        )
+        if token_xml is None:
+            return None
+        parent_node_xml.append(token_xml)
+
+
+    def make_resumption_token_element(
+        self,
+        resumption_token_dict,
+        api_json_obj,
+    ):
+        """ makes a (detached) XML element for a resumption token """
         if not api_json_obj or not isinstance(api_json_obj, dict):
             return None
         now_dt = datetime.datetime.now()
         expiration_dt = now_dt + datetime.timedelta(days=1)
         expiration_date = expiration_dt.strftime('%Y-%m-%dT%H:%M:%SZ')
-        start_index = api_json_obj.get('startIndex', 0)
+        start_index = api_json_obj.get('cursor', api_json_obj.get('startIndex', 0))
         complete_list_size = api_json_obj.get('totalResults', 0)
-        
+        items_count = len(api_json_obj.get('oc-api:has-results', []))
+        if (start_index + items_count) >= complete_list_size:
+            # This is the last part of the list.
+            if not isinstance(resumption_token_dict, dict):
+                # The complete list is in this response, so we
+                # don't need a resumption token.
+                return None
+            # The last part of a list gets an empty resumption token.
+            return etree.Element(
+                'resumptionToken',
+                completeListSize=str(complete_list_size),
+                cursor=str(start_index),
+            )
+
         if isinstance(resumption_token_dict, dict):
             new_resumption_dict = self.make_update_resumption_object(
                 api_json_obj,
@@ -453,14 +501,14 @@ class SolrOAIpmh():
             new_resumption_dict,
             ensure_ascii=False,
         )
-        resumption_token = etree.SubElement(
-            parent_node_xml,
+        resumption_token = etree.Element(
             'resumptionToken',
             expirationDate=str(expiration_date),
             completeListSize=str(complete_list_size),
             cursor=str(start_index),
         )
         resumption_token.text = new_resumption_token_text
+        return resumption_token
 
 
     def check_resumption_token(self, request):
@@ -1052,9 +1100,10 @@ class SolrOAIpmh():
         self.make_datacite_metadata_xml(payload_xml, json_ld)
 
 
-    def make_record_metadata_xml(self, parent_node, item):
+    def make_record_metadata_xml(self, parent_node, item, json_ld=None):
         """ makes metadata about a record """
-        json_ld = self.get_item_json_ld(item)
+        if json_ld is None:
+            json_ld = self.get_item_json_ld(item)
         if not json_ld:
             return None
         metadata_xml = etree.SubElement(parent_node, 'metadata')
@@ -1127,17 +1176,13 @@ class SolrOAIpmh():
         if not uris:
             self.errors.append('noRecordsMatch')
             return None
-        # Make the list of records in XML         
-        list_recs_xml = etree.SubElement(self.root, 'ListRecords')
-        for item in uris:
-            # make an item header XML
-            rec_xml = etree.SubElement(list_recs_xml, 'record')
-            self.make_item_identifier_xml(rec_xml, item)
-            self.make_record_metadata_xml(rec_xml, item)
-        # now add the new sumption token
-        self.make_resumption_token_xml(
+        # The list of records gets streamed in XML, see
+        # iter_xml_bytes()
+        self.stream_list_tag = 'ListRecords'
+        self.stream_items = uris
+        # now make the new resumption token
+        self.stream_token_xml = self.make_resumption_token_element(
             self.resumption_token_dict,
-            list_recs_xml,
             metadata_uris,
         )
         return True
@@ -1179,19 +1224,73 @@ class SolrOAIpmh():
         if not items:
             self.errors.append('noRecordsMatch')
             return None
-        list_ids_xml = etree.SubElement(self.root, 'ListIdentifiers')
-        for item in items:
-            # make an item header XML
-            self.make_item_identifier_xml(list_ids_xml, item)
-        # now add the new resumption token
-        self.make_resumption_token_xml(
+        # The list of identifiers gets streamed in XML, see
+        # iter_xml_bytes()
+        self.stream_list_tag = 'ListIdentifiers'
+        self.stream_items = items
+        # now make the new resumption token
+        self.stream_token_xml = self.make_resumption_token_element(
             self.resumption_token_dict,
-            list_ids_xml,
             metadata_uris,
         )
         return True
 
 
+    def iter_stream_item_xml(self):
+        """ yields lists of (detached) XML elements for the
+            items of a streamed list, in batches of
+            OAI_RECORD_BATCH_SIZE items
+        """
+        items = self.stream_items or []
+        for i in range(0, len(items), self.OAI_RECORD_BATCH_SIZE):
+            batch_items = items[i:(i + self.OAI_RECORD_BATCH_SIZE)]
+            if self.stream_list_tag == 'ListIdentifiers':
+                parent_node = etree.Element('ListIdentifiers')
+                for act_item in batch_items:
+                    self.make_item_identifier_xml(parent_node, act_item)
+                yield list(parent_node)
+                continue
+            # Make the representations of the batch of items in
+            # a fixed number of queries.
+            rep_dicts = item.make_representation_dicts(
+                [act_item['uuid'] for act_item in batch_items if act_item.get('uuid')]
+            )
+            batch_xml = []
+            for act_item in batch_items:
+                rec_xml = etree.Element('record')
+                self.make_item_identifier_xml(rec_xml, act_item)
+                _, json_ld = rep_dicts.get(str(act_item.get('uuid')), (None, None,))
+                self.make_record_metadata_xml(rec_xml, act_item, json_ld=json_ld)
+                batch_xml.append(rec_xml)
+            yield batch_xml
+
+
+    def iter_xml_bytes(self):
+        """ yields bytes of the XML document, writing a streamed
+            list of items one batch at a time
+        """
+        if not self.stream_list_tag:
+            yield self.output_xml_string()
+            return None
+        buffer = io.BytesIO()
+        with etree.xmlfile(buffer, encoding='utf-8') as xf:
+            xf.write_declaration()
+            with xf.element(self.root.tag, attrib=dict(self.root.attrib), nsmap=self.root.nsmap):
+                for child_xml in self.root:
+                    xf.write(child_xml)
+                with xf.element(self.stream_list_tag):
+                    for batch_xml in self.iter_stream_item_xml():
+                        for item_xml in batch_xml:
+                            xf.write(item_xml)
+                        xf.flush()
+                        yield buffer.getvalue()
+                        buffer.seek(0)
+                        buffer.truncate(0)
+                    if self.stream_token_xml is not None:
+                        xf.write(self.stream_token_xml)
+        yield buffer.getvalue()
+
+
     def make_update_resumption_object(
         self,
         api_json_obj=None,
@@ -1221,6 +1320,12 @@ class SolrOAIpmh():
                 # we have a next cursor mark.
                 resumption_token_dict['rows'] = api_json_obj['itemsPerPage']
                 resumption_token_dict['cursorMark'] = api_json_obj['nextCursorMark']
+            if 'cursor' in api_json_obj:
+                # the number of items delivered before the next page
+                resumption_token_dict['cursor'] = (
+                    api_json_obj['cursor']
+                    + len(api_json_obj.get('oc-api:has-results', []))
+                )
             if 'itemsPerPage' in api_json_obj and \
                'startIndex' in api_json_obj:
                 # make the 'start' key at the next page
@@ -1272,6 +1377,84 @@ class SolrOAIpmh():
         return output
 
 
+    def make_solr_request_dict(self, resumption_token_dict):
+        """ makes a search request dict (without any
+            faceting params) to get items for OAI-PMH
+        """
+        request_dict = {
+            'sort': resumption_token_dict.get('sort', self.default_sort),
+        }
+        if resumption_token_dict.get('published'):
+            request_dict['published'] = resumption_token_dict['published']
+        request_dict = self.add_set_params_to_solr_request(request_dict)
+        if self.identifier:
+            request_dict['id'] = str(self.identifier)
+        return request_dict
+
+
+    def get_token_int(self, resumption_token_dict, key, default):
+        """ gets a non-negative integer value from a resumption token """
+        try:
+            value = int(resumption_token_dict.get(key, default))
+        except:
+            value = default
+        if value < 0:
+            value = default
+        return value
+
+
+    def get_solr_oai_items(self, resumption_token_dict):
+        """ gets a page of items from Solr, for OAI-PMH,
+            with a cursorMark and only the fields we need
+        """
+        rows = self.get_token_int(resumption_token_dict, 'rows', self.rows)
+        if rows < 1 or rows > self.rows:
+            rows = self.rows
+        request_dict = self.make_solr_request_dict(resumption_token_dict)
+        search_solr = SearchSolr()
+        query = search_export.make_export_query(
+            search_solr,
+            request_dict,
+            rows=rows,
+        )
+        query['cursorMark'] = resumption_token_dict.get('cursorMark', '*')
+        query['fl'] = ','.join(self.OAI_SOLR_FIELDS)
+        search_solr.solr_connect()
+        solr_json = search_solr.solr.search(**query).raw_response
+        if not solr_json or not solr_json.get('response'):
+            return None
+        items = []
+        for doc in solr_json['response'].get('docs', []):
+            item_dict = search_utilities.parse_solr_encoded_entity_str(
+                doc.get('slug_type_uri_label', '')
+            )
+            if not item_dict:
+                continue
+            items.append(
+                {
+                    'uuid': doc.get('uuid'),
+                    'uri': make_url_from_partial_url(
+                        item_dict.get('uri', ''),
+                        base_url=settings.CANONICAL_HOST,
+                    ),
+                    'published': doc.get('published', ''),
+                }
+            )
+        return {
+            'oc-api:has-results': items,
+            'totalResults': solr_json['response'].get('numFound', 0),
+            'itemsPerPage': rows,
+            'cursor': self.get_token_int(resumption_token_dict, 'cursor', 0),
+            'nextCursorMark': solr_json.get('nextCursorMark'),
+            # So the next resumption tokens don't get items
+            # published after this first request.
+            'oai-pmh:earliestDatestamp': None,
+            'dcmi:created': datetime.datetime.utcnow().strftime(
+                '%Y-%m-%dT%H:%M:%SZ'
+            ),
+        }
+
+
     def get_metadata_uris(self):
         """ gets metadata and uris
         """
@@ -1285,17 +1468,9 @@ class SolrOAIpmh():
                 None,
                 {}
             )
-        
-        request_dict = copy.deepcopy(resumption_token_dict)
-        request_dict['oai-pmh'] = 1  # So we don't ask for facet counts, which is expensive
-        request_dict['response'] = 'metadata,uri-meta'
-        request_dict['attributes'] = 'dc-terms-creator,dc-terms-contributor'
-        request_dict = self.add_set_params_to_solr_request(request_dict)
-        if self.identifier:
-            request_dict['id'] = str(self.identifier)
         solr_json = None
         try:
-            solr_json = main_search.process_solr_query(request_dict=request_dict)
+            solr_json = self.get_solr_oai_items(resumption_token_dict)
         except:
             solr_json = None
         if not solr_json:
@@ -1349,6 +1524,8 @@ class SolrOAIpmh():
 
     def output_xml_string(self):
         """ outputs the string of the XML """
+        if self.stream_list_tag:
+            return b''.join(self.iter_xml_bytes())
         output = etree.tostring(
             self.root,
             xml_declaration=True,
@@ -1,5 +1,5 @@
 
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from opencontext_py.libs.requestnegotiation import RequestNegotiation
 from opencontext_py.apps.oai.solr_oai_pmh import SolrOAIpmh
 from django.views.decorators.csrf import csrf_exempt
@@ -18,6 +18,14 @@ def index(request):
     if req_neg.supported:
         # requester wanted a mimetype we DO support
         xml_ok = oai_obj.process_request(request)
+        if xml_ok and oai_obj.stream_list_tag:
+            # stream long lists of records (and identifiers) to the
+            # client, making the XML one batch of records at a time
+            return StreamingHttpResponse(
+                oai_obj.iter_xml_bytes(),
+                content_type=req_neg.use_response_type + "; charset=utf8",
+                status=oai_obj.http_resp_code,
+            )
         if xml_ok: 
             return HttpResponse(
                 oai_obj.output_xml_string(),
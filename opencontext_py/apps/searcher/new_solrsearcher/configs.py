@@ -11,6 +11,13 @@ from opencontext_py.apps.indexer import solrdocument_new_schema as SolrDoc
 # connect to the default solr server.
 USE_TEST_SOLR_CONNECTION = True
 
+# If this is True, range facets on numeric and date attributes use
+# cached min/max stats over the whole index when stats for the specific
+# search filters are not yet cached. This means attribute searches need
+# only one solr round trip, at the cost of range buckets that are
+# sometimes wider than the filtered data.
+STATS_PREQUERY_USE_FIELD_WIDE_STATS = False
+
 REQUEST_CONTEXT_HIERARCHY_DELIM = '/'
 REQUEST_PROP_HIERARCHY_DELIM = SolrDoc.SOLR_VALUE_DELIM.replace('_', '-')
 REQUEST_OR_OPERATOR = '||'
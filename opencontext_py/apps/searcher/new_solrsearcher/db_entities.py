@@ -14,6 +14,12 @@ from opencontext_py.apps.all_items.models import (
 )
 from opencontext_py.apps.all_items.editorial import api as editorial_api
 from opencontext_py.apps.all_items import hierarchy
+from opencontext_py.libs.cacheutilities import (
+    cache_get,
+    cache_get_many,
+    cache_set,
+    cache_set_many,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -123,9 +129,8 @@ def get_cache_manifest_item_by_path(
             filter_args=filter_args
         )
 
-    cache = caches['redis_search']
     cache_key = make_path_manifest_item_cache_key(path, filter_args)
-    man_obj = cache.get(cache_key)
+    man_obj = cache_get('redis_search', cache_key)
     if man_obj:
         return man_obj
 
@@ -136,10 +141,7 @@ def get_cache_manifest_item_by_path(
     )
     if not man_obj:
         return None
-    try:
-        cache.set(cache_key, man_obj)
-    except:
-        pass
+    cache_set('redis_search', cache_key, man_obj)
     return man_obj
 
 
@@ -160,12 +162,16 @@ def get_cache_manifest_items_by_path(
             filter_args=filter_args
         )
 
-    cache = caches['redis_search']
+    # Get all the cached paths in one round trip.
+    path_cache_keys = {
+        path: make_path_manifest_item_cache_key(path, filter_args)
+        for path in paths_list
+    }
+    cache_dict = cache_get_many('redis_search', list(path_cache_keys.values()))
     output = []
     db_query_paths = []
-    for path in paths_list:
-        cache_key = make_path_manifest_item_cache_key(path, filter_args)
-        man_obj = cache.get(cache_key)
+    for path, cache_key in path_cache_keys.items():
+        man_obj = cache_dict.get(cache_key)
         if man_obj:
             # We found the manifest object in the cache
             output.append(man_obj)
@@ -177,6 +183,7 @@ def get_cache_manifest_items_by_path(
         return output
 
     # We didn't find some paths in the cache, so do a DB query.
+    new_cache_dict = {}
     for man_obj in db_get_manifest_items_by_path(
         db_query_paths,
         filter_args=filter_args
@@ -186,19 +193,16 @@ def get_cache_manifest_items_by_path(
             man_obj.path,
             filter_args
         )
-        try:
-            cache.set(cache_key, man_obj)
-        except:
-            pass
+        new_cache_dict[cache_key] = man_obj
+    cache_set_many('redis_search', new_cache_dict)
     return output
 
 
 def get_cache_item_key_dict():
     """Gets a list of item_keys that are actually in use."""
     # This should limit expensive queries on a field that is rarely used.
-    cache = caches['redis_search']
     cache_key = 'manifest_item_keys_dict'
-    item_key_dict = cache.get(cache_key)
+    item_key_dict = cache_get('redis_search', cache_key)
     if item_key_dict:
         # Item is already in the cache, so return it
         return item_key_dict
@@ -206,10 +210,7 @@ def get_cache_item_key_dict():
         item_key__isnull=False,
     ).order_by()
     item_key_dict = {m.item_key:m for m in m_qs} 
-    try:
-        cache.set(cache_key, item_key_dict)
-    except:
-        pass
+    cache_set('redis_search', cache_key, item_key_dict)
     return item_key_dict
 
 
@@ -218,9 +219,8 @@ def get_cache_man_obj_by_any_id(identifier, use_cache=True):
     if not use_cache:
         return editorial_api.get_man_obj_by_any_id(identifier)
 
-    cache = caches['redis_search']
     cache_key = make_id_manifest_item_cache_key(identifier)
-    man_obj = cache.get(cache_key)
+    man_obj = cache_get('redis_search', cache_key)
     if man_obj:
         # Found it in the cache, the fastest, happiest scenario
         return man_obj
@@ -233,13 +233,42 @@ def get_cache_man_obj_by_any_id(identifier, use_cache=True):
     )
     if not man_obj:
         return None
-    try:
-        cache.set(cache_key, man_obj)
-    except:
-        pass
+    cache_set('redis_search', cache_key, man_obj)
     return man_obj
 
 
+def get_cache_man_objs_by_any_ids(identifiers, use_cache=True):
+    """Gets and caches manifest objects for a list of identifiers,
+    getting the already cached objects in one round trip
+
+    :param list identifiers: A list of identifiers (uuids, uris,
+        slugs, etc.)
+
+    :return dict of AllManifest objects keyed by identifier. Identifiers
+        that can't be found are missing from the output dict.
+    """
+    if not use_cache:
+        cache_dict = {}
+    else:
+        cache_dict = cache_get_many(
+            'redis_search',
+            [make_id_manifest_item_cache_key(i) for i in identifiers]
+        )
+    output = {}
+    for identifier in identifiers:
+        man_obj = cache_dict.get(make_id_manifest_item_cache_key(identifier))
+        if not man_obj:
+            # Still need to look this up in the database.
+            man_obj = get_cache_man_obj_by_any_id(
+                identifier,
+                use_cache=use_cache,
+            )
+        if not man_obj:
+            continue
+        output[identifier] = man_obj
+    return output
+
+
 def get_man_obj_parent(man_obj):
     """Gets the parent manifest item for the input manifest item
 
@@ -273,9 +302,8 @@ def get_man_obj_children_list(man_obj, use_cache=True):
             output_child_objs=True
         )
 
-    cache = caches['redis_search']
     cache_key = make_slug_manifest_children_cache_key(man_obj.slug)
-    children_objs = cache.get(cache_key)
+    children_objs = cache_get('redis_search', cache_key)
     if children_objs is not None:
         # Found it in the cache, the fastest, happiest scenario
         return children_objs
@@ -288,10 +316,7 @@ def get_man_obj_children_list(man_obj, use_cache=True):
     )
     if children_objs is None:
         return None
-    try:
-        cache.set(cache_key, children_objs)
-    except:
-        pass
+    cache_set('redis_search', cache_key, children_objs)
     return children_objs
 
 
@@ -609,8 +634,7 @@ def get_desc_and_banner_url_by_slug(proj_desc_banner_qs, slug, use_cache=True):
         path_item_str = f'projects-hero-for-slug: {slug}'
         hash_obj.update(path_item_str.encode('utf-8'))
         cache_key = f'{settings.CACHE_PREFIX_PROJ_META}hs_{str(hash_obj.hexdigest())}'
-        cache = caches['redis_search']
-        cached_tuple = cache.get(cache_key)
+        cached_tuple = cache_get('redis_search', cache_key)
     if cached_tuple:
         # return description, banner_url
         return cached_tuple[0], cached_tuple[1]
@@ -631,10 +655,7 @@ def get_desc_and_banner_url_by_slug(proj_desc_banner_qs, slug, use_cache=True):
             break
     if not use_cache:
         return description, banner_url
-    try:
-        cache.set(cache_key, (description, banner_url))
-    except:
-        pass
+    cache_set('redis_search', cache_key, (description, banner_url))
     return description, banner_url
 
 
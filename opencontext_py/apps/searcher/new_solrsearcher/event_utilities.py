@@ -1,12 +1,14 @@
 import logging
 
-from django.core.cache import caches
-
 
 
 from opencontext_py.apps.all_items.models import (
     AllSpaceTime,
 )
+from opencontext_py.libs.cacheutilities import (
+    cache_get_many,
+    cache_set_many,
+)
 
 
 
@@ -24,12 +26,15 @@ def make_cache_spacetime_obj_dict(
     excludes={'geometry_type__in': ['Point', 'point']},
 ):
     """Make a dict of SpaceTime objects keyed by uuid"""
-    cache = caches['redis']
+    # Get all the cached objects in one round trip.
+    uuid_cache_keys = {
+        uuid: make_spacetime_obj_cache_key(uuid) for uuid in uuids
+    }
+    cache_dict = cache_get_many('redis', list(uuid_cache_keys.values()))
     uuids_for_qs = []
     uuid_event_dict = {}
-    for uuid in uuids:
-        cache_key = make_spacetime_obj_cache_key(uuid)
-        event_obj = cache.get(cache_key)
+    for uuid, cache_key in uuid_cache_keys.items():
+        event_obj = cache_dict.get(cache_key)
         if event_obj is None:
             uuids_for_qs.append(uuid)
         else:
@@ -53,14 +58,14 @@ def make_cache_spacetime_obj_dict(
     if event_qs:
         event_qs = event_qs.exclude(**excludes)
 
+    new_cache_dict = {}
     for event_obj in event_qs:
         cache_key = make_spacetime_obj_cache_key(str(event_obj.item.uuid))
-        try:
-            cache.set(cache_key, event_obj)
-        except:
-            pass
+        new_cache_dict[cache_key] = event_obj
         uuid_event_dict[str(event_obj.item.uuid)] = event_obj
     
+    # Cache all the new objects in one round trip.
+    cache_set_many('redis', new_cache_dict)
     return uuid_event_dict
 
 
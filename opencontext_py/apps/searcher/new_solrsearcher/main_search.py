@@ -10,8 +10,8 @@ from opencontext_py.libs.rootpath import RootPath
 
 from opencontext_py.apps.searcher.new_solrsearcher.searchsolr import SearchSolr
 from opencontext_py.apps.searcher.new_solrsearcher.resultmaker import ResultMaker
-
-from opencontext_py.libs.queue_utilities import make_hash_id_from_args
+from opencontext_py.apps.searcher.new_solrsearcher import search_cache
+from opencontext_py.apps.searcher.new_solrsearcher import search_timing
 
 logger = logging.getLogger(__name__)
 
@@ -29,37 +29,50 @@ else:
 # --------------------------------------------------------------------
 
 
-def process_solr_query_via_solr_and_db(request_dict, base_search_url='/query/'):
+def process_solr_query_via_solr_and_db(
+    request_dict,
+    base_search_url='/query/',
+    timer=None,
+):
     """Processes a request dict to formulate a solr query and process a
        response from solr
 
     :param dict request_dict: Dictionary derived from a solr
         request object with client GET request parameters.
+    :param SearchTimer timer: A SearchTimer object to record the time
+        taken by different stages of the search
     """
-    start_time = time.time()
+    if timer is None:
+        timer = search_timing.SearchTimer()
     search_solr = SearchSolr()
-    search_solr.add_initial_facet_fields(request_dict)
-    search_solr.init_facet_fields.append('item_type')
-    query = search_solr.compose_query(request_dict)
-    query = search_solr.update_query_with_stats_prequery(
-        query
-    )
+    with timer.stage(search_timing.STAGE_COMPOSE_QUERY):
+        search_solr.add_initial_facet_fields(request_dict)
+        search_solr.init_facet_fields.append('item_type')
+        query = search_solr.compose_query(request_dict)
+    with timer.stage(search_timing.STAGE_STATS_PREQUERY):
+        query = search_solr.update_query_with_stats_prequery(
+            query
+        )
     if request_dict.get('oai-pmh'):
         # Empty this!
         query['facet.field'] = []
-    prep_solr_query_time = time.time()
-    solr_response = search_solr.query_solr(query)
-    solr_response_time = time.time()
+    with timer.stage(search_timing.STAGE_SOLR):
+        solr_response = search_solr.query_solr(query)
+    qtime = solr_response.get('responseHeader', {}).get('QTime')
+    # The QTime is how long Solr took to process the query, so the
+    # difference from the 'solr' stage is network and (de)serialization.
+    timer.add(search_timing.STAGE_SOLR_QTIME, qtime)
     result_maker = ResultMaker(
         request_dict=request_dict,
         facet_fields_to_client_request=copy.deepcopy(search_solr.facet_fields_to_client_request),
         slugs_for_config_facets=copy.deepcopy(search_solr.slugs_for_config_facets),
         base_search_url=base_search_url,
+        timer=timer,
     )
-    result_maker.create_result(
-        solr_json=solr_response
-    )
-    solr_end_time = time.time()
+    with timer.stage(search_timing.STAGE_RESULT):
+        result_maker.create_result(
+            solr_json=solr_response
+        )
     if isinstance(result_maker.result, list):
         # Case of a list response.
         return result_maker.result
@@ -70,48 +83,125 @@ def process_solr_query_via_solr_and_db(request_dict, base_search_url='/query/'):
         solr_response['response'].pop('docs')
         result_maker.result = solr_response
     if settings.DEBUG:
-        result_maker.result['prep_solr_query_time'] = (prep_solr_query_time - start_time) * 10**3
-        result_maker.result['solr_response_time'] = (solr_response_time - prep_solr_query_time) * 10**3
-        result_maker.result['process_solr_result_time'] = (solr_end_time - solr_response_time) * 10**3
+        result_maker.result['stage_times'] = timer.stages.copy()
     if not settings.DEBUG and not request_dict.get('solr') and result_maker.result.get('query'):
         # Get rid of the solr query if we're not in debug mode and did not specifically
         # ask for it.
         result_maker.result.pop('query')
-    result_maker.result['Qtime'] = solr_response.get('responseHeader', {}).get('QTime')
+    result_maker.result['Qtime'] = qtime
     return result_maker.result
 
 
-def process_solr_query(request_dict, base_search_url='/query/'):
+def compute_and_cache_search_result(
+    request_dict,
+    cache_key,
+    result_cache_key,
+    base_search_url='/query/',
+    timer=None,
+    lock_token=None,
+):
+    """Computes a search result, caches it (stamped with the cache_key),
+    and releases the lock on the cache_key if we hold it.
+
+    NOTE: This also gets called in a redis queue worker to refresh
+    stale search results.
+
+    :param str lock_token: The token of the lock we acquired on the
+        cache_key, or None if we don't hold the lock.
+    """
+    record_metrics = False
+    if timer is None:
+        # We're not timing a client request (probably in a redis
+        # queue worker), so record the stage metrics here.
+        timer = search_timing.SearchTimer()
+        record_metrics = True
+    try:
+        result = process_solr_query_via_solr_and_db(
+            request_dict,
+            base_search_url=base_search_url,
+            timer=timer,
+        )
+        search_cache.cache_search_result(
+            result_cache_key=result_cache_key,
+            cache_key=cache_key,
+            result=result,
+            timeout=SEARCH_CACHE_TIMEOUT,
+        )
+    finally:
+        if lock_token:
+            search_cache.release_lock(cache_key, lock_token)
+    if record_metrics:
+        timer.set_total()
+        timer.record_metrics()
+    return result
+
+
+def process_solr_query(request_dict, base_search_url='/query/', timer=None):
     """Processes a request dict to formulate a solr query and process a
        response from solr
 
     :param dict request_dict: Dictionary derived from a solr
         request object with client GET request parameters.
+    :param SearchTimer timer: A SearchTimer object to record the time
+        taken by different stages of the search
     """
+    if timer is None:
+        timer = search_timing.SearchTimer()
     reset_cache = False
     if request_dict.get('reset_cache'):
         reset_cache = True
         request_dict.pop('reset_cache')
         print(f'Resetting cache for {request_dict}')
-    cache = caches['redis_search']
-    cache_key_suffix = make_hash_id_from_args(
-        args=request_dict
-    )
-    cache_key = f'{settings.CACHE_PREFIX_SEARCH}{str(cache_key_suffix)}'
+    # NOTE: The cache key includes index generation numbers. A cached
+    # result stamped with a different cache key was computed before a
+    # relevant index commit, so it is stale.
+    cache_key = search_cache.make_search_cache_key(request_dict)
+    result_cache_key = search_cache.make_result_cache_key(request_dict)
     result = None
+    is_fresh = False
     if not reset_cache:
-        result = cache.get(cache_key)
-    if result:
+        with timer.stage(search_timing.STAGE_CACHE):
+            result, is_fresh = search_cache.get_cached_search_result(
+                result_cache_key,
+                cache_key,
+            )
+    if result and is_fresh:
         # We have a result from the cache, so return it.
-        print(f'Solr query result from cache {cache_key}')
+        print(f'Solr query result from cache {result_cache_key}')
         return result
-    # Do the hard work of computing the result from scratch
-    result = process_solr_query_via_solr_and_db(
+    if result:
+        # Serve the stale result now, and refresh it in the background
+        # (unless another process is already refreshing it).
+        search_cache.enqueue_search_refresh(
+            func=compute_and_cache_search_result,
+            kwargs={
+                'request_dict': copy.deepcopy(request_dict),
+                'cache_key': cache_key,
+                'result_cache_key': result_cache_key,
+                'base_search_url': base_search_url,
+            },
+            cache_key=cache_key,
+        )
+        print(f'Solr query stale result from cache {result_cache_key}')
+        return result
+    lock_token = search_cache.acquire_lock(cache_key)
+    if not lock_token and not reset_cache:
+        # Another process is computing this same result, so wait for it
+        # rather than sending an identical query to solr.
+        result = search_cache.wait_for_cached_result(result_cache_key, cache_key)
+        if result:
+            print(f'Solr query result from coalesced request {cache_key}')
+            return result
+        # We gave up waiting. Try again to get the lock, but compute the
+        # result ourselves even if we can't get it.
+        lock_token = search_cache.acquire_lock(cache_key)
+    # Do the hard work of computing the result from scratch. We only
+    # release the lock if we hold it.
+    return compute_and_cache_search_result(
         request_dict,
+        cache_key=cache_key,
+        result_cache_key=result_cache_key,
         base_search_url=base_search_url,
+        timer=timer,
+        lock_token=lock_token,
     )
-    try:
-        cache.set(cache_key, result, timeout=SEARCH_CACHE_TIMEOUT)
-    except:
-        pass
-    return result
\ No newline at end of file
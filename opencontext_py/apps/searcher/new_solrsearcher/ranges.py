@@ -1,10 +1,25 @@
+import logging
+
+from django.conf import settings
+from django.core.cache import caches
 
 from opencontext_py.libs.solrclient import SolrClient
+from opencontext_py.libs.queue_utilities import make_hash_id_from_args
 
 from opencontext_py.apps.searcher.new_solrsearcher import configs
+from opencontext_py.apps.searcher.new_solrsearcher import search_cache
 from opencontext_py.apps.searcher.new_solrsearcher import utilities
 
 
+logger = logging.getLogger(__name__)
+
+
+# How long do we cache stats (min, max, etc.) for range facets? These
+# cache keys include index generation numbers, so reindexing
+# invalidates them anyway.
+STATS_CACHE_TIMEOUT = 60 * 60 * 24 * 7  # 1 week
+
+
 
 def compose_stats_query(fq_list=[], stats_fields_list=[], facet_fields=[], q='*:*'):
     """Compose a stats query to get stats for solr fields for ranges
@@ -29,22 +44,22 @@ def compose_stats_query(fq_list=[], stats_fields_list=[], facet_fields=[], q='*:
     return query_dict
 
 
-def stats_ranges_query_dict_via_solr(
-    stats_query,
-    default_group_size=20,
-    solr=None,
-    return_pre_query_response=False):
-    """ Makes stats range facet query dict by processing a solr query
-    """
-    if not solr:
-        # Connect to solr.
-        if configs.USE_TEST_SOLR_CONNECTION:
-            # Connect to the testing solr server
-            solr = SolrClient(use_test_solr=True).solr
-        else:
-            # Connect to the default solr server
-            solr =  SolrClient().solr
+def get_solr_connection(solr=None):
+    """Gets a solr connection if we don't already have one"""
+    if solr:
+        return solr
+    if configs.USE_TEST_SOLR_CONNECTION:
+        # Connect to the testing solr server
+        return SolrClient(use_test_solr=True).solr
+    # Connect to the default solr server
+    return SolrClient().solr
+
 
+def get_stats_response_via_solr(stats_query, solr=None):
+    """Gets the raw solr JSON response for a stats query, or None if
+    the response lacks stats fields
+    """
+    solr = get_solr_connection(solr)
     results = solr.search(**stats_query)
     solr_json = results.raw_response
     if not isinstance(solr_json, dict):
@@ -55,14 +70,183 @@ def stats_ranges_query_dict_via_solr(
 
     if not 'stats_fields' in solr_json['stats']:
         return None
+    return solr_json
 
-    query_dict = {}
+
+def stats_ranges_query_dict_via_solr(
+    stats_query,
+    default_group_size=20,
+    solr=None,
+    return_pre_query_response=False):
+    """ Makes stats range facet query dict by processing a solr query
+    """
+    solr_json = get_stats_response_via_solr(stats_query, solr=solr)
+    if not solr_json:
+        return None
+    query_dict = make_ranges_query_dict_from_stats_fields(
+        solr_json['stats']['stats_fields'],
+        default_group_size=default_group_size,
+    )
     if return_pre_query_response:
         # This is for testing purposes.
         query_dict['pre-query-response'] = solr_json
+    return query_dict
+
+
+def make_stats_cache_key(stats_query, generation_token=''):
+    """Makes a cache key for the stats of fields given a set of filters
+
+    :param dict stats_query: A stats query made by compose_stats_query
+    :param str generation_token: A string of index generation numbers
+        relevant to the query
+    """
+    key_args = {
+        'q': stats_query.get('q'),
+        'fq': sorted(stats_query.get('fq', [])),
+        'stats.field': sorted(stats_query.get('stats.field', [])),
+        'gen': generation_token,
+    }
+    hash_id = make_hash_id_from_args(key_args)
+    return f'{settings.CACHE_PREFIX_SEARCH}stats_{hash_id}'
+
+
+def get_cache_stats_fields(stats_query, solr=None, generation_token=''):
+    """Gets (via the cache if possible) the stats_fields dict for a
+    stats query
+
+    :param dict stats_query: A stats query made by compose_stats_query
+    :param str generation_token: A string of index generation numbers
+        relevant to the query
+    """
+    cache = caches['redis_search']
+    cache_key = make_stats_cache_key(stats_query, generation_token)
+    try:
+        stats_fields = cache.get(cache_key)
+    except:
+        stats_fields = None
+    if stats_fields is not None:
+        return stats_fields
+    solr_json = get_stats_response_via_solr(stats_query, solr=solr)
+    if not solr_json:
+        return None
+    stats_fields = solr_json['stats']['stats_fields']
+    try:
+        cache.set(cache_key, stats_fields, timeout=STATS_CACHE_TIMEOUT)
+    except:
+        logger.info(f'Cache failure with: {cache_key}')
+    return stats_fields
+
+
+def get_cached_only_stats_fields(stats_query, generation_token=''):
+    """Gets the stats_fields dict for a stats query from the cache,
+    without querying solr. Returns None on a cache miss."""
+    cache = caches['redis_search']
+    cache_key = make_stats_cache_key(stats_query, generation_token)
+    try:
+        return cache.get(cache_key)
+    except:
+        return None
+
+
+def get_field_wide_stats_fields(stats_fields_list, solr=None):
+    """Gets stats for fields over the whole index (ignoring filters)
+
+    Field-wide stats get computed once per index generation, and are
+    shared by all searches using those fields. Range buckets made
+    from field-wide stats are wider than needed for a filtered search,
+    but we avoid a second solr round trip per search.
+
+    NOTE: These stats cover the whole index, so they're keyed on the
+    generations that change with any reindexing, not on a (project
+    filtered) request's generations.
+
+    :param list stats_fields_list: List of fields for stats
+    """
+    generation_token = search_cache.get_index_generation_token()
+    stats_fields = {}
+    missing_fields = []
+    for solr_field in stats_fields_list:
+        field_stats_query = compose_stats_query(stats_fields_list=[solr_field])
+        field_stats = get_cached_only_stats_fields(
+            field_stats_query,
+            generation_token=generation_token
+        )
+        if field_stats is None:
+            missing_fields.append(solr_field)
+            continue
+        stats_fields.update(field_stats)
+    if not missing_fields:
+        return stats_fields
+    # Get all the missing fields in one query, then cache each
+    # field's stats separately.
+    stats_query = compose_stats_query(stats_fields_list=missing_fields)
+    solr_json = get_stats_response_via_solr(stats_query, solr=solr)
+    if not solr_json:
+        return stats_fields
+    cache = caches['redis_search']
+    for solr_field, field_stats in solr_json['stats']['stats_fields'].items():
+        stats_fields[solr_field] = field_stats
+        field_stats_query = compose_stats_query(stats_fields_list=[solr_field])
+        cache_key = make_stats_cache_key(field_stats_query, generation_token)
+        try:
+            cache.set(cache_key, {solr_field: field_stats}, timeout=STATS_CACHE_TIMEOUT)
+        except:
+            logger.info(f'Cache failure with: {cache_key}')
+    return stats_fields
+
+
+def stats_ranges_query_dict_via_cache(
+    stats_query,
+    default_group_size=20,
+    solr=None,
+    generation_token='',
+    use_field_wide_stats=configs.STATS_PREQUERY_USE_FIELD_WIDE_STATS,
+):
+    """Makes stats range facet query dict, using cached stats where
+    possible so the main query is often the only solr round trip.
+
+    :param dict stats_query: A stats query made by compose_stats_query
+    :param str generation_token: A string of index generation numbers
+        relevant to the query
+    :param bool use_field_wide_stats: If True, and the stats for this
+        specific set of filters are not cached, use (cached) stats over
+        the whole index rather than querying solr for the filtered stats.
+    """
+    stats_fields = None
+    if use_field_wide_stats:
+        stats_fields = get_cached_only_stats_fields(
+            stats_query,
+            generation_token=generation_token
+        )
+        if stats_fields is None:
+            stats_fields = get_field_wide_stats_fields(
+                stats_query.get('stats.field', []),
+                solr=solr,
+            )
+    else:
+        stats_fields = get_cache_stats_fields(
+            stats_query,
+            solr=solr,
+            generation_token=generation_token,
+        )
+    if not stats_fields:
+        return None
+    return make_ranges_query_dict_from_stats_fields(
+        stats_fields,
+        default_group_size=default_group_size,
+    )
+
+
+def make_ranges_query_dict_from_stats_fields(stats_fields, default_group_size=20):
+    """Makes a stats range facet query dict from solr stats fields
+
+    :param dict stats_fields: The solr_json['stats']['stats_fields']
+        dict from a solr stats query response
+    """
+    query_dict = {}
     query_dict['facet.range'] = []
     query_dict['stats.field'] = []
-    for solr_field_key, stats in solr_json['stats']['stats_fields'].items():
+    for solr_field_key, stats in stats_fields.items():
         group_size = default_group_size
         if not stats or not stats.get('count'):
             continue
@@ -9,7 +9,7 @@ from opencontext_py.libs.rootpath import RootPath
 
 
 from opencontext_py.apps.searcher.new_solrsearcher import configs
-from opencontext_py.apps.searcher.new_solrsearcher.searchlinks import SearchLinks
+from opencontext_py.apps.searcher.new_solrsearcher.searchlinks import SearchLinkTemplate
 from opencontext_py.apps.searcher.new_solrsearcher import utilities
 
 # ---------------------------------------------------------------------
@@ -206,32 +206,27 @@ class ResultFacetsChronologyFromDF():
             ascending=[True, False, False],
             inplace=True,
         )
-        options = []
-        for _, row in df_g.iterrows():
-            sl = SearchLinks(
-                request_dict=copy.deepcopy(self.request_dict),
-                base_search_url=self.base_search_url
-            )
-            # Remove non search related params.
-            sl.remove_non_query_params()
-
-            # Update the request dict for this facet option.
-            sl.replace_param_value(
+        # The chronology options vary only by the tile and the
+        # start and stop dates.
+        sl_tmpl = SearchLinkTemplate(
+            request_dict=self.request_dict,
+            vary_params=[
                 'allevent-chronotile',
-                match_old_value=None,
-                new_value=row['agg_tile'],
-            )
-            sl.replace_param_value(
                 'allevent-start',
-                match_old_value=None,
-                new_value=row['earliest_bce_ce'],
-            )
-            sl.replace_param_value(
                 'allevent-stop',
-                match_old_value=None,
-                new_value=row['latest_bce_ce'],
+            ],
+            base_search_url=self.base_search_url,
+        )
+        options = []
+        for row in df_g.to_dict('records'):
+            # Update the request dict for this facet option.
+            urls = sl_tmpl.make_urls(
+                {
+                    'allevent-chronotile': row['agg_tile'],
+                    'allevent-start': row['earliest_bce_ce'],
+                    'allevent-stop': row['latest_bce_ce'],
+                }
             )
-            urls = sl.make_urls_from_request_dict()
             if urls['html'] == self.current_filters_url:
                 # The new URL matches our current filter
                 # url, so don't add this facet option.
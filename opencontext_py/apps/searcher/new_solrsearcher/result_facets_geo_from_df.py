@@ -14,7 +14,7 @@ from opencontext_py.apps.indexer import solrdocument_new_schema as SolrDoc
 
 from opencontext_py.apps.searcher.new_solrsearcher import configs
 from opencontext_py.apps.searcher.new_solrsearcher import event_utilities
-from opencontext_py.apps.searcher.new_solrsearcher.searchlinks import SearchLinks
+from opencontext_py.apps.searcher.new_solrsearcher.searchlinks import SearchLinkTemplate
 from opencontext_py.apps.searcher.new_solrsearcher import utilities
 
 
@@ -89,19 +89,13 @@ class ResultFacetsGeoFromDF():
         if len(tiles_df.index) < 2:
             return self.default_aggregation_depth
         
-        tiles_df['lon_lat'] = tiles_df['facet_value'].apply(
-            get_tile_lon_lat_coordinates
-        )
-        tiles_df['lon'] = tiles_df['lon_lat'].str.get(1)
-        tiles_df['lon'] = pd.to_numeric(tiles_df['lon'])
-        tiles_df['lat'] = tiles_df['lon_lat'].str.get(1)
-        tiles_df['lat'] = pd.to_numeric(tiles_df['lat'])
-        tiles_df.drop(
-            columns=['lon_lat'],
-            inplace=True
-        )
-        
         gm = GlobalMercator()
+        # Get the center coordinates of all the tiles in one go.
+        # Remember geojson ordering of the coordinates (lon, lat)
+        tiles_df['lon'], tiles_df['lat'] = gm.quadtrees_to_geojson_lon_lat_arrays(
+            tiles_df['facet_value'].astype(str).to_numpy()
+        )
+
         max_distance = gm.distance_on_unit_sphere(
             tiles_df['lat'].min(),
             tiles_df['lon'].min(), 
@@ -221,24 +215,29 @@ class ResultFacetsGeoFromDF():
             ascending=[False, True],
             inplace=True,
         )
+        # Make the URLs for all the tile options in one batch, with
+        # the non search related params removed.
+        sl_tmpl = SearchLinkTemplate(
+            request_dict=self.request_dict,
+            vary_params=['allevent-geotile'],
+            base_search_url=self.base_search_url,
+        )
+        urls_list = sl_tmpl.make_urls_list(
+            'allevent-geotile',
+            df_g['agg_tile'].tolist(),
+        )
+        # Get the bounds of all the tile options in one go.
+        gm = GlobalMercator()
+        tile_bounds = zip(
+            *[a.tolist() for a in gm.quadtrees_to_lat_lon_arrays(df_g['agg_tile'].tolist())]
+        )
         options = []
-        for _, row in df_g.iterrows():
-            tile = row['agg_tile']
-            count = row['facet_count']
-            sl = SearchLinks(
-                request_dict=copy.deepcopy(self.request_dict),
-                base_search_url=self.base_search_url
-            )
-            # Remove non search related params.
-            sl.remove_non_query_params()
-
-            # Update the request dict for this facet option.
-            sl.replace_param_value(
-                'allevent-geotile',
-                match_old_value=None,
-                new_value=tile,
-            )  
-            urls = sl.make_urls_from_request_dict()
+        for tile, count, urls, bounds in zip(
+            df_g['agg_tile'].tolist(),
+            df_g['facet_count'].tolist(),
+            urls_list,
+            tile_bounds,
+        ):
             if urls['html'] == self.current_filters_url:
                 # The new URL matches our current filter
                 # url, so don't add this facet option.
@@ -258,14 +257,16 @@ class ResultFacetsGeoFromDF():
                 tile,
                 option,
             )
-            
-            gm = GlobalMercator()
+
             if feature_type == 'Polygon':
                 # Get polygon coordinates (a list of lists)
-                geo_coords = gm.quadtree_to_geojson_poly_coords(tile)
+                geo_coords = gm.lat_lon_bounds_to_geojson_poly_coords(bounds)
             elif feature_type == 'Point':
                 # Get point coordinates (a list of lon,lat values)
-                geo_coords = gm.quadtree_to_geojson_lon_lat(tile)
+                geo_coords = [
+                    ((bounds[1] + bounds[3]) / 2),
+                    ((bounds[0] + bounds[2]) / 2),
+                ]
             else:
                 # We shouldn't be here!
                 continue
@@ -343,11 +344,19 @@ class ResultFacetsGeoFromDF():
         # already present in the cache.
         uuid_context_dict = self._get_cache_contexts_dict(uuids)
         
+        # All the feature options vary only by the context path.
+        sl_tmpl = SearchLinkTemplate(
+            request_dict=self.request_dict,
+            vary_params=['path'],
+            base_search_url=self.base_search_url,
+        )
+
         # Now make the final 
         geo_options = []
-        for _, row in facets_df[valid_index].iterrows():
-            solr_entity_str = row['facet_value']
-            count = row['facet_count']
+        for solr_entity_str, count in zip(
+            facets_df[valid_index]['facet_value'].tolist(),
+            facets_df[valid_index]['facet_count'].tolist(),
+        ):
             if solr_entity_str not in parsed_solr_entities:
                 # This solr_entity_str did not validate to extract a UUID.
                 continue
@@ -363,20 +372,8 @@ class ResultFacetsGeoFromDF():
                 logger.warn('No context path for {}'.format(uuid))
                 continue
             
-            sl = SearchLinks(
-                request_dict=copy.deepcopy(self.request_dict),
-                base_search_url=self.base_search_url
-            )
-            # Remove non search related params.
-            sl.remove_non_query_params()
-
-            # Update the request dict for this facet option.
-            sl.replace_param_value(
-                'path',
-                match_old_value=None,
-                new_value=context_path,
-            )  
-            urls = sl.make_urls_from_request_dict()
+            # Update the request path for this facet option.
+            urls = sl_tmpl.make_urls({'path': context_path})
 
             # NOTE: We're not checking if the URLs are the same
             # as the current search URL, because part of the point
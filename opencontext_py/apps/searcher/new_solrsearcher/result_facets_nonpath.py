@@ -10,7 +10,10 @@ from opencontext_py.apps.etl.importer.utilities import validate_transform_data_t
 
 from opencontext_py.apps.searcher.new_solrsearcher import configs
 from opencontext_py.apps.searcher.new_solrsearcher import db_entities
-from opencontext_py.apps.searcher.new_solrsearcher.searchlinks import SearchLinks
+from opencontext_py.apps.searcher.new_solrsearcher.searchlinks import (
+    SearchLinks,
+    SearchLinkTemplate,
+)
 from opencontext_py.apps.searcher.new_solrsearcher import utilities
 
 # ---------------------------------------------------------------------
@@ -56,6 +59,11 @@ class ResultFacetsNonPath():
         if not len(options_tuples):
             return None
 
+        sl_tmpl = SearchLinkTemplate(
+            request_dict=self.request_dict,
+            vary_params=['type'],
+            base_search_url=self.base_search_url,
+        )
         # Iterate through tuples of item_type counts
         options = []
         for facet_value, count in options_tuples:
@@ -68,20 +76,8 @@ class ResultFacetsNonPath():
             if not type_dict:
                 # Unrecognized item type. Skip.
                 continue
-            sl = SearchLinks(
-                request_dict=copy.deepcopy(self.request_dict),
-                base_search_url=self.base_search_url
-            )
-            # Remove non search related params.
-            sl.remove_non_query_params()
-
             # Update the request dict for this facet option.
-            sl.replace_param_value(
-                'type',
-                match_old_value=None,
-                new_value=facet_value,
-            )
-            urls = sl.make_urls_from_request_dict()
+            urls = sl_tmpl.make_urls({'type': facet_value})
             if urls['html'] == self.current_filters_url:
                 # The new URL matches our current filter
                 # url, so don't add this facet option.
@@ -227,6 +223,17 @@ class ResultFacetsNonPath():
         if not proj_class_sum_list:
             return  None
         print(f'project_slugs has {len(proj_class_sum_list)} item-classes')
+        # Options vary only by the item type and the item class (cat),
+        # and leave out the project summary param.
+        sl_tmpl = SearchLinkTemplate(
+            request_dict=self.request_dict,
+            vary_params=['type', 'cat'],
+            base_search_url=self.base_search_url,
+            remove_params=(
+                configs.QUERY_NEW_URL_IGNORE_PARAMS
+                + ['proj-summary']
+            ),
+        )
         options = []
         for item_type_piv in item_type_classes_pivot:
             item_type = item_type_piv.get('value')
@@ -236,21 +243,8 @@ class ResultFacetsNonPath():
             if not item_type_dict:
                 continue
             item_type_dict['count'] = item_type_piv.get('count')
-            sl = SearchLinks(
-                request_dict=copy.deepcopy(self.request_dict),
-                base_search_url=self.base_search_url
-            )
-            # Remove non search related params.
-            sl.remove_non_query_params()
-            if sl.request_dict.get('proj-summary'):
-                sl.request_dict.pop('proj-summary', None)
             # Update the request dict for this facet option.
-            sl.replace_param_value(
-                'type',
-                match_old_value=None,
-                new_value=item_type,
-            )
-            urls = sl.make_urls_from_request_dict()
+            urls = sl_tmpl.make_urls({'type': item_type})
             if urls['html'] == self.current_filters_url:
                 # The new URL matches our current filter
                 # url, so don't add this facet option.
@@ -274,12 +268,12 @@ class ResultFacetsNonPath():
                     # This item class is a parent, not the most
                     # specific level present
                     continue
-                sl.replace_param_value(
-                    'cat',
-                    match_old_value=None,
-                    new_value=parsed_val.get('slug'),
+                piv_urls = sl_tmpl.make_urls(
+                    {
+                        'type': item_type,
+                        'cat': parsed_val.get('slug'),
+                    }
                 )
-                piv_urls = sl.make_urls_from_request_dict()
                 if piv_urls['html'] == self.current_filters_url:
                     # The new URL matches our current filter
                     # url, so don't add this facet option.
@@ -331,6 +325,12 @@ class ResultFacetsNonPath():
             return None
         # Iterate through tuples of item_type counts
         self.download_stopwords_if_not_present()
+        english_stopwords = set(stopwords.words('english'))
+        sl_tmpl = SearchLinkTemplate(
+            request_dict=self.request_dict,
+            vary_params=['q'],
+            base_search_url=self.base_search_url,
+        )
         options = []
         for facet_value, count in options_tuples:
             # The get_item_type_dict should return the
@@ -342,24 +342,12 @@ class ResultFacetsNonPath():
             if facet_value in configs.KEYWORDS_TO_SKIP:
                 # No Open Context specific terms that are not informative
                 continue
-            if facet_value in stopwords.words('english'):
+            if facet_value in english_stopwords:
                 # Skip common English stopwords
                 continue
 
-            sl = SearchLinks(
-                request_dict=copy.deepcopy(self.request_dict),
-                base_search_url=self.base_search_url
-            )
-            # Remove non search related params.
-            sl.remove_non_query_params()
-
             # Update the request dict for this facet option.
-            sl.replace_param_value(
-                'q',
-                match_old_value=None,
-                new_value=facet_value,
-            )
-            urls = sl.make_urls_from_request_dict()
+            urls = sl_tmpl.make_urls({'q': facet_value})
             if urls['html'] == self.current_filters_url:
                 # The new URL matches our current filter
                 # url, so don't add this facet option.
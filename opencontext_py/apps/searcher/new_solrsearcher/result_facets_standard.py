@@ -13,7 +13,7 @@ from opencontext_py.apps.indexer import solrdocument_new_schema as SolrDoc
 from opencontext_py.apps.searcher.new_solrsearcher import configs
 from opencontext_py.apps.searcher.new_solrsearcher import db_entities
 from opencontext_py.apps.searcher.new_solrsearcher.searchlinks import (
-    SearchLinks,
+    SearchLinkTemplate,
 )
 from opencontext_py.apps.searcher.new_solrsearcher import utilities
 
@@ -150,6 +150,24 @@ class ResultFacetsStandard():
             in the output options list.
         :param list options_tuples: List of (facet_value, count) tuples
         """
+        if param_key == 'prop':
+            # Prop can be a list. If the match_old_value is None
+            # then we add to new_value to the existing list of
+            # all prop parameter values.
+            add_to_param_list = True
+        else:
+            # All the other param_key's can only take a single
+            # value.
+            add_to_param_list = False
+
+        # All the options vary only by the value of the param_key.
+        sl_tmpl = SearchLinkTemplate(
+            request_dict=self.request_dict,
+            vary_params=[param_key],
+            base_search_url=self.base_search_url,
+            match_old_value=match_old_value,
+            add_to_param_list=add_to_param_list,
+        )
         options = []
         for facet_value, count in options_tuples:
             if count < 1:
@@ -191,31 +209,8 @@ class ResultFacetsStandard():
                 else:
                     new_value = match_old_value + new_value
 
-            sl = SearchLinks(
-                request_dict=copy.deepcopy(self.request_dict),
-                base_search_url=self.base_search_url
-            )
-            # Remove non search related params.
-            sl.remove_non_query_params()
-
-            if param_key == 'prop':
-                # Prop can be a list. If the match_old_value is None
-                # then we add to new_value to the existing list of
-                # all prop parameter values.
-                add_to_param_list = True
-            else:
-                # All the other param_key's can only take a single
-                # value.
-                add_to_param_list = False
-
             # Update the request dict for this facet option.
-            sl.replace_param_value(
-                param_key,
-                match_old_value=match_old_value,
-                new_value=new_value,
-                add_to_param_list=add_to_param_list,
-            )
-            urls = sl.make_urls_from_request_dict()
+            urls = sl_tmpl.make_urls({param_key: new_value})
             if urls['html'] == self.current_filters_url:
                 # The new URL matches our current filter
                 # url, so don't add this facet option.
@@ -563,6 +558,14 @@ class ResultFacetsStandard():
         :param list options_tuples: List of (facet_value, count) tuples
         """
         delim = configs.REQUEST_PROP_HIERARCHY_DELIM
+        # All the options vary only by the range query in the value of
+        # the param_key.
+        sl_tmpl = SearchLinkTemplate(
+            request_dict=self.request_dict,
+            vary_params=[param_key],
+            base_search_url=self.base_search_url,
+            match_old_value=match_old_value,
+        )
         options = []
         options_length = len(options_tuples)
         for i, option_tup in enumerate(options_tuples):
@@ -651,20 +654,8 @@ class ResultFacetsStandard():
                 else:
                     new_value = match_old_value + delim + range_query
 
-            sl = SearchLinks(
-                request_dict=copy.deepcopy(self.request_dict),
-                base_search_url=self.base_search_url
-            )
-            # Remove non search related params.
-            sl.remove_non_query_params()
-
             # Update the request dict for this facet option.
-            sl.replace_param_value(
-                param_key,
-                match_old_value=match_old_value,
-                new_value=new_value,
-            )
-            urls = sl.make_urls_from_request_dict()
+            urls = sl_tmpl.make_urls({param_key: new_value})
             if urls['html'] == self.current_filters_url:
                 # The new URL matches our current filter
                 # url, so don't add this facet option.
@@ -21,6 +21,7 @@ from opencontext_py.apps.indexer import solrdocument_new_schema as SolrDoc
 from opencontext_py.apps.searcher.new_solrsearcher import configs
 from opencontext_py.apps.searcher.new_solrsearcher import db_entities
 from opencontext_py.apps.searcher.new_solrsearcher import event_utilities
+from opencontext_py.apps.searcher.new_solrsearcher import search_timing
 from opencontext_py.apps.searcher.new_solrsearcher import utilities
 
 
@@ -836,6 +837,7 @@ class ResultRecord():
             )
             return sampling_site
         last_region_obj = None
+        context_uuids = []
         for context in self.contexts:
             context_uuid = get_uuid_from_entity_dict(
                 context,
@@ -844,7 +846,11 @@ class ResultRecord():
             )
             if not context_uuid:
                 continue
-            man_obj = db_entities.get_cache_man_obj_by_any_id(context_uuid)
+            context_uuids.append(context_uuid)
+        # Get all the context manifest objects in one cache round trip.
+        context_objs = db_entities.get_cache_man_objs_by_any_ids(context_uuids)
+        for context_uuid in context_uuids:
+            man_obj = context_objs.get(context_uuid)
             if not man_obj:
                 continue
             if man_obj.item_class.slug in configs.ISAMPLES_SAMPLING_SITE_ITEM_CLASS_SLUGS:
@@ -1149,8 +1155,11 @@ class ResultRecords():
 
     """ Methods to prepare result records """
 
-    def __init__(self, request_dict, total_found=0, start=0, proj_index=False):
+    def __init__(self, request_dict, total_found=0, start=0, proj_index=False, timer=None):
         rp = RootPath()
+        if timer is None:
+            timer = search_timing.SearchTimer()
+        self.timer = timer
         self.request_dict = copy.deepcopy(request_dict)
         self.base_url = rp.get_baseurl()
         self.total_found = total_found
@@ -1412,11 +1421,12 @@ class ResultRecords():
         """
         if not self.allow_missing_strings_db_query or not self.do_missing_strings_db_query:
             return {}
-        return db_entities.get_db_uuid_pred_str_dict(
-            uuids=uuids,
-            db_limit_string_attributes=self.db_limit_string_attributes,
-            requested_attrib_slugs=requested_attrib_slugs
-        )
+        with self.timer.stage(search_timing.STAGE_DB_STRINGS):
+            return db_entities.get_db_uuid_pred_str_dict(
+                uuids=uuids,
+                db_limit_string_attributes=self.db_limit_string_attributes,
+                requested_attrib_slugs=requested_attrib_slugs
+            )
 
 
     def make_records_from_solr(self, solr_json):
@@ -18,6 +18,7 @@ from opencontext_py.apps.searcher.new_solrsearcher.result_facets_geo_from_df imp
 from opencontext_py.apps.searcher.new_solrsearcher.result_facets_nonpath import ResultFacetsNonPath
 from opencontext_py.apps.searcher.new_solrsearcher.result_facets_standard import ResultFacetsStandard
 from opencontext_py.apps.searcher.new_solrsearcher import project_overlays
+from opencontext_py.apps.searcher.new_solrsearcher import search_timing
 from opencontext_py.apps.searcher.new_solrsearcher.result_records import (
     get_record_uuids_from_solr,
     get_record_uris_from_solr,
@@ -39,9 +40,15 @@ class ResultMaker():
         request_dict=None,
         facet_fields_to_client_request={},
         slugs_for_config_facets=[],
-        base_search_url='/search/'
+        base_search_url='/search/',
+        timer=None,
     ):
         self.result = LastUpdatedOrderedDict()
+        # Records the time taken by different stages of making the
+        # result.
+        if timer is None:
+            timer = search_timing.SearchTimer()
+        self.timer = timer
         self.request_dict = copy.deepcopy(request_dict)
         self.base_search_url = base_search_url
         self.id = None
@@ -922,6 +929,7 @@ class ResultMaker():
             total_found=self.total_found,
             start=self.start,
             proj_index=self.request_dict.get('proj-index', False),
+            timer=self.timer,
         )
 
         # Make metadata dict objects for each individual search result
@@ -951,6 +959,7 @@ class ResultMaker():
             total_found=self.total_found,
             start=self.start,
             proj_index=self.request_dict.get('proj-index', False),
+            timer=self.timer,
         )
 
         # Make geojson features for each individual search result
@@ -1024,67 +1033,75 @@ class ResultMaker():
         
         # Make the facets dataframe to speed processing
         # of facet results.
-        self.prepare_facets_df(solr_json)
+        with self.timer.stage(search_timing.STAGE_FACETS_DF):
+            self.prepare_facets_df(solr_json)
 
         if 'metadata' in self.act_responses:
             # Add search metadata to the response to the client.
-            self.result['id'] = self.make_response_id()
-            self.add_publishing_datetime_metadata(solr_json)
-            self.add_human_remains_flag(solr_json)
-            self.add_all_events_date_range(solr_json)
-            self.add_geo_chrono_counts(solr_json)
-            # The paging function below provides the count of
-            # search results
-            self.add_paging_json(solr_json)
-            self.add_sorting_json()
-            self.add_filters_json()
-            self.add_text_fields()
+            with self.timer.stage(search_timing.STAGE_METADATA):
+                self.result['id'] = self.make_response_id()
+                self.add_publishing_datetime_metadata(solr_json)
+                self.add_human_remains_flag(solr_json)
+                self.add_all_events_date_range(solr_json)
+                self.add_geo_chrono_counts(solr_json)
+                # The paging function below provides the count of
+                # search results
+                self.add_paging_json(solr_json)
+                self.add_sorting_json()
+                self.add_filters_json()
+                self.add_text_fields()
 
         if 'chrono-facet' in self.act_responses:
             # Add facet options for chronology tiles (time spans)
-            self.add_chronology_facets(solr_json)
+            with self.timer.stage(search_timing.STAGE_CHRONO_FACETS):
+                self.add_chronology_facets(solr_json)
 
         if 'prop-range' in self.act_responses:
             # Add facet ranges to the result.
-            self.add_facet_ranges(solr_json)
+            with self.timer.stage(search_timing.STAGE_RANGE_FACETS):
+                self.add_facet_ranges(solr_json)
 
         if 'prop-facet' in self.act_responses:
-            # Add the "standard" facets (for entities, often in hierarchies)
-            self.add_standard_facets(solr_json)
-            # Add the item-type facets
-            self.add_item_type_facets(solr_json)
-            # Add related media facet options
-            self.add_rel_media_facets(solr_json)
-            # Add keyword facet options (if keywords are present)
-            self.add_keyword_facets(solr_json)
-            # Adds overlay images, associated with project facet options.
-            self.add_project_image_overlays()
+            with self.timer.stage(search_timing.STAGE_STANDARD_FACETS):
+                # Add the "standard" facets (for entities, often in hierarchies)
+                self.add_standard_facets(solr_json)
+                # Add the item-type facets
+                self.add_item_type_facets(solr_json)
+                # Add related media facet options
+                self.add_rel_media_facets(solr_json)
+                # Add keyword facet options (if keywords are present)
+                self.add_keyword_facets(solr_json)
+                # Adds overlay images, associated with project facet options.
+                self.add_project_image_overlays()
 
         if 'geo-facet' in self.act_responses:
             # Add the geographic tile facets.
-            self.add_geotile_facets(solr_json)
+            with self.timer.stage(search_timing.STAGE_GEO_FACETS):
+                self.add_geotile_facets(solr_json)
 
         if 'geo-feature' in self.act_responses:
             # Add the geographic tile facets.
-            self.add_geo_contained_in_facets(solr_json)
-
-        if 'uuid' in self.act_responses:
-            # Adds a simple list of uuids to the result.
-            self.add_uuid_records(solr_json)
-
-        if 'uri' in self.act_responses:
-            # Adds a simple list of uuids to the result.
-            self.add_uri_records(solr_json)
-
-        if 'uri-meta' in self.act_responses:
-            # Adds uri-meta dictionary objects that provide
-            # record uri together with attribute metadata.
-            self.add_uri_meta_records(solr_json)
-
-        if 'geo-record' in self.act_responses or 'no-geo-record'in self.act_responses:
-            # Adds geo-json expressed features for individual
-            # result records
-            self.add_geo_records(solr_json)
+            with self.timer.stage(search_timing.STAGE_GEO_FEATURE_FACETS):
+                self.add_geo_contained_in_facets(solr_json)
+
+        with self.timer.stage(search_timing.STAGE_RECORDS):
+            if 'uuid' in self.act_responses:
+                # Adds a simple list of uuids to the result.
+                self.add_uuid_records(solr_json)
+
+            if 'uri' in self.act_responses:
+                # Adds a simple list of uuids to the result.
+                self.add_uri_records(solr_json)
+
+            if 'uri-meta' in self.act_responses:
+                # Adds uri-meta dictionary objects that provide
+                # record uri together with attribute metadata.
+                self.add_uri_meta_records(solr_json)
+
+            if 'geo-record' in self.act_responses or 'no-geo-record'in self.act_responses:
+                # Adds geo-json expressed features for individual
+                # result records
+                self.add_geo_records(solr_json)
 
         if 'solr' in self.act_responses:
             # Adds the raw solr response to the result.
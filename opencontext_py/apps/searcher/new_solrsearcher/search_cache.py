@@ -0,0 +1,409 @@
+import logging
+import time
+import uuid as GenUUID
+from time import sleep
+
+import django_rq
+
+from django.conf import settings
+from django.core.cache import caches
+
+from opencontext_py.apps.all_items import hierarchy
+from opencontext_py.apps.all_items.models import AllManifest
+from opencontext_py.apps.searcher.new_solrsearcher import configs
+from opencontext_py.apps.searcher.new_solrsearcher import utilities
+
+from opencontext_py.libs.queue_utilities import make_hash_id_from_args
+
+
+logger = logging.getLogger(__name__)
+
+
+# --------------------------------------------------------------------
+# NOTE: These functions manage index "generation" numbers that get mixed
+# into search result cache keys. Every time the indexer commits changes
+# to Solr, it bumps the generation numbers relevant to the changed items.
+# Cached search results keyed with older generation numbers then simply
+# stop getting requested and age out of the cache, so we don't need to
+# clear the whole search cache after (partial) reindexing.
+#
+# There are 3 kinds of generation numbers:
+#
+# 1. The "global" generation, bumped only when we want to invalidate
+#    every cached search result.
+# 2. The "any" generation, bumped with every index commit. Searches
+#    not limited to specific projects use this.
+# 3. Project generations, bumped when items in a project (or one of
+#    the project's child projects) get indexed. Searches limited to
+#    projects use the generations of those projects (but not the
+#    "any" generation), so reindexing one project only invalidates
+#    searches that may touch that project.
+# --------------------------------------------------------------------
+
+SEARCH_GENERATION_CACHE = 'redis_search'
+SEARCH_GENERATION_KEY_GLOBAL = 'search-gen-global'
+SEARCH_GENERATION_KEY_ANY = 'search-gen-any'
+SEARCH_GENERATION_KEY_PROJ_PREFIX = 'search-gen-proj-'
+
+# Configs for coalescing concurrent requests for the same search and for
+# serving stale results while a search result gets refreshed.
+SEARCH_LOCK_TIMEOUT = 60 * 2  # 2 minutes, longer than a slow search.
+SEARCH_LOCK_WAIT = 30  # Seconds to wait for another process' result.
+SEARCH_LOCK_POLL_INTERVAL = 0.1
+SEARCH_REFRESH_QUEUE = 'default'
+
+
+def make_initial_generation():
+    """Makes an initial generation number
+
+    We use the current time (in milliseconds) rather than 0, so if a
+    generation key gets lost (evicted or cleared), the new generation
+    number can't collide with an older one still used in cache keys.
+    """
+    return int(time.time() * 1000)
+
+
+def make_project_generation_key(project_slug):
+    """Makes a cache key for a project's index generation number"""
+    return f'{SEARCH_GENERATION_KEY_PROJ_PREFIX}{project_slug}'
+
+
+def get_generations(keys):
+    """Gets a dict of generation numbers for a list of generation keys
+
+    :param list keys: List of generation cache keys
+    """
+    cache = caches[SEARCH_GENERATION_CACHE]
+    try:
+        generations = cache.get_many(keys)
+    except:
+        generations = {}
+    for key in keys:
+        if generations.get(key) is not None:
+            continue
+        initial = make_initial_generation()
+        try:
+            # Use add, so we don't clobber a value set by another
+            # process in the meantime.
+            cache.add(key, initial, timeout=None)
+            generations[key] = cache.get(key, initial)
+        except:
+            generations[key] = initial
+    return generations
+
+
+def bump_generation(key):
+    """Increments an index generation number"""
+    cache = caches[SEARCH_GENERATION_CACHE]
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # The key does not exist yet.
+        pass
+    except:
+        logger.info(f'Cache failure with: {key}')
+        return None
+    new_gen = make_initial_generation()
+    try:
+        cache.set(key, new_gen, timeout=None)
+    except:
+        logger.info(f'Cache failure with: {key}')
+    return new_gen
+
+
+def bump_global_search_generation():
+    """Invalidates all cached search results"""
+    return bump_generation(SEARCH_GENERATION_KEY_GLOBAL)
+
+
+def bump_search_generations(project_slugs=None):
+    """Invalidates cached search results that may include items
+    from projects identified by a list of slugs
+
+    :param list project_slugs: List of slugs of projects (including
+        parent projects) with changes in the index.
+    """
+    bump_generation(SEARCH_GENERATION_KEY_ANY)
+    if not project_slugs:
+        return None
+    for project_slug in set(project_slugs):
+        bump_generation(make_project_generation_key(project_slug))
+
+
+def get_project_slugs_for_uuids(uuids):
+    """Gets the slugs of projects, and their parent projects, for
+    items identified by a list of uuids
+
+    :param list uuids: List of uuids of items changed in the index.
+    """
+    m_qs = AllManifest.objects.filter(
+        uuid__in=uuids,
+    ).select_related(
+        'project'
+    )
+    proj_objs = {}
+    for man_obj in m_qs:
+        if man_obj.item_type == 'projects':
+            proj_objs[str(man_obj.uuid)] = man_obj
+        proj_objs[str(man_obj.project.uuid)] = man_obj.project
+    project_slugs = set()
+    for proj_obj in proj_objs.values():
+        project_slugs.add(proj_obj.slug)
+        for parent_proj in hierarchy.get_project_hierarchy(proj_obj):
+            project_slugs.add(parent_proj.slug)
+    return list(project_slugs)
+
+
+def bump_search_generations_for_uuids(uuids):
+    """Invalidates cached search results that may include items
+    identified by a list of uuids
+
+    :param list uuids: List of uuids of items changed in the index.
+    """
+    try:
+        project_slugs = get_project_slugs_for_uuids(uuids)
+    except Exception as e:
+        # Something went wrong figuring out the projects, so be
+        # safe and invalidate everything.
+        logger.error(f'Could not get projects for index generation: {str(e)}')
+        return bump_global_search_generation()
+    if not project_slugs:
+        # None of the uuids are in the manifest (like items already
+        # deleted), so we don't know which projects changed. Be safe
+        # and invalidate everything.
+        return bump_global_search_generation()
+    return bump_search_generations(project_slugs)
+
+
+def get_request_project_slugs(request_dict):
+    """Gets the slugs of projects used to filter a search request
+
+    :param dict request_dict: Dictionary derived from a solr
+        request object with client GET request parameters.
+    """
+    raw_paths = utilities.get_request_param_value(
+        request_dict,
+        param='proj',
+        default=None,
+        as_list=True,
+        solr_escape=False,
+    )
+    if not raw_paths:
+        return []
+    project_slugs = []
+    for raw_path in raw_paths:
+        if not raw_path:
+            continue
+        for or_path in raw_path.split(configs.REQUEST_OR_OPERATOR):
+            for slug in or_path.split(configs.REQUEST_PROP_HIERARCHY_DELIM):
+                if not slug or slug in project_slugs:
+                    continue
+                project_slugs.append(slug)
+    return project_slugs
+
+
+def get_search_generation_token(request_dict):
+    """Makes a string of generation numbers relevant to a search request
+
+    :param dict request_dict: Dictionary derived from a solr
+        request object with client GET request parameters.
+    """
+    keys = [SEARCH_GENERATION_KEY_GLOBAL]
+    project_slugs = get_request_project_slugs(request_dict)
+    if project_slugs:
+        keys += [make_project_generation_key(slug) for slug in project_slugs]
+    else:
+        keys.append(SEARCH_GENERATION_KEY_ANY)
+    generations = get_generations(keys)
+    return '-'.join([str(generations.get(key)) for key in keys])
+
+
+def get_index_generation_token():
+    """Makes a string of generation numbers that change with any
+    change to the index, for caching things (like field-wide stats)
+    computed over the whole index"""
+    keys = [SEARCH_GENERATION_KEY_GLOBAL, SEARCH_GENERATION_KEY_ANY]
+    generations = get_generations(keys)
+    return '-'.join([str(generations.get(key)) for key in keys])
+
+
+def make_search_cache_key(request_dict):
+    """Makes a search result cache key that includes the index
+    generations relevant to a search request
+
+    :param dict request_dict: Dictionary derived from a solr
+        request object with client GET request parameters.
+    """
+    cache_key_suffix = make_hash_id_from_args(
+        args=request_dict
+    )
+    gen_hash = make_hash_id_from_args(
+        args=get_search_generation_token(request_dict)
+    )
+    return f'{settings.CACHE_PREFIX_SEARCH}{gen_hash[:12]}_{str(cache_key_suffix)}'
+
+
+
+# --------------------------------------------------------------------
+# NOTE: These functions help coalesce concurrent requests for the same
+# search (single-flight) and serve "stale" search results while they
+# get refreshed.
+#
+# We keep one cached copy of each search result, under a key that does
+# not include index generations (so it survives reindexing). The copy
+# gets stamped with the generation keyed cache key (from
+# make_search_cache_key) current when we computed it. A cached copy with
+# a different stamp is stale. We serve the stale copy and refresh it in
+# a redis queue (RQ) job.
+#
+# Locks hold a unique token, so a process only releases a lock that it
+# still holds (and not one that expired and got taken by another
+# process).
+# --------------------------------------------------------------------
+
+def make_result_cache_key(request_dict):
+    """Makes a cache key for the (fresh or stale) cached copy of a
+    search result. This key does not include index generations, so
+    it survives reindexing.
+
+    :param dict request_dict: Dictionary derived from a solr
+        request object with client GET request parameters.
+    """
+    cache_key_suffix = make_hash_id_from_args(
+        args=request_dict
+    )
+    return f'{settings.CACHE_PREFIX_SEARCH}result_{str(cache_key_suffix)}'
+
+
+def make_lock_key(cache_key):
+    """Makes a lock key for a search cache key"""
+    return f'lock_{cache_key}'
+
+
+def acquire_lock(cache_key, timeout=SEARCH_LOCK_TIMEOUT):
+    """Attempts to acquire a lock on computing the result for a cache
+    key.
+
+    returns a unique lock token if we got the lock, otherwise None
+    """
+    cache = caches['redis_search']
+    token = GenUUID.uuid4().hex
+    try:
+        # add only sets the key if it does not exist (Redis SET NX),
+        # so only one process at a time gets the lock.
+        if cache.add(make_lock_key(cache_key), token, timeout=timeout):
+            return token
+        return None
+    except:
+        # The cache is not working, so don't bother coalescing.
+        return token
+
+
+def release_lock(cache_key, token):
+    """Releases a lock on computing the result for a cache key, if
+    the lock still holds our token
+
+    returns True if we released the lock
+    """
+    if not token:
+        return False
+    cache = caches['redis_search']
+    lock_key = make_lock_key(cache_key)
+    try:
+        if cache.get(lock_key) != token:
+            # Our lock expired, and maybe another process holds
+            # the lock now.
+            return False
+        cache.delete(lock_key)
+    except:
+        return False
+    return True
+
+
+def get_cached_search_result(result_cache_key, cache_key, cached=None):
+    """Gets a cached copy of a search result, and if it is fresh
+
+    :param str result_cache_key: The key for the cached copy of the
+        search result (see make_result_cache_key)
+    :param str cache_key: The index generation keyed cache key (see
+        make_search_cache_key) for a fresh result
+    :param dict cached: An optional cached dict (the cached copy
+        wrapped with its stamp), already retrieved from the cache
+
+    returns a (result, is_fresh) tuple. The result is None if there's
+        no cached copy.
+    """
+    if cached is None:
+        cache = caches['redis_search']
+        try:
+            cached = cache.get(result_cache_key)
+        except:
+            cached = None
+    if not isinstance(cached, dict) or not cached.get('result'):
+        return None, False
+    return cached['result'], (cached.get('cache_key') == cache_key)
+
+
+def wait_for_cached_result(result_cache_key, cache_key, wait=SEARCH_LOCK_WAIT):
+    """Waits for another process holding the lock on a cache_key to
+    cache its result. Returns None if we gave up waiting.
+    """
+    cache = caches['redis_search']
+    lock_key = make_lock_key(cache_key)
+    end_time = time.time() + wait
+    while time.time() < end_time:
+        try:
+            cached = cache.get_many([result_cache_key, lock_key])
+        except:
+            return None
+        result, is_fresh = get_cached_search_result(
+            result_cache_key,
+            cache_key,
+            cached=cached.get(result_cache_key, {}),
+        )
+        if result and is_fresh:
+            return result
+        if not cached.get(lock_key):
+            # The other process gave up without caching a result.
+            return None
+        sleep(SEARCH_LOCK_POLL_INTERVAL)
+    return None
+
+
+def cache_search_result(result_cache_key, cache_key, result, timeout):
+    """Caches a search result, stamped with the generation keyed
+    cache_key"""
+    cache = caches['redis_search']
+    try:
+        cache.set(
+            result_cache_key,
+            {'cache_key': cache_key, 'result': result},
+            timeout=timeout,
+        )
+    except:
+        pass
+
+
+def enqueue_search_refresh(func, kwargs, cache_key):
+    """Enqueues a job to refresh a stale search result, unless a refresh
+    is already underway. Returns True if we enqueued a job.
+
+    :param Object func: The function that computes and caches the
+        search result. It gets a lock_token keyword argument, so it
+        can release the lock when done.
+    :param dict kwargs: Keyword argument dict that we're passing to
+        the function func
+    :param str cache_key: The cache key for the (fresh) search result
+    """
+    lock_token = acquire_lock(cache_key)
+    if not lock_token:
+        # Another process is already computing this result.
+        return False
+    try:
+        queue = django_rq.get_queue(SEARCH_REFRESH_QUEUE)
+        queue.enqueue(func, lock_token=lock_token, **kwargs)
+    except Exception as e:
+        logger.info(f'Could not enqueue search refresh for {cache_key}: {str(e)}')
+        release_lock(cache_key, lock_token)
+        return False
+    return True
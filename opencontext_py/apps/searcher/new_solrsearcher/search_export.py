@@ -0,0 +1,255 @@
+import csv
+import io
+import json
+import logging
+from datetime import datetime
+
+from django.conf import settings
+
+from opencontext_py.apps.searcher.new_solrsearcher import configs
+from opencontext_py.apps.searcher.new_solrsearcher.result_records import ResultRecords
+from opencontext_py.apps.searcher.new_solrsearcher.searchsolr import SearchSolr
+from opencontext_py.apps.searcher.new_solrsearcher import utilities
+
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------
+# NOTE: These functions stream every record for a search as NDJSON,
+# CSV, or GeoJSONSeq. We walk through the Solr results with a cursorMark
+# and turn each batch of Solr documents into records with ResultRecords,
+# yielding lines as we go. Only one batch is in memory at a time, and
+# we skip all the facets and search metadata of a normal search
+# response, so bulk harvesters don't need to page through /query/.
+# ---------------------------------------------------------------------
+
+# Number of Solr documents to get (and make into records) per batch.
+EXPORT_ROWS_PER_BATCH = 1000
+
+# Export formats and their response content types
+EXPORT_FORMAT_CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+    'geojsonseq': 'application/geo+json-seq',
+}
+
+# GeoJSON text sequences (RFC 8142) start each record with this
+# record separator character.
+GEOJSONSEQ_RECORD_SEPARATOR = '\x1e'
+
+# Request parameters that don't apply to an export.
+EXPORT_IGNORE_REQUEST_PARAMS = [
+    'start',
+    'rows',
+    'cursorMark',
+    'response',
+]
+
+
+# ---------------------------------------------------------------------
+# testing
+"""
+from opencontext_py.apps.searcher.new_solrsearcher import search_export
+request_dict = {'path': 'Turkey', 'proj': ['domuztepe-excavations']}
+for line in search_export.iter_export_lines(request_dict, 'ndjson'):
+    print(line)
+"""
+# ---------------------------------------------------------------------
+
+
+def make_export_request_dict(request_dict, export_format='ndjson'):
+    """Makes a copy of a request dict prepared for an export
+
+    :param dict request_dict: Dictionary derived from a solr
+        request object with client GET request parameters.
+    :param str export_format: The export format
+    """
+    export_request_dict = {
+        key: value
+        for key, value in request_dict.items()
+        if key not in EXPORT_IGNORE_REQUEST_PARAMS
+    }
+    if export_format == 'csv':
+        # CSV cells need single values, not lists of values.
+        export_request_dict['flatten-attributes'] = ['1']
+    return export_request_dict
+
+
+def make_export_query(search_solr, request_dict, rows=EXPORT_ROWS_PER_BATCH):
+    """Makes a solr query for iterating through all search results
+    with a cursorMark, without facets or stats
+
+    :param SearchSolr search_solr: A SearchSolr object
+    :param dict request_dict: Dictionary derived from a solr
+        request object with client GET request parameters.
+    :param int rows: The number of rows to get in each batch
+    """
+    search_solr.init_facet_fields = []
+    search_solr.init_stats_fields = []
+    query = search_solr.compose_query(request_dict)
+    # We don't need facets, stats, or range pre-queries for an export.
+    for key in ['prequery-stats', 'facet.field', 'facet.range', 'stats.field', 'start']:
+        query.pop(key, None)
+    query['facet'] = 'false'
+    query['stats'] = 'false'
+    query['rows'] = rows
+    query['cursorMark'] = '*'
+    query = search_solr.finish_query(query)
+    # Don't fill up Solr's query cache with cursor pages.
+    query['cache'] = 'false'
+    return query
+
+
+def iter_solr_cursor_responses(request_dict, rows=EXPORT_ROWS_PER_BATCH):
+    """Yields solr JSON responses for each batch of search results,
+    walking through the results with a cursorMark
+
+    :param dict request_dict: Dictionary derived from a solr
+        request object with client GET request parameters.
+    :param int rows: The number of rows to get in each batch
+
+    NOTE: Solr errors get raised, even after we've yielded some
+    responses. A streamed export response then gets aborted (with the
+    200 status already sent), so clients can tell the export is
+    incomplete.
+    """
+    search_solr = SearchSolr()
+    query = make_export_query(search_solr, request_dict, rows=rows)
+    search_solr.solr_connect()
+    while True:
+        try:
+            solr_json = search_solr.solr.search(**query).raw_response
+        except Exception as error:
+            logger.error(
+                f'[{datetime.now().strftime("%x %X ")}'
+                f'{settings.TIME_ZONE}] Export error: '
+                f'{str(error)} => Query: {query}'
+            )
+            # Raise rather than just stopping, so the streamed response
+            # gets aborted instead of looking like a complete export.
+            raise
+        if not solr_json:
+            raise ValueError(f'Empty Solr response for export query: {query}')
+        doc_list = utilities.get_dict_path_value(
+            configs.RECORD_PATH_KEYS,
+            solr_json,
+            default=[]
+        )
+        if not doc_list:
+            return None
+        yield solr_json
+        next_cursor = solr_json.get('nextCursorMark')
+        if not next_cursor or next_cursor == query['cursorMark']:
+            # We've reached the end of the results.
+            return None
+        query['cursorMark'] = next_cursor
+
+
+def iter_export_records(request_dict, export_format='ndjson', rows=EXPORT_ROWS_PER_BATCH):
+    """Yields result record dicts for all the results of a search
+
+    :param dict request_dict: Dictionary derived from a solr
+        request object with client GET request parameters.
+    :param str export_format: The export format. GeoJSONSeq exports
+        yield GeoJSON features, other formats yield record
+        properties dicts.
+    :param int rows: The number of rows to get in each batch
+    """
+    request_dict = make_export_request_dict(request_dict, export_format)
+    start = 0
+    for solr_json in iter_solr_cursor_responses(request_dict, rows=rows):
+        total_found = solr_json.get('response', {}).get('numFound', 0)
+        r_recs = ResultRecords(
+            request_dict=request_dict,
+            total_found=total_found,
+            start=start,
+        )
+        if export_format == 'geojsonseq':
+            features, non_geo_records = r_recs.make_geojson_records_from_solr(
+                solr_json
+            )
+            records = features + non_geo_records
+        else:
+            records = r_recs.make_uri_meta_records_from_solr(solr_json)
+        start += len(
+            utilities.get_dict_path_value(
+                configs.RECORD_PATH_KEYS,
+                solr_json,
+                default=[]
+            )
+        )
+        for record in records:
+            yield record
+
+
+def make_csv_value(value):
+    """Makes a value suitable for a CSV cell"""
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def make_csv_line(row):
+    """Makes a CSV formatted line from a list of values"""
+    output = io.StringIO()
+    csv.writer(output).writerow([make_csv_value(v) for v in row])
+    return output.getvalue()
+
+
+def iter_export_lines(request_dict, export_format='ndjson', rows=EXPORT_ROWS_PER_BATCH):
+    """Yields lines of text for streaming all the results of a search
+
+    :param dict request_dict: Dictionary derived from a solr
+        request object with client GET request parameters.
+    :param str export_format: The export format, one of 'ndjson',
+        'csv', or 'geojsonseq'
+    :param int rows: The number of rows to get in each batch
+
+    NOTE: CSV columns come from the first record (plus any columns new
+    in the rest of the first batch), because we need to output the
+    header before seeing all the records. Values for columns that first
+    appear in later batches get left out.
+    """
+    records = iter_export_records(request_dict, export_format, rows=rows)
+    if export_format != 'csv':
+        prefix = ''
+        if export_format == 'geojsonseq':
+            prefix = GEOJSONSEQ_RECORD_SEPARATOR
+        for record in records:
+            yield prefix + json.dumps(record, ensure_ascii=False) + '\n'
+        return None
+
+    columns = None
+    first_batch = []
+    for record in records:
+        if columns is None:
+            # Gather the first batch of records to decide on columns.
+            first_batch.append(record)
+            if len(first_batch) < rows:
+                continue
+            columns = get_csv_columns(first_batch)
+            yield make_csv_line(columns)
+            for first_record in first_batch:
+                yield make_csv_line([first_record.get(c) for c in columns])
+            first_batch = []
+            continue
+        yield make_csv_line([record.get(c) for c in columns])
+    if columns is None and first_batch:
+        # All the records fit in the first batch.
+        columns = get_csv_columns(first_batch)
+        yield make_csv_line(columns)
+        for first_record in first_batch:
+            yield make_csv_line([first_record.get(c) for c in columns])
+
+
+def get_csv_columns(records):
+    """Gets a list of columns (keys) from a list of record dicts,
+    in the order they first appear"""
+    columns = []
+    for record in records:
+        for key in record.keys():
+            if key in columns:
+                continue
+            columns.append(key)
+    return columns
@@ -0,0 +1,187 @@
+import logging
+import time
+from contextlib import contextmanager
+
+from django.core.cache import caches
+
+from opencontext_py.libs.cacheutilities import get_redis_client
+from opencontext_py.libs.general import LastUpdatedOrderedDict
+
+
+logger = logging.getLogger(__name__)
+
+
+# --------------------------------------------------------------------
+# NOTE: These functions and the SearchTimer class record how long each
+# stage of the search pipeline takes. A SearchTimer is cheap (just a few
+# perf_counter calls per stage), so it is always on. The timings for a
+# request go out to the client in a Server-Timing header and get
+# aggregated in redis as Prometheus style histograms, so we can see
+# which stages (especially which facet builders) dominate tail latency
+# in production.
+# --------------------------------------------------------------------
+
+SEARCH_METRICS_CACHE = 'redis'
+SEARCH_METRICS_KEY = 'search-timing-metrics'
+SEARCH_METRICS_NAME = 'oc_search_stage_seconds'
+
+# Histogram bucket upper bounds, in seconds.
+SEARCH_METRICS_BUCKETS = [
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+]
+
+# We store sums as integer microseconds so redis can increment them
+# atomically.
+MICROSECONDS = 10**6
+
+# Stage names, so the header, metrics, and code use the same labels.
+STAGE_CACHE = 'cache'
+STAGE_COMPOSE_QUERY = 'compose_query'
+STAGE_STATS_PREQUERY = 'stats_prequery'
+STAGE_SOLR = 'solr'
+STAGE_SOLR_QTIME = 'solr_qtime'
+STAGE_RESULT = 'result'
+STAGE_FACETS_DF = 'facets_df'
+STAGE_METADATA = 'metadata'
+STAGE_CHRONO_FACETS = 'chrono_facets'
+STAGE_RANGE_FACETS = 'range_facets'
+STAGE_STANDARD_FACETS = 'standard_facets'
+STAGE_GEO_FACETS = 'geo_facets'
+STAGE_GEO_FEATURE_FACETS = 'geo_feature_facets'
+STAGE_RECORDS = 'records'
+STAGE_DB_STRINGS = 'db_strings'
+STAGE_JSON = 'json'
+STAGE_TEMPLATE = 'template'
+STAGE_TOTAL = 'total'
+
+
+def make_metrics_key():
+    """Makes the redis key for the metrics hash, within the metrics
+    cache's namespace (key prefix)"""
+    return caches[SEARCH_METRICS_CACHE].make_key(SEARCH_METRICS_KEY)
+
+
+class SearchTimer():
+    """Records durations (in milliseconds) of stages of a search request"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.stages = LastUpdatedOrderedDict()
+
+    def add(self, stage, duration_ms):
+        """Adds a duration (in milliseconds) to a stage. Repeated stages
+        get summed together.
+        """
+        if duration_ms is None:
+            return None
+        self.stages[stage] = self.stages.get(stage, 0) + duration_ms
+
+    @contextmanager
+    def stage(self, stage):
+        """Context manager to time a block of code as a stage"""
+        stage_start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.add(stage, (time.perf_counter() - stage_start) * 10**3)
+
+    def set_total(self):
+        """Sets the total time elapsed since the timer was created"""
+        self.stages[STAGE_TOTAL] = (time.perf_counter() - self.start) * 10**3
+
+    def make_server_timing_header(self):
+        """Makes a Server-Timing header value for the timed stages"""
+        return ', '.join(
+            [f'{stage};dur={dur:.1f}' for stage, dur in self.stages.items()]
+        )
+
+    def add_server_timing_header(self, response):
+        """Adds a Server-Timing header to an HttpResponse"""
+        if not self.stages:
+            return response
+        response['Server-Timing'] = self.make_server_timing_header()
+        return response
+
+    def record_metrics(self):
+        """Aggregates the timed stages into redis histograms"""
+        if not self.stages:
+            return None
+        try:
+            client = get_redis_client(SEARCH_METRICS_CACHE)
+        except:
+            client = None
+        if client is None:
+            return None
+        try:
+            metrics_key = make_metrics_key()
+            pipe = client.pipeline(transaction=False)
+            for stage, dur_ms in self.stages.items():
+                dur = dur_ms / 10**3
+                pipe.hincrby(metrics_key, f'{stage}|count', 1)
+                pipe.hincrby(metrics_key, f'{stage}|sum', int(dur * MICROSECONDS))
+                for bucket in SEARCH_METRICS_BUCKETS:
+                    if dur <= bucket:
+                        pipe.hincrby(metrics_key, f'{stage}|{bucket}', 1)
+            pipe.execute()
+        except Exception as e:
+            logger.info(f'Could not record search timing metrics: {str(e)}')
+
+
+def get_metrics_dict():
+    """Gets the aggregated stage timing metrics from redis
+
+    returns a dict keyed by stage, with dicts of 'count', 'sum' (in
+    microseconds), and cumulative bucket counts.
+    """
+    client = get_redis_client(SEARCH_METRICS_CACHE)
+    if client is None:
+        return {}
+    raw = client.hgetall(make_metrics_key())
+    metrics = {}
+    for field, value in raw.items():
+        if isinstance(field, bytes):
+            field = field.decode('utf-8')
+        stage, _, metric = field.partition('|')
+        metrics.setdefault(stage, {})
+        metrics[stage][metric] = int(value)
+    return metrics
+
+
+def make_prometheus_text(metrics=None):
+    """Makes a Prometheus text exposition of the stage timing metrics
+
+    :param dict metrics: A metrics dict from get_metrics_dict
+    """
+    if metrics is None:
+        metrics = get_metrics_dict()
+    lines = [
+        f'# HELP {SEARCH_METRICS_NAME} Time spent in stages of the search pipeline.',
+        f'# TYPE {SEARCH_METRICS_NAME} histogram',
+    ]
+    for stage in sorted(metrics.keys()):
+        stage_metrics = metrics[stage]
+        count = stage_metrics.get('count', 0)
+        for bucket in SEARCH_METRICS_BUCKETS:
+            lines.append(
+                f'{SEARCH_METRICS_NAME}_bucket{{stage="{stage}",le="{bucket}"}} '
+                f'{stage_metrics.get(str(bucket), 0)}'
+            )
+        lines.append(
+            f'{SEARCH_METRICS_NAME}_bucket{{stage="{stage}",le="+Inf"}} {count}'
+        )
+        lines.append(
+            f'{SEARCH_METRICS_NAME}_sum{{stage="{stage}"}} '
+            f'{stage_metrics.get("sum", 0) / MICROSECONDS}'
+        )
+        lines.append(
+            f'{SEARCH_METRICS_NAME}_count{{stage="{stage}"}} {count}'
+        )
+    return '\n'.join(lines) + '\n'
+
+
+def reset_metrics():
+    """Deletes the aggregated stage timing metrics"""
+    client = get_redis_client(SEARCH_METRICS_CACHE)
+    if client is None:
+        return None
+    client.delete(make_metrics_key())
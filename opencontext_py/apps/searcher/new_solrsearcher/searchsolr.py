@@ -9,6 +9,7 @@ from opencontext_py.apps.searcher.new_solrsearcher import configs
 from opencontext_py.apps.searcher.new_solrsearcher import utilities
 from opencontext_py.apps.searcher.new_solrsearcher import querymaker
 from opencontext_py.apps.searcher.new_solrsearcher import ranges
+from opencontext_py.apps.searcher.new_solrsearcher import search_cache
 from opencontext_py.apps.searcher.new_solrsearcher.sorting import SortingOptions
 
 
@@ -44,6 +45,8 @@ class SearchSolr():
         # Limit number of project facets (because we don't want
         # too many collections returned as facet counts)
         self.limit_project_facets = False
+        # The client request dict used to compose the query.
+        self.request_dict = {}
 
     def solr_connect(self):
         """ Connects to solr """
@@ -245,6 +248,7 @@ class SearchSolr():
         :param dict request_dict: The dictionary of keyed by client
         request parameters and their request parameter values.
         """
+        self.request_dict = request_dict
         query = {}
         query['facet'] = 'true'
         query['facet.mincount'] = 1
@@ -802,7 +806,8 @@ class SearchSolr():
     def update_query_with_stats_prequery(self, query):
         """Updates the main query dict if stats fields
            need facet ranges defined. If so, sends off an
-           initial pre-query to solr.
+           initial pre-query to solr, unless the stats
+           for these fields and filters are already cached.
         """
         # NOTE: This needs to happen at the end, after
         # we have already defined a bunch of solr
@@ -818,9 +823,14 @@ class SearchSolr():
             stats_fields_list=prestats_fields,
             q=query['q']
         )
-        stats_q_dict = ranges.stats_ranges_query_dict_via_solr(
+        # NOTE: The cached stats are keyed with the index generation
+        # numbers relevant to this request, so reindexing invalidates them.
+        stats_q_dict = ranges.stats_ranges_query_dict_via_cache(
             stats_query=stats_query,
-            solr=self.solr
+            solr=self.solr,
+            generation_token=search_cache.get_search_generation_token(
+                self.request_dict
+            ),
         )
         query = utilities.combine_query_dict_lists(
             part_query_dict=stats_q_dict,
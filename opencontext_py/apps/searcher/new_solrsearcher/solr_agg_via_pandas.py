@@ -7,6 +7,10 @@ from django.core.cache import caches
 from opencontext_py.apps.searcher.new_solrsearcher import configs
 from opencontext_py.apps.searcher.new_solrsearcher import utilities
 
+from opencontext_py.libs.cachecodec import (
+    decode_cache_value,
+    encode_cache_value,
+)
 from opencontext_py.libs.queue_utilities import make_hash_id_from_args
 
 
@@ -75,7 +79,7 @@ def make_cache_df_of_solr_facets(
     cache_key = f'{settings.CACHE_PREFIX_FACET_DF}{str(cache_key_suffix)}'
     df = None
     if not reset_cache:
-        df = cache.get(cache_key)
+        df = decode_cache_value(cache.get(cache_key))
     if df is not None:
         # We have a result from the cache, so return it.
         print(f'Solr facets dataframe from cache {cache_key}')
@@ -83,7 +87,7 @@ def make_cache_df_of_solr_facets(
     # Do the hard work of computing the result from scratch
     df = make_df_of_solr_facets(solr_json, path_keys_list=path_keys_list)
     try:
-        cache.set(cache_key, df, timeout=FACET_DF_CACHE_TIMEOUT)
+        cache.set(cache_key, encode_cache_value(df), timeout=FACET_DF_CACHE_TIMEOUT)
     except:
         pass
     return df
\ No newline at end of file
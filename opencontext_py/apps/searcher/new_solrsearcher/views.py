@@ -3,7 +3,7 @@ import json
 
 from django.conf import settings
 from django.core.cache import caches
-from django.http import HttpResponse, HttpResponseRedirect
+from django.http import HttpResponse, HttpResponseRedirect, StreamingHttpResponse
 from django.shortcuts import redirect
 
 from django.template import loader
@@ -16,6 +16,8 @@ from opencontext_py.apps.searcher.new_solrsearcher import main_search
 from opencontext_py.apps.searcher.new_solrsearcher import configs
 from opencontext_py.apps.searcher.new_solrsearcher import project_index_summary
 from opencontext_py.apps.searcher.new_solrsearcher import project_index_search
+from opencontext_py.apps.searcher.new_solrsearcher import search_export
+from opencontext_py.apps.searcher.new_solrsearcher import search_timing
 from opencontext_py.apps.searcher.new_solrsearcher import suggest
 from opencontext_py.apps.searcher.new_solrsearcher import utilities
 
@@ -33,9 +35,24 @@ else:
     SEARCH_CACHE_TIMEOUT = 60 * 60 * 24 * 7 # 1 week
 
 
-def make_json_response(request, req_neg, response_dict):
+def finish_timed_response(response, timer=None):
+    """Adds a Server-Timing header to a response and records the
+    stage timing metrics"""
+    if timer is None:
+        return response
+    timer.set_total()
+    timer.add_server_timing_header(response)
+    timer.record_metrics()
+    return response
+
+
+def make_json_response(request, req_neg, response_dict, timer=None):
     """Makes a JSON response with content negotiation"""
-    json_output = json.dumps(response_dict, indent=4, ensure_ascii=False)
+    if timer is None:
+        json_output = json.dumps(response_dict, indent=4, ensure_ascii=False)
+    else:
+        with timer.stage(search_timing.STAGE_JSON):
+            json_output = json.dumps(response_dict, indent=4, ensure_ascii=False)
     if 'callback' in request.GET:
         # The JSON-P response
         funct = request.GET['callback']
@@ -44,7 +61,7 @@ def make_json_response(request, req_neg, response_dict):
             content_type='application/javascript' + "; charset=utf8"
         )
         patch_vary_headers(response, ['accept', 'Accept', 'content-type'])
-        return response
+        return finish_timed_response(response, timer)
     cache = caches['default']
     cache_key = get_cache_key(request, cache=cache)
     print(f'Cache key: "{cache_key}" for "{request.path}"')
@@ -53,16 +70,20 @@ def make_json_response(request, req_neg, response_dict):
         content_type=req_neg.use_response_type + "; charset=utf8"
     )
     patch_vary_headers(response, ['accept', 'Accept', 'content-type'])
-    return response
+    return finish_timed_response(response, timer)
 
 
 def query_json(request, spatial_context=None):
     """ API for searching Open Context """
 
+    timer = search_timing.SearchTimer()
     request_dict = utilities.make_request_obj_dict(
         request, spatial_context=spatial_context
     )
-    response_dict = main_search.process_solr_query(request_dict.copy())
+    response_dict = main_search.process_solr_query(
+        request_dict.copy(),
+        timer=timer,
+    )
 
     req_neg = RequestNegotiation('application/json')
     req_neg.supported_types = ['application/ld+json']
@@ -84,16 +105,20 @@ def query_json(request, spatial_context=None):
         patch_vary_headers(response, ['accept', 'Accept', 'content-type'])
         return response
 
-    return make_json_response(request, req_neg, response_dict)
+    return make_json_response(request, req_neg, response_dict, timer=timer)
 
 
 def query_html(request, spatial_context=None):
     """HTML representation for searching Open Context """
 
+    timer = search_timing.SearchTimer()
     request_dict = utilities.make_request_obj_dict(
         request, spatial_context=spatial_context
     )
-    response_dict = main_search.process_solr_query(request_dict.copy())
+    response_dict = main_search.process_solr_query(
+        request_dict.copy(),
+        timer=timer,
+    )
 
     req_neg = RequestNegotiation('text/html')
     req_neg.supported_types = [
@@ -119,7 +144,7 @@ def query_html(request, spatial_context=None):
         return response
 
     if req_neg.use_response_type.endswith('json'):
-        return make_json_response(request, req_neg, response_dict)
+        return make_json_response(request, req_neg, response_dict, timer=timer)
 
     cache = caches['default']
     cache_key = get_cache_key(request, cache=cache)
@@ -140,12 +165,53 @@ def query_html(request, spatial_context=None):
         'human_remains_ok': request.session.get('human_remains_ok', False),
         'CACHE_KEY': cache_key,
     }
-    template = loader.get_template('bootstrap_vue/search/search.html')
-    response = HttpResponse(template.render(context, request))
+    with timer.stage(search_timing.STAGE_TEMPLATE):
+        template = loader.get_template('bootstrap_vue/search/search.html')
+        response = HttpResponse(template.render(context, request))
     patch_vary_headers(response, ['accept', 'Accept', 'content-type'])
+    return finish_timed_response(response, timer)
+
+
+def query_export(request, spatial_context=None, export_format='ndjson'):
+    """Streams all the records of a search as NDJSON, CSV, or GeoJSONSeq"""
+    content_type = search_export.EXPORT_FORMAT_CONTENT_TYPES.get(export_format)
+    if not content_type:
+        return HttpResponse(
+            f'Unsupported export format: {export_format}',
+            content_type='text/plain; charset=utf8',
+            status=415
+        )
+    request_dict = utilities.make_request_obj_dict(
+        request, spatial_context=spatial_context
+    )
+    response = StreamingHttpResponse(
+        search_export.iter_export_lines(request_dict, export_format),
+        content_type=content_type + "; charset=utf8"
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="open-context-search.{export_format}"'
+    )
     return response
 
 
+@cache_control(no_cache=True)
+def search_metrics(request):
+    """Prometheus style metrics of time spent in stages of the search
+    pipeline"""
+    try:
+        output = search_timing.make_prometheus_text()
+    except Exception as e:
+        return HttpResponse(
+            f'Search metrics not available: {str(e)}',
+            content_type='text/plain; charset=utf8',
+            status=503
+        )
+    return HttpResponse(
+        output,
+        content_type='text/plain; version=0.0.4; charset=utf8'
+    )
+
+
 @cache_control(no_cache=True)
 def suggest_json(request):
     """ API for getting search term suggestions from Open Context """
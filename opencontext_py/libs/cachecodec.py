@@ -0,0 +1,221 @@
+import logging
+import pickle
+import zlib
+
+import pandas as pd
+
+from django.apps import apps
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Model
+
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------
+# NOTE: These functions make compact versions of Django model objects
+# and pandas DataFrames for caching.
+#
+# A pickled model instance drags along its _state, and the whole
+# pickled graph of related objects, and unpickling it is slow. Instead,
+# we cache a model object as a slim tuple of its model label and
+# concrete field values, plus the (slim) related objects it was
+# fetched with via select_related, so that things like
+# event_obj.item.uuid still work without database queries.
+#
+# DataFrames get cached as zlib compressed (pickle protocol 5) bytes.
+# NOTE: Arrow / Parquet would be nice, but pyarrow is not a
+# dependency, and our context dataframes have columns of meta_json
+# dicts that don't round trip through Arrow.
+#
+# Values that we don't recognize get cached as they are. Cached values
+# that don't have a codec tag (like values cached before we started
+# using this codec) get returned as they are.
+# ---------------------------------------------------------------------
+
+CODEC_MODEL_TAG = 'oc-codec-model-v1'
+CODEC_MODEL_LIST_TAG = 'oc-codec-model-list-v1'
+CODEC_MODEL_DICT_TAG = 'oc-codec-model-dict-v1'
+CODEC_DF_TAG = 'oc-codec-df-v1'
+
+CODEC_TAGS = {
+    CODEC_MODEL_TAG,
+    CODEC_MODEL_LIST_TAG,
+    CODEC_MODEL_DICT_TAG,
+    CODEC_DF_TAG,
+}
+
+# How many levels of related (select_related) objects to keep.
+MAX_RELATED_DEPTH = 2
+
+# zlib compression level for DataFrame bytes. Low levels are much
+# faster and still shrink our (text heavy) dataframes a lot.
+DF_COMPRESS_LEVEL = 3
+
+
+# ---------------------------------------------------------------------
+# testing
+"""
+from opencontext_py.apps.all_items.models import AllSpaceTime
+from opencontext_py.libs import cachecodec
+event_obj = AllSpaceTime.objects.select_related('item').first()
+data = cachecodec.encode_cache_value(event_obj)
+new_obj = cachecodec.decode_cache_value(data)
+new_obj.item.label == event_obj.item.label
+"""
+# ---------------------------------------------------------------------
+
+
+def get_forward_relation_field_names(model):
+    """Gets a set of forward relation (foreign key) field names"""
+    return {
+        f.name for f in model._meta.concrete_fields if f.is_relation
+    }
+
+
+def encode_model_obj(obj, depth=0):
+    """Encodes a model object as a slim tuple
+
+    :param Model obj: A Django model object
+    :param int depth: The depth of related objects encoded so far
+
+    returns a (model_label, values, related, extras) tuple
+    """
+    meta = obj._meta
+    attnames = set()
+    values = []
+    for field in meta.concrete_fields:
+        attnames.add(field.attname)
+        values.append(getattr(obj, field.attname))
+    related = []
+    if depth < MAX_RELATED_DEPTH:
+        rel_names = get_forward_relation_field_names(obj.__class__)
+        for name, rel_obj in obj._state.fields_cache.items():
+            if name not in rel_names:
+                continue
+            if rel_obj is not None:
+                rel_obj = encode_model_obj(rel_obj, depth=(depth + 1))
+            related.append((name, rel_obj,))
+    # Keep annotations (attributes that are not model fields).
+    extras = [
+        (key, value,)
+        for key, value in obj.__dict__.items()
+        if not key.startswith('_')
+        and key not in attnames
+        and not isinstance(value, Model)
+    ]
+    return (meta.label_lower, tuple(values), tuple(related), tuple(extras),)
+
+
+def decode_model_obj(data):
+    """Decodes a model object from a slim tuple
+
+    :param tuple data: A tuple made by encode_model_obj
+
+    returns a model object, or None if the model's fields
+    changed since the object got encoded
+    """
+    label, values, related, extras = data
+    model = apps.get_model(label)
+    fields = model._meta.concrete_fields
+    if len(fields) != len(values):
+        # The model changed since we cached this.
+        return None
+    obj = model.from_db(
+        DEFAULT_DB_ALIAS,
+        [f.attname for f in fields],
+        values,
+    )
+    for name, rel_data in related:
+        rel_obj = None
+        if rel_data is not None:
+            rel_obj = decode_model_obj(rel_data)
+            if rel_obj is None:
+                return None
+        model._meta.get_field(name).set_cached_value(obj, rel_obj)
+    for key, value in extras:
+        setattr(obj, key, value)
+    return obj
+
+
+def encode_df(df):
+    """Encodes a DataFrame as compressed bytes"""
+    return zlib.compress(
+        pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL),
+        DF_COMPRESS_LEVEL,
+    )
+
+
+def decode_df(data):
+    """Decodes a DataFrame from compressed bytes"""
+    return pickle.loads(zlib.decompress(data))
+
+
+def encode_cache_value(value):
+    """Encodes a value for caching, if it is a model object, a list or
+    dict of model objects, or a DataFrame
+
+    :param value: The value to cache
+
+    returns the encoded value (or the value itself, if we don't
+    encode it)
+    """
+    if isinstance(value, Model):
+        return (CODEC_MODEL_TAG, encode_model_obj(value),)
+    if isinstance(value, pd.DataFrame):
+        return (CODEC_DF_TAG, encode_df(value),)
+    if (
+        isinstance(value, list)
+        and value
+        and all(isinstance(v, Model) for v in value)
+    ):
+        return (
+            CODEC_MODEL_LIST_TAG,
+            tuple(encode_model_obj(v) for v in value),
+        )
+    if (
+        isinstance(value, dict)
+        and value
+        and all(isinstance(v, Model) for v in value.values())
+    ):
+        return (
+            CODEC_MODEL_DICT_TAG,
+            tuple((k, encode_model_obj(v),) for k, v in value.items()),
+        )
+    return value
+
+
+def decode_cache_value(value):
+    """Decodes a cached value made by encode_cache_value
+
+    :param value: The value from the cache
+
+    returns the decoded value (or the value itself, if it was
+    not encoded), or None if decoding failed
+    """
+    if (
+        not isinstance(value, tuple)
+        or len(value) != 2
+        or not isinstance(value[0], str)
+        or value[0] not in CODEC_TAGS
+    ):
+        return value
+    tag, data = value
+    try:
+        if tag == CODEC_MODEL_TAG:
+            return decode_model_obj(data)
+        if tag == CODEC_DF_TAG:
+            return decode_df(data)
+        if tag == CODEC_MODEL_LIST_TAG:
+            objs = [decode_model_obj(d) for d in data]
+            if None in objs:
+                return None
+            return objs
+        if tag == CODEC_MODEL_DICT_TAG:
+            obj_dict = {k: decode_model_obj(d) for k, d in data}
+            if None in obj_dict.values():
+                return None
+            return obj_dict
+    except Exception as e:
+        logger.info(f'Cache decode failure ({tag}): {str(e)}')
+    return None
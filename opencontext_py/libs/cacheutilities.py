@@ -1,6 +1,198 @@
 import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+
 from django.core.cache import caches
 
+from opencontext_py.libs.cachecodec import (
+    decode_cache_value,
+    encode_cache_value,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Number of keys to scan and delete in a single redis round trip when
+# clearing a cache namespace.
+NAMESPACE_SCAN_COUNT = 1000
+
+
+# ---------------------------------------------------------------------
+# NOTE: These functions batch cache lookups, so that getting many
+# objects (like the manifest or spacetime objects for a page of search
+# results) takes a single redis round trip (an MGET for reads, a
+# pipeline for writes) rather than one round trip per key.
+#
+# While a request memo is open (see request_memo_scope, used by the
+# CacheMemoMiddleware), values we get from or set in a cache also get
+# kept in an in-process dict, so repeated lookups of the same key
+# within a request don't go to redis at all. Outside of a request memo
+# (RQ workers, management commands, the shell) the memo is off, so we
+# don't keep stale objects around in long running processes.
+#
+# Memoized objects are shared within a request, so callers should not
+# modify them in place. Model objects and DataFrames get stored in
+# their compact cachecodec forms.
+# ---------------------------------------------------------------------
+_REQUEST_MEMO = threading.local()
+
+
+def get_request_memo():
+    """Gets the current thread's request memo dict, or None if there
+    is no open request memo"""
+    return getattr(_REQUEST_MEMO, 'memo', None)
+
+
+@contextmanager
+def request_memo_scope():
+    """Opens a request memo for the current thread, closing it
+    (and forgetting everything in it) at the end"""
+    prior_memo = get_request_memo()
+    if prior_memo is None:
+        _REQUEST_MEMO.memo = {}
+    try:
+        yield _REQUEST_MEMO.memo
+    finally:
+        if prior_memo is None:
+            _REQUEST_MEMO.memo = None
+
+
+def cache_get_many(cache_name, keys):
+    """Gets many objects from a cache in a single round trip
+
+    :param str cache_name: The name of the cache in settings.CACHES
+    :param list keys: List of cache keys
+
+    returns a dict of the found objects, keyed by cache key. Keys
+    that are not in the cache are missing from the output dict.
+    """
+    memo = get_request_memo()
+    output = {}
+    cache_keys = []
+    for key in keys:
+        if memo is not None and (cache_name, key,) in memo:
+            output[key] = memo[(cache_name, key,)]
+            continue
+        cache_keys.append(key)
+    # Remove duplicate keys, keeping the order.
+    cache_keys = list(dict.fromkeys(cache_keys))
+    if not cache_keys:
+        return output
+    try:
+        cache_dict = caches[cache_name].get_many(cache_keys)
+    except:
+        logger.info(f'Cache get_many failure with {len(cache_keys)} keys in {cache_name}')
+        cache_dict = {}
+    for key, obj in cache_dict.items():
+        obj = decode_cache_value(obj)
+        if obj is None:
+            continue
+        output[key] = obj
+        if memo is not None:
+            memo[(cache_name, key,)] = obj
+    return output
+
+
+def cache_set_many(cache_name, key_obj_dict, timeout=None):
+    """Sets many objects in a cache in a single round trip
+
+    :param str cache_name: The name of the cache in settings.CACHES
+    :param dict key_obj_dict: Dictionary of objects to cache, keyed
+        by cache key
+    :param int timeout: Cache timeout in seconds, None for the
+        cache's default timeout
+
+    returns True if successfully cached
+    """
+    if not key_obj_dict:
+        return True
+    memo = get_request_memo()
+    if memo is not None:
+        for key, obj in key_obj_dict.items():
+            memo[(cache_name, key,)] = obj
+    cache = caches[cache_name]
+    try:
+        encoded_dict = {
+            key: encode_cache_value(obj) for key, obj in key_obj_dict.items()
+        }
+        if timeout is None:
+            cache.set_many(encoded_dict)
+        else:
+            cache.set_many(encoded_dict, timeout=timeout)
+    except:
+        logger.info(f'Cache set_many failure with {len(key_obj_dict)} keys in {cache_name}')
+        return False
+    return True
+
+
+def cache_get(cache_name, key):
+    """Gets an object from the request memo or a cache
+
+    :param str cache_name: The name of the cache in settings.CACHES
+    :param str key: The cache key
+
+    returns the cached object or None
+    """
+    return cache_get_many(cache_name, [key]).get(key)
+
+
+def cache_set(cache_name, key, obj, timeout=None):
+    """Sets an object in a cache (and the request memo)
+
+    :param str cache_name: The name of the cache in settings.CACHES
+    :param str key: The cache key
+    :param obj: The object to cache
+    :param int timeout: Cache timeout in seconds, None for the
+        cache's default timeout
+
+    returns True if successfully cached
+    """
+    return cache_set_many(cache_name, {key: obj}, timeout=timeout)
+
+
+def get_redis_client(cache_name):
+    """Gets the raw redis client for a django redis cache, or None if
+    the cache is not redis backed"""
+    cache = caches[cache_name]
+    cache_client = getattr(cache, '_cache', None)
+    if not hasattr(cache_client, 'get_client'):
+        return None
+    return cache_client.get_client(write=True)
+
+
+def clear_cache_namespace(cache_name):
+    """Clears only the keys belonging to a cache's namespace (key prefix)
+
+    Django's RedisCache.clear() flushes the whole redis logical
+    database, which takes out every other cache that happens to
+    share that database. Instead, we scan for keys with this cache's
+    KEY_PREFIX and delete those in batches. Non-redis caches just
+    get cleared.
+
+    :param str cache_name: The name of the cache in settings.CACHES
+
+    returns the number of keys deleted (or None for non-redis caches)
+    """
+    cache = caches[cache_name]
+    key_prefix = getattr(cache, 'key_prefix', '')
+    client = get_redis_client(cache_name)
+    if client is None or not key_prefix:
+        # Not redis, or no namespace to limit the clearing to.
+        cache.clear()
+        return None
+    deleted = 0
+    batch = []
+    for key in client.scan_iter(match=f'{key_prefix}:*', count=NAMESPACE_SCAN_COUNT):
+        batch.append(key)
+        if len(batch) >= NAMESPACE_SCAN_COUNT:
+            deleted += client.delete(*batch)
+            batch = []
+    if batch:
+        deleted += client.delete(*batch)
+    logger.info(f'Cleared {deleted} keys from cache {cache_name} ({key_prefix})')
+    return deleted
+
 
 class CacheUtilities():
     """ Methods to use different caches to
@@ -0,0 +1,154 @@
+import io
+import json
+
+import pandas as pd
+
+from django.db import connection
+from django.utils import timezone
+
+
+# ---------------------------------------------------------------------
+# NOTE: These functions load rows from pandas dataframes into model
+# tables with the PostgreSQL COPY command.
+#
+# COPY streams rows to the database in one statement, which is much
+# faster than bulk_create (which builds a model object for each row,
+# and sends big multi-row INSERT statements). But COPY skips all model
+# save logic, so callers need to prepare values (like primary keys and
+# hashes) themselves. Fields missing from a dataframe get their model
+# defaults.
+# ---------------------------------------------------------------------
+
+# The string that marks a NULL value in the CSV we COPY. PostgreSQL
+# only reads an unquoted COPY_NULL as NULL, so we quote every non-null
+# value. That way a text value of \N (common in MySQL exports)
+# stays text.
+COPY_NULL = '\\N'
+
+# The number of dataframe rows to send in each COPY statement.
+COPY_CHUNK_SIZE = 50000
+
+COPY_INTEGER_FIELD_TYPES = {
+    'AutoField',
+    'BigAutoField',
+    'BigIntegerField',
+    'IntegerField',
+    'PositiveBigIntegerField',
+    'PositiveIntegerField',
+    'PositiveSmallIntegerField',
+    'SmallAutoField',
+    'SmallIntegerField',
+}
+
+
+# ---------------------------------------------------------------------
+# testing
+"""
+import pandas as pd
+from opencontext_py.apps.etl.importer.models import DataSourceRecord
+from opencontext_py.libs import dbcopy
+df = pd.DataFrame(...)
+dbcopy.copy_df_to_model_table(DataSourceRecord, df)
+"""
+# ---------------------------------------------------------------------
+
+
+def prep_copy_value(value, internal_type):
+    """Prepares a single value to COPY into a field of a given
+    internal type"""
+    if value is None:
+        return None
+    if internal_type == 'JSONField':
+        return json.dumps(value, ensure_ascii=False)
+    if internal_type in COPY_INTEGER_FIELD_TYPES:
+        return int(value)
+    return value
+
+
+def get_field_copy_default(field, now):
+    """Gets the default value for a field missing from a dataframe"""
+    if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+        return now
+    if field.has_default():
+        return field.get_default()
+    if field.null:
+        return None
+    return field.get_default()
+
+
+def make_model_copy_df(model, df):
+    """Makes a dataframe, with a column for each concrete field of a model,
+    ready to COPY into the model's table
+
+    :param Model model: A Django model class
+    :param DataFrame df: A dataframe with columns named for model field
+        attnames (like 'subject_id' for the 'subject' foreign key)
+
+    returns a dataframe with columns named for database columns
+    """
+    now = timezone.now()
+    copy_df = pd.DataFrame(index=df.index)
+    for field in model._meta.concrete_fields:
+        internal_type = field.get_internal_type()
+        if field.attname not in df.columns:
+            value = prep_copy_value(get_field_copy_default(field, now), internal_type)
+            copy_df[field.column] = pd.Series(
+                [value] * len(df.index),
+                index=df.index,
+                dtype=object,
+            )
+            continue
+        col = df[field.attname].astype(object)
+        col = col.where(col.notnull(), None)
+        if internal_type == 'JSONField' or internal_type in COPY_INTEGER_FIELD_TYPES:
+            col = col.map(lambda v: prep_copy_value(v, internal_type))
+        copy_df[field.column] = col
+    return copy_df
+
+
+def format_copy_csv_value(value):
+    """Formats a value for the CSV we COPY, quoting all non-null values
+    so they can't be confused with COPY_NULL"""
+    if value is None:
+        return COPY_NULL
+    value = str(value).replace('"', '""')
+    return f'"{value}"'
+
+
+def write_copy_csv(copy_df, buffer):
+    """Writes the rows of a dataframe prepared by make_model_copy_df
+    as CSV for COPY
+
+    :param DataFrame copy_df: A dataframe with None for NULL values
+    :param file buffer: A text buffer to write the CSV into
+    """
+    for row in copy_df.itertuples(index=False, name=None):
+        buffer.write(','.join([format_copy_csv_value(v) for v in row]))
+        buffer.write('\n')
+
+
+def copy_df_to_model_table(model, df, chunk_size=COPY_CHUNK_SIZE):
+    """COPYs the rows of a dataframe into a model's table
+
+    :param Model model: A Django model class
+    :param DataFrame df: A dataframe with columns named for model field
+        attnames. Missing fields get their model defaults.
+    :param int chunk_size: The number of rows to send in each COPY
+
+    returns the number of rows copied
+    """
+    if df is None or df.empty:
+        return 0
+    copy_df = make_model_copy_df(model, df)
+    db_cols = ', '.join([f'"{col}"' for col in copy_df.columns])
+    sql = (
+        f'COPY {model._meta.db_table} ({db_cols}) '
+        f"FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')"
+    )
+    with connection.cursor() as cursor:
+        for i in range(0, len(copy_df.index), chunk_size):
+            buffer = io.StringIO()
+            write_copy_csv(copy_df.iloc[i:(i + chunk_size)], buffer)
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+    return len(copy_df.index)
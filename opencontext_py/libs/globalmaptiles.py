@@ -65,6 +65,60 @@ Class is available under the open-source GDAL license (www.gdal.org).
 
 import math
 
+import numpy as np
+
+
+# ---------------------------------------------------------------------
+# NOTE: Quadtree (quadkey) tiles are Morton codes. Each digit of a
+# quadtree holds one bit of the tile x coordinate (digit & 1) and one
+# bit of the (top-left origin) tile y coordinate (digit & 2), so
+# interleaving the bits of the tile coordinates makes a number whose
+# base 4 digits are the quadtree. These functions work on Python ints
+# and on NumPy arrays of unsigned ints alike, for tile coordinates of
+# up to MAX_MORTON_ZOOM bits.
+# ---------------------------------------------------------------------
+MAX_MORTON_ZOOM = 32
+
+# Each hex digit of a Morton code is two quadtree digits.
+HEX_TO_QUADTREE_DIGITS = str.maketrans(
+    {
+        f'{i:x}': f'{(i >> 2)}{(i & 3)}' for i in range(16)
+    }
+)
+
+
+def spread_morton_bits(x):
+    """Spreads the (up to 32) bits of x so a 0 bit sits between each
+    of them"""
+    x = x & 0x00000000FFFFFFFF
+    x = (x | (x << 16)) & 0x0000FFFF0000FFFF
+    x = (x | (x << 8)) & 0x00FF00FF00FF00FF
+    x = (x | (x << 4)) & 0x0F0F0F0F0F0F0F0F
+    x = (x | (x << 2)) & 0x3333333333333333
+    x = (x | (x << 1)) & 0x5555555555555555
+    return x
+
+
+def compact_morton_bits(x):
+    """Undoes spread_morton_bits, getting the even bits of x"""
+    x = x & 0x5555555555555555
+    x = (x | (x >> 1)) & 0x3333333333333333
+    x = (x | (x >> 2)) & 0x0F0F0F0F0F0F0F0F
+    x = (x | (x >> 4)) & 0x00FF00FF00FF00FF
+    x = (x | (x >> 8)) & 0x0000FFFF0000FFFF
+    x = (x | (x >> 16)) & 0x00000000FFFFFFFF
+    return x
+
+
+def check_morton_zoom(zoom):
+    """Raises a ValueError for zoom levels too deep for Morton codes"""
+    if isinstance(zoom, int):
+        too_deep = zoom > MAX_MORTON_ZOOM
+    else:
+        too_deep = np.any(np.asarray(zoom) > MAX_MORTON_ZOOM)
+    if too_deep:
+        raise ValueError(f'Zoom levels deeper than {MAX_MORTON_ZOOM} are not supported')
+
 
 class GlobalMercator(object):
     """
@@ -251,38 +305,91 @@ class GlobalMercator(object):
 
     def QuadTree(self, tx, ty, zoom):
         "Converts TMS tile coordinates to Microsoft QuadTree"
-        quadKey = ""
+        if zoom < 1:
+            return ""
+        check_morton_zoom(zoom)
         ty = (2**zoom - 1) - ty
-        for i in range(zoom, 0, -1):
-            digit = 0
-            mask = 1 << (i-1)
-            if (tx & mask) != 0:
-                digit += 1
-            if (ty & mask) != 0:
-                digit += 2
-            quadKey += str(digit)
-        return quadKey
+        mask = (1 << zoom) - 1
+        code = spread_morton_bits(tx & mask) | (spread_morton_bits(ty & mask) << 1)
+        # Format the Morton code in hex, then make each hex digit
+        # into two quadtree digits.
+        quadKey = format(code, f'0{((zoom + 1) // 2)}x').translate(
+            HEX_TO_QUADTREE_DIGITS
+        )
+        return quadKey[(len(quadKey) - zoom):]
+
+    def QuadTrees(self, tx, ty, zoom):
+        """
+        Converts NumPy arrays of TMS tile coordinates (and a zoom level or an
+        array of zoom levels) to an array of Microsoft QuadTrees
+        """
+        tx = np.asarray(tx, dtype=np.int64)
+        ty = np.asarray(ty, dtype=np.int64)
+        zoom = np.broadcast_to(np.asarray(zoom, dtype=np.int64), tx.shape)
+        check_morton_zoom(zoom)
+        max_zoom = int(zoom.max()) if zoom.size else 0
+        if max_zoom < 1:
+            return np.full(tx.shape, '', dtype='<U1')
+        mask = (np.ones_like(tx) << zoom) - 1
+        ty = mask - ty
+        code = (
+            spread_morton_bits((tx & mask).astype(np.uint64))
+            | (spread_morton_bits((ty & mask).astype(np.uint64)) << np.uint64(1))
+        )
+        # Get the base 4 digits of the Morton codes, most significant
+        # first. Digits past each quadtree's zoom become null bytes,
+        # which the fixed width bytes type drops.
+        digit_index = np.arange(max_zoom, dtype=np.int64)
+        shifts = (2 * (zoom[..., np.newaxis] - 1 - digit_index)).clip(min=0)
+        digits = (code[..., np.newaxis] >> shifts.astype(np.uint64)) & np.uint64(3)
+        digits = (digits + ord('0')).astype(np.uint8)
+        digits[digit_index >= zoom[..., np.newaxis]] = 0
+        quadkeys = np.ascontiguousarray(digits).view(f'S{max_zoom}')[..., 0]
+        return quadkeys.astype(f'<U{max_zoom}')
 
     def quadtree_to_tile(self, quadtree, zoom):
         """
         Added by Eric Kansa by porting code from PHP version of Open Context
         Converts a quadtree to a tile, as an intermediary step in making lat/lon bounds
         """
-        tx = 0
-        ty = 0
-        i = zoom
-        while(i >= 1):
-            ch = quadtree[zoom - i]
-            mask = 1 << (i-1)
-            digit = int(ch)
-            if(digit & 1):
-                tx += mask
-            if(digit & 2):
-                ty += mask
-            i -= 1
+        check_morton_zoom(zoom)
+        quadtree = quadtree[:zoom]
+        if len(quadtree) < zoom or quadtree.strip('0123'):
+            raise ValueError(f'Invalid quadtree: {quadtree}')
+        code = int(quadtree, 4) if zoom else 0
+        tx = compact_morton_bits(code)
+        ty = compact_morton_bits(code >> 1)
         ty = ((1 << zoom) - 1) - ty
         return tx, ty
 
+    def quadtrees_to_tiles(self, quadtrees):
+        """
+        Converts an array (or list) of quadtrees to arrays of tile x, tile y
+        coordinates, and zoom levels (the quadtree lengths)
+        """
+        quadtrees = np.asarray(quadtrees, dtype=str)
+        # Non ASCII quadtrees raise a UnicodeEncodeError (a ValueError)
+        qt_bytes = np.ascontiguousarray(quadtrees.astype('S'))
+        width = qt_bytes.dtype.itemsize
+        chars = qt_bytes.view(np.uint8).reshape(quadtrees.shape + (width,))
+        zoom = (chars != 0).sum(axis=-1).astype(np.int64)
+        check_morton_zoom(zoom)
+        digit_index = np.arange(width, dtype=np.int64)
+        in_zoom = digit_index < zoom[..., np.newaxis]
+        if np.any(in_zoom & ((chars < ord('0')) | (chars > ord('3')))):
+            raise ValueError('Invalid quadtree(s), digits must be 0 to 3')
+        digits = np.where(in_zoom, chars.astype(np.int64) - ord('0'), 0)
+        # Add up the digits into Morton codes.
+        shifts = (2 * (zoom[..., np.newaxis] - 1 - digit_index)).clip(min=0)
+        code = (digits.astype(np.uint64) << shifts.astype(np.uint64)).sum(
+            axis=-1,
+            dtype=np.uint64,
+        )
+        tx = compact_morton_bits(code).astype(np.int64)
+        ty = compact_morton_bits(code >> np.uint64(1)).astype(np.int64)
+        ty = ((np.ones_like(ty) << zoom) - 1) - ty
+        return tx, ty, zoom
+
     def geojson_coords_to_quadtree(self, coords, zoom=False):
         """
         Added by Eric Kansa to make it easier to get
@@ -305,6 +412,30 @@ class GlobalMercator(object):
         tx, ty = self.MetersToTile(mx, my, zoom)
         return self.QuadTree(tx, ty, zoom)
 
+    def lat_lon_arrays_to_quadtrees(self, lats, lons, zoom=False):
+        """
+        Converts arrays of latitude longitude coordinates to an array of
+        quadtree tiles, with a zoom level (or an array of zoom levels)
+        """
+        if zoom is False:
+            zoom = self.MAX_ZOOM
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        zoom = np.asarray(zoom, dtype=np.int64)
+        # Same math as LatLonToMeters, MetersToTile
+        mx = lons * self.originShift / 180.0
+        with np.errstate(divide='ignore'):
+            my = np.log(np.tan((90 + lats) * np.pi / 360.0)) / (np.pi / 180.0)
+        my = my * self.originShift / 180.0
+        if not np.all(np.isfinite(mx)) or not np.all(np.isfinite(my)):
+            raise ValueError('Coordinates can not be projected to tiles')
+        res = self.initialResolution / np.power(2.0, zoom)
+        px = (mx + self.originShift) / res
+        py = (my + self.originShift) / res
+        tx = (np.ceil(px / float(self.tileSize)) - 1).astype(np.int64)
+        ty = (np.ceil(py / float(self.tileSize)) - 1).astype(np.int64)
+        return self.QuadTrees(tx, ty, zoom)
+
     def quadtree_to_lat_lon(self, quadtree):
         """
         Added by Eric Kansa by porting code from PHP version of Open Context
@@ -314,6 +445,34 @@ class GlobalMercator(object):
         tx, ty = self.quadtree_to_tile(quadtree, zoom)
         return self.TileLatLonBounds(tx, ty, zoom)
 
+    def quadtrees_to_lat_lon_arrays(self, quadtrees):
+        """
+        Converts an array (or list) of quadtree tiles to arrays of
+        bounding min_lat, min_lon, max_lat, max_lon coordinates
+        """
+        tx, ty, zoom = self.quadtrees_to_tiles(quadtrees)
+        # Same math as TileLatLonBounds, PixelsToMeters, MetersToLatLon
+        res = self.initialResolution / np.power(2.0, zoom)
+        bounds = []
+        for x, y in [(tx, ty), ((tx + 1), (ty + 1))]:
+            mx = (x * self.tileSize) * res - self.originShift
+            my = (y * self.tileSize) * res - self.originShift
+            lon = (mx / self.originShift) * 180.0
+            lat = (my / self.originShift) * 180.0
+            lat = 180 / np.pi * (2 * np.arctan(np.exp(lat * np.pi / 180.0)) - np.pi / 2.0)
+            bounds += [lat, lon]
+        return tuple(bounds)
+
+    def quadtrees_to_geojson_lon_lat_arrays(self, quadtrees):
+        """
+        Makes arrays of center lon, lat points (GeoJSON order) of an array
+        (or list) of quadtree tiles
+        """
+        min_lat, min_lon, max_lat, max_lon = self.quadtrees_to_lat_lon_arrays(
+            quadtrees
+        )
+        return (min_lon + max_lon) / 2, (min_lat + max_lat) / 2
+
     def quadtree_to_geojson_lon_lat(self, quadtree):
         """
         Makes a pair of lon, lat points in the GeoJSON order.
@@ -330,9 +489,16 @@ class GlobalMercator(object):
 
         Added by Eric Kansa
         """
+        bounds = self.quadtree_to_lat_lon(quadtree)
+        return self.lat_lon_bounds_to_geojson_poly_coords(bounds)
+
+    def lat_lon_bounds_to_geojson_poly_coords(self, bounds):
+        """
+        Transforms min_lat, min_lon, max_lat, max_lon bounds into a set
+        of coordinates for a GeoJSON polygon region.
+        """
         coords = []
         outer_coords = []
-        bounds = self.quadtree_to_lat_lon(quadtree)
         # right hand rule, counter clockwise outside
         outer_coords.append([bounds[1], bounds[0]])
         outer_coords.append([bounds[3], bounds[0]])
@@ -0,0 +1,239 @@
+import os
+import shutil
+import tempfile
+
+import duckdb
+import pandas as pd
+
+from django.db.models import Q
+
+
+# ---------------------------------------------------------------------
+# NOTE: These functions read big querysets into pandas dataframes one
+# page at a time, using keyset pagination.
+#
+# Django's Paginator makes OFFSET queries, so the database needs to
+# scan past all of the prior rows to get each page, and concatenating
+# each page onto a growing dataframe copies all of the prior rows
+# again. Instead, we get each page with a filter for rows that sort
+# after the last row of the prior page, collect the page dataframes in
+# a list, and concatenate them once. Optionally, pages can get spilled
+# to Parquet files in a temporary directory (written and read back with
+# DuckDB) so we don't keep a list of page dataframes in memory.
+#
+# The key fields must be in the values of the queryset and must end
+# with a unique field (like the primary key), so every row has a
+# distinct position. Key fields sort in ascending order, with NULLs
+# last (the PostgreSQL default).
+# ---------------------------------------------------------------------
+
+KEYSET_CHUNK_SIZE = 10000
+
+
+# ---------------------------------------------------------------------
+# testing
+"""
+from opencontext_py.apps.all_items.models import AllManifest
+from opencontext_py.libs import keysetpages
+man_qs = AllManifest.objects.filter(item_type='projects').values(
+    'uuid', 'label', 'sort',
+)
+df = keysetpages.make_df_from_keyset_pages(
+    man_qs,
+    key_fields=['sort', 'uuid'],
+    spill_dir='/tmp',
+)
+"""
+# ---------------------------------------------------------------------
+
+
+def make_keyset_after_q(key_fields, last_values):
+    """Makes a Q object to filter for rows that sort after the
+    last_values of the key_fields
+
+    :param list key_fields: The ascending order fields of a queryset,
+        ending with a unique field
+    :param list last_values: The values of the key_fields for the last
+        row of the prior page
+
+    returns a Q object
+    """
+    after_q = None
+    prior_eq_q = Q()
+    for field, value in zip(key_fields, last_values):
+        if value is None:
+            # NULLs sort last, so nothing sorts after a NULL in this
+            # field. Only NULLs sort the same.
+            field_eq_q = Q(**{f'{field}__isnull': True})
+        else:
+            field_after_q = (
+                Q(**{f'{field}__gt': value})
+                | Q(**{f'{field}__isnull': True})
+            )
+            if after_q is None:
+                after_q = prior_eq_q & field_after_q
+            else:
+                after_q |= (prior_eq_q & field_after_q)
+            field_eq_q = Q(**{field: value})
+        prior_eq_q &= field_eq_q
+    return after_q
+
+
+def iter_keyset_pages(values_qs, key_fields, chunk_size=KEYSET_CHUNK_SIZE):
+    """Yields lists of row dicts from a values queryset, one page at a
+    time, in order of the key_fields
+
+    :param QuerySet values_qs: A queryset made with .values(), with
+        all the key_fields in its values
+    :param list key_fields: The ascending order fields for the pages,
+        ending with a unique field (like the primary key)
+    :param int chunk_size: The number of rows in each page
+    """
+    values_qs = values_qs.order_by(*key_fields)
+    after_q = None
+    while True:
+        page_qs = values_qs
+        if after_q is not None:
+            page_qs = page_qs.filter(after_q)
+        page = list(page_qs[:chunk_size])
+        if not page:
+            return
+        yield page
+        if len(page) < chunk_size:
+            # This is the last page.
+            return
+        after_q = make_keyset_after_q(
+            key_fields,
+            [page[-1][field] for field in key_fields],
+        )
+
+
+def spill_page_df(con, page_df, spill_dir, page_num):
+    """Writes a page dataframe to a Parquet file
+
+    returns the path to the Parquet file
+    """
+    path = os.path.join(spill_dir, f'page-{page_num:08d}.parquet')
+    # Leave out object columns that only have missing values, because
+    # DuckDB can't tell their types. They get added back when we read.
+    null_cols = [
+        col for col in page_df.columns
+        if page_df[col].dtype == object and not page_df[col].notnull().any()
+    ]
+    if null_cols:
+        page_df = page_df.drop(columns=null_cols)
+    con.register('page_df', page_df)
+    con.execute(f"COPY page_df TO '{path}' (FORMAT PARQUET)")
+    con.unregister('page_df')
+    return path
+
+
+def read_spilled_page_dfs(con, paths, cols, object_cols):
+    """Reads spilled page Parquet files (in order) into one dataframe"""
+    paths_sql = ', '.join([f"'{path}'" for path in paths])
+    df = con.execute(
+        f"SELECT * FROM read_parquet([{paths_sql}], union_by_name=true)"
+    ).df()
+    # DuckDB gives back pd.NA for missing values, so make the columns
+    # that were objects in the pages into objects with None again.
+    for col in object_cols:
+        if col not in df.columns:
+            df[col] = None
+            continue
+        df[col] = df[col].astype(object)
+        df[col] = df[col].where(df[col].notnull(), None)
+    return df[cols]
+
+
+def make_df_from_pages(pages, drop_cols=None, spill_dir=None, print_progress=False):
+    """Makes one dataframe from an iterable of pages (lists of row dicts),
+    concatenating the pages once
+
+    :param iterable pages: An iterable of lists of row dicts
+    :param list drop_cols: Columns to drop from each page (like key
+        fields not wanted in the output)
+    :param str spill_dir: An optional directory for temporary Parquet
+        files of each page, rather than keeping pages in memory
+
+    returns a dataframe
+    """
+    page_dfs = []
+    paths = []
+    cols = []
+    object_cols = []
+    typed_cols = []
+    row_count = 0
+    con = None
+    temp_dir = None
+    try:
+        for page in pages:
+            page_df = pd.DataFrame.from_records(page)
+            if drop_cols:
+                page_df.drop(
+                    columns=[c for c in drop_cols if c in page_df.columns],
+                    inplace=True,
+                )
+            row_count += len(page_df.index)
+            if print_progress:
+                print(f'Got {row_count} rows')
+            if not spill_dir:
+                page_dfs.append(page_df)
+                continue
+            if con is None:
+                os.makedirs(spill_dir, exist_ok=True)
+                temp_dir = tempfile.mkdtemp(dir=spill_dir)
+                con = duckdb.connect(':memory:')
+                # Keep timezone aware datetimes in UTC.
+                con.execute("SET TimeZone = 'UTC'")
+            for col in page_df.columns:
+                if col not in cols:
+                    cols.append(col)
+                if page_df[col].dtype != object:
+                    if col not in typed_cols:
+                        typed_cols.append(col)
+                elif col not in object_cols:
+                    object_cols.append(col)
+            paths.append(spill_page_df(con, page_df, temp_dir, len(paths)))
+        if paths:
+            # Columns with a (non-object) type in any page, only have
+            # missing values in the pages where they are objects.
+            object_cols = [c for c in object_cols if c not in typed_cols]
+            return read_spilled_page_dfs(con, paths, cols, object_cols)
+    finally:
+        if con is not None:
+            con.close()
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    if not page_dfs:
+        return pd.DataFrame(data={})
+    return pd.concat(page_dfs, ignore_index=True)
+
+
+def make_df_from_keyset_pages(
+    values_qs,
+    key_fields,
+    chunk_size=KEYSET_CHUNK_SIZE,
+    drop_cols=None,
+    spill_dir=None,
+    print_progress=False,
+):
+    """Makes a dataframe from a values queryset, getting rows in keyset
+    paginated chunks
+
+    :param QuerySet values_qs: A queryset made with .values(), with
+        all the key_fields in its values
+    :param list key_fields: The ascending order fields for the pages,
+        ending with a unique field (like the primary key)
+    :param int chunk_size: The number of rows in each page
+    :param list drop_cols: Columns to drop from the output dataframe
+    :param str spill_dir: An optional directory for temporary Parquet
+        files of each page, rather than keeping pages in memory
+
+    returns a dataframe
+    """
+    return make_df_from_pages(
+        iter_keyset_pages(values_qs, key_fields, chunk_size=chunk_size),
+        drop_cols=drop_cols,
+        spill_dir=spill_dir,
+        print_progress=print_progress,
+    )
@@ -1,13 +1,108 @@
+import os
+import threading
+
 import pysolr
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from django.conf import settings
 
 
+# Retry Solr requests that fail with these HTTP status codes, which
+# usually mean Solr (or a proxy in front of it) is briefly unavailable.
+SOLR_RETRY_STATUS_CODES = [502, 503, 504]
+
+# Process-wide HTTP sessions (with keep-alive connection pools) and
+# pysolr.Solr objects, shared across requests. These are keyed by
+# process id, because connections must not be shared by processes
+# forked after they were opened (as in parallel indexing).
+_SOLR_SESSIONS = {}
+_SOLR_CONNECTIONS = {}
+_SOLR_LOCK = threading.Lock()
+
+
+def make_solr_session(
+    pool_connections=settings.SOLR_POOL_CONNECTIONS,
+    pool_maxsize=settings.SOLR_POOL_MAXSIZE,
+    max_retries=settings.SOLR_MAX_RETRIES,
+    backoff_factor=settings.SOLR_RETRY_BACKOFF,
+):
+    """Makes a requests session with a pool of keep-alive connections
+    and retries with backoff
+
+    :param int pool_connections: Number of (host) connection pools
+    :param int pool_maxsize: Maximum number of connections kept alive
+        in a pool
+    :param int max_retries: Maximum number of retries for a request
+    :param float backoff_factor: Backoff factor for sleeping between
+        retries (backoff_factor * (2 ** (retry number - 1)) seconds)
+    """
+    retry_args = {
+        'total': max_retries,
+        'connect': max_retries,
+        # Don't retry read errors (like read timeouts) after a request
+        # got sent. A slow query would take several times the timeout,
+        # and an overloaded Solr would get more copies of a heavy query.
+        'read': 0,
+        'backoff_factor': backoff_factor,
+        'status_forcelist': SOLR_RETRY_STATUS_CODES,
+        # Let pysolr raise its usual errors when we run out of retries.
+        'raise_on_status': False,
+    }
+    # NOTE: Searches with long queries and index updates get POSTed.
+    # Solr updates are idempotent (documents get replaced by id), so
+    # it's OK to retry them.
+    try:
+        retry = Retry(allowed_methods=['GET', 'POST'], **retry_args)
+    except TypeError:
+        # Older urllib3
+        retry = Retry(method_whitelist=['GET', 'POST'], **retry_args)
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_solr_session():
+    """Gets this process' shared requests session for Solr"""
+    pid = os.getpid()
+    session = _SOLR_SESSIONS.get(pid)
+    if session is not None:
+        return session
+    with _SOLR_LOCK:
+        session = _SOLR_SESSIONS.get(pid)
+        if session is None:
+            # Forget sessions inherited from a parent process.
+            _SOLR_SESSIONS.clear()
+            _SOLR_CONNECTIONS.clear()
+            session = make_solr_session()
+            _SOLR_SESSIONS[pid] = session
+    return session
+
+
+def reset_solr_connections():
+    """Closes and forgets this process' shared Solr connections"""
+    with _SOLR_LOCK:
+        session = _SOLR_SESSIONS.pop(os.getpid(), None)
+        _SOLR_CONNECTIONS.clear()
+    if session is not None:
+        session.close()
+
 
 class SolrClient():
     '''
     Provides a connection to our Solr instance. This is useful for both
     crawling and searching.
+
+    The pysolr.Solr objects share a process-wide HTTP session, so
+    making a new SolrClient is cheap and does not open new
+    connections. Pass a different timeout for a per-call timeout.
     '''
     def __init__(
         self,
@@ -21,7 +116,7 @@ class SolrClient():
         auth=None,
         use_test_solr=False,
     ):
-        solr_connection_url = self.make_solr_url( 
+        solr_connection_url = self.make_solr_url(
             solr_host=solr_host,
             solr_port=solr_port,
             solr_collection=solr_collection,
@@ -29,18 +124,52 @@ class SolrClient():
         )
         try:
             # print(solr_connection_string)
-            self.solr = pysolr.Solr(
+            self.solr = self.get_shared_solr(
                 solr_connection_url,
                 search_handler=search_handler,
-                always_commit=always_commit, 
-                timeout=timeout, 
+                always_commit=always_commit,
+                timeout=timeout,
                 auth=auth
             )
         except:
             print(f'Error: Could not connect to Solr at: {solr_connection_url}')
             self.solr = None
 
-    def make_solr_url(self, 
+    def get_shared_solr(
+        self,
+        solr_connection_url,
+        search_handler=None,
+        always_commit=False,
+        timeout=30,
+        auth=None,
+    ):
+        """Gets a pysolr.Solr object that uses this process' shared
+        HTTP session"""
+        session = get_solr_session()
+        solr_args = {
+            'search_handler': search_handler,
+            'always_commit': always_commit,
+            'timeout': timeout,
+            'auth': auth,
+            'session': session,
+        }
+        if auth is not None:
+            # Don't keep auth credentials around in the shared dict.
+            return pysolr.Solr(solr_connection_url, **solr_args)
+        key = (
+            os.getpid(),
+            solr_connection_url,
+            search_handler,
+            always_commit,
+            timeout,
+        )
+        solr = _SOLR_CONNECTIONS.get(key)
+        if solr is None:
+            solr = pysolr.Solr(solr_connection_url, **solr_args)
+            _SOLR_CONNECTIONS[key] = solr
+        return solr
+
+    def make_solr_url(self,
         solr_host=settings.SOLR_HOST,
         solr_port=settings.SOLR_PORT,
         solr_collection=settings.SOLR_COLLECTION,
@@ -59,4 +188,3 @@ class SolrClient():
         else:
             solr_connection_url = f'{solr_host}:{str(solr_port)}/solr/{solr_collection}'
         return solr_connection_url
-        
\ No newline at end of file
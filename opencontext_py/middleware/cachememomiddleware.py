@@ -0,0 +1,18 @@
+from opencontext_py.libs.cacheutilities import request_memo_scope
+
+
+class CacheMemoMiddleware(object):
+
+    """ Opens an in-process memo of cached objects for each request,
+        so repeated cache lookups of the same keys within a request
+        don't make more round trips to redis
+
+    """
+
+    def __init__(self, get_response=None):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with request_memo_scope():
+            response = self.get_response(request)
+        return response
@@ -60,6 +60,14 @@ else:
     SOLR_PORT_TEST = SOLR_PORT_TEST
     SOLR_COLLECTION_TEST = SOLR_COLLECTION_TEST
 
+# Solr HTTP connection pooling. Each process shares keep-alive HTTP
+# sessions to Solr across requests, with retries (and backoff) for
+# connection errors and Solr being temporarily unavailable.
+SOLR_POOL_CONNECTIONS = secrets.get('SOLR_POOL_CONNECTIONS', 4)
+SOLR_POOL_MAXSIZE = secrets.get('SOLR_POOL_MAXSIZE', 20)
+SOLR_MAX_RETRIES = secrets.get('SOLR_MAX_RETRIES', 3)
+SOLR_RETRY_BACKOFF = secrets.get('SOLR_RETRY_BACKOFF', 0.3)
+
 # SECURITY WARNING: don't run with debug turned on in production!
 if get_secret('DEBUG') == 1:
     DEBUG = True
@@ -264,6 +272,8 @@ MIDDLEWARE = (
     'django.middleware.security.SecurityMiddleware',
     # User agent
     'django_user_agents.middleware.UserAgentMiddleware',
+    # Memo of cached objects for each request
+    'opencontext_py.middleware.cachememomiddleware.CacheMemoMiddleware',
     # Record requests
     # 'opencontext_py.middleware.requestmiddleware.RequestMiddleware',
 )
@@ -337,6 +347,14 @@ redis_split = REDIS_HOST_PORT.split(':')
 REDIS_HOST = redis_split[0]
 REDIS_PORT = redis_split[1]
 
+# Redis logical databases. The RQ queues use database 0. Each of the
+# redis caches gets its own logical database (and key prefix) so
+# clearing one cache (say, the search cache after reindexing) does not
+# flush the expensive project context dataframes in another.
+REDIS_CACHE_DB = secrets.get('REDIS_CACHE_DB', 1)
+REDIS_SEARCH_CACHE_DB = secrets.get('REDIS_SEARCH_CACHE_DB', 2)
+REDIS_CONTEXT_CACHE_DB = secrets.get('REDIS_CONTEXT_CACHE_DB', 3)
+
 if DEBUG:
     # Short caching for debugging
     FILE_CACHE_TIMEOUT = (60 * 5)
@@ -351,17 +369,20 @@ if DEBUG:
         },
         'redis': {
             "BACKEND": "django.core.cache.backends.redis.RedisCache",
-            'LOCATION': f'redis://{REDIS_HOST_PORT}/1',
+            'LOCATION': f'redis://{REDIS_HOST_PORT}/{REDIS_CACHE_DB}',
+            'KEY_PREFIX': 'oc-redis',
             'TIMEOUT': (60 * 5),  # 2 minute for cache
         },
         'redis_search': {
             "BACKEND": "django.core.cache.backends.redis.RedisCache",
-            'LOCATION': f'redis://{REDIS_HOST_PORT}/1',
+            'LOCATION': f'redis://{REDIS_HOST_PORT}/{REDIS_SEARCH_CACHE_DB}',
+            'KEY_PREFIX': 'oc-search',
             'TIMEOUT': (60 * 5),  # 2 minute for cache
         },
         'redis_context': {
             "BACKEND": "django.core.cache.backends.redis.RedisCache",
-            'LOCATION': f'redis://{REDIS_HOST_PORT}/1',
+            'LOCATION': f'redis://{REDIS_HOST_PORT}/{REDIS_CONTEXT_CACHE_DB}',
+            'KEY_PREFIX': 'oc-context',
             'TIMEOUT': (60 * 5),  # 2 minute for cache
         },
         'file': {
@@ -393,17 +414,20 @@ else:
         },
         'redis': {
             "BACKEND": "django.core.cache.backends.redis.RedisCache",
-            'LOCATION': f'redis://{REDIS_HOST_PORT}/1',
+            'LOCATION': f'redis://{REDIS_HOST_PORT}/{REDIS_CACHE_DB}',
+            'KEY_PREFIX': 'oc-redis',
             'TIMEOUT': (60 * 60 * 4),  # 4 hours for cache
         },
         'redis_search': {
             "BACKEND": "django.core.cache.backends.redis.RedisCache",
-            'LOCATION': f'redis://{REDIS_HOST_PORT}/1',
+            'LOCATION': f'redis://{REDIS_HOST_PORT}/{REDIS_SEARCH_CACHE_DB}',
+            'KEY_PREFIX': 'oc-search',
             'TIMEOUT': (60 * 60 * 4),  # 4 hours for cache
         },
         'redis_context': {
            "BACKEND": "django.core.cache.backends.redis.RedisCache",
-            'LOCATION': f'redis://{REDIS_HOST_PORT}/1',
+            'LOCATION': f'redis://{REDIS_HOST_PORT}/{REDIS_CONTEXT_CACHE_DB}',
+            'KEY_PREFIX': 'oc-context',
             'TIMEOUT': (7 * 24 * 60 * 60),  # 7 days for cache
         },
         'file': {
@@ -497,6 +521,26 @@ REFINE_URL = secrets.get(
     'http://127.0.0.1:3333', # The default.
 )
 
+# A directory for Parquet snapshots of ETL data source records, to
+# speed up making dataframes from data sources. None (the default)
+# means we don't use snapshots.
+ETL_DF_SNAPSHOT_PATH = secrets.get('ETL_DF_SNAPSHOT_PATH')
+
+# ----------------------------
+# TABLE EXPORT SETTINGS
+# ----------------------------
+# A local directory (shared by the web app and the rq workers) for the
+# (Parquet) dataframes made in the stages of table exports. None (the
+# default) means we keep these dataframes in the redis cache.
+EXPORT_STAGE_STORE_PATH = secrets.get('EXPORT_STAGE_STORE_PATH')
+
+# ----------------------------
+# SITEMAP SETTINGS
+# ----------------------------
+# A directory for prebuilt (gzipped) sitemap files. None (the default)
+# means we make sitemaps from the database on each request.
+SITEMAP_FILES_PATH = secrets.get('SITEMAP_FILES_PATH')
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/1.6/howto/static-files/
 if DEBUG:
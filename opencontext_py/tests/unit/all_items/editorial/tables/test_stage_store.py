@@ -0,0 +1,57 @@
+import pytest
+import logging
+import uuid as GenUUID
+
+import numpy as np
+import pandas as pd
+
+from opencontext_py.apps.all_items.editorial.tables import stage_store
+
+
+logger = logging.getLogger("tests-unit-logger")
+
+
+def make_stage_df():
+    """Makes a dataframe like those made in export stages"""
+    df = pd.DataFrame(
+        data={
+            'subject_id': [GenUUID.uuid4(), GenUUID.uuid4(), None],
+            'label': ['a', None, 'c'],
+            'note': [None, None, None],
+            'sort': [1.5, np.nan, 3.0],
+            'count': [1, 2, 3],
+            'published': pd.to_datetime(
+                ['2020-01-01', '2021-06-01', None],
+                utc=True,
+            ),
+        },
+        index=[10, 5, 7],
+    )
+    df.index.name = 'row'
+    return df
+
+
+def test_stage_df_parquet_round_trip(tmp_path):
+    """Tests saving a dataframe to a Parquet file and loading it"""
+    df = make_stage_df()
+    meta = stage_store.get_stage_df_parquet_meta(df)
+    assert meta['uuid_cols'] == ['subject_id']
+    assert meta['null_cols'] == ['note']
+    meta['columns'] = df.columns.tolist()
+    file_path = str(tmp_path / 'df.parquet')
+    stage_store.write_stage_df_parquet(df, file_path, meta)
+    df_l = stage_store.read_stage_df_parquet(file_path, meta)
+    pd.testing.assert_frame_equal(df_l, df)
+    assert df_l['label'].isnull().tolist() == [False, True, False]
+    assert df_l['subject_id'].tolist() == df['subject_id'].tolist()
+
+
+def test_stage_df_parquet_meta_needs_pickle():
+    """Tests finding dataframes that don't fit in Parquet files"""
+    df = make_stage_df()
+    assert stage_store.get_stage_df_parquet_meta(df.reset_index()) is not None
+    df['mixed'] = ['a', 1, None]
+    assert stage_store.get_stage_df_parquet_meta(df) is None
+    df = make_stage_df()
+    df['list'] = [['a'], None, ['b', 'c']]
+    assert stage_store.get_stage_df_parquet_meta(df) is None
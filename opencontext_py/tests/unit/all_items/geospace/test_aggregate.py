@@ -0,0 +1,85 @@
+import pytest
+import logging
+
+import numpy as np
+import pandas as pd
+
+from scipy.cluster.hierarchy import linkage, fcluster
+
+from opencontext_py.apps.all_items.geospace import aggregate as geo_agg
+
+
+logger = logging.getLogger("tests-unit-logger")
+
+
+def make_clumps_df(points_per_clump=500):
+    """Makes a dataframe of points in 3 clumps, far apart"""
+    rng = np.random.default_rng(7)
+    centers = [(35.0, 32.0), (23.0, 38.0), (44.0, 41.0)]
+    return pd.DataFrame(
+        data=np.concatenate(
+            [
+                rng.normal(loc=c, scale=0.2, size=(points_per_clump, 2))
+                for c in centers
+            ]
+        ),
+        columns=['longitude', 'latitude'],
+    )
+
+
+def test_check_region_overlaps():
+    """Tests checking overlaps of region bounding boxes"""
+    region_dicts = [
+        {'id': 1, 'min_lon': 0, 'min_lat': 0, 'max_lon': 2, 'max_lat': 2},
+        {'id': 2, 'min_lon': 1, 'min_lat': 1, 'max_lon': 3, 'max_lat': 3},
+        {'id': 3, 'min_lon': 10, 'min_lat': 10, 'max_lon': 11, 'max_lat': 11},
+    ]
+    assert geo_agg.check_region_overlaps(region_dicts) == [{1, 2}]
+    assert geo_agg.check_region_overlaps(region_dicts[1:]) == []
+
+
+def test_make_weighted_points_df():
+    """Tests deduplicating and binning points into weighted points"""
+    df = make_clumps_df()
+    df = pd.concat([df, df], ignore_index=True)
+    df_w = geo_agg.make_weighted_points_df(df)
+    assert len(df_w.index) == 1500
+    assert df_w['count_points'].sum() == 3000
+    df_w = geo_agg.make_weighted_points_df(df, max_points=100)
+    assert len(df_w.index) <= 100
+    assert df_w['count_points'].sum() == 3000
+    # The grid cells keep the bounds of all the points.
+    assert df_w['min_lon'].min() == df['longitude'].min()
+    assert df_w['max_lat'].max() == df['latitude'].max()
+
+
+def test_make_weighted_ward_linkage():
+    """Tests that weighted points cluster like the same points repeated
+    by their weights"""
+    rng = np.random.default_rng(3)
+    points = rng.normal(scale=4.0, size=(60, 2))
+    weights = rng.integers(1, 5, size=60)
+    link_matrix = geo_agg.make_weighted_ward_linkage(points, weights)
+    rep_link_matrix = linkage(np.repeat(points, weights, axis=0), method='ward')
+    rep_index = np.repeat(np.arange(60), weights)
+    for cluster_count in [2, 4, 7]:
+        cluster_ids = fcluster(link_matrix, cluster_count, criterion='maxclust')
+        rep_cluster_ids = fcluster(rep_link_matrix, cluster_count, criterion='maxclust')
+        # The same partitions, even if numbered differently.
+        pairs = set(zip(cluster_ids[rep_index], rep_cluster_ids))
+        assert len(pairs) == len(set(rep_cluster_ids)) == cluster_count
+
+
+@pytest.mark.parametrize('max_points', [geo_agg.MAX_HIERARCHICAL_POINTS, 100])
+def test_cluster_geo_centroids_hierarchical(max_points):
+    """Tests clustering points into non-overlapping regions"""
+    df = make_clumps_df()
+    region_dicts = geo_agg.cluster_geo_centroids_hierarchical(
+        df,
+        max_points=max_points,
+    )
+    assert geo_agg.check_region_overlaps(region_dicts) == []
+    assert sum([r['count_points'] for r in region_dicts]) == 1500
+    assert 3 <= len(region_dicts) <= geo_agg.MAX_CLUSTERS
+    # The default cluster method does the same.
+    assert geo_agg.cluster_geo_centroids(df) is not None
@@ -0,0 +1,48 @@
+import pytest
+import logging
+import time
+from types import SimpleNamespace
+
+from django.core.cache.backends.locmem import LocMemCache
+
+from opencontext_py.apps.all_items import configs
+from opencontext_py.apps.all_items.representations import rep_cache
+
+
+logger = logging.getLogger("tests-unit-logger")
+
+
+def test_item_revision_stamps(monkeypatch):
+    """Tests that item, project, and global revisions change the
+    revision stamp of an item"""
+    cache = LocMemCache('test-rep-cache', {})
+    monkeypatch.setattr(rep_cache, 'caches', {rep_cache.REP_CACHE_NAME: cache})
+    item_man_obj = SimpleNamespace(
+        uuid='item-a',
+        project_id='proj-a',
+        item_type='subjects',
+        updated=None,
+    )
+    other_man_obj = SimpleNamespace(
+        uuid='item-b',
+        project_id='proj-b',
+        item_type='types',
+        updated=None,
+    )
+    oc_man_obj = SimpleNamespace(
+        uuid='pred-c',
+        project_id=configs.OPEN_CONTEXT_PROJ_UUID,
+        item_type='predicates',
+        updated=None,
+    )
+    stamps = [rep_cache.make_item_revision_stamp(item_man_obj)]
+    for bump_man_obj in [item_man_obj, other_man_obj, oc_man_obj]:
+        # Revisions are in milliseconds.
+        time.sleep(0.002)
+        rep_cache.bump_rep_revisions_for_items([bump_man_obj])
+        stamps.append(rep_cache.make_item_revision_stamp(item_man_obj))
+    # Edits of the item itself, and of shared Open Context items,
+    # change the stamp. Edits in other projects don't.
+    assert stamps[1] != stamps[0]
+    assert stamps[2] == stamps[1]
+    assert stamps[3] != stamps[2]
@@ -0,0 +1,109 @@
+import pytest
+import io
+import logging
+
+import pandas as pd
+
+from opencontext_py.apps.all_items import configs
+from opencontext_py.apps.all_items.models import AllAssertion
+from opencontext_py.apps.etl.importer import utilities as etl_utils
+from opencontext_py.apps.etl.importer.transforms import utilities as trans_utils
+from opencontext_py.libs import dbcopy
+
+
+logger = logging.getLogger("tests-unit-logger")
+
+
+TEST_SUBJECT_UUID = '9b3c4e7e-0a6b-4c9f-8b3e-111111111111'
+TEST_PREDICATE_UUID = '5e3c4e7e-0a6b-4c9f-8b3e-222222222222'
+
+# Tuples of (literal attribute, object value) for test assertions.
+TEST_ASSERTION_OBJECTS = [
+    ('object_id', configs.DEFAULT_CLASS_UUID,),
+    ('obj_string', 'A string',),
+    ('obj_boolean', False,),
+    ('obj_integer', 5,),
+    ('obj_double', 2.5,),
+    (
+        'obj_datetime',
+        etl_utils.validate_transform_data_type_value('2020-01-05', 'xsd:date'),
+    ),
+]
+
+# Tuples of (data_type, raw values, expected values).
+TESTS_VALIDATE_SERIES = [
+    (
+        'xsd:integer',
+        ['1', '1.9', '-3.9', '1_000', 'nan', 'abc', ''],
+        [1, 1, -3, 1000, None, None, None],
+    ),
+    (
+        'xsd:double',
+        ['1', '2.5', '1e3', 'inf', 'abc', ''],
+        [1.0, 2.5, 1000.0, None, None, None],
+    ),
+    (
+        'xsd:boolean',
+        ['Yes', 'f', '1', 'maybe', ''],
+        [True, False, True, None, None],
+    ),
+    (
+        'xsd:string',
+        [' a ', 'b', '  '],
+        ['a', 'b', None],
+    ),
+]
+
+
+def test_make_df_assertion_uuids():
+    """Tests that batch assertion uuids match the model's uuids"""
+    rows = []
+    for attrib, value in TEST_ASSERTION_OBJECTS:
+        rows.append(
+            {
+                'subject_id': TEST_SUBJECT_UUID,
+                'predicate_id': TEST_PREDICATE_UUID,
+                'observation_id': configs.DEFAULT_OBS_UUID,
+                'event_id': configs.DEFAULT_EVENT_UUID,
+                'attribute_group_id': configs.DEFAULT_ATTRIBUTE_GROUP_UUID,
+                'language_id': configs.DEFAULT_LANG_UUID,
+                attrib: value,
+            }
+        )
+    assert_df = pd.DataFrame(rows).astype(object)
+    assert_df = assert_df.where(assert_df.notnull(), None)
+    uuids = trans_utils.make_df_assertion_uuids(assert_df).tolist()
+    expected = [AllAssertion().primary_key_create(**row) for row in rows]
+    assert uuids == expected
+    assert all(uuid.startswith(TEST_SUBJECT_UUID.split('-')[0]) for uuid in uuids)
+
+
+@pytest.mark.parametrize("data_type, raw_values, expected", TESTS_VALIDATE_SERIES)
+def test_validate_transform_data_type_series(data_type, raw_values, expected):
+    """Tests vectorized validation of literal values"""
+    vals = etl_utils.validate_transform_data_type_series(
+        pd.Series(raw_values),
+        data_type,
+    )
+    assert vals.tolist() == expected
+
+
+def test_copy_assertion_null_marker_obj_string():
+    """Tests that an obj_string matching the COPY null marker gets
+    copied as a string, not as NULL"""
+    rows = []
+    for obj_string in ['\\N', None]:
+        rows.append(
+            {
+                'uuid': TEST_SUBJECT_UUID,
+                'subject_id': TEST_SUBJECT_UUID,
+                'predicate_id': TEST_PREDICATE_UUID,
+                'obj_string': obj_string,
+            }
+        )
+    copy_df = dbcopy.make_model_copy_df(AllAssertion, pd.DataFrame(rows))
+    obj_strings = copy_df['obj_string'].tolist()
+    assert obj_strings == ['\\N', None]
+    buffer = io.StringIO()
+    dbcopy.write_copy_csv(copy_df[['obj_string']], buffer)
+    assert buffer.getvalue() == '"\\N"\n\\N\n'
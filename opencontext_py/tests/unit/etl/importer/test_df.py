@@ -0,0 +1,85 @@
+import pytest
+import logging
+
+import pandas as pd
+
+from opencontext_py.apps.etl.importer import df as etl_df
+from opencontext_py.apps.etl.importer.models import (
+    DataSource,
+    DataSourceRecord,
+)
+
+
+logger = logging.getLogger("tests-unit-logger")
+
+
+TEST_DATA_SOURCE_UUID = '9b3c4e7e-0a6b-4c9f-8b3e-111111111111'
+
+
+def test_make_data_source_records_df():
+    """Tests melting a dataframe into DataSourceRecords"""
+    ds_source = DataSource(uuid=TEST_DATA_SOURCE_UUID)
+    df = pd.DataFrame(
+        {
+            'Site': ['A', 'B', 'C'],
+            'Area': ['1', '', '3'],
+            'Note': ['', 'ok', ''],
+        }
+    )
+    rec_df = etl_df.make_data_source_records_df(df.iloc[1:], ds_source)
+    # Empty cells are skipped, rows are numbered from 1.
+    assert list(zip(rec_df['row_num'], rec_df['field_num'], rec_df['record'])) == [
+        (2, 1, 'B'),
+        (2, 3, 'ok'),
+        (3, 1, 'C'),
+        (3, 2, '3'),
+    ]
+    expected_uuids = [
+        DataSourceRecord().primary_key_create(
+            data_source_id=TEST_DATA_SOURCE_UUID,
+            row_num=row_num,
+            field_num=field_num,
+        )
+        for row_num, field_num in zip(rec_df['row_num'], rec_df['field_num'])
+    ]
+    assert rec_df['uuid'].tolist() == expected_uuids
+
+
+def test_make_wide_df_from_records_long_df():
+    """Tests pivoting long format records into a wide dataframe"""
+    long_df = pd.DataFrame.from_records(
+        [
+            (2, 1, 'a', None, 'item-a'),
+            (1, 1, 'b', 'context-b', None),
+            (1, 2, 'x', None, None),
+            (2, 3, 'z', None, None),
+        ],
+        columns=etl_df.RECORDS_LONG_DF_COLS,
+    )
+    df = etl_df.make_wide_df_from_records_long_df(
+        long_df,
+        field_nums=[1, 2],
+        include_uuid_cols=True,
+        include_error_cols=True,
+    )
+    assert df.columns.tolist() == [
+        'row_num',
+        '1_context', '1_item', '1_col',
+        '2_context', '2_item', '2_col',
+        '3_context', '3_item', '3_col',
+        '1_reconcile_errors', '2_reconcile_errors', '3_reconcile_errors',
+    ]
+    assert df['row_num'].tolist() == [1, 2]
+    assert df['1_col'].tolist() == ['b', 'a']
+    # Missing records are empty strings, missing uuids are None.
+    assert df['2_col'].tolist() == ['x', '']
+    assert df['1_context'].tolist() == ['context-b', None]
+    assert df['1_item'].tolist() == [None, 'item-a']
+
+    # No records makes an empty dataframe (without a spurious empty row)
+    df = etl_df.make_wide_df_from_records_long_df(
+        long_df.iloc[0:0],
+        field_nums=[1, 2],
+    )
+    assert df.empty
+    assert df.columns.tolist() == ['row_num', '1_col', '2_col']
@@ -0,0 +1,41 @@
+import pytest
+import logging
+
+import pandas as pd
+
+from opencontext_py.apps.etl.importer.transforms import reconcile
+
+
+logger = logging.getLogger("tests-unit-logger")
+
+
+TEST_UUID = '9b3c4e7e-0a6b-4c9f-8b3e-111111111111'
+
+
+def test_make_df_reconcile_groups():
+    """Tests grouping rows by distinct record, uuid, and other id"""
+    df = pd.DataFrame(
+        {
+            'row_num': [1, 2, 3, 4, 5, 6, 7],
+            '1_col': ['A', 'B', 'A', 'A', '', 'B', 'C'],
+            '2_col': ['', '', TEST_UUID.upper(), TEST_UUID, '', 'bad', ''],
+            '3_col': ['', 'x', '', '', '', 'x', None],
+        },
+        index=range(10, 17),
+    )
+    groups_df, row_groups = reconcile.make_df_reconcile_groups(
+        df,
+        df.index,
+        '1_col',
+        col_uuid='2_col',
+        col_other_id='3_col',
+    )
+    # Groups are in order of first appearance.
+    assert groups_df['raw_column_record'].tolist() == ['A', 'B', 'A', '', 'C']
+    assert groups_df['record_uuid'].tolist()[2] == TEST_UUID
+    assert pd.isnull(groups_df['record_uuid'].tolist()[0])
+    assert groups_df['record_other_id'].tolist()[1] == 'x'
+    # Upper and lower case versions of the same uuid group together,
+    # and invalid uuids don't make new groups.
+    assert row_groups.tolist() == [0, 1, 2, 2, 3, 1, 4]
+    assert row_groups.index.tolist() == df.index.tolist()
@@ -0,0 +1,60 @@
+import pytest
+import logging
+
+import pandas as pd
+
+from opencontext_py.apps.all_items import configs
+from opencontext_py.apps.all_items.models import AllManifest
+from opencontext_py.libs import cachecodec
+
+
+logger = logging.getLogger("tests-unit-logger")
+
+
+def test_model_obj_round_trip():
+    """Tests encoding and decoding model objects with related objects"""
+    man_obj = AllManifest(**configs.DEFAULT_CLASS_DICT)
+    context_obj = AllManifest(**configs.DEFAULT_EVENT_DICT)
+    # Act like we got this with select_related('context')
+    AllManifest._meta.get_field('context').set_cached_value(man_obj, context_obj)
+    man_obj.item_description = 'An annotation'
+
+    data = cachecodec.encode_cache_value(man_obj)
+    assert data[0] == cachecodec.CODEC_MODEL_TAG
+    new_obj = cachecodec.decode_cache_value(data)
+    assert new_obj.uuid == man_obj.uuid
+    assert new_obj.label == man_obj.label
+    assert new_obj.meta_json == man_obj.meta_json
+    assert new_obj.item_description == 'An annotation'
+    assert AllManifest._meta.get_field('context').is_cached(new_obj)
+    assert new_obj.context.label == context_obj.label
+
+    objs = cachecodec.decode_cache_value(
+        cachecodec.encode_cache_value([man_obj, context_obj])
+    )
+    assert [o.uuid for o in objs] == [man_obj.uuid, context_obj.uuid]
+
+
+def test_df_round_trip():
+    """Tests encoding and decoding DataFrames"""
+    df = pd.DataFrame(
+        {
+            'facet_field': ['a', 'b', 'c'],
+            'facet_count': [1, 2, 3],
+            'meta_json': [{}, {'sort': 1}, None],
+        }
+    )
+    data = cachecodec.encode_cache_value(df)
+    assert data[0] == cachecodec.CODEC_DF_TAG
+    assert isinstance(data[1], bytes)
+    new_df = cachecodec.decode_cache_value(data)
+    assert new_df.equals(df)
+
+
+def test_pass_through_values():
+    """Tests that values without a codec pass through unchanged"""
+    for value in [None, [], {}, 'a', ('a', 'b',), {'a': 1}, [1, 2]]:
+        assert cachecodec.encode_cache_value(value) == value
+        assert cachecodec.decode_cache_value(value) == value
+    # A bad encoded value decodes as a cache miss.
+    assert cachecodec.decode_cache_value((cachecodec.CODEC_DF_TAG, b'bad',)) is None
@@ -0,0 +1,59 @@
+import pytest
+import logging
+
+from opencontext_py.libs import cacheutilities
+
+
+logger = logging.getLogger("tests-unit-logger")
+
+
+class CountingCache():
+    """A dict backed cache that counts round trips"""
+    def __init__(self):
+        self.data = {}
+        self.round_trips = 0
+
+    def get_many(self, keys):
+        self.round_trips += 1
+        return {k: self.data[k] for k in keys if k in self.data}
+
+    def set_many(self, key_obj_dict, timeout=None):
+        self.round_trips += 1
+        self.data.update(key_obj_dict)
+
+
+@pytest.fixture
+def counting_cache(monkeypatch):
+    cache = CountingCache()
+    monkeypatch.setattr(cacheutilities, 'caches', {'redis': cache})
+    return cache
+
+
+def test_cache_get_set_many(counting_cache):
+    """Tests getting and setting many keys in single round trips"""
+    assert cacheutilities.cache_set_many('redis', {'a': 1, 'b': 2})
+    assert counting_cache.round_trips == 1
+    found = cacheutilities.cache_get_many('redis', ['a', 'b', 'c', 'a'])
+    assert found == {'a': 1, 'b': 2}
+    assert counting_cache.round_trips == 2
+    # Without a request memo, every lookup goes to the cache.
+    assert cacheutilities.cache_get('redis', 'a') == 1
+    assert counting_cache.round_trips == 3
+
+
+def test_request_memo_scope(counting_cache):
+    """Tests that the request memo skips repeated cache lookups"""
+    counting_cache.data = {'a': 1, 'b': 2}
+    with cacheutilities.request_memo_scope():
+        cacheutilities.cache_get_many('redis', ['a', 'b'])
+        assert counting_cache.round_trips == 1
+        assert cacheutilities.cache_get_many('redis', ['a', 'b']) == {'a': 1, 'b': 2}
+        assert counting_cache.round_trips == 1
+        # Values we set are memoized too.
+        cacheutilities.cache_set('redis', 'c', 3)
+        assert cacheutilities.cache_get('redis', 'c') == 3
+        assert counting_cache.round_trips == 2
+    # The memo is forgotten after the scope.
+    assert cacheutilities.get_request_memo() is None
+    cacheutilities.cache_get('redis', 'a')
+    assert counting_cache.round_trips == 3
@@ -0,0 +1,30 @@
+import pytest
+import io
+import logging
+
+import pandas as pd
+
+from opencontext_py.libs import dbcopy
+
+
+logger = logging.getLogger("tests-unit-logger")
+
+
+def test_write_copy_csv_null_marker_text():
+    """Tests that text matching the COPY null marker stays text"""
+    copy_df = pd.DataFrame(
+        {
+            'record': ['\\N', 'say "hi"', 'a,b\nc'],
+            'row_num': [1, 2, None],
+        },
+        dtype=object,
+    )
+    buffer = io.StringIO()
+    dbcopy.write_copy_csv(copy_df, buffer)
+    lines = buffer.getvalue()
+    # Only real NULLs get the unquoted null marker.
+    assert lines == (
+        '"\\N","1"\n'
+        '"say ""hi""","2"\n'
+        '"a,b\nc",\\N\n'
+    )
@@ -0,0 +1,62 @@
+import pytest
+
+import logging
+
+import numpy as np
+
+from opencontext_py.libs.globalmaptiles import GlobalMercator
+
+
+logger = logging.getLogger("tests-unit-logger")
+
+
+TEST_LAT_LON_ZOOM_TILES = [
+    # Tuples of (lat, lon, zoom, expected_quadtree)
+    (37.97, 23.72, 20, '12210020330113300001',),
+    (-33.86, 151.21, 12, '311230133002',),
+    (41.89, -87.62, 1, '0',),
+    (0.5, -0.5, 5, '03333',),
+]
+
+
+@pytest.mark.parametrize('lat, lon, zoom, expected', TEST_LAT_LON_ZOOM_TILES)
+def test_lat_lon_to_quadtree(lat, lon, zoom, expected):
+    """Tests making a quadtree from a lat, lon"""
+    gm = GlobalMercator()
+    assert gm.lat_lon_to_quadtree(lat, lon, zoom) == expected
+    tx, ty = gm.quadtree_to_tile(expected, zoom)
+    assert gm.QuadTree(tx, ty, zoom) == expected
+
+
+def test_lat_lon_arrays_to_quadtrees():
+    """Tests making arrays of quadtrees, with mixed zoom levels"""
+    gm = GlobalMercator()
+    lats, lons, zooms, expected = zip(*TEST_LAT_LON_ZOOM_TILES)
+    quadtrees = gm.lat_lon_arrays_to_quadtrees(lats, lons, zooms)
+    assert quadtrees.tolist() == list(expected)
+    quadtrees = gm.lat_lon_arrays_to_quadtrees(lats, lons)
+    assert quadtrees.tolist() == [
+        gm.lat_lon_to_quadtree(lat, lon) for lat, lon in zip(lats, lons)
+    ]
+
+
+def test_quadtrees_to_lat_lon_arrays():
+    """Tests getting the bounds of arrays of quadtrees"""
+    gm = GlobalMercator()
+    quadtrees = [tile for _, _, _, tile in TEST_LAT_LON_ZOOM_TILES] + ['1202', '']
+    bounds = gm.quadtrees_to_lat_lon_arrays(quadtrees)
+    for i, quadtree in enumerate(quadtrees):
+        assert np.allclose(
+            [b[i] for b in bounds],
+            gm.quadtree_to_lat_lon(quadtree),
+        )
+    assert np.allclose(
+        [b[4] for b in bounds],
+        [40.979898069620155, 0.0, 55.7765730186677, 22.499999999999986],
+    )
+    lons, lats = gm.quadtrees_to_geojson_lon_lat_arrays(quadtrees)
+    assert np.allclose([lons[0], lats[0]], gm.quadtree_to_geojson_lon_lat(quadtrees[0]))
+    with pytest.raises(ValueError):
+        gm.quadtrees_to_lat_lon_arrays(['1202', '1a'])
+    with pytest.raises(ValueError):
+        gm.quadtree_to_lat_lon('14')
@@ -0,0 +1,57 @@
+import pytest
+import logging
+
+from django.db.models import Q
+
+from opencontext_py.libs import keysetpages
+
+
+logger = logging.getLogger("tests-unit-logger")
+
+
+PAGES = [
+    [
+        {'uuid': 'a', 'label': 'A', 'sort': 1.0, 'note': None},
+        {'uuid': 'b', 'label': None, 'sort': None, 'note': None},
+    ],
+    [
+        {'uuid': 'c', 'label': 'C', 'sort': 2.5, 'note': 'x'},
+    ],
+]
+
+
+def test_make_keyset_after_q():
+    """Tests making filters for rows after the last row of a page"""
+    after_q = keysetpages.make_keyset_after_q(['sort', 'uuid'], [1.0, 'a'])
+    assert after_q == (
+        (Q() & (Q(sort__gt=1.0) | Q(sort__isnull=True)))
+        | ((Q() & Q(sort=1.0)) & (Q(uuid__gt='a') | Q(uuid__isnull=True)))
+    )
+    # Nothing sorts after a NULL, so only the uuid can come after.
+    after_q = keysetpages.make_keyset_after_q(['sort', 'uuid'], [None, 'b'])
+    assert after_q == (
+        (Q() & Q(sort__isnull=True)) & (Q(uuid__gt='b') | Q(uuid__isnull=True))
+    )
+
+
+@pytest.mark.parametrize('spill', [False, True])
+def test_make_df_from_pages(spill, tmp_path):
+    """Tests concatenating pages into one dataframe, in memory or
+    spilled to Parquet files"""
+    spill_dir = None
+    if spill:
+        spill_dir = str(tmp_path)
+    df = keysetpages.make_df_from_pages(
+        PAGES,
+        drop_cols=['sort'],
+        spill_dir=spill_dir,
+    )
+    assert df.columns.tolist() == ['uuid', 'label', 'note']
+    assert df['uuid'].tolist() == ['a', 'b', 'c']
+    assert df['label'].isnull().tolist() == [False, True, False]
+    assert df['label'].tolist()[2] == 'C'
+    assert df['note'].isnull().tolist() == [True, True, False]
+    if spill:
+        # The temporary page files are gone.
+        assert not list(tmp_path.iterdir())
+    assert keysetpages.make_df_from_pages([]).empty
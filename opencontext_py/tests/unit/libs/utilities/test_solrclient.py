@@ -0,0 +1,18 @@
+import pytest
+import logging
+
+from opencontext_py.libs import solrclient
+
+
+logger = logging.getLogger("tests-unit-logger")
+
+
+def test_make_solr_session_retries():
+    """Tests that Solr sessions retry connection errors and unavailable
+    statuses, but not read timeouts"""
+    session = solrclient.make_solr_session(max_retries=3)
+    retry = session.get_adapter('http://localhost:8983/solr').max_retries
+    assert retry.total == 3
+    assert retry.connect == 3
+    assert retry.read == 0
+    assert retry.status_forcelist == solrclient.SOLR_RETRY_STATUS_CODES
@@ -0,0 +1,74 @@
+import pytest
+import logging
+
+from lxml import etree
+
+from opencontext_py.apps.oai.solr_oai_pmh import SolrOAIpmh
+
+
+logger = logging.getLogger("tests-unit-logger")
+
+
+ITEMS = [
+    {
+        'uuid': f'uuid-{i}',
+        'uri': f'https://opencontext.org/media/uuid-{i}',
+        'published': '2020-01-02T00:00:00Z',
+    }
+    for i in range(3)
+]
+
+
+def test_make_resumption_token_element():
+    """Tests resumption tokens for the parts of a list"""
+    oai_obj = SolrOAIpmh()
+    api_json_obj = {
+        'oc-api:has-results': ITEMS,
+        'totalResults': 5,
+        'itemsPerPage': 3,
+        'cursor': 0,
+        'nextCursorMark': 'next-mark',
+        'oai-pmh:earliestDatestamp': None,
+        'dcmi:created': '2024-01-01T00:00:00Z',
+    }
+    token_xml = oai_obj.make_resumption_token_element(None, api_json_obj)
+    assert token_xml.get('completeListSize') == '5'
+    assert token_xml.get('cursor') == '0'
+    assert '"cursorMark": "next-mark"' in token_xml.text
+    assert '"cursor": 3' in token_xml.text
+    assert '"published": "[* TO 2024-01-01T00:00:00Z]"' in token_xml.text
+
+    # The last part of a list gets an empty token.
+    api_json_obj['cursor'] = 3
+    api_json_obj['oc-api:has-results'] = ITEMS[:2]
+    token_xml = oai_obj.make_resumption_token_element(
+        {'rows': 3, 'sort': 'published--desc', 'cursorMark': 'next-mark'},
+        api_json_obj,
+    )
+    assert token_xml.text is None
+    assert token_xml.get('cursor') == '3'
+
+    # A complete list doesn't need a token.
+    api_json_obj['cursor'] = 0
+    api_json_obj['totalResults'] = 2
+    assert oai_obj.make_resumption_token_element(None, api_json_obj) is None
+
+
+def test_iter_xml_bytes_list_identifiers():
+    """Tests streaming the XML for a list of identifiers"""
+    oai_obj = SolrOAIpmh()
+    oai_obj.make_xml_root()
+    oai_obj.make_general_xml()
+    oai_obj.stream_list_tag = 'ListIdentifiers'
+    oai_obj.stream_items = ITEMS
+    oai_obj.OAI_RECORD_BATCH_SIZE = 2
+    chunks = list(oai_obj.iter_xml_bytes())
+    # One chunk for each batch of items, then the end of the document.
+    assert len(chunks) == 3
+    root = etree.fromstring(b''.join(chunks))
+    ids = root.findall(
+        '{' + oai_obj.OAI_PMH_NS + '}ListIdentifiers/'
+        + '{' + oai_obj.OAI_PMH_NS + '}header/'
+        + '{' + oai_obj.OAI_PMH_NS + '}identifier'
+    )
+    assert [id_xml.text for id_xml in ids] == [act_item['uri'] for act_item in ITEMS]
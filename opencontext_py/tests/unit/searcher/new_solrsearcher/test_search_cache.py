@@ -0,0 +1,89 @@
+import pytest
+import logging
+
+from django.core.cache.backends.locmem import LocMemCache
+
+from opencontext_py.apps.searcher.new_solrsearcher import search_cache
+
+
+logger = logging.getLogger("tests-unit-logger")
+
+
+TESTS_REQUEST_PROJECT_SLUGS = [
+    # Tuples of test cases, with request dicts and expected output lists:
+    #
+    # (request_dict, expected_project_slugs,),
+    #
+    ({}, [],),
+    ({'q': 'pottery'}, [],),
+    ({'proj': ['foo']}, ['foo'],),
+    ({'proj': ['foo---bar']}, ['foo', 'bar'],),
+    ({'proj': ['foo---bar||bad']}, ['foo', 'bar', 'bad'],),
+    ({'proj': ['foo', 'bar---foo']}, ['foo', 'bar'],),
+]
+
+
+def test_get_request_project_slugs():
+    """Tests extraction of project slugs from a search request"""
+    for request_dict, expected_slugs in TESTS_REQUEST_PROJECT_SLUGS:
+        slugs = search_cache.get_request_project_slugs(request_dict)
+        assert slugs == expected_slugs
+
+
+def test_search_lock_tokens(monkeypatch):
+    """Tests that only the holder of a lock can release it"""
+    cache = LocMemCache('test-search-lock', {})
+    monkeypatch.setattr(search_cache, 'caches', {'redis_search': cache})
+    token = search_cache.acquire_lock('search_key')
+    assert token
+    # Another process can't get the lock, and can't release it.
+    assert search_cache.acquire_lock('search_key') is None
+    assert not search_cache.release_lock('search_key', None)
+    assert not search_cache.release_lock('search_key', 'other-token')
+    assert search_cache.acquire_lock('search_key') is None
+    assert search_cache.release_lock('search_key', token)
+    assert search_cache.acquire_lock('search_key')
+
+
+def test_cached_search_result_stamps(monkeypatch):
+    """Tests that cached results with an old cache key stamp are stale"""
+    cache = LocMemCache('test-search-result', {})
+    monkeypatch.setattr(search_cache, 'caches', {'redis_search': cache})
+    assert search_cache.get_cached_search_result('result_key', 'gen_1') == (None, False)
+    search_cache.cache_search_result('result_key', 'gen_1', {'a': 1}, timeout=60)
+    assert search_cache.get_cached_search_result('result_key', 'gen_1') == ({'a': 1}, True)
+    assert search_cache.get_cached_search_result('result_key', 'gen_2') == ({'a': 1}, False)
+    # No lock is held, so we don't wait for a fresh result.
+    assert search_cache.wait_for_cached_result('result_key', 'gen_2', wait=1) is None
+
+
+def test_bump_generations_for_unknown_uuids(monkeypatch):
+    """Tests that uuids without manifest items (like deleted items)
+    invalidate all cached searches"""
+    cache = LocMemCache('test-search-gen', {})
+    monkeypatch.setattr(search_cache, 'caches', {'redis_search': cache})
+    monkeypatch.setattr(search_cache, 'get_project_slugs_for_uuids', lambda uuids: [])
+    proj_request = {'proj': ['foo']}
+    old_token = search_cache.get_search_generation_token(proj_request)
+    search_cache.bump_search_generations_for_uuids(['deleted-uuid'])
+    assert search_cache.get_search_generation_token(proj_request) != old_token
+
+    # Known projects only invalidate searches for those projects.
+    monkeypatch.setattr(search_cache, 'get_project_slugs_for_uuids', lambda uuids: ['bar'])
+    old_token = search_cache.get_search_generation_token(proj_request)
+    old_bar_token = search_cache.get_search_generation_token({'proj': ['bar']})
+    search_cache.bump_search_generations_for_uuids(['bar-uuid'])
+    assert search_cache.get_search_generation_token(proj_request) == old_token
+    assert search_cache.get_search_generation_token({'proj': ['bar']}) != old_bar_token
+
+
+def test_index_generation_token(monkeypatch):
+    """Tests that the whole-index token changes with any project's
+    reindexing, unlike another project's search token"""
+    cache = LocMemCache('test-search-index-gen', {})
+    monkeypatch.setattr(search_cache, 'caches', {'redis_search': cache})
+    old_index_token = search_cache.get_index_generation_token()
+    old_foo_token = search_cache.get_search_generation_token({'proj': ['foo']})
+    search_cache.bump_search_generations(['bar'])
+    assert search_cache.get_index_generation_token() != old_index_token
+    assert search_cache.get_search_generation_token({'proj': ['foo']}) == old_foo_token
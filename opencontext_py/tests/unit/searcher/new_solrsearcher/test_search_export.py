@@ -0,0 +1,113 @@
+import json
+import pytest
+import logging
+
+from opencontext_py.apps.searcher.new_solrsearcher import search_export
+
+
+logger = logging.getLogger("tests-unit-logger")
+
+
+TEST_RECORDS = [
+    {'uri': 'https://opencontext.org/subjects/a', 'label': 'A', 'count': 1,},
+    {'uri': 'https://opencontext.org/subjects/b', 'label': 'B, "quoted"',},
+    {'uri': 'https://opencontext.org/subjects/c', 'label': 'C', 'tags': ['x', 'y'],},
+]
+
+
+def test_make_export_request_dict():
+    """Tests removing paging params, and flattening attributes for CSV"""
+    request_dict = {
+        'path': 'Turkey',
+        'start': ['20'],
+        'rows': ['100'],
+        'cursorMark': ['abc'],
+        'proj': ['foo'],
+    }
+    export_request_dict = search_export.make_export_request_dict(
+        request_dict,
+        export_format='ndjson',
+    )
+    assert export_request_dict == {'path': 'Turkey', 'proj': ['foo']}
+    export_request_dict = search_export.make_export_request_dict(
+        request_dict,
+        export_format='csv',
+    )
+    assert export_request_dict['flatten-attributes'] == ['1']
+    # We did not change the original request dict.
+    assert request_dict['start'] == ['20']
+
+
+def test_iter_export_lines(monkeypatch):
+    """Tests making lines of NDJSON, GeoJSONSeq, and CSV output"""
+    monkeypatch.setattr(
+        search_export,
+        'iter_export_records',
+        lambda request_dict, export_format, rows: iter(TEST_RECORDS),
+    )
+    lines = list(search_export.iter_export_lines({}, 'ndjson'))
+    assert [json.loads(line) for line in lines] == TEST_RECORDS
+
+    lines = list(search_export.iter_export_lines({}, 'geojsonseq'))
+    for line in lines:
+        assert line.startswith(search_export.GEOJSONSEQ_RECORD_SEPARATOR)
+        assert line.endswith('\n')
+
+    # Columns come from all the records in the first batch.
+    lines = list(search_export.iter_export_lines({}, 'csv', rows=10))
+    assert lines[0] == 'uri,label,count,tags\r\n'
+    assert lines[2] == 'https://opencontext.org/subjects/b,"B, ""quoted""",,\r\n'
+    assert lines[3] == 'https://opencontext.org/subjects/c,C,,"[""x"", ""y""]"\r\n'
+
+    # Columns only come from the first batch.
+    lines = list(search_export.iter_export_lines({}, 'csv', rows=1))
+    assert lines[0] == 'uri,label,count\r\n'
+    assert len(lines) == 4
+
+
+class FakeSolrResults:
+    def __init__(self, raw_response):
+        self.raw_response = raw_response
+
+
+class FakeSolr:
+    """Gives one page of results, then fails on the next cursor page"""
+    def __init__(self):
+        self.cursor_marks = []
+
+    def search(self, **query):
+        self.cursor_marks.append(query['cursorMark'])
+        if len(self.cursor_marks) > 1:
+            raise IOError('Solr went away')
+        return FakeSolrResults(
+            {
+                'response': {'numFound': 2, 'docs': [{'uuid': 'a'}]},
+                'nextCursorMark': 'next',
+            }
+        )
+
+
+class FakeSearchSolr:
+    def __init__(self):
+        self.solr = FakeSolr()
+
+    def solr_connect(self):
+        pass
+
+
+def test_iter_solr_cursor_responses_error(monkeypatch):
+    """Tests that a Solr error on a later cursor page gets raised, rather
+    than ending the export as if it were complete"""
+    search_solr = FakeSearchSolr()
+    monkeypatch.setattr(search_export, 'SearchSolr', lambda: search_solr)
+    monkeypatch.setattr(
+        search_export,
+        'make_export_query',
+        lambda search_solr, request_dict, rows: {'cursorMark': '*'},
+    )
+    responses = search_export.iter_solr_cursor_responses({})
+    solr_json = next(responses)
+    assert solr_json['response']['docs'] == [{'uuid': 'a'}]
+    with pytest.raises(IOError):
+        next(responses)
+    assert search_solr.solr.cursor_marks == ['*', 'next']
@@ -0,0 +1,67 @@
+import pytest
+import logging
+
+from opencontext_py.apps.searcher.new_solrsearcher import search_timing
+
+
+logger = logging.getLogger("tests-unit-logger")
+
+
+TESTS_SERVER_TIMING_HEADER = [
+    # Tuples of test cases, with lists of (stage, duration) tuples
+    # added to a timer and the expected Server-Timing header:
+    #
+    # (stage_durations, expected_header,),
+    #
+    ([], '',),
+    ([('solr', 12.34)], 'solr;dur=12.3',),
+    ([('solr', 10), ('json', 2.5)], 'solr;dur=10.0, json;dur=2.5',),
+    # Repeated stages get summed.
+    ([('records', 1), ('json', 2), ('records', 3)], 'records;dur=4.0, json;dur=2.0',),
+    # Missing durations (like a missing Solr QTime) get skipped.
+    ([('solr_qtime', None), ('solr', 5)], 'solr;dur=5.0',),
+]
+
+
+def test_make_server_timing_header():
+    """Tests making Server-Timing header values from timed stages"""
+    for stage_durations, expected_header in TESTS_SERVER_TIMING_HEADER:
+        timer = search_timing.SearchTimer()
+        for stage, duration in stage_durations:
+            timer.add(stage, duration)
+        assert timer.make_server_timing_header() == expected_header
+
+
+def test_stage_context_manager():
+    """Tests that the stage context manager records time, even with
+    exceptions"""
+    timer = search_timing.SearchTimer()
+    with timer.stage('compose_query'):
+        pass
+    with pytest.raises(ValueError):
+        with timer.stage('solr'):
+            raise ValueError('Solr went away')
+    assert list(timer.stages.keys()) == ['compose_query', 'solr']
+    assert timer.stages['solr'] >= 0
+
+
+def test_make_prometheus_text():
+    """Tests making Prometheus text from aggregated metrics"""
+    metrics = {
+        'solr': {
+            'count': 3,
+            'sum': 1500000,
+            '0.5': 2,
+            '1.0': 3,
+        },
+    }
+    text = search_timing.make_prometheus_text(metrics)
+    lines = text.splitlines()
+    name = search_timing.SEARCH_METRICS_NAME
+    assert f'# TYPE {name} histogram' in lines
+    assert f'{name}_bucket{{stage="solr",le="0.25"}} 0' in lines
+    assert f'{name}_bucket{{stage="solr",le="0.5"}} 2' in lines
+    assert f'{name}_bucket{{stage="solr",le="1.0"}} 3' in lines
+    assert f'{name}_bucket{{stage="solr",le="+Inf"}} 3' in lines
+    assert f'{name}_sum{{stage="solr"}} 1.5' in lines
+    assert f'{name}_count{{stage="solr"}} 3' in lines
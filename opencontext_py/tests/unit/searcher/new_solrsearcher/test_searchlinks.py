@@ -1,7 +1,10 @@
 import copy
 import pytest
 import logging
-from opencontext_py.apps.searcher.new_solrsearcher.searchlinks import SearchLinks
+from opencontext_py.apps.searcher.new_solrsearcher.searchlinks import (
+    SearchLinks,
+    SearchLinkTemplate,
+)
 
 logger = logging.getLogger("tests-unit-logger")
 
@@ -154,4 +157,68 @@ def test_replace_param_value():
         urls = sl.make_urls_from_request_dict(
             base_request_url=TEST_BASE_URL
         )
-        assert urls['html'] == expected_html_url
\ No newline at end of file
+        assert urls['html'] == expected_html_url
+
+TESTS_SEARCH_LINK_TEMPLATE = [
+    # Tuples of test cases, with request dicts, template arguments,
+    # and lists of new values dicts for facet options:
+    #
+    # (request_dict, template_kwargs, new_values_list),
+    #
+    (
+        {},
+        {'vary_params': ['type']},
+        [{'type': 'subjects'}, {'type': 'media'},],
+    ),
+    (
+        {'path': 'Italy', 'rows': 20, 'sort': 'label'},
+        {'vary_params': ['path']},
+        [{'path': 'Italy/Rome'}, {'path': None}, {'path': 'Turkey'},],
+    ),
+    (
+        {'path': 'Italy', 'prop': ['foo---bar', 'ipsum---lorum',], 'q': 'a b'},
+        {'vary_params': ['prop'], 'add_to_param_list': True},
+        [{'prop': 'zzz'}, {'prop': 'aaa'}, {'prop': 'foo---bar'},],
+    ),
+    (
+        {'path': 'Italy', 'prop': ['foo---bar', 'ipsum---lorum',]},
+        {'vary_params': ['prop'], 'match_old_value': 'bar'},
+        [{'prop': 'blubbie'}, {'prop': None},],
+    ),
+    (
+        {'proj': 'foo', 'allevent-start': '-500', 'type': 'subjects'},
+        {'vary_params': ['allevent-chronotile', 'allevent-start', 'allevent-stop']},
+        [
+            {'allevent-chronotile': '1020', 'allevent-start': -1000.5, 'allevent-stop': 20},
+            {'allevent-chronotile': '10', 'allevent-start': 5, 'allevent-stop': 6},
+        ],
+    ),
+]
+
+
+def test_search_link_template():
+    """Tests that SearchLinkTemplate URLs match SearchLinks URLs"""
+    for request_dict, template_kwargs, new_values_list in TESTS_SEARCH_LINK_TEMPLATE:
+        sl_tmpl = SearchLinkTemplate(
+            request_dict=copy.deepcopy(request_dict),
+            base_search_url=TEST_BASE_URL,
+            base_request_url=TEST_BASE_URL,
+            **template_kwargs
+        )
+        for new_values in new_values_list:
+            sl = SearchLinks(
+                request_dict=copy.deepcopy(request_dict),
+                base_search_url=TEST_BASE_URL
+            )
+            sl.remove_non_query_params()
+            for param, new_value in new_values.items():
+                sl.replace_param_value(
+                    param,
+                    match_old_value=template_kwargs.get('match_old_value'),
+                    new_value=new_value,
+                    add_to_param_list=template_kwargs.get('add_to_param_list', False),
+                )
+            expected_urls = sl.make_urls_from_request_dict(
+                base_request_url=TEST_BASE_URL
+            )
+            assert sl_tmpl.make_urls(new_values) == expected_urls
@@ -94,6 +94,9 @@ urlpatterns = [
     re_path(r'^suggest.json?', NewSearchViews.suggest_json, name='new_search_suggest_json'),
     re_path(r'^suggest', NewSearchViews.suggest_json, name='new_search_suggest'),
     re_path(r'^map-projects.json', NewSearchViews.projects_geojson, name='map_projects_geojson'),
+    re_path(r'^query-metrics', NewSearchViews.search_metrics, name='new_search_metrics'),
+    re_path(r'^query\.(?P<export_format>ndjson|csv|geojsonseq)$', NewSearchViews.query_export, name='new_search_export_d'),
+    re_path(r'^query/(?P<spatial_context>\S+)?\.(?P<export_format>ndjson|csv|geojsonseq)$', NewSearchViews.query_export, name='new_search_export'),
     re_path(r'^query.json?', NewSearchViews.query_json, name='new_search_json_d'),
     re_path(r'^query/(?P<spatial_context>\S+)?.json', NewSearchViews.query_json, name='new_search_json'),
     re_path(r'^query/(?P<spatial_context>\S+)?', NewSearchViews.query_html, name='new_search_html'),